@@ -0,0 +1,142 @@
+"""Offline verification of Google ID tokens against a cached signing key set."""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+import jwt
+import requests
+from django.conf import settings
+from jwt.api_jwk import PyJWK, PyJWKSet
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+class GoogleKeysUnavailable(Exception):
+    """Google's signing keys could not be fetched and none are cached."""
+
+
+class GoogleKeyStore:
+    """
+    Process-local cache of Google's JWKS signing keys.
+
+    Keys are fetched over a pooled ``requests`` session and kept for as long as the
+    response's ``Cache-Control: max-age`` allows, so verifying a sign-in is pure CPU
+    work on the hot path. An unknown ``kid`` triggers an early refresh to pick up
+    key rotation, at most once per ``forced_refresh_interval`` seconds so forged
+    tokens cannot drive unbounded fetches. A failed refresh keeps serving the
+    stale keys and is not retried for ``forced_refresh_interval`` seconds, so an
+    outage does not put a blocking fetch in front of every sign-in.
+    """
+
+    def __init__(
+        self,
+        certs_url: str,
+        session: Optional[requests.Session] = None,
+        default_ttl: int = 3600,
+        timeout: float = 5.0,
+        forced_refresh_interval: float = 60.0,
+    ) -> None:
+        self.certs_url = certs_url
+        self.default_ttl = default_ttl
+        self.timeout = timeout
+        self.forced_refresh_interval = forced_refresh_interval
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self.session = session
+        self._keys: Dict[str, PyJWK] = {}
+        self._expires_at = 0.0
+        self._forced_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _ttl(self, headers: Mapping[str, str]) -> int:
+        match = MAX_AGE_PATTERN.search(headers.get("Cache-Control", ""))
+        if not match:
+            return self.default_ttl
+        age = int(headers.get("Age", "0") or 0)
+        return max(int(match.group(1)) - age, 0)
+
+    def _fresh(self) -> bool:
+        return bool(self._keys) and time.monotonic() < self._expires_at
+
+    def refresh(self, force: bool = False) -> None:
+        # Checked before locking too, so verifying with cached keys never waits on a fetch.
+        if not force and self._fresh():
+            return
+        with self._lock:
+            now = time.monotonic()
+            if force:
+                if self._forced_at is not None and now - self._forced_at < self.forced_refresh_interval:
+                    return
+                self._forced_at = now
+            elif self._fresh():
+                return
+            try:
+                response = self.session.get(self.certs_url, timeout=self.timeout)
+                response.raise_for_status()
+                key_set = PyJWKSet.from_dict(response.json())
+            except (requests.RequestException, ValueError, jwt.PyJWTError) as exc:
+                if not self._keys:
+                    raise GoogleKeysUnavailable(f"Unable to fetch Google signing keys: {exc}") from exc
+                logger.warning("Refreshing Google signing keys failed, serving cached keys: %s", exc)
+                self._expires_at = time.monotonic() + min(self.forced_refresh_interval, self.default_ttl)
+                return
+            self._keys = {key.key_id: key for key in key_set.keys if key.public_key_use in ("sig", None)}
+            self._expires_at = time.monotonic() + self._ttl(response.headers)
+
+    def get_key(self, kid: Optional[str]) -> PyJWK:
+        self.refresh()
+        key = self._keys.get(kid or "")
+        if key is None:
+            self.refresh(force=True)
+            key = self._keys.get(kid or "")
+        if key is None:
+            raise ValueError(f"No Google signing key matches kid '{kid}'.")
+        return key
+
+    def verify(self, token: str, audience: str) -> Dict[str, object]:
+        """
+        Validate signature, audience, expiry and issuer; raises ``ValueError`` when invalid.
+
+        Raises ``GoogleKeysUnavailable`` when the keys cannot be fetched at all.
+        """
+
+        try:
+            header = jwt.get_unverified_header(token)
+            key = self.get_key(header.get("kid"))
+            claims = jwt.decode(
+                token,
+                key.key,
+                algorithms=[key.algorithm_name],
+                audience=audience,
+                leeway=settings.GOOGLE_OAUTH_CLOCK_SKEW_SECONDS,
+                options={"require": ["exp", "iat"]},
+            )
+        except jwt.PyJWTError as exc:
+            raise ValueError(str(exc)) from exc
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {claims.get('iss')}")
+        return claims
+
+
+_key_store: Optional[GoogleKeyStore] = None
+_key_store_lock = threading.Lock()
+
+
+def get_google_key_store() -> GoogleKeyStore:
+    """Return the shared key store for ``settings.GOOGLE_OAUTH_CERTS_URL``."""
+
+    global _key_store
+    with _key_store_lock:
+        if _key_store is None or _key_store.certs_url != settings.GOOGLE_OAUTH_CERTS_URL:
+            _key_store = GoogleKeyStore(settings.GOOGLE_OAUTH_CERTS_URL)
+        return _key_store
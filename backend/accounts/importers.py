@@ -0,0 +1,295 @@
+"""Bulk onboarding of facilities and staff accounts from CSV/XLSX files."""
+from __future__ import annotations
+
+import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+from rest_framework.authtoken.models import Token
+
+from inventory.models import Facility
+
+from .models import User
+from .utils import generate_usernames, normalize_email
+
+FACILITY_FIELDS = (
+    "name",
+    "facility_type",
+    "ownership",
+    "address",
+    "city",
+    "state",
+    "lga",
+    "latitude",
+    "longitude",
+    "contact_email",
+    "contact_phone",
+)
+BATCH_SIZE = 1000
+HASH_CHUNK_SIZE = 200
+
+
+@dataclass
+class RowError:
+    sheet: str
+    row: int
+    message: str
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"sheet": self.sheet, "row": self.row, "message": self.message}
+
+
+@dataclass
+class ImportReport:
+    facilities_created: int = 0
+    facilities_updated: int = 0
+    users_created: int = 0
+    tokens_created: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "facilities_created": self.facilities_created,
+            "facilities_updated": self.facilities_updated,
+            "users_created": self.users_created,
+            "tokens_created": self.tokens_created,
+            "errors": [error.as_dict() for error in self.errors],
+        }
+
+
+def read_rows(handle: IO, filename: str) -> Iterator[Dict[str, str]]:
+    """Yield dict rows from a CSV or XLSX upload, keyed by lower-cased header."""
+
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        try:
+            from openpyxl import load_workbook
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ValueError("Reading XLSX files requires the 'openpyxl' package.") from exc
+
+        workbook = load_workbook(handle, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(value or "").strip().lower() for value in next(rows, ())]
+        for values in rows:
+            yield {
+                key: "" if value is None else str(value).strip()
+                for key, value in zip(header, values)
+                if key
+            }
+        workbook.close()
+        return
+
+    if isinstance(handle.read(0), bytes):
+        handle = io.TextIOWrapper(handle, encoding="utf-8-sig", newline="")
+    for row in csv.DictReader(handle):
+        yield {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+
+
+def _init_hash_worker() -> None:
+    """Configure Django in spawned worker processes (no-op under fork)."""
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "healteex_backend.settings")
+    django.setup()
+
+
+def _hash_chunk(passwords: Sequence[Optional[str]]) -> List[str]:
+    return [make_password(password or None) for password in passwords]
+
+
+def hash_passwords(passwords: Sequence[Optional[str]], processes: Optional[int] = None) -> List[str]:
+    """
+    Hash passwords across a process pool.
+
+    PBKDF2 dominates the cost of account creation, so chunks are farmed out to
+    ``processes`` workers. Blank passwords produce unusable password hashes.
+    """
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    usable = sum(1 for password in passwords if password)
+    if processes <= 1 or usable < HASH_CHUNK_SIZE:
+        return _hash_chunk(passwords)
+
+    chunks = [passwords[i : i + HASH_CHUNK_SIZE] for i in range(0, len(passwords), HASH_CHUNK_SIZE)]
+    hashed: List[str] = []
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_hash_worker) as pool:
+        for chunk in pool.map(_hash_chunk, chunks):
+            hashed.extend(chunk)
+    return hashed
+
+
+class OnboardingImporter:
+    """
+    Import facilities and users in one pass.
+
+    Facilities are upserted on ``code``; users reference facilities through a
+    ``facility_code`` column that is resolved with a single bulk lookup. Invalid
+    rows are skipped and reported rather than aborting the whole import.
+    """
+
+    def __init__(self, processes: Optional[int] = None, issue_tokens: bool = True) -> None:
+        self.processes = processes
+        self.issue_tokens = issue_tokens
+
+    def run(
+        self,
+        facility_rows: Iterable[Dict[str, str]] = (),
+        user_rows: Iterable[Dict[str, str]] = (),
+    ) -> ImportReport:
+        report = ImportReport()
+        with transaction.atomic():
+            self._import_facilities(facility_rows, report)
+            self._import_users(user_rows, report)
+        report.errors.sort(key=lambda error: (error.sheet != "facilities", error.row))
+        return report
+
+    # --- Facilities ---------------------------------------------------
+    def _import_facilities(self, rows: Iterable[Dict[str, str]], report: ImportReport) -> None:
+        """
+        Upsert facilities on ``code``.
+
+        Existing facilities only take the columns present in the file, so a
+        partial sheet (e.g. ``code,contact_phone``) never blanks the others.
+        """
+
+        rows = list(rows)
+        columns = {key for row in rows for key in row}
+        missing = [name for name in FACILITY_FIELDS if name not in columns]
+        existing = set(self._resolve_facilities({row.get("code", "") for row in rows}))
+
+        facilities: Dict[str, Facility] = {}
+        for index, row in enumerate(rows, start=2):
+            code = row.get("code", "")
+            facility = Facility(code=code)
+            for name in FACILITY_FIELDS:
+                value = row.get(name, "")
+                if name in ("latitude", "longitude"):
+                    value = value or None
+                setattr(facility, name, value)
+            try:
+                facility.full_clean(exclude=missing if code in existing else None, validate_unique=False)
+            except ValidationError as exc:
+                report.errors.append(RowError("facilities", index, _format_error(exc)))
+                continue
+            if code in facilities:
+                report.errors.append(RowError("facilities", index, f"Duplicate facility code '{code}' in file."))
+                continue
+            facilities[code] = facility
+
+        if not facilities:
+            return
+
+        Facility.objects.bulk_create(
+            facilities.values(),
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["code"],
+            update_fields=[name for name in FACILITY_FIELDS if name in columns] + ["updated_at"],
+        )
+        updated = len(existing & set(facilities))
+        report.facilities_updated += updated
+        report.facilities_created += len(facilities) - updated
+
+    # --- Users --------------------------------------------------------
+    def _import_users(self, rows: Iterable[Dict[str, str]], report: ImportReport) -> None:
+        roles = dict(User.Roles.choices)
+        candidates: List[Tuple[int, Dict[str, str]]] = []
+        seen: set = set()
+        for index, row in enumerate(rows, start=2):
+            email = row.get("email", "")
+            role = row.get("role", "") or User.Roles.PHARMACIST
+            try:
+                validate_email(email)
+            except ValidationError:
+                report.errors.append(RowError("users", index, f"Invalid email '{email}'."))
+                continue
+            if role not in roles:
+                report.errors.append(RowError("users", index, f"Unsupported role '{role}'."))
+                continue
+            key = (normalize_email(email), role)
+            if key in seen:
+                report.errors.append(RowError("users", index, "Duplicate email and role in file."))
+                continue
+            seen.add(key)
+            row["role"] = role
+            candidates.append((index, row))
+
+        if not candidates:
+            return
+
+        facility_ids = self._resolve_facilities({row.get("facility_code", "") for _, row in candidates})
+        existing = self._existing_accounts(candidates)
+
+        accepted: List[Tuple[int, Dict[str, str]]] = []
+        for index, row in candidates:
+            facility_code = row.get("facility_code", "")
+            if facility_code and facility_code not in facility_ids:
+                report.errors.append(RowError("users", index, f"Unknown facility code '{facility_code}'."))
+                continue
+            if (normalize_email(row["email"]), row["role"]) in existing:
+                report.errors.append(RowError("users", index, "An account already exists for this email and role."))
+                continue
+            accepted.append((index, row))
+
+        if not accepted:
+            return
+
+        usernames = generate_usernames([(row["email"], row["role"]) for _, row in accepted])
+        password_hashes = hash_passwords([row.get("password", "") for _, row in accepted], self.processes)
+        users = [
+            User(
+                username=username,
+                email=row["email"],
+                role=row["role"],
+                first_name=row.get("first_name", ""),
+                last_name=row.get("last_name", ""),
+                facility_id=facility_ids.get(row.get("facility_code", "")),
+                password=password_hash,
+            )
+            for (_, row), username, password_hash in zip(accepted, usernames, password_hashes)
+        ]
+        User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+        report.users_created += len(users)
+
+        if self.issue_tokens:
+            if any(user.pk is None for user in users):
+                ids = dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+                for user in users:
+                    user.pk = ids[user.username]
+            tokens = [Token(key=Token.generate_key(), user=user) for user in users]
+            Token.objects.bulk_create(tokens, batch_size=BATCH_SIZE)
+            report.tokens_created += len(tokens)
+
+    def _resolve_facilities(self, codes: Iterable[str]) -> Dict[str, int]:
+        codes = [code for code in codes if code]
+        resolved: Dict[str, int] = {}
+        for offset in range(0, len(codes), BATCH_SIZE):
+            resolved.update(
+                Facility.objects.filter(code__in=codes[offset : offset + BATCH_SIZE]).values_list("code", "id")
+            )
+        return resolved
+
+    def _existing_accounts(self, candidates: Sequence[Tuple[int, Dict[str, str]]]) -> set:
+        emails = list({normalize_email(row["email"]) for _, row in candidates})
+        existing: set = set()
+        for offset in range(0, len(emails), BATCH_SIZE):
+            existing.update(
+                User.objects.annotate(email_lower=Lower("email"))
+                .filter(email_lower__in=emails[offset : offset + BATCH_SIZE])
+                .values_list("email_lower", "role")
+            )
+        return existing
+
+
+def _format_error(exc: ValidationError) -> str:
+    if hasattr(exc, "message_dict"):
+        return "; ".join(f"{name}: {' '.join(messages)}" for name, messages in exc.message_dict.items())
+    return " ".join(exc.messages)
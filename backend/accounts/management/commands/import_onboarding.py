@@ -0,0 +1,52 @@
+"""Management command for bulk onboarding facilities and staff accounts."""
+from __future__ import annotations
+
+import json
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.importers import OnboardingImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = "Imports facilities and users from CSV/XLSX files in a single pass."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--facilities", help="CSV/XLSX file of facilities keyed by 'code'.")
+        parser.add_argument("--users", help="CSV/XLSX file of users with an optional 'facility_code' column.")
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=None,
+            help="Worker processes used for password hashing (defaults to the CPU count).",
+        )
+        parser.add_argument("--no-tokens", action="store_true", help="Skip minting API tokens for new users.")
+
+    def handle(self, *args, **options):
+        if not options["facilities"] and not options["users"]:
+            raise CommandError("Provide --facilities and/or --users.")
+
+        importer = OnboardingImporter(processes=options["processes"], issue_tokens=not options["no_tokens"])
+        with ExitStack() as stack:
+            sources = {}
+            for name in ("facilities", "users"):
+                path = options[name]
+                if not path:
+                    sources[name] = ()
+                    continue
+                try:
+                    handle = stack.enter_context(open(path, "rb"))
+                except OSError as exc:
+                    raise CommandError(f"Cannot open {path}: {exc}") from exc
+                sources[name] = read_rows(handle, path)
+            try:
+                report = importer.run(facility_rows=sources["facilities"], user_rows=sources["users"])
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+
+        for error in report.errors:
+            self.stderr.write(f"{error.sheet} row {error.row}: {error.message}")
+        summary = report.as_dict()
+        summary.pop("errors")
+        self.stdout.write(self.style.SUCCESS(f"Import finished: {json.dumps(summary)} ({len(report.errors)} errors)"))
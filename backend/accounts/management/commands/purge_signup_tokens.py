@@ -0,0 +1,29 @@
+"""Management command that deletes signup tokens which can no longer be redeemed."""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from accounts.models import SignupToken
+
+
+class Command(BaseCommand):
+    help = "Deletes expired or used signup tokens in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many tokens would be deleted.")
+
+    def handle(self, *args, **options):
+        queryset = SignupToken.purgeable()
+        if options["dry_run"]:
+            self.stdout.write(f"{queryset.count()} signup tokens would be deleted")
+            return
+
+        deleted = 0
+        while True:
+            batch = list(queryset.values_list("pk", flat=True)[: options["batch_size"]])
+            if not batch:
+                break
+            deleted += SignupToken.objects.filter(pk__in=batch).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} signup tokens"))
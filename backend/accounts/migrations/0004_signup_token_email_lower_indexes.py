@@ -0,0 +1,23 @@
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0003_signuptoken"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="signuptoken",
+            index=models.Index(Lower("email"), models.F("role"), name="accounts_st_email_lower_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="signuptoken",
+            index=models.Index(fields=["expires_at"], name="accounts_st_expires_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(Lower("email"), name="accounts_user_email_lower_idx"),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0004_signup_token_email_lower_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="user",
+            name="accounts_user_email_lower_idx",
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(Lower("email"), models.F("role"), name="accounts_user_email_role_idx"),
+        ),
+    ]
@@ -5,6 +5,7 @@ from datetime import timedelta
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 from django.utils.crypto import get_random_string
 
@@ -33,6 +34,11 @@ class User(AbstractUser):
         help_text="Facility associated with the user, if applicable.",
     )
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(Lower("email"), "role", name="accounts_user_email_role_idx"),
+        ]
+
     def __str__(self) -> str:  # pragma: no cover - trivial representation
         return f"{self.get_full_name()} ({self.username})"
 
@@ -51,6 +57,8 @@ class SignupToken(models.Model):
         indexes = [
             models.Index(fields=["email", "role"]),
             models.Index(fields=["token"]),
+            models.Index(Lower("email"), "role", name="accounts_st_email_lower_idx"),
+            models.Index(fields=["expires_at"], name="accounts_st_expires_idx"),
         ]
         ordering = ["-created_at"]
 
@@ -58,6 +66,29 @@ class SignupToken(models.Model):
         self.is_used = True
         self.save(update_fields=["is_used"])
 
+    def claim(self) -> bool:
+        """
+        Atomically mark the token used if it is still valid.
+
+        Issues a single conditional UPDATE so that two concurrent verifications of
+        the same token cannot both succeed; returns whether this caller won.
+        """
+
+        claimed = SignupToken.objects.filter(
+            pk=self.pk,
+            is_used=False,
+            expires_at__gte=timezone.now(),
+        ).update(is_used=True)
+        if claimed:
+            self.is_used = True
+        return bool(claimed)
+
+    @classmethod
+    def purgeable(cls):
+        """Tokens that can no longer be redeemed."""
+
+        return cls.objects.filter(models.Q(is_used=True) | models.Q(expires_at__lt=timezone.now()))
+
     @classmethod
     def issue(cls, email: str, role: str, lifetime_minutes: int = 30) -> "SignupToken":
         """Create a new signed token with a short lifetime."""
@@ -0,0 +1,16 @@
+"""Role-based DRF permissions."""
+from __future__ import annotations
+
+from rest_framework.permissions import BasePermission
+
+from .models import User
+
+
+class IsPolicyMakerOrSuperAdmin(BasePermission):
+    """Allow national views to policy makers, super admins and Django superusers."""
+
+    def has_permission(self, request, view) -> bool:
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        return user.is_superuser or user.role in (User.Roles.POLICY_MAKER, User.Roles.SUPER_ADMIN)
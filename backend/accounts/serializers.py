@@ -1,11 +1,13 @@
 """Serializers for accounts API."""
 from __future__ import annotations
 
+from django.db import transaction
+from django.db.models.functions import Lower
 from django.utils import timezone
 from rest_framework import serializers
 
 from .models import SignupToken, User
-from .utils import generate_username
+from .utils import generate_username, normalize_email, save_with_unique_username, users_with_email
 
 
 class SignupRequestSerializer(serializers.Serializer):
@@ -15,8 +17,8 @@ class SignupRequestSerializer(serializers.Serializer):
     def validate(self, attrs):
         email = attrs["email"]
         role = attrs["role"]
-        active_tokens = SignupToken.objects.filter(
-            email__iexact=email,
+        active_tokens = SignupToken.objects.alias(email_lower=Lower("email")).filter(
+            email_lower=normalize_email(email),
             role=role,
             is_used=False,
             expires_at__gte=timezone.now(),
@@ -60,31 +62,32 @@ class SignupVerifySerializer(serializers.Serializer):
         last_name = self.validated_data.get("last_name", "")
         password = self.validated_data.get("password")
 
-        user_exists = User.objects.filter(
-            email__iexact=signup_token.email,
-            role=signup_token.role,
-        ).exists()
-        if user_exists:
-            signup_token.mark_used()
-            raise serializers.ValidationError(
-                {"token": "An account already exists for this email and role. Please log in instead."}
-            )
-
-        username = generate_username(signup_token.email, signup_token.role)
         user = User(
-            username=username,
             email=signup_token.email,
             role=signup_token.role,
             first_name=first_name,
             last_name=last_name,
         )
+        # Hash before claiming so the token row is not held across PBKDF2.
         if password:
             user.set_password(password)
         else:
             user.set_unusable_password()
-        user.save()
 
-        signup_token.mark_used()
+        with transaction.atomic():
+            if not signup_token.claim():
+                raise serializers.ValidationError({"token": "Invalid or expired token."})
+
+            user_exists = users_with_email(signup_token.email, signup_token.role).exists()
+            if not user_exists:
+                user.username = generate_username(signup_token.email, signup_token.role)
+                save_with_unique_username(user)
+
+        if user_exists:
+            # The claim is committed so the token cannot be replayed.
+            raise serializers.ValidationError(
+                {"token": "An account already exists for this email and role. Please log in instead."}
+            )
         return {
             "user": user,
             "remember_me": self.validated_data.get("remember_me", False),
@@ -0,0 +1,137 @@
+"""Offline tests for Google sign-in against a local JWKS stand-in."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from jwt.algorithms import RSAAlgorithm
+from rest_framework.test import APIClient
+
+from accounts.google_auth import GoogleKeyStore
+from accounts.models import User
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+
+def _jwks(kid: str) -> dict:
+    key = json.loads(RSAAlgorithm.to_jwk(PRIVATE_KEY.public_key()))
+    key.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return {"keys": [key]}
+
+
+def _id_token(kid: str = "key-1", **claims) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "iat": now,
+        "exp": now + 600,
+        "email": "Amaka@Gmail.com",
+        "email_verified": True,
+        "given_name": "Amaka",
+        **claims,
+    }
+    return jwt.encode(payload, PRIVATE_KEY, algorithm="RS256", headers={"kid": kid})
+
+
+class _JWKSHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        self.server.hits += 1
+        if self.server.down:
+            self.send_error(503)
+            return
+        body = json.dumps(_jwks(self.server.kid)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", "public, max-age=600, must-revalidate")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class GoogleSignInTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _JWKSHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.certs_url = f"http://127.0.0.1:{cls.server.server_address[1]}/certs"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.server.hits = 0
+        self.server.down = False
+        self.server.kid = "key-1"
+        self.store = GoogleKeyStore(self.certs_url)
+
+    def test_keys_are_fetched_once_within_max_age(self) -> None:
+        for _ in range(3):
+            self.assertEqual(self.store.verify(_id_token(), CLIENT_ID)["email"], "Amaka@Gmail.com")
+
+        self.assertEqual(self.server.hits, 1)
+
+    def test_unknown_kid_refreshes_for_rotation(self) -> None:
+        self.store.verify(_id_token(), CLIENT_ID)
+        self.server.kid = "key-2"
+
+        self.store.verify(_id_token(kid="key-2"), CLIENT_ID)
+
+        self.assertEqual(self.server.hits, 2)
+
+    def test_unknown_kids_cannot_force_repeated_fetches(self) -> None:
+        self.store.verify(_id_token(), CLIENT_ID)
+
+        for kid in ("forged-1", "forged-2", "forged-3"):
+            with self.assertRaises(ValueError):
+                self.store.verify(_id_token(kid=kid), CLIENT_ID)
+
+        self.assertEqual(self.server.hits, 2)
+
+    def test_failed_refresh_serves_stale_keys_without_refetching(self) -> None:
+        self.store.verify(_id_token(), CLIENT_ID)
+        self.server.down = True
+        self.store._expires_at = 0.0  # The cached keys' max-age has run out.
+
+        for _ in range(3):
+            self.store.verify(_id_token(), CLIENT_ID)
+
+        self.assertEqual(self.server.hits, 2)
+
+    def test_rejects_wrong_audience_and_issuer(self) -> None:
+        with self.assertRaises(ValueError):
+            self.store.verify(_id_token(aud="someone-else"), CLIENT_ID)
+        with self.assertRaises(ValueError):
+            self.store.verify(_id_token(iss="https://evil.example"), CLIENT_ID)
+        with self.assertRaises(ValueError):
+            self.store.verify(_id_token(iat=None), CLIENT_ID)
+
+    def test_sign_in_endpoint_provisions_user(self) -> None:
+        with override_settings(GOOGLE_OAUTH_CLIENT_ID=CLIENT_ID, GOOGLE_OAUTH_CERTS_URL=self.certs_url):
+            response = APIClient().post(reverse("google-sign-in"), {"id_token": _id_token()}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(email="Amaka@Gmail.com")
+        self.assertEqual(user.username, "amaka-pharmacist")
+        self.assertFalse(user.has_usable_password())
+
+    def test_unreachable_key_server_is_unavailable_not_invalid(self) -> None:
+        with override_settings(GOOGLE_OAUTH_CLIENT_ID=CLIENT_ID, GOOGLE_OAUTH_CERTS_URL="http://127.0.0.1:9/certs"):
+            response = APIClient().post(reverse("google-sign-in"), {"id_token": _id_token()}, format="json")
+
+        self.assertEqual(response.status_code, 503)
@@ -0,0 +1,41 @@
+"""Tests for email-based login lookups."""
+from __future__ import annotations
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from accounts.utils import users_with_email
+
+
+class EmailLoginTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.pharmacist = User.objects.create_user(
+            username="ada-pharmacist", email="Ada@Clinic.ng", password="S3cure-pass!", role=User.Roles.PHARMACIST
+        )
+
+    def test_lookup_is_case_insensitive_and_role_scoped(self) -> None:
+        User.objects.create(username="ada-policy", email="ada@clinic.ng", role=User.Roles.POLICY_MAKER)
+
+        self.assertEqual(list(users_with_email("  ADA@clinic.NG ", User.Roles.PHARMACIST)), [self.pharmacist])
+        self.assertEqual(users_with_email("ada@clinic.ng").count(), 2)
+
+    def test_jwt_login_by_email(self) -> None:
+        response = self.client.post(
+            reverse("jwt-create"), {"email": "ada@clinic.ng", "password": "S3cure-pass!"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["user"]["username"], "ada-pharmacist")
+
+    def test_jwt_login_requires_role_when_ambiguous(self) -> None:
+        User.objects.create(username="ada-policy", email="ada@clinic.ng", role=User.Roles.POLICY_MAKER)
+
+        response = self.client.post(
+            reverse("jwt-create"), {"email": "ada@clinic.ng", "password": "S3cure-pass!"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("role", response.json())
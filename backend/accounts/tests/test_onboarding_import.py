@@ -0,0 +1,94 @@
+"""Tests for the bulk onboarding importer."""
+from __future__ import annotations
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from inventory.models import Facility
+
+FACILITIES_CSV = b"""code,name,facility_type,ownership,state,lga
+LAG-001,Lagos Clinic,clinic,public,Lagos,Ikeja
+LAG-002,Lagos Pharmacy,pharmacy,private,Lagos,Surulere
+BAD-001,Broken,spaceship,public,Lagos,
+"""
+
+USERS_CSV = b"""email,role,first_name,last_name,facility_code,password
+info@lag1.ng,pharmacist,Ada,Obi,LAG-001,
+info@lag2.ng,pharmacist,Bola,Ade,LAG-002,
+chief@lag1.ng,facility_admin,Chi,Eze,LAG-001,S3cure-pass!
+ghost@lag9.ng,pharmacist,Dayo,Ola,LAG-999,
+existing@demo.ng,pharmacist,Efe,Uche,,
+not-an-email,pharmacist,Funmi,Oni,,
+"""
+
+
+class OnboardingImportApiTests(TestCase):
+    """Exercise the admin-only import endpoint end to end."""
+
+    def setUp(self) -> None:
+        Facility.objects.create(
+            code="LAG-002", name="Old Name", facility_type="pharmacy", ownership="private", state="Lagos"
+        )
+        User.objects.create(username="existing", email="Existing@demo.ng", role=User.Roles.PHARMACIST)
+        self.admin = User.objects.create(username="root", is_staff=True, role=User.Roles.SUPER_ADMIN)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_imports_rows_and_reports_errors(self) -> None:
+        response = self.client.post(
+            reverse("accounts:onboarding-import"),
+            {
+                "facilities": SimpleUploadedFile("facilities.csv", FACILITIES_CSV),
+                "users": SimpleUploadedFile("users.csv", USERS_CSV),
+            },
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(payload["facilities_created"], 1)
+        self.assertEqual(payload["facilities_updated"], 1)
+        self.assertEqual(payload["users_created"], 3)
+        self.assertEqual(payload["tokens_created"], 3)
+        self.assertEqual([(e["sheet"], e["row"]) for e in payload["errors"]], [
+            ("facilities", 4),
+            ("users", 5),
+            ("users", 6),
+            ("users", 7),
+        ])
+
+        self.assertEqual(Facility.objects.get(code="LAG-002").name, "Lagos Pharmacy")
+        chief = User.objects.get(email="chief@lag1.ng")
+        self.assertEqual(chief.facility.code, "LAG-001")
+        self.assertTrue(chief.check_password("S3cure-pass!"))
+        self.assertFalse(User.objects.get(email="info@lag1.ng").has_usable_password())
+        self.assertEqual(
+            sorted(User.objects.filter(email__startswith="info@").values_list("username", flat=True)),
+            ["info-pharmacist", "info-pharmacist-2"],
+        )
+        self.assertTrue(Token.objects.filter(user=chief).exists())
+
+    def test_partial_file_only_updates_its_columns(self) -> None:
+        response = self.client.post(
+            reverse("accounts:onboarding-import"),
+            {"facilities": SimpleUploadedFile("facilities.csv", b"code,contact_phone\nLAG-002,0800\nNEW-001,0801\n")},
+            format="multipart",
+        )
+
+        payload = response.json()
+        self.assertEqual((payload["facilities_updated"], payload["facilities_created"]), (1, 0))
+        # A new facility still needs every required column.
+        self.assertEqual([(e["sheet"], e["row"]) for e in payload["errors"]], [("facilities", 3)])
+        facility = Facility.objects.get(code="LAG-002")
+        self.assertEqual((facility.name, facility.state, facility.contact_phone), ("Old Name", "Lagos", "0800"))
+
+    def test_requires_admin(self) -> None:
+        self.client.force_authenticate(User.objects.create(username="pharm"))
+
+        response = self.client.post(reverse("accounts:onboarding-import"), {}, format="multipart")
+
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,53 @@
+"""Tests for the signup token lifecycle."""
+from __future__ import annotations
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import SignupToken, User
+
+
+class SignupVerifyTests(TestCase):
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.token = SignupToken.issue(email="Nurse@Clinic.ng", role=User.Roles.PHARMACIST)
+
+    def _verify(self):
+        return self.client.post(
+            reverse("accounts:signup-verify"), {"token": self.token.token, "first_name": "Ngozi"}, format="json"
+        )
+
+    def test_token_can_only_be_claimed_once(self) -> None:
+        stale = SignupToken.objects.get(pk=self.token.pk)
+
+        self.assertEqual(self._verify().status_code, 201)
+        self.assertFalse(stale.claim())
+        self.assertEqual(self._verify().status_code, 400)
+        self.assertEqual(User.objects.filter(email="Nurse@Clinic.ng").count(), 1)
+
+    def test_existing_account_consumes_token(self) -> None:
+        User.objects.create(username="nurse", email="nurse@clinic.ng", role=User.Roles.PHARMACIST)
+
+        response = self._verify()
+
+        self.assertEqual(response.status_code, 400)
+        self.token.refresh_from_db()
+        self.assertTrue(self.token.is_used)
+
+
+class PurgeSignupTokensTests(TestCase):
+    def test_removes_used_and_expired_tokens(self) -> None:
+        live = SignupToken.issue(email="a@b.ng", role=User.Roles.PHARMACIST)
+        SignupToken.issue(email="c@d.ng", role=User.Roles.PHARMACIST).mark_used()
+        expired = SignupToken.issue(email="e@f.ng", role=User.Roles.PHARMACIST)
+        SignupToken.objects.filter(pk=expired.pk).update(expires_at=timezone.now() - timedelta(minutes=1))
+
+        call_command("purge_signup_tokens", batch_size=1, stdout=StringIO())
+
+        self.assertEqual(list(SignupToken.objects.values_list("pk", flat=True)), [live.pk])
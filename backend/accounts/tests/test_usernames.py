@@ -0,0 +1,50 @@
+"""Tests for username allocation helpers."""
+from __future__ import annotations
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from accounts.utils import generate_username, generate_usernames, save_with_unique_username
+
+
+class GenerateUsernameTests(TestCase):
+    """Verify suffix allocation stays a single query regardless of collisions."""
+
+    def test_returns_base_when_free(self) -> None:
+        self.assertEqual(generate_username("Info@facility.ng", "pharmacist"), "info-pharmacist")
+
+    def test_picks_next_numeric_suffix_in_one_query(self) -> None:
+        User.objects.bulk_create(
+            [User(username="info-pharmacist")]
+            + [User(username=f"info-pharmacist-{n}") for n in range(2, 12)]
+            + [User(username="info-pharmacist-pharmacist")]
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            username = generate_username("info@facility.ng", "pharmacist")
+
+        self.assertEqual(username, "info-pharmacist-12")
+        self.assertEqual(len(queries), 1)
+
+    def test_bulk_allocation_handles_duplicates_within_batch(self) -> None:
+        User.objects.create(username="admin-facility-admin")
+
+        usernames = generate_usernames(
+            [
+                ("admin@a.ng", "facility_admin"),
+                ("admin@b.ng", "facility_admin"),
+                ("info@a.ng", "pharmacist"),
+            ]
+        )
+
+        self.assertEqual(usernames, ["admin-facility-admin-2", "admin-facility-admin-3", "info-pharmacist"])
+
+    def test_save_reallocates_on_collision(self) -> None:
+        User.objects.create(username="info-pharmacist", email="info@a.ng", role=User.Roles.PHARMACIST)
+        user = User(username="info-pharmacist", email="info@b.ng", role=User.Roles.PHARMACIST)
+
+        save_with_unique_username(user)
+
+        self.assertEqual(user.username, "info-pharmacist-2")
@@ -4,7 +4,7 @@ from __future__ import annotations
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from .views import SignupRequestView, SignupVerifyView, UserViewSet
+from .views import OnboardingImportView, SignupRequestView, SignupVerifyView, UserViewSet
 
 app_name = "accounts"
 
@@ -14,5 +14,6 @@ router.register(r"users", UserViewSet)
 urlpatterns = [
     path("signup/request/", SignupRequestView.as_view(), name="signup-request"),
     path("signup/verify/", SignupVerifyView.as_view(), name="signup-verify"),
+    path("onboarding/import/", OnboardingImportView.as_view(), name="onboarding-import"),
     path("", include(router.urls)),
 ]
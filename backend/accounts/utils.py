@@ -1,11 +1,15 @@
 """Utility helpers for accounts app."""
 from __future__ import annotations
 
-from typing import Dict
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from django.conf import settings
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Length, Lower
+from rest_framework_simplejwt.tokens import RefreshToken
 
 
 def build_jwt_response(user, remember_me: bool = False) -> Dict[str, object]:
@@ -40,20 +44,118 @@ def build_jwt_response(user, remember_me: bool = False) -> Dict[str, object]:
     }
 
 
+def normalize_email(email: str) -> str:
+    """Canonical form used for case-insensitive email lookups."""
+
+    return (email or "").strip().lower()
+
+
+def users_with_email(email: str, role: Optional[str] = None):
+    """
+    Return users whose email matches case-insensitively, optionally for one role.
+
+    Filters on ``LOWER(email)`` so the ``(lower(email), role)`` expression index is
+    used; ``email__iexact`` compiles to ``UPPER(...)`` on Postgres and cannot be.
+    """
+
+    queryset = get_user_model().objects.alias(email_lower=Lower("email")).filter(email_lower=normalize_email(email))
+    if role:
+        queryset = queryset.filter(role=role)
+    return queryset
+
+
+def _username_base(email: str, role: str) -> str:
+    local_part = (email.split("@")[0] or "user").lower()
+    role_slug = role.replace("_", "-")
+    return f"{local_part}-{role_slug}"
+
+
+def _next_suffix(base_username: str, taken: Iterable[str]) -> int:
+    """Return the next free numeric suffix for ``base_username`` given the taken names."""
+
+    pattern = re.compile(rf"^{re.escape(base_username)}(?:-(\d+))?$")
+    highest = 0
+    for username in taken:
+        match = pattern.match(username)
+        if not match:
+            continue
+        highest = max(highest, int(match.group(1) or 1))
+    return highest + 1
+
+
+def _format_username(base_username: str, suffix: int) -> str:
+    return base_username if suffix == 1 else f"{base_username}-{suffix}"
+
+
 def generate_username(email: str, role: str) -> str:
     """
     Generate a unique username based on email + role.
 
-    Ensures uniqueness by appending an incrementing suffix when necessary.
+    The highest existing ``<base>-<n>`` suffix is found with a single query that
+    walks the username index by prefix, so the cost does not grow with the number
+    of users sharing a common local part (``info``, ``admin``...). Callers racing
+    for the same name are resolved by :func:`save_with_unique_username`.
     """
 
     user_model = get_user_model()
-    local_part = (email.split("@")[0] or "user").lower()
-    role_slug = role.replace("_", "-")
-    base_username = f"{local_part}-{role_slug}"
-    candidate = base_username
-    counter = 1
-    while user_model.objects.filter(username=candidate).exists():
-        counter += 1
-        candidate = f"{base_username}-{counter}"
-    return candidate
+    base_username = _username_base(email, role)
+    highest = (
+        user_model.objects.filter(username__startswith=base_username)
+        .filter(username__regex=rf"^{re.escape(base_username)}(-[0-9]+)?$")
+        .order_by(Length("username").desc(), "-username")
+        .values_list("username", flat=True)
+        .first()
+    )
+    if highest is None:
+        return base_username
+    return _format_username(base_username, _next_suffix(base_username, [highest]))
+
+
+def generate_usernames(pairs: Iterable[Tuple[str, str]], chunk_size: int = 500) -> List[str]:
+    """
+    Allocate unique usernames for many ``(email, role)`` pairs in one pass.
+
+    Existing names are fetched with one prefix query per chunk of distinct bases and
+    suffixes are then handed out in memory, so duplicates inside the batch itself
+    (e.g. several ``info@`` addresses) also receive distinct names.
+    """
+
+    user_model = get_user_model()
+    bases = [_username_base(email, role) for email, role in pairs]
+    distinct_bases = list(dict.fromkeys(bases))
+
+    next_suffix: Dict[str, int] = {}
+    for offset in range(0, len(distinct_bases), chunk_size):
+        chunk = distinct_bases[offset : offset + chunk_size]
+        prefix_filter = Q()
+        for base_username in chunk:
+            prefix_filter |= Q(username__startswith=base_username)
+        taken = list(user_model.objects.filter(prefix_filter).values_list("username", flat=True))
+        for base_username in chunk:
+            next_suffix[base_username] = _next_suffix(base_username, taken)
+
+    usernames: List[str] = []
+    for base_username in bases:
+        suffix = next_suffix[base_username]
+        next_suffix[base_username] = suffix + 1
+        usernames.append(_format_username(base_username, suffix))
+    return usernames
+
+
+def save_with_unique_username(user, max_attempts: int = 5) -> None:
+    """
+    Save a new user, re-allocating the username if a concurrent signup claimed it.
+
+    Each attempt runs in its own savepoint so an ``IntegrityError`` on the unique
+    username index does not poison an outer transaction.
+    """
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            with transaction.atomic():
+                user.save()
+            return
+        except IntegrityError:
+            if attempt == max_attempts:
+                raise
+            user.username = generate_username(user.email, user.role)
@@ -2,13 +2,16 @@
 from __future__ import annotations
 
 from django.conf import settings
-from django.core.mail import send_mail
 from rest_framework import status, viewsets
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from notifications.outbox import enqueue_email
+
+from .importers import OnboardingImporter, read_rows
 from .models import SignupToken, User
 from .serializers import SignupRequestSerializer, SignupVerifySerializer, UserSerializer
 from .utils import build_jwt_response
@@ -46,13 +49,7 @@ class SignupRequestView(APIView):
             f"This token expires in {settings.SIGNUP_TOKEN_LIFETIME_MINUTES} minutes."
         )
 
-        send_mail(
-            subject="Healteex signup confirmation",
-            message=message,
-            from_email=None,
-            recipient_list=[token.email],
-            fail_silently=True,
-        )
+        enqueue_email(token.email, "Healteex signup confirmation", message)
 
         return Response(
             {
@@ -75,3 +72,31 @@ class SignupVerifyView(APIView):
         result = serializer.save()
         token_payload = build_jwt_response(result["user"], remember_me=result["remember_me"])
         return Response(token_payload, status=status.HTTP_201_CREATED)
+
+
+class OnboardingImportView(APIView):
+    """Bulk import facilities and users from uploaded CSV/XLSX files (admin only)."""
+
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request: Request, *args, **kwargs) -> Response:  # type: ignore[override]
+        facilities_file = request.FILES.get("facilities")
+        users_file = request.FILES.get("users")
+        if not facilities_file and not users_file:
+            return Response(
+                {"detail": "Upload a 'facilities' and/or 'users' file."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            # Hash in this process: a request must not fork a pool per upload. Large files belong to
+            # `manage.py import_onboarding`, which hashes across every CPU.
+            report = OnboardingImporter(processes=1).run(
+                facility_rows=read_rows(facilities_file, facilities_file.name) if facilities_file else (),
+                user_rows=read_rows(users_file, users_file.name) if users_file else (),
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report.as_dict(), status=status.HTTP_200_OK)
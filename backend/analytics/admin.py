@@ -0,0 +1,35 @@
+"""Admin registrations for analytics models."""
+from __future__ import annotations
+
+from django.contrib import admin
+
+from .models import BacktestResult, BacktestRun, DemandFeature, ForecastModelVersion, ReconciledForecast
+
+
+class BacktestResultInline(admin.TabularInline):
+    model = BacktestResult
+    extra = 0
+
+
+@admin.register(BacktestRun)
+class BacktestRunAdmin(admin.ModelAdmin):
+    list_display = ("id", "created_at", "period", "horizon", "origins", "series", "wall_seconds")
+    inlines = [BacktestResultInline]
+
+
+@admin.register(ReconciledForecast)
+class ReconciledForecastAdmin(admin.ModelAdmin):
+    list_display = ("level", "state", "lga", "medicine", "period_start", "method", "predicted_demand")
+    list_filter = ("level", "method", "model_version")
+
+
+@admin.register(DemandFeature)
+class DemandFeatureAdmin(admin.ModelAdmin):
+    list_display = ("facility", "medicine", "period", "demand", "adjusted_demand", "mean_3", "computed_at")
+    list_filter = ("period", "rainy_season")
+
+
+@admin.register(ForecastModelVersion)
+class ForecastModelVersionAdmin(admin.ModelAdmin):
+    list_display = ("version", "model", "period", "trained_through", "series", "is_active", "mase", "created_at")
+    list_filter = ("model", "period", "is_active")
@@ -0,0 +1,158 @@
+"""
+Rolling-origin backtesting of the models in :mod:`analytics.forecasting`.
+
+For each origin the model is fitted on the periods before it and scored on the
+next ``horizon`` periods. Work is split into (model, chunk of series) tasks run
+on a process pool; workers only receive NumPy arrays and record their own CPU
+time and peak allocation, so the report covers cost as well as accuracy. Like
+the models, this module does not import Django.
+"""
+from __future__ import annotations
+
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .forecasting import get_model
+
+# Scores are accumulated per series; these are the summed fields.
+SCORE_FIELDS = ("ape_sum", "ape_count", "scaled_sum", "scaled_count", "error_sum", "actual_sum")
+
+
+@dataclass
+class SeriesScores:
+    """Per-series error sums of one model over every origin, plus what it cost to produce them."""
+
+    ape_sum: np.ndarray
+    ape_count: np.ndarray
+    scaled_sum: np.ndarray
+    scaled_count: np.ndarray
+    error_sum: np.ndarray
+    actual_sum: np.ndarray
+    seconds: float
+    peak_bytes: int
+
+    @classmethod
+    def concatenate(cls, parts: Sequence["SeriesScores"]) -> "SeriesScores":
+        return cls(
+            **{name: np.concatenate([getattr(part, name) for part in parts]) for name in SCORE_FIELDS},
+            seconds=sum(part.seconds for part in parts),
+            peak_bytes=max((part.peak_bytes for part in parts), default=0),
+        )
+
+
+def rolling_origins(periods: int, horizon: int, origins: int, min_train: int = 2) -> List[int]:
+    """The last ``origins`` one-step-apart origins that leave ``horizon`` periods to score."""
+
+    last = periods - horizon
+    selected = [origin for origin in range(last - origins + 1, last + 1) if origin >= min_train]
+    if not selected:
+        raise ValueError(
+            f"{periods} periods are not enough for a {horizon}-period horizon with {min_train} training periods."
+        )
+    return selected
+
+
+def evaluate(model_name: str, values: np.ndarray, origins: Sequence[int], horizon: int) -> SeriesScores:
+    """
+    Score one model on ``values`` (series × periods) at every origin.
+
+    MASE scales each origin's mean absolute error by the in-sample MAE of the
+    one-step naive forecast on the training window; series whose training
+    window is constant have no scale and are left out of MASE.
+    """
+
+    was_tracing = tracemalloc.is_tracing()
+    if was_tracing:
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.start()
+    started = time.process_time()
+
+    model = get_model(model_name)
+    sums = {name: np.zeros(values.shape[0]) for name in SCORE_FIELDS}
+    for origin in origins:
+        train = values[:, :origin]
+        actual = values[:, origin : origin + horizon]
+        error = model(train, horizon) - actual
+        absolute = np.abs(error)
+
+        positive = actual > 0
+        sums["ape_sum"] += np.where(positive, absolute / np.where(positive, actual, 1), 0).sum(axis=1)
+        sums["ape_count"] += positive.sum(axis=1)
+        scale = np.abs(np.diff(train, axis=1)).mean(axis=1)
+        scaled = scale > 0
+        sums["scaled_sum"] += np.where(scaled, absolute.mean(axis=1) / np.where(scaled, scale, 1), 0)
+        sums["scaled_count"] += scaled
+        sums["error_sum"] += error.sum(axis=1)
+        sums["actual_sum"] += actual.sum(axis=1)
+
+    seconds = time.process_time() - started
+    _, peak = tracemalloc.get_traced_memory()
+    if not was_tracing:
+        tracemalloc.stop()
+    return SeriesScores(**sums, seconds=seconds, peak_bytes=peak)
+
+
+def run_backtest(
+    values: np.ndarray, model_names: Sequence[str], horizon: int, origins: Sequence[int], workers: int = 1
+) -> Dict[str, SeriesScores]:
+    """Evaluate every model on every series, splitting series into ``workers`` chunks per model."""
+
+    chunks = [chunk for chunk in np.array_split(np.arange(values.shape[0]), max(workers, 1)) if len(chunk)]
+    if workers <= 1:
+        return {name: evaluate(name, values, origins, horizon) for name in model_names}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            name: [pool.submit(evaluate, name, values[chunk], origins, horizon) for chunk in chunks]
+            for name in model_names
+        }
+        return {
+            name: SeriesScores.concatenate([future.result() for future in parts]) for name, parts in futures.items()
+        }
+
+
+def summarize(
+    scores: Mapping[str, SeriesScores], groupings: Mapping[str, Tuple[np.ndarray, Sequence[str]]]
+) -> List[dict]:
+    """
+    Aggregate per-series scores into report rows.
+
+    ``groupings`` maps a group-by name to ``(codes, labels)``: one integer code per
+    series indexing ``labels``. MAPE and bias are percentages; bias is positive
+    when forecasts run high.
+    """
+
+    rows = []
+    for model_name, score in scores.items():
+        for group_by, (codes, labels) in groupings.items():
+            totals = {name: np.bincount(codes, getattr(score, name), len(labels)) for name in SCORE_FIELDS}
+            series = np.bincount(codes, minlength=len(labels))
+            for position, label in enumerate(labels):
+                if not series[position]:
+                    continue
+                rows.append(
+                    {
+                        "model": model_name,
+                        "group_by": group_by,
+                        "group": label,
+                        "series": int(series[position]),
+                        "mape": _ratio(totals["ape_sum"][position], totals["ape_count"][position], 100),
+                        "mase": _ratio(totals["scaled_sum"][position], totals["scaled_count"][position]),
+                        "bias": _ratio(totals["error_sum"][position], totals["actual_sum"][position], 100),
+                        "seconds": round(score.seconds, 4),
+                        "peak_memory_mb": round(score.peak_bytes / 2**20, 2),
+                    }
+                )
+    return rows
+
+
+def _ratio(numerator: float, denominator: float, factor: float = 1) -> Optional[float]:
+    if not denominator:
+        return None
+    return round(float(numerator) / float(denominator) * factor, 4)
@@ -0,0 +1,341 @@
+"""Process-local columnar cache of the latest stock position of every facility × medicine pair."""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from healteex_backend.db_routers import use_replicas
+from inventory.models import Facility, Forecast, StockSnapshot
+
+FACILITY_ATTRIBUTES = ("state", "lga", "facility_type", "ownership")
+GROUP_BY_CHOICES = ("national", *FACILITY_ATTRIBUTES, "medicine")
+LOW_STOCK_DAYS = 30
+# Re-read rows changed shortly before the last watermark to catch late commits.
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+@dataclass(frozen=True)
+class CubeData:
+    """
+    Immutable arrays describing one refresh of the cube.
+
+    Pair arrays share an index; ``facility_index`` points into the facility arrays,
+    whose attributes are stored as integer codes into ``labels[attribute]``.
+    """
+
+    facility_ids: np.ndarray
+    attribute_codes: Mapping[str, np.ndarray]
+    labels: Mapping[str, Tuple[str, ...]]
+    facility_index: np.ndarray
+    medicine_ids: np.ndarray
+    stock_on_hand: np.ndarray
+    days_of_stock: np.ndarray
+    snapshot_at: np.ndarray
+    forecast_demand: np.ndarray
+    forecast_date: np.ndarray
+    refreshed_at: Optional[datetime] = None
+
+    @classmethod
+    def empty(cls) -> "CubeData":
+        return cls(
+            facility_ids=np.empty(0, dtype=np.int64),
+            attribute_codes={name: np.empty(0, dtype=np.int32) for name in FACILITY_ATTRIBUTES},
+            labels={name: () for name in FACILITY_ATTRIBUTES},
+            facility_index=np.empty(0, dtype=np.int64),
+            medicine_ids=np.empty(0, dtype=np.int64),
+            stock_on_hand=np.empty(0, dtype=np.float64),
+            days_of_stock=np.empty(0, dtype=np.float64),
+            snapshot_at=np.empty(0, dtype="datetime64[us]"),
+            forecast_demand=np.empty(0, dtype=np.float64),
+            forecast_date=np.empty(0, dtype="datetime64[D]"),
+        )
+
+    def attribute(self, name: str) -> np.ndarray:
+        """Per-pair codes for a facility attribute."""
+
+        return self.attribute_codes[name][self.facility_index]
+
+
+def _utc_naive(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if timezone.is_aware(value) else value
+
+
+class StockCube:
+    """
+    Columnar snapshot of current stock, days of stock and forecast demand.
+
+    The first read builds the arrays from the latest snapshot and forecast of each
+    pair. Later reads apply only rows whose ``updated_at`` moved past the stored
+    watermarks, at most once per ``ANALYTICS_CACHE_REFRESH_SECONDS``, and a full
+    rebuild every ``ANALYTICS_CACHE_REBUILD_SECONDS`` picks up deletions. Each
+    refresh publishes a new :class:`CubeData`, so readers never see a partial update.
+    """
+
+    def __init__(self, refresh_interval: Optional[int] = None, rebuild_interval: Optional[int] = None) -> None:
+        self.refresh_interval = (
+            settings.ANALYTICS_CACHE_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        )
+        self.rebuild_interval = (
+            settings.ANALYTICS_CACHE_REBUILD_SECONDS if rebuild_interval is None else rebuild_interval
+        )
+        self._data = CubeData.empty()
+        self._lock = threading.Lock()
+        self._checked_at = 0.0
+        self._built_at = 0.0
+        self._watermarks: Dict[str, Optional[datetime]] = {}
+        self._pairs: Dict[Tuple[int, int], int] = {}
+        self._facilities: Dict[int, int] = {}
+
+    def data(self) -> CubeData:
+        """Return the current arrays, refreshing them first when they are stale."""
+
+        now = time.monotonic()
+        if now - self._checked_at >= self.refresh_interval:
+            with self._lock:
+                if now - self._checked_at >= self.refresh_interval:
+                    self.refresh(full=now - self._built_at >= self.rebuild_interval)
+        return self._data
+
+    def refresh(self, full: bool = False) -> CubeData:
+        with use_replicas():
+            if full or not self._watermarks:
+                self._rebuild()
+            else:
+                self._apply_changes()
+        self._checked_at = time.monotonic()
+        self._data = replace(self._data, refreshed_at=timezone.now())
+        return self._data
+
+    # --- Loading ------------------------------------------------------
+    def _since(self, name: str):
+        watermark = self._watermarks.get(name)
+        return {} if watermark is None else {"updated_at__gte": watermark - WATERMARK_OVERLAP}
+
+    def _advance(self, name: str, stamps: Iterable[datetime]) -> None:
+        latest = max(stamps, default=None)
+        if latest is not None and (self._watermarks.get(name) is None or latest > self._watermarks[name]):
+            self._watermarks[name] = latest
+
+    def _rebuild(self) -> None:
+        self._watermarks = {"facility": None, "snapshot": None, "forecast": None}
+        self._pairs, self._facilities = {}, {}
+
+        latest_snapshot = StockSnapshot.objects.filter(
+            facility=OuterRef("facility"), medicine=OuterRef("medicine")
+        ).order_by("-recorded_at")
+        latest_forecast = Forecast.objects.filter(
+            facility=OuterRef("facility"), medicine=OuterRef("medicine")
+        ).order_by("-forecast_date", "-period_start")
+        self._apply(
+            CubeData.empty(),
+            facilities=Facility.objects.values_list("id", *FACILITY_ATTRIBUTES, "updated_at"),
+            snapshots=StockSnapshot.objects.filter(
+                pk=Subquery(latest_snapshot.values("pk")[:1])
+            ).values_list("facility_id", "medicine_id", "stock_on_hand", "days_of_stock", "recorded_at", "updated_at"),
+            forecasts=Forecast.objects.filter(pk=Subquery(latest_forecast.values("pk")[:1])).values_list(
+                "facility_id", "medicine_id", "predicted_demand", "forecast_date", "updated_at"
+            ),
+        )
+        self._built_at = time.monotonic()
+
+    def _apply_changes(self) -> None:
+        self._apply(
+            self._data,
+            facilities=Facility.objects.filter(**self._since("facility")).values_list(
+                "id", *FACILITY_ATTRIBUTES, "updated_at"
+            ),
+            snapshots=StockSnapshot.objects.filter(**self._since("snapshot")).values_list(
+                "facility_id", "medicine_id", "stock_on_hand", "days_of_stock", "recorded_at", "updated_at"
+            ),
+            forecasts=Forecast.objects.filter(**self._since("forecast")).values_list(
+                "facility_id", "medicine_id", "predicted_demand", "forecast_date", "updated_at"
+            ),
+        )
+
+    def _apply(
+        self,
+        data: CubeData,
+        facilities: Iterable[Sequence],
+        snapshots: Iterable[Sequence],
+        forecasts: Iterable[Sequence],
+    ) -> None:
+        """Publish ``data`` updated with the given rows; arrays are copied, never modified in place."""
+
+        facilities, snapshots, forecasts = list(facilities), list(snapshots), list(forecasts)
+        if not (facilities or snapshots or forecasts):
+            self._data = data
+            return
+
+        # Facilities: append new ones, then overwrite attribute codes on the copies.
+        labels = {name: list(data.labels[name]) for name in FACILITY_ATTRIBUTES}
+        lookups = {name: {label: code for code, label in enumerate(labels[name])} for name in FACILITY_ATTRIBUTES}
+        new_facilities = [row[0] for row in facilities if row[0] not in self._facilities]
+        for facility_id in new_facilities:
+            self._facilities[facility_id] = len(self._facilities)
+        facility_ids = np.concatenate([data.facility_ids, np.array(new_facilities, dtype=np.int64)])
+        codes = {
+            name: np.concatenate([data.attribute_codes[name], np.zeros(len(new_facilities), dtype=np.int32)])
+            for name in FACILITY_ATTRIBUTES
+        }
+        for row in facilities:
+            position = self._facilities[row[0]]
+            for offset, name in enumerate(FACILITY_ATTRIBUTES, start=1):
+                label = row[offset] or ""
+                if label not in lookups[name]:
+                    lookups[name][label] = len(labels[name])
+                    labels[name].append(label)
+                codes[name][position] = lookups[name][label]
+
+        # Pairs: snapshots and forecasts may introduce pairs not seen before.
+        new_pairs = []
+        for facility_id, medicine_id, *_ in [*snapshots, *forecasts]:
+            key = (facility_id, medicine_id)
+            if key not in self._pairs and facility_id in self._facilities:
+                self._pairs[key] = len(self._pairs)
+                new_pairs.append(key)
+        grow = len(new_pairs)
+        facility_index = np.concatenate(
+            [data.facility_index, np.array([self._facilities[f] for f, _ in new_pairs], dtype=np.int64)]
+        )
+        medicine_ids = np.concatenate([data.medicine_ids, np.array([m for _, m in new_pairs], dtype=np.int64)])
+        # Pairs known only from a forecast have no stock position yet: NaN, not zero.
+        stock_on_hand = np.concatenate([data.stock_on_hand, np.full(grow, np.nan)])
+        days_of_stock = np.concatenate([data.days_of_stock, np.full(grow, np.nan)])
+        snapshot_at = np.concatenate([data.snapshot_at, np.full(grow, np.datetime64("NaT"), dtype="datetime64[us]")])
+        forecast_demand = np.concatenate([data.forecast_demand, np.full(grow, np.nan)])
+        forecast_date = np.concatenate([data.forecast_date, np.full(grow, np.datetime64("NaT"), dtype="datetime64[D]")])
+
+        # Only move a pair forward in time; replays of older rows are ignored.
+        for facility_id, medicine_id, stock, days, recorded_at, _ in snapshots:
+            position = self._pairs.get((facility_id, medicine_id))
+            stamp = np.datetime64(_utc_naive(recorded_at), "us")
+            if position is None or (not np.isnat(snapshot_at[position]) and stamp < snapshot_at[position]):
+                continue
+            stock_on_hand[position] = float(stock)
+            days_of_stock[position] = np.nan if days is None else days
+            snapshot_at[position] = stamp
+        for facility_id, medicine_id, demand, made_on, _ in forecasts:
+            position = self._pairs.get((facility_id, medicine_id))
+            stamp = np.datetime64(made_on, "D")
+            if position is None or (not np.isnat(forecast_date[position]) and stamp < forecast_date[position]):
+                continue
+            forecast_demand[position] = float(demand)
+            forecast_date[position] = stamp
+
+        self._advance("facility", (row[-1] for row in facilities))
+        self._advance("snapshot", (row[-1] for row in snapshots))
+        self._advance("forecast", (row[-1] for row in forecasts))
+        self._data = CubeData(
+            facility_ids=facility_ids,
+            attribute_codes=codes,
+            labels={name: tuple(values) for name, values in labels.items()},
+            facility_index=facility_index,
+            medicine_ids=medicine_ids,
+            stock_on_hand=stock_on_hand,
+            days_of_stock=days_of_stock,
+            snapshot_at=snapshot_at,
+            forecast_demand=forecast_demand,
+            forecast_date=forecast_date,
+            refreshed_at=data.refreshed_at,
+        )
+
+
+def summarize(
+    data: CubeData,
+    group_by: str = "state",
+    filters: Optional[Mapping[str, Sequence[str]]] = None,
+    medicine_ids: Optional[Sequence[int]] = None,
+) -> List[Dict[str, object]]:
+    """
+    Aggregate pairs per group with vectorised filters and ``np.bincount``.
+
+    ``filters`` maps facility attributes to accepted labels. Each group reports
+    facility and pair counts, total stock and forecast demand, months of stock
+    (stock over forecast demand), stocked-out and low-stock pair counts and the
+    mean days of stock. Stock figures only count pairs with a snapshot, so a pair
+    known only from its forecast is never reported as stocked out.
+    """
+
+    mask = np.ones(len(data.facility_index), dtype=bool)
+    for name, accepted in (filters or {}).items():
+        lookup = {label: code for code, label in enumerate(data.labels[name])}
+        mask &= np.isin(data.attribute(name), [lookup[label] for label in accepted if label in lookup])
+    if medicine_ids is not None:
+        mask &= np.isin(data.medicine_ids, list(medicine_ids))
+
+    if group_by == "national":
+        keys: Sequence[object] = ["national"]
+        groups = np.zeros(int(mask.sum()), dtype=np.int64)
+    elif group_by == "medicine":
+        keys, groups = np.unique(data.medicine_ids[mask], return_inverse=True)
+        keys = keys.tolist()
+    else:
+        keys = data.labels[group_by]
+        groups = data.attribute(group_by)[mask].astype(np.int64)
+    size = len(keys)
+    if size == 0 or not mask.any():
+        return []
+
+    stock = data.stock_on_hand[mask]
+    demand = data.forecast_demand[mask]
+    days = data.days_of_stock[mask]
+    has_demand = ~np.isnan(demand)
+    has_stock = ~np.isnan(stock)
+    has_days = ~np.isnan(days)
+    both = has_demand & has_stock
+    pairs = np.bincount(groups, minlength=size)
+    facility_pairs = np.unique(groups * len(data.facility_ids) + data.facility_index[mask])
+    facilities = np.bincount(facility_pairs // max(len(data.facility_ids), 1), minlength=size)
+    stock_total = np.bincount(groups, weights=np.where(has_stock, stock, 0.0), minlength=size)
+    demand_total = np.bincount(groups, weights=np.where(has_demand, demand, 0.0), minlength=size)
+    stock_with_demand = np.bincount(groups, weights=np.where(both, stock, 0.0), minlength=size)
+    demand_with_stock = np.bincount(groups, weights=np.where(both, demand, 0.0), minlength=size)
+    stocked_out = np.bincount(groups, weights=has_stock & (np.nan_to_num(stock) <= 0), minlength=size)
+    low_stock = np.bincount(groups, weights=has_days & (np.nan_to_num(days) < LOW_STOCK_DAYS), minlength=size)
+    days_total = np.bincount(groups, weights=np.where(has_days, days, 0.0), minlength=size)
+    days_pairs = np.bincount(groups, weights=has_days, minlength=size)
+
+    summary = []
+    for index in np.flatnonzero(pairs):
+        summary.append(
+            {
+                "key": keys[index],
+                "facilities": int(facilities[index]),
+                "pairs": int(pairs[index]),
+                "stock_on_hand": round(float(stock_total[index]), 2),
+                "forecast_demand": round(float(demand_total[index]), 2),
+                "months_of_stock": (
+                    round(float(stock_with_demand[index] / demand_with_stock[index]), 2)
+                    if demand_with_stock[index]
+                    else None
+                ),
+                "stocked_out": int(stocked_out[index]),
+                "low_stock": int(low_stock[index]),
+                "mean_days_of_stock": (
+                    round(float(days_total[index] / days_pairs[index]), 1) if days_pairs[index] else None
+                ),
+            }
+        )
+    return summary
+
+
+_cube: Optional[StockCube] = None
+_cube_lock = threading.Lock()
+
+
+def get_stock_cube() -> StockCube:
+    """Return the process-wide cube, created on first use."""
+
+    global _cube
+    with _cube_lock:
+        if _cube is None:
+            _cube = StockCube()
+        return _cube
@@ -0,0 +1,338 @@
+"""
+Forecasting feature store.
+
+Lags, rolling statistics, stock-out censored demand and seasonality flags are
+computed once per facility × medicine × month into :class:`DemandFeature`.
+:func:`refresh_features` only recomputes pairs whose consumption buckets or
+stock snapshots changed since the previous run (plus the month that just closed),
+and :func:`load_features` reads any subset of pairs into dense NumPy matrices.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from healteex_backend.db_routers import use_replicas
+from inventory.archive import read_ledger
+from inventory.consumption import local_month
+from inventory.models import MonthlyConsumption, StockSnapshot
+from inventory.partitioning import add_months
+
+from .history import load_demand_history, pair_keys, period_bounds, period_start, utc_start
+from .models import DemandFeature
+
+Pair = Tuple[int, int]
+
+BATCH_SIZE = 2000
+LAGS = (1, 2, 3, 12)
+# Months of history read before the first recomputed month; covers the longest lag.
+LOOKBACK_MONTHS = max(LAGS)
+# The malaria transmission season, which drives demand for antimalarials and ORS.
+RAINY_MONTHS = frozenset(range(4, 11))
+# Re-read rows changed shortly before the last run to catch late commits.
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+FEATURE_DTYPES: Dict[str, np.dtype] = {
+    "demand": np.dtype(np.float64),
+    "stockout_days": np.dtype(np.int16),
+    "adjusted_demand": np.dtype(np.float64),
+    **{f"lag_{lag}": np.dtype(np.float64) for lag in LAGS},
+    "mean_3": np.dtype(np.float64),
+    "mean_6": np.dtype(np.float64),
+    "std_6": np.dtype(np.float64),
+    "active_months": np.dtype(np.int16),
+    "month_of_year": np.dtype(np.int8),
+    "rainy_season": np.dtype(np.bool_),
+}
+FEATURE_COLUMNS = tuple(FEATURE_DTYPES)
+
+
+@dataclass
+class FeatureMatrix:
+    """
+    Features of a set of pairs (rows) over consecutive months (columns).
+
+    ``present`` marks the cells that have a stored row; the others are zero.
+    """
+
+    facility_ids: np.ndarray
+    medicine_ids: np.ndarray
+    periods: np.ndarray
+    present: np.ndarray
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.facility_ids)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+
+def compute_features(demand: np.ndarray, stockout_days: np.ndarray, periods: Sequence[date]) -> Dict[str, np.ndarray]:
+    """
+    Feature matrices for a ``(series, months)`` demand history.
+
+    Months before the first column count as zero demand, so callers read
+    :data:`LOOKBACK_MONTHS` of history before the first month they store.
+    """
+
+    series, months = demand.shape
+    days = np.array([(add_months(value, 1) - value).days for value in periods], dtype=np.float64)
+    available = days - stockout_days
+
+    # Demand in a month without any stock is unobserved: carry the recent level forward.
+    adjusted = np.zeros_like(demand, dtype=np.float64)
+    for column in range(months):
+        observed = demand[:, column] * days[column] / np.maximum(available[:, column], 1)
+        recent = adjusted[:, max(column - 3, 0) : column].mean(axis=1) if column else np.zeros(series)
+        adjusted[:, column] = np.where(available[:, column] > 0, observed, recent)
+
+    padded = np.concatenate([np.zeros((series, LOOKBACK_MONTHS)), adjusted], axis=1)
+    sums = np.concatenate([np.zeros((series, 1)), np.cumsum(padded, axis=1)], axis=1)
+    squares = np.concatenate([np.zeros((series, 1)), np.cumsum(padded**2, axis=1)], axis=1)
+    active = np.concatenate(
+        [np.zeros((series, LOOKBACK_MONTHS + 1), dtype=np.int64), np.cumsum(demand > 0, axis=1)], axis=1
+    )
+    # Column ``c`` of the output sits at ``c + LOOKBACK_MONTHS`` in the padded arrays.
+    current = np.arange(months) + LOOKBACK_MONTHS
+
+    def trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+        return (values[:, current] - values[:, current - window]) / window
+
+    mean_6 = trailing_mean(sums, 6)
+    month_of_year = np.array([value.month for value in periods], dtype=np.int8)
+    features = {
+        "demand": demand.astype(np.float64),
+        "stockout_days": stockout_days.astype(np.int16),
+        "adjusted_demand": adjusted,
+        **{f"lag_{lag}": padded[:, current - lag] for lag in LAGS},
+        "mean_3": trailing_mean(sums, 3),
+        "mean_6": mean_6,
+        "std_6": np.sqrt(np.maximum(trailing_mean(squares, 6) - mean_6**2, 0)),
+        "active_months": (active[:, current] - active[:, current - LOOKBACK_MONTHS]).astype(np.int16),
+        "month_of_year": np.broadcast_to(month_of_year, (series, months)),
+        "rainy_season": np.broadcast_to(np.isin(month_of_year, list(RAINY_MONTHS)), (series, months)),
+    }
+    return {name: np.round(values, 4) if values.dtype.kind == "f" else values for name, values in features.items()}
+
+
+def _stockout_days(
+    facility_ids: np.ndarray, medicine_ids: np.ndarray, periods: Sequence[date], end: date
+) -> np.ndarray:
+    """Distinct local days per series and month with a snapshot at or below zero stock."""
+
+    counts = np.zeros((len(facility_ids), len(periods)), dtype=np.int64)
+    snapshots = read_ledger(
+        "snapshots",
+        start=utc_start(periods[0]),
+        end=utc_start(end),
+        columns=["facility_id", "medicine_id", "stock_on_hand"],
+        facility_ids=set(facility_ids.tolist()),
+        medicine_ids=set(medicine_ids.tolist()),
+    )
+    out = snapshots["stock_on_hand"] <= 0
+    keys = pair_keys(facility_ids, medicine_ids)
+    snapshot_keys = pair_keys(snapshots["facility_id"][out], snapshots["medicine_id"][out])
+    rows = np.minimum(np.searchsorted(keys, snapshot_keys), len(keys) - 1)
+    known = keys[rows] == snapshot_keys
+    if not known.any():
+        return counts
+
+    recorded_at = snapshots["recorded_at"][out][known]
+    bounds = period_bounds(periods)
+    columns = np.searchsorted(bounds, recorded_at, side="right") - 1
+    days = (recorded_at - bounds[columns]) // np.timedelta64(1, "D")
+    cells = np.unique(np.stack([rows[known], columns, days], axis=1), axis=0)
+    np.add.at(counts, (cells[:, 0], cells[:, 1]), 1)
+    return counts
+
+
+def _changed_pairs(end: date) -> Dict[Pair, date]:
+    """First month to recompute for every pair touched since the previous run."""
+
+    since = DemandFeature.objects.aggregate(latest=Max("computed_at"))["latest"] - WATERMARK_OVERLAP
+    touched: Dict[Pair, date] = {}
+
+    def touch(pair: Pair, month: date) -> None:
+        if month < end and (pair not in touched or month < touched[pair]):
+            touched[pair] = month
+
+    for facility_id, medicine_id, month in MonthlyConsumption.objects.filter(updated_at__gte=since).values_list(
+        "facility_id", "medicine_id", "month"
+    ):
+        touch((facility_id, medicine_id), month)
+    for facility_id, medicine_id, recorded_at in StockSnapshot.objects.filter(updated_at__gte=since).values_list(
+        "facility_id", "medicine_id", "recorded_at"
+    ):
+        touch((facility_id, medicine_id), local_month(recorded_at))
+    # Pairs still active in the last year need rows for months closed since their latest one.
+    closed = (
+        DemandFeature.objects.values("facility_id", "medicine_id")
+        .annotate(latest=Max("period"))
+        .filter(latest__lt=add_months(end, -1), latest__gte=add_months(end, -LOOKBACK_MONTHS - 1))
+    )
+    for row in closed:
+        touch((row["facility_id"], row["medicine_id"]), add_months(row["latest"], 1))
+    return touched
+
+
+def refresh_features(full: bool = False, today: Optional[date] = None) -> Dict[str, int]:
+    """
+    Bring the feature store up to date with the ledger, up to the last complete month.
+
+    Without ``full`` only pairs whose consumption buckets or stock snapshots changed
+    since the previous run are recomputed, from the earliest changed month onwards.
+    The first run, and ``full`` runs, rebuild every pair from its first issue.
+    """
+
+    started = timezone.now()
+    end = period_start(today or timezone.localdate(), "month")
+    full = full or not DemandFeature.objects.exists()
+    touched: Dict[Pair, date] = {}
+    if not full:
+        touched = _changed_pairs(end)
+        if not touched:
+            return {"pairs": 0, "rows": 0}
+
+    history = load_demand_history(
+        "month",
+        start=None if full else add_months(min(touched.values()), -LOOKBACK_MONTHS),
+        end=end,
+        facility_ids=None if full else {pair[0] for pair in touched},
+        medicine_ids=None if full else {pair[1] for pair in touched},
+    )
+    if not len(history):
+        return {"pairs": 0, "rows": 0}
+
+    periods = np.array(history.periods, dtype="datetime64[D]")
+    if full:
+        # Store each pair from its first issue.
+        write_from = np.argmax(history.values > 0, axis=1)
+    else:
+        # Skip pairs that were only loaded because the facility and medicine filters cross.
+        firsts = [touched.get(pair) for pair in zip(history.facility_ids.tolist(), history.medicine_ids.tolist())]
+        write_from = np.array(
+            [len(periods) if first is None else np.searchsorted(periods, np.datetime64(first, "D")) for first in firsts]
+        )
+
+    stockout_days = _stockout_days(history.facility_ids, history.medicine_ids, history.periods, end)
+    features = compute_features(history.values, stockout_days, history.periods)
+    rows, columns = np.nonzero(np.arange(len(periods))[None, :] >= write_from[:, None])
+    facility_ids = history.facility_ids[rows].tolist()
+    medicine_ids = history.medicine_ids[rows].tolist()
+    months = [history.periods[column] for column in columns.tolist()]
+    values = {name: matrix[rows, columns].tolist() for name, matrix in features.items()}
+    objects = [
+        DemandFeature(
+            facility_id=facility_ids[index],
+            medicine_id=medicine_ids[index],
+            period=months[index],
+            computed_at=started,
+            **{name: column[index] for name, column in values.items()},
+        )
+        for index in range(len(rows))
+    ]
+
+    with transaction.atomic():
+        if full:
+            DemandFeature.objects.all().delete()
+        DemandFeature.objects.bulk_create(
+            objects,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["facility", "medicine", "period"],
+            update_fields=[*FEATURE_COLUMNS, "computed_at"],
+        )
+    return {"pairs": int(np.count_nonzero(write_from < len(periods))), "rows": len(objects)}
+
+
+def load_features(
+    pairs: Optional[Iterable[Pair]] = None,
+    facility_ids: Optional[Iterable[int]] = None,
+    medicine_ids: Optional[Iterable[int]] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> FeatureMatrix:
+    """
+    Load stored features as ``(pairs, months)`` matrices, one per column.
+
+    Rows stream from the database cursor into a typed record array, so no model
+    instances or intermediate lists are built. With ``pairs`` the matrix rows
+    follow the given order (pairs without features are all absent); otherwise
+    they are every stored pair matching the filters, sorted. Months run from the
+    month of ``start`` to the last month starting before ``end``, defaulting to
+    the range of the loaded rows.
+    """
+
+    columns = list(columns or FEATURE_COLUMNS)
+    unknown = set(columns) - set(FEATURE_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown feature columns {sorted(unknown)}; expected some of {list(FEATURE_COLUMNS)}.")
+
+    queryset = DemandFeature.objects.all()
+    requested = None
+    if pairs is not None:
+        requested = np.array(list(pairs), dtype=np.int64).reshape(-1, 2)
+        facility_ids = set(requested[:, 0].tolist()) if facility_ids is None else facility_ids
+        medicine_ids = set(requested[:, 1].tolist()) if medicine_ids is None else medicine_ids
+    if facility_ids is not None:
+        queryset = queryset.filter(facility_id__in=list(facility_ids))
+    if medicine_ids is not None:
+        queryset = queryset.filter(medicine_id__in=list(medicine_ids))
+    if start:
+        queryset = queryset.filter(period__gte=period_start(start, "month"))
+    if end:
+        queryset = queryset.filter(period__lt=end)
+
+    dtype = np.dtype(
+        [("facility_id", np.int64), ("medicine_id", np.int64), ("period", "datetime64[D]")]
+        + [(name, FEATURE_DTYPES[name]) for name in columns]
+    )
+    with use_replicas():
+        records = np.fromiter(
+            queryset.order_by().values_list(*dtype.names).iterator(chunk_size=BATCH_SIZE), dtype=dtype
+        )
+
+    record_keys = pair_keys(records["facility_id"], records["medicine_id"])
+    if requested is not None:
+        keys = pair_keys(requested[:, 0], requested[:, 1])
+        order = np.argsort(keys, kind="stable")
+        positions = np.minimum(np.searchsorted(keys[order], record_keys), max(len(keys) - 1, 0))
+        matched = keys[order][positions] == record_keys if len(keys) else np.zeros(len(records), dtype=bool)
+        records, rows = records[matched], order[positions[matched]]
+        pair_facilities, pair_medicines = requested[:, 0], requested[:, 1]
+    else:
+        keys, rows = np.unique(record_keys, return_inverse=True)
+        pair_facilities, pair_medicines = keys >> 32, keys & 0xFFFFFFFF
+
+    months = records["period"].astype("datetime64[M]")
+    first = np.datetime64(start, "M") if start else (months.min() if len(records) else None)
+    last = np.datetime64(end - timedelta(days=1), "M") + 1 if end else (months.max() + 1 if len(records) else first)
+    first = last if first is None else first
+    if first is None:
+        periods = np.empty(0, dtype="datetime64[D]")
+    else:
+        periods = np.arange(first, last).astype("datetime64[D]")
+    month_columns = (months - first).astype(np.int64) if len(records) else np.empty(0, np.int64)
+
+    present = np.zeros((len(pair_facilities), len(periods)), dtype=bool)
+    present[rows, month_columns] = True
+    matrices = {}
+    for name in columns:
+        matrix = np.zeros(present.shape, dtype=FEATURE_DTYPES[name])
+        matrix[rows, month_columns] = records[name]
+        matrices[name] = matrix
+    return FeatureMatrix(
+        facility_ids=pair_facilities,
+        medicine_ids=pair_medicines,
+        periods=periods,
+        present=present,
+        columns=matrices,
+    )
@@ -0,0 +1,94 @@
+"""
+Baseline demand forecasting models.
+
+Every model takes a ``(series, periods)`` history matrix and a horizon and returns
+a ``(series, horizon)`` forecast, computing all series at once. This module only
+depends on NumPy so it can be imported by backtest worker processes without
+setting up Django.
+"""
+from __future__ import annotations
+
+from typing import Callable, Dict
+
+import numpy as np
+
+ForecastModel = Callable[[np.ndarray, int], np.ndarray]
+
+FORECAST_MODELS: Dict[str, ForecastModel] = {}
+
+
+def register(name: str) -> Callable[[ForecastModel], ForecastModel]:
+    """Add a model to :data:`FORECAST_MODELS` under ``name``."""
+
+    def decorator(model: ForecastModel) -> ForecastModel:
+        FORECAST_MODELS[name] = model
+        return model
+
+    return decorator
+
+
+def get_model(name: str) -> ForecastModel:
+    try:
+        return FORECAST_MODELS[name]
+    except KeyError as exc:
+        raise KeyError(f"Unknown forecasting model {name!r}; expected one of {sorted(FORECAST_MODELS)}.") from exc
+
+
+def one_step_errors(model: ForecastModel, history: np.ndarray, periods: int) -> np.ndarray:
+    """Errors of one-period-ahead forecasts of the last ``periods`` columns, fitted on the columns before each."""
+
+    columns = history.shape[1]
+    return np.stack([model(history[:, :t], 1)[:, 0] - history[:, t] for t in range(columns - periods, columns)], axis=1)
+
+
+def _flat(level: np.ndarray, horizon: int) -> np.ndarray:
+    return np.repeat(level[:, None], horizon, axis=1)
+
+
+@register("naive")
+def naive(history: np.ndarray, horizon: int) -> np.ndarray:
+    """Repeat the last observed period."""
+
+    return _flat(history[:, -1], horizon)
+
+
+@register("moving_average")
+def moving_average(history: np.ndarray, horizon: int, window: int = 3) -> np.ndarray:
+    """Mean of the last ``window`` periods."""
+
+    return _flat(history[:, -window:].mean(axis=1), horizon)
+
+
+@register("ses")
+def simple_exponential_smoothing(history: np.ndarray, horizon: int, alpha: float = 0.3) -> np.ndarray:
+    """Simple exponential smoothing, initialised with the first observation."""
+
+    level = history[:, 0].astype(np.float64)
+    for column in range(1, history.shape[1]):
+        level = alpha * history[:, column] + (1 - alpha) * level
+    return _flat(level, horizon)
+
+
+@register("croston")
+def croston(history: np.ndarray, horizon: int, alpha: float = 0.1) -> np.ndarray:
+    """
+    Croston's method for intermittent demand.
+
+    Demand sizes and the intervals between non-zero periods are smoothed
+    separately; the forecast is their ratio. Series with no demand forecast zero.
+    """
+
+    size = np.zeros(history.shape[0])
+    interval = np.ones(history.shape[0])
+    since = np.ones(history.shape[0])
+    seen = np.zeros(history.shape[0], dtype=bool)
+    for column in range(history.shape[1]):
+        demand = history[:, column]
+        hit = demand > 0
+        first = hit & ~seen
+        update = hit & seen
+        size = np.where(first, demand, np.where(update, alpha * demand + (1 - alpha) * size, size))
+        interval = np.where(first, since, np.where(update, alpha * since + (1 - alpha) * interval, interval))
+        seen |= hit
+        since = np.where(hit, 1, since + 1)
+    return _flat(np.where(seen, size / interval, 0.0), horizon)
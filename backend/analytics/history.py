@@ -0,0 +1,134 @@
+"""Demand history of every facility × medicine series as a dense NumPy matrix."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.utils import timezone
+
+from healteex_backend.db_routers import use_replicas
+from inventory.archive import read_ledger
+from inventory.models import Facility, InventoryTransaction, Medicine
+from inventory.partitioning import add_months
+
+PERIODS = ("month", "week")
+UNCATEGORISED = "uncategorised"
+
+
+@dataclass
+class DemandHistory:
+    """Issued quantity per series (row) and period (column), with the attributes reports group by."""
+
+    periods: List[date]
+    facility_ids: np.ndarray
+    medicine_ids: np.ndarray
+    values: np.ndarray
+    facility_types: List[str]
+    categories: List[str]
+
+    def __len__(self) -> int:
+        return len(self.facility_ids)
+
+    def groupings(self) -> Dict[str, Tuple[np.ndarray, List[str]]]:
+        """``(codes, labels)`` per group-by, as expected by :func:`analytics.backtest.summarize`."""
+
+        return {
+            "all": (np.zeros(len(self), dtype=np.int64), ["all"]),
+            "facility_type": _encode(self.facility_types),
+            "category": _encode(self.categories),
+        }
+
+
+def _encode(values: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+    labels, codes = np.unique(np.asarray(values, dtype=object).astype(str), return_inverse=True)
+    return codes.astype(np.int64), labels.tolist()
+
+
+def pair_keys(facility_ids: np.ndarray, medicine_ids: np.ndarray) -> np.ndarray:
+    """One sortable int64 per facility × medicine pair, ordered like ``np.unique(pairs, axis=0)``."""
+
+    return (np.asarray(facility_ids, dtype=np.int64) << 32) | np.asarray(medicine_ids, dtype=np.int64)
+
+
+def period_start(value: date, period: str) -> date:
+    if period == "week":
+        return value - timedelta(days=value.weekday())
+    return value.replace(day=1)
+
+
+def next_period(value: date, period: str) -> date:
+    return value + timedelta(weeks=1) if period == "week" else add_months(value, 1)
+
+
+def utc_start(value: date) -> datetime:
+    """Midnight at the start of ``value`` in the project time zone, as an aware UTC datetime."""
+
+    return timezone.make_aware(datetime.combine(value, time.min)).astimezone(dt_timezone.utc)
+
+
+def period_bounds(periods: Sequence[date]) -> np.ndarray:
+    """Start of each period in naive UTC, matching the ledger's datetime columns."""
+
+    return np.array([utc_start(value).replace(tzinfo=None) for value in periods], dtype="datetime64[us]")
+
+
+def load_demand_history(
+    period: str = "month",
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    facility_ids: Optional[Iterable[int]] = None,
+    medicine_ids: Optional[Iterable[int]] = None,
+) -> DemandHistory:
+    """
+    Aggregate ISSUE transactions, archived and live, into complete periods.
+
+    Periods are calendar months or Monday-based weeks in the project time zone,
+    from ``start`` (or the first issue) up to ``end`` (default: the start of the
+    current, incomplete period). Periods without issues are zero. Series can be
+    limited to the given facilities and medicines.
+    """
+
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {PERIODS}.")
+    end = period_start(end or timezone.localdate(), period)
+    ledger = read_ledger(
+        "transactions",
+        start=utc_start(period_start(start, period)) if start else None,
+        end=utc_start(end),
+        columns=["facility_id", "medicine_id", "transaction_type", "quantity"],
+        facility_ids=facility_ids,
+        medicine_ids=medicine_ids,
+    )
+    issues = ledger["transaction_type"] == InventoryTransaction.TransactionType.ISSUE
+    occurred_at = ledger["occurred_at"][issues]
+    if not len(occurred_at):
+        return DemandHistory([], np.empty(0, np.int64), np.empty(0, np.int64), np.zeros((0, 0)), [], [])
+
+    first_issue = timezone.localtime(occurred_at.min().item().replace(tzinfo=dt_timezone.utc)).date()
+    periods = [period_start(start or first_issue, period)]
+    while next_period(periods[-1], period) < end:
+        periods.append(next_period(periods[-1], period))
+    columns = np.searchsorted(period_bounds(periods), occurred_at, side="right") - 1
+
+    keys = np.stack([ledger["facility_id"][issues], ledger["medicine_id"][issues]], axis=1)
+    pairs, rows = np.unique(keys, axis=0, return_inverse=True)
+    values = np.zeros((len(pairs), len(periods)))
+    np.add.at(values, (rows.reshape(-1), columns), np.round(ledger["quantity"][issues].astype(np.float64), 2))
+
+    facility_ids, medicine_ids = pairs[:, 0], pairs[:, 1]
+    with use_replicas():
+        facility_types = dict(
+            Facility.objects.filter(pk__in=set(facility_ids.tolist())).values_list("pk", "facility_type")
+        )
+        categories = dict(Medicine.objects.filter(pk__in=set(medicine_ids.tolist())).values_list("pk", "category"))
+    return DemandHistory(
+        periods=periods,
+        facility_ids=facility_ids,
+        medicine_ids=medicine_ids,
+        values=values,
+        facility_types=[facility_types.get(facility_id, "") for facility_id in facility_ids.tolist()],
+        categories=[categories.get(medicine_id) or UNCATEGORISED for medicine_id in medicine_ids.tolist()],
+    )
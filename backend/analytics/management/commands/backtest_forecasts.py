@@ -0,0 +1,108 @@
+"""Management command that backtests the registered forecasting models on the demand history."""
+from __future__ import annotations
+
+import json
+import os
+import time
+from datetime import date, datetime
+from typing import Optional
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from analytics.backtest import rolling_origins, run_backtest, summarize
+from analytics.forecasting import FORECAST_MODELS
+from analytics.history import PERIODS, load_demand_history
+from analytics.models import BacktestResult, BacktestRun
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays issue history with rolling forecast origins and reports MAPE, MASE and bias per model, "
+        "facility type and medicine category, with the CPU time and peak memory of each model."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            action="append",
+            choices=sorted(FORECAST_MODELS),
+            help="Only evaluate the named model (repeatable).",
+        )
+        parser.add_argument("--period", choices=PERIODS, default="month")
+        parser.add_argument("--horizon", type=int, default=3, help="Periods forecast from each origin.")
+        parser.add_argument("--origins", type=int, default=6, help="Number of rolling origins.")
+        parser.add_argument("--start", help="Ignore history before this day (YYYY-MM-DD).")
+        parser.add_argument("--end", help="Backtest as of this day (YYYY-MM-DD); defaults to today.")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+        parser.add_argument("--json", action="store_true", help="Print one JSON object per result row.")
+        parser.add_argument("--no-save", action="store_true", help="Do not store the results.")
+
+    def handle(self, *args, **options):
+        if options["horizon"] < 1 or options["origins"] < 1:
+            raise CommandError("--horizon and --origins must be at least 1.")
+        start, end = (_parse_date(options, name) for name in ("start", "end"))
+
+        started = time.perf_counter()
+        history = load_demand_history(options["period"], start=start, end=end)
+        try:
+            origins = rolling_origins(len(history.periods), options["horizon"], options["origins"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        models = options["model"] or sorted(FORECAST_MODELS)
+        scores = run_backtest(history.values, models, options["horizon"], origins, workers=options["workers"])
+        rows = summarize(scores, history.groupings())
+        wall_seconds = round(time.perf_counter() - started, 3)
+
+        if not options["no_save"]:
+            with transaction.atomic():
+                run = BacktestRun.objects.create(
+                    period=options["period"],
+                    horizon=options["horizon"],
+                    origins=len(origins),
+                    series=len(history),
+                    workers=options["workers"],
+                    wall_seconds=wall_seconds,
+                )
+                BacktestResult.objects.bulk_create([BacktestResult(run=run, **row) for row in rows])
+
+        if options["json"]:
+            for row in rows:
+                self.stdout.write(json.dumps(row))
+        else:
+            self._write_table(rows)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(history)} series x {len(origins)} origins, {len(models)} models in {wall_seconds}s"
+            )
+        )
+
+    def _write_table(self, rows):
+        self.stdout.write(
+            f"{'group':<32} {'model':<16} {'series':>7} {'MAPE%':>8} {'MASE':>7} {'bias%':>8} {'cpu s':>8} {'MB':>8}"
+        )
+        rows = sorted(rows, key=lambda row: (row["group_by"], row["group"], _sort_key(row["mase"])))
+        for row in rows:
+            self.stdout.write(
+                f"{row['group_by'] + '=' + row['group']:<32} {row['model']:<16} {row['series']:>7} "
+                f"{_format(row['mape']):>8} {_format(row['mase']):>7} {_format(row['bias']):>8} "
+                f"{row['seconds']:>8.3f} {row['peak_memory_mb']:>8.2f}"
+            )
+
+
+def _parse_date(options, name: str) -> Optional[date]:
+    if not options[name]:
+        return None
+    try:
+        return datetime.strptime(options[name], "%Y-%m-%d").date()
+    except ValueError as exc:
+        raise CommandError(f"--{name} expects YYYY-MM-DD.") from exc
+
+
+def _sort_key(value):
+    return float("inf") if value is None else value
+
+
+def _format(value) -> str:
+    return "-" if value is None else f"{value:.2f}"
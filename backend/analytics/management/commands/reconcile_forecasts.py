@@ -0,0 +1,45 @@
+"""Management command that reconciles facility forecasts up the LGA, state and national hierarchy."""
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.forecasting import FORECAST_MODELS
+from analytics.reconciliation import METHODS, reconcile_forecasts
+
+
+class Command(BaseCommand):
+    help = "Stores forecasts for every LGA, state and the nation that add up with the facility forecasts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--method", choices=METHODS, action="append", help="Defaults to bottom_up (repeatable).")
+        parser.add_argument("--model-version", help="Forecast batch to reconcile; defaults to the latest.")
+        parser.add_argument("--forecast-date", help="Forecast batch date (YYYY-MM-DD); defaults to the latest.")
+        parser.add_argument(
+            "--base-model",
+            choices=sorted(FORECAST_MODELS),
+            default="ses",
+            help="Model producing the history-based upper-level forecasts used by mint.",
+        )
+
+    def handle(self, *args, **options):
+        forecast_date = None
+        if options["forecast_date"]:
+            try:
+                forecast_date = datetime.strptime(options["forecast_date"], "%Y-%m-%d").date()
+            except ValueError as exc:
+                raise CommandError("--forecast-date expects YYYY-MM-DD.") from exc
+
+        for method in options["method"] or ["bottom_up"]:
+            started = time.perf_counter()
+            result = reconcile_forecasts(
+                model_version=options["model_version"],
+                forecast_date=forecast_date,
+                method=method,
+                base_model=options["base_model"],
+            )
+            result.update(method=method, seconds=round(time.perf_counter() - started, 3))
+            self.stdout.write(self.style.SUCCESS(json.dumps(result)))
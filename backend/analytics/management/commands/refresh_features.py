@@ -0,0 +1,25 @@
+"""Management command that brings the forecasting feature store up to date."""
+from __future__ import annotations
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from analytics.features import refresh_features
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes demand features for the facility × medicine pairs whose consumption or stock snapshots "
+        "changed since the previous run, and adds the months closed since then."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Rebuild every pair from its first issue.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = refresh_features(full=options["full"])
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        self.stdout.write(self.style.SUCCESS(json.dumps(result)))
@@ -0,0 +1,84 @@
+"""Management command that compares replenishment policies by Monte Carlo simulation."""
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.scenarios import (
+    DEFAULT_POLICIES,
+    DEFAULT_TRANSPORT_DAYS,
+    build_scenario,
+    parse_policy,
+    scenario_policies,
+)
+from analytics.simulation import run_simulation, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulates warehouse-to-facility replenishment in a state under each policy, sampling demand from the "
+        "forecasts, and reports stock-out probability, fill rate and holding cost."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--state", required=True)
+        parser.add_argument("--medicine", type=int, action="append", help="Only simulate this medicine (repeatable).")
+        parser.add_argument(
+            "--policy",
+            action="append",
+            help="name:service_level:review_days (repeatable); defaults to "
+            + ", ".join(f"{name}:{level}:{days}" for name, level, days in DEFAULT_POLICIES)
+            + ".",
+        )
+        parser.add_argument("--days", type=int, default=90)
+        parser.add_argument("--replications", type=int, default=1000)
+        parser.add_argument("--transport-days", type=int, default=DEFAULT_TRANSPORT_DAYS)
+        parser.add_argument("--holding-cost", type=float, default=1.0, help="Cost per unit held per day.")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes.")
+        parser.add_argument("--json", action="store_true", help="Print one JSON object per policy.")
+
+    def handle(self, *args, **options):
+        if options["days"] < 1 or options["replications"] < 1 or options["transport_days"] < 1:
+            raise CommandError("--days, --replications and --transport-days must be at least 1.")
+        try:
+            specs = [parse_policy(spec) for spec in options["policy"]] if options["policy"] else DEFAULT_POLICIES
+            scenario = build_scenario(options["state"], options["medicine"], options["transport_days"])
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+
+        started = time.perf_counter()
+        results = run_simulation(
+            scenario.network,
+            scenario_policies(scenario, specs),
+            days=options["days"],
+            replications=options["replications"],
+            seed=options["seed"],
+            workers=options["workers"],
+        )
+        rows = summarize(results, options["days"], options["holding_cost"])
+        seconds = round(time.perf_counter() - started, 3)
+
+        if options["json"]:
+            for row in rows:
+                self.stdout.write(json.dumps(row))
+        else:
+            self.stdout.write(
+                f"{'policy':<16} {'P(stock-out)':>12} {'out days':>9} {'fill':>7} "
+                f"{'facility':>10} {'warehouse':>10} {'holding cost':>14}"
+            )
+            for row in rows:
+                self.stdout.write(
+                    f"{row['policy']:<16} {row['stockout_probability']:>12.4f} {row['stockout_day_rate']:>9.4f} "
+                    f"{row['fill_rate'] or 0:>7.4f} {row['facility_stock']:>10.0f} {row['warehouse_stock']:>10.0f} "
+                    f"{row['holding_cost']:>14.0f}"
+                )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{scenario.network.series} series, {scenario.network.nodes} warehouse nodes, "
+                f"{options['replications']} replications x {options['days']} days in {seconds}s"
+            )
+        )
@@ -0,0 +1,64 @@
+"""Management command that trains a forecasting model and registers its artifact."""
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.forecasting import FORECAST_MODELS
+from analytics.history import PERIODS
+from analytics.registry import train_model, write_forecasts
+
+
+class Command(BaseCommand):
+    help = (
+        "Fits a forecasting model on the demand history of every facility × medicine series and stores the "
+        "parameters as a new memory-mappable version in the model registry."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--model", choices=sorted(FORECAST_MODELS), default="ses")
+        parser.add_argument("--version", help="Version name; defaults to <model>-<period>-<timestamp>.")
+        parser.add_argument("--period", choices=PERIODS, default="month")
+        parser.add_argument("--end", help="Train on history before this day (YYYY-MM-DD); defaults to today.")
+        parser.add_argument("--activate", action="store_true", help="Serve this version when none is requested.")
+        parser.add_argument(
+            "--write-forecasts",
+            action="store_true",
+            help="Also store Forecast rows for every trained series, tagged with the version.",
+        )
+        parser.add_argument("--horizon", type=int, default=1, help="Periods covered by written forecasts.")
+
+    def handle(self, *args, **options):
+        if options["horizon"] < 1:
+            raise CommandError("--horizon must be at least 1.")
+        end = None
+        if options["end"]:
+            try:
+                end = datetime.strptime(options["end"], "%Y-%m-%d").date()
+            except ValueError as exc:
+                raise CommandError("--end expects YYYY-MM-DD.") from exc
+
+        started = time.perf_counter()
+        try:
+            registered = train_model(
+                options["model"],
+                version=options["version"],
+                period=options["period"],
+                end=end,
+                activate=options["activate"],
+            )
+        except (ValueError, FileExistsError) as exc:
+            raise CommandError(str(exc)) from exc
+        result = {
+            "version": registered.version,
+            "series": registered.series,
+            "trained_through": registered.trained_through.isoformat(),
+            "active": registered.is_active,
+        }
+        if options["write_forecasts"]:
+            result["forecasts"] = write_forecasts(registered, horizon=options["horizon"])
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        self.stdout.write(self.style.SUCCESS(json.dumps(result)))
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies: list = []
+
+    operations = [
+        migrations.CreateModel(
+            name="BacktestRun",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("period", models.CharField(max_length=16)),
+                ("horizon", models.PositiveSmallIntegerField()),
+                ("origins", models.PositiveSmallIntegerField()),
+                ("series", models.PositiveIntegerField()),
+                ("workers", models.PositiveSmallIntegerField(default=1)),
+                ("wall_seconds", models.FloatField()),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="BacktestResult",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("model", models.CharField(max_length=64)),
+                ("group_by", models.CharField(max_length=32)),
+                ("group", models.CharField(max_length=128)),
+                ("series", models.PositiveIntegerField()),
+                (
+                    "mape",
+                    models.FloatField(
+                        blank=True, help_text="Mean absolute percentage error over non-zero actuals.", null=True
+                    ),
+                ),
+                (
+                    "mase",
+                    models.FloatField(
+                        blank=True, help_text="Mean absolute error scaled by the naive forecast's.", null=True
+                    ),
+                ),
+                (
+                    "bias",
+                    models.FloatField(blank=True, help_text="Total error as a percentage of total demand.", null=True),
+                ),
+                ("seconds", models.FloatField(help_text="CPU seconds spent forecasting and scoring all series.")),
+                ("peak_memory_mb", models.FloatField()),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="results",
+                        to="analytics.backtestrun",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["run", "group_by", "group", "mase"],
+                "unique_together": {("run", "model", "group_by", "group")},
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0008_requisitions"),
+        ("analytics", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReconciledForecast",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "level",
+                    models.CharField(
+                        choices=[
+                            ("national", "National"),
+                            ("state", "State"),
+                            ("lga", "Local Government Area"),
+                            ("facility", "Facility"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("state", models.CharField(blank=True, max_length=128)),
+                ("lga", models.CharField(blank=True, max_length=128)),
+                (
+                    "facility",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reconciled_forecasts",
+                        to="inventory.facility",
+                    ),
+                ),
+                (
+                    "medicine",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reconciled_forecasts",
+                        to="inventory.medicine",
+                    ),
+                ),
+                ("forecast_date", models.DateField()),
+                ("period_start", models.DateField()),
+                ("period_end", models.DateField()),
+                ("model_version", models.CharField(max_length=64)),
+                ("method", models.CharField(max_length=16)),
+                (
+                    "base_demand",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        help_text="The node's own forecast before reconciliation.",
+                        max_digits=14,
+                        null=True,
+                    ),
+                ),
+                ("predicted_demand", models.DecimalField(decimal_places=2, max_digits=14)),
+            ],
+            options={
+                "ordering": ["level", "state", "lga", "medicine", "period_start"],
+                "indexes": [
+                    models.Index(
+                        fields=["method", "level", "state", "lga", "medicine", "period_start"],
+                        name="analytics_reconciled_node_idx",
+                    ),
+                    models.Index(
+                        fields=["model_version", "forecast_date", "method"], name="analytics_reconciled_batch_idx"
+                    ),
+                ],
+            },
+        ),
+    ]
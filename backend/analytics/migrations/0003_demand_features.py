@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0008_requisitions"),
+        ("analytics", "0002_reconciled_forecasts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DemandFeature",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("period", models.DateField(help_text="First day of the month, in the project time zone.")),
+                ("demand", models.FloatField(help_text="Quantity issued in the month.")),
+                (
+                    "stockout_days",
+                    models.PositiveSmallIntegerField(help_text="Days with a stock snapshot at or below zero."),
+                ),
+                (
+                    "adjusted_demand",
+                    models.FloatField(help_text="Demand scaled up to the days the medicine was in stock."),
+                ),
+                ("lag_1", models.FloatField()),
+                ("lag_2", models.FloatField()),
+                ("lag_3", models.FloatField()),
+                ("lag_12", models.FloatField()),
+                ("mean_3", models.FloatField()),
+                ("mean_6", models.FloatField()),
+                ("std_6", models.FloatField()),
+                (
+                    "active_months",
+                    models.PositiveSmallIntegerField(help_text="Months with issues among the previous twelve."),
+                ),
+                ("month_of_year", models.PositiveSmallIntegerField()),
+                ("rainy_season", models.BooleanField()),
+                ("computed_at", models.DateTimeField()),
+                (
+                    "facility",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="demand_features",
+                        to="inventory.facility",
+                    ),
+                ),
+                (
+                    "medicine",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="demand_features",
+                        to="inventory.medicine",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["facility", "medicine", "period"],
+                "indexes": [models.Index(fields=["computed_at"], name="analytics_feature_computed_idx")],
+                "unique_together": {("facility", "medicine", "period")},
+            },
+        ),
+    ]
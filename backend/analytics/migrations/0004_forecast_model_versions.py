@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analytics", "0003_demand_features"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ForecastModelVersion",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("version", models.CharField(max_length=64, unique=True)),
+                ("model", models.CharField(help_text="Name of the model in analytics.forecasting.", max_length=64)),
+                ("period", models.CharField(max_length=16)),
+                (
+                    "trained_through",
+                    models.DateField(help_text="First period not seen in training; forecasts start here."),
+                ),
+                ("series", models.PositiveIntegerField()),
+                (
+                    "is_active",
+                    models.BooleanField(default=False, help_text="Served when a request names no version."),
+                ),
+                (
+                    "mape",
+                    models.FloatField(blank=True, help_text="From the latest backtest of the model, if any.", null=True),
+                ),
+                (
+                    "mase",
+                    models.FloatField(blank=True, help_text="From the latest backtest of the model, if any.", null=True),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
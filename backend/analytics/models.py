@@ -0,0 +1,158 @@
+"""Persisted analytics products: backtests, reconciled forecasts, demand features and the model registry."""
+from __future__ import annotations
+
+from django.db import models
+
+
+class BacktestRun(models.Model):
+    """One rolling-origin backtest over the demand history."""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    period = models.CharField(max_length=16)
+    horizon = models.PositiveSmallIntegerField()
+    origins = models.PositiveSmallIntegerField()
+    series = models.PositiveIntegerField()
+    workers = models.PositiveSmallIntegerField(default=1)
+    wall_seconds = models.FloatField()
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"Backtest {self.pk} ({self.period}, h={self.horizon})"
+
+
+class BacktestResult(models.Model):
+    """Accuracy and cost of one model on one group of series in a run."""
+
+    run = models.ForeignKey(BacktestRun, on_delete=models.CASCADE, related_name="results")
+    model = models.CharField(max_length=64)
+    group_by = models.CharField(max_length=32)
+    group = models.CharField(max_length=128)
+    series = models.PositiveIntegerField()
+    mape = models.FloatField(null=True, blank=True, help_text="Mean absolute percentage error over non-zero actuals.")
+    mase = models.FloatField(null=True, blank=True, help_text="Mean absolute error scaled by the naive forecast's.")
+    bias = models.FloatField(null=True, blank=True, help_text="Total error as a percentage of total demand.")
+    seconds = models.FloatField(help_text="CPU seconds spent forecasting and scoring all series.")
+    peak_memory_mb = models.FloatField()
+
+    class Meta:
+        ordering = ["run", "group_by", "group", "mase"]
+        unique_together = ("run", "model", "group_by", "group")
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.model} on {self.group_by}={self.group}"
+
+
+class ReconciledForecast(models.Model):
+    """
+    Demand forecast of one hierarchy node, coherent with the levels above and below it.
+
+    ``state`` and ``lga`` identify the node (blank above their level); facility
+    rows are only stored for methods that adjust facility forecasts.
+    """
+
+    class Level(models.TextChoices):
+        NATIONAL = "national", "National"
+        STATE = "state", "State"
+        LGA = "lga", "Local Government Area"
+        FACILITY = "facility", "Facility"
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    level = models.CharField(max_length=16, choices=Level.choices)
+    state = models.CharField(max_length=128, blank=True)
+    lga = models.CharField(max_length=128, blank=True)
+    facility = models.ForeignKey(
+        "inventory.Facility", on_delete=models.CASCADE, null=True, blank=True, related_name="reconciled_forecasts"
+    )
+    medicine = models.ForeignKey("inventory.Medicine", on_delete=models.CASCADE, related_name="reconciled_forecasts")
+    forecast_date = models.DateField()
+    period_start = models.DateField()
+    period_end = models.DateField()
+    model_version = models.CharField(max_length=64)
+    method = models.CharField(max_length=16)
+    base_demand = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="The node's own forecast before reconciliation.",
+    )
+    predicted_demand = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        ordering = ["level", "state", "lga", "medicine", "period_start"]
+        indexes = [
+            models.Index(
+                fields=["method", "level", "state", "lga", "medicine", "period_start"],
+                name="analytics_reconciled_node_idx",
+            ),
+            models.Index(fields=["model_version", "forecast_date", "method"], name="analytics_reconciled_batch_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.level} forecast of {self.medicine} ({self.period_start:%Y-%m-%d})"
+
+
+class DemandFeature(models.Model):
+    """
+    Precomputed forecasting features of one facility × medicine × month, maintained by ``analytics.features``.
+
+    Lags and rolling statistics describe the stock-out adjusted demand of the
+    months *before* ``period``, so a row pairs this month's demand with the
+    features available to forecast it.
+    """
+
+    facility = models.ForeignKey("inventory.Facility", on_delete=models.CASCADE, related_name="demand_features")
+    medicine = models.ForeignKey("inventory.Medicine", on_delete=models.CASCADE, related_name="demand_features")
+    period = models.DateField(help_text="First day of the month, in the project time zone.")
+    demand = models.FloatField(help_text="Quantity issued in the month.")
+    stockout_days = models.PositiveSmallIntegerField(help_text="Days with a stock snapshot at or below zero.")
+    adjusted_demand = models.FloatField(help_text="Demand scaled up to the days the medicine was in stock.")
+    lag_1 = models.FloatField()
+    lag_2 = models.FloatField()
+    lag_3 = models.FloatField()
+    lag_12 = models.FloatField()
+    mean_3 = models.FloatField()
+    mean_6 = models.FloatField()
+    std_6 = models.FloatField()
+    active_months = models.PositiveSmallIntegerField(help_text="Months with issues among the previous twelve.")
+    month_of_year = models.PositiveSmallIntegerField()
+    rainy_season = models.BooleanField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["facility", "medicine", "period"]
+        unique_together = ("facility", "medicine", "period")
+        indexes = [
+            # Incremental refreshes resume from the latest computed_at.
+            models.Index(fields=["computed_at"], name="analytics_feature_computed_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"Features of {self.medicine} at {self.facility} ({self.period:%Y-%m})"
+
+
+class ForecastModelVersion(models.Model):
+    """
+    A trained forecast model whose artifact lives in the registry directory, see ``analytics.registry``.
+
+    ``version`` is the value written to ``Forecast.model_version`` by forecasts
+    produced from it.
+    """
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    version = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=64, help_text="Name of the model in analytics.forecasting.")
+    period = models.CharField(max_length=16)
+    trained_through = models.DateField(help_text="First period not seen in training; forecasts start here.")
+    series = models.PositiveIntegerField()
+    is_active = models.BooleanField(default=False, help_text="Served when a request names no version.")
+    mape = models.FloatField(null=True, blank=True, help_text="From the latest backtest of the model, if any.")
+    mase = models.FloatField(null=True, blank=True, help_text="From the latest backtest of the model, if any.")
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.version} ({self.model})"
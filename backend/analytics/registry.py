@@ -0,0 +1,313 @@
+"""
+Versioned forecast model artifacts on local disk.
+
+Training fits one of the :mod:`analytics.forecasting` models on the demand
+history and stores its per-series parameters under
+``<MODEL_REGISTRY_DIR>/<version>/`` as a ``manifest.json`` plus one uncompressed
+``.npy`` file per array, sorted by series key. Loading memory-maps the arrays:
+opening a version only reads the file headers, lookups page in what they touch,
+and every worker process on the host shares the same page cache. Each process
+keeps the most recently used versions mapped in a small LRU.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from inventory.models import Forecast
+
+from .forecasting import get_model, one_step_errors
+from .history import PERIODS, load_demand_history, next_period, pair_keys
+from .models import BacktestResult, ForecastModelVersion
+
+ARRAYS = ("keys", "level", "sigma")
+MANIFEST = "manifest.json"
+# One-step errors over this many trailing periods give each series' spread.
+RESIDUAL_PERIODS = 6
+INTERVAL_Z = NormalDist().inv_cdf(0.975)
+BATCH_SIZE = 2000
+VERSION_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,63}$")
+
+
+@dataclass(frozen=True)
+class ModelArtifact:
+    """
+    Memory-mapped parameters of one trained version.
+
+    ``keys`` are sorted :func:`analytics.history.pair_keys`; ``level`` is the
+    per-period forecast of each series and ``sigma`` its one-step error standard
+    deviation (NaN with too little history).
+    """
+
+    version: str
+    manifest: Dict[str, object]
+    keys: np.ndarray
+    level: np.ndarray
+    sigma: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def predict(self, facility_ids: np.ndarray, medicine_ids: np.ndarray, horizon: int = 1) -> Dict[str, np.ndarray]:
+        """
+        Total demand over the next ``horizon`` periods, with a 95% interval, per requested pair.
+
+        ``found`` is False for pairs the version was not trained on; their values are NaN.
+        """
+
+        keys = pair_keys(facility_ids, medicine_ids)
+        positions = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        found = self.keys[positions] == keys
+        level = np.where(found, self.level[positions], np.nan)
+        sigma = np.where(found, self.sigma[positions], np.nan)
+        predicted = level * horizon
+        spread = INTERVAL_Z * sigma * np.sqrt(horizon)
+        return {
+            "found": found,
+            "predicted": predicted,
+            "lower": np.maximum(predicted - spread, 0),
+            "upper": predicted + spread,
+        }
+
+
+_cache: "OrderedDict[Tuple[str, str], ModelArtifact]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def registry_root() -> Path:
+    return Path(settings.MODEL_REGISTRY_DIR)
+
+
+def _version_dir(version: str, root: Optional[Path] = None) -> Path:
+    if not VERSION_PATTERN.match(version):
+        raise ValueError(f"Invalid model version {version!r}; use up to 64 letters, digits, '.', '-' and '_'.")
+    return (root or registry_root()) / version
+
+
+def write_artifact(
+    version: str, manifest: Dict[str, object], arrays: Dict[str, np.ndarray], root: Optional[Path] = None
+) -> Path:
+    """Write a new version atomically; existing versions are never overwritten."""
+
+    target = _version_dir(version, root)
+    if target.exists():
+        raise FileExistsError(f"Model version {version!r} already exists.")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{version}-"))
+    try:
+        for name in ARRAYS:
+            with open(staging / f"{name}.npy", "wb") as handle:
+                np.save(handle, np.ascontiguousarray(arrays[name]))
+                handle.flush()
+                os.fsync(handle.fileno())
+        with open(staging / MANIFEST, "w") as handle:
+            json.dump({**manifest, "version": version, "arrays": list(ARRAYS)}, handle, default=str)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return target
+
+
+def load_artifact(version: str, root: Optional[Path] = None) -> ModelArtifact:
+    """Map a version's arrays, reusing this process's mapping while it stays among the hot versions."""
+
+    directory = _version_dir(version, root)
+    cache_key = (str(directory.parent), version)
+    with _cache_lock:
+        artifact = _cache.get(cache_key)
+        if artifact is not None:
+            _cache.move_to_end(cache_key)
+            return artifact
+
+    try:
+        manifest = json.loads((directory / MANIFEST).read_text())
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"Model version {version!r} has no artifact under {directory.parent}.") from exc
+    arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+    artifact = ModelArtifact(version=version, manifest=manifest, **arrays)
+    with _cache_lock:
+        _cache[cache_key] = artifact
+        _cache.move_to_end(cache_key)
+        while len(_cache) > max(settings.MODEL_REGISTRY_CACHE_SIZE, 1):
+            _cache.popitem(last=False)
+    return artifact
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def resolve_version(version: Optional[str] = None) -> ForecastModelVersion:
+    """The named version, else the active one, else the newest; raises ``DoesNotExist``."""
+
+    versions = ForecastModelVersion.objects.all()
+    if version:
+        return versions.get(version=version)
+    active = versions.filter(is_active=True).first()
+    if active is not None:
+        return active
+    latest = versions.first()
+    if latest is None:
+        raise ForecastModelVersion.DoesNotExist("No forecast model has been trained.")
+    return latest
+
+
+def train_model(
+    model_name: str,
+    version: Optional[str] = None,
+    period: str = "month",
+    end: Optional[date] = None,
+    activate: bool = False,
+) -> ForecastModelVersion:
+    """
+    Fit ``model_name`` on every series' demand history before ``end`` and register the result.
+
+    The model's one-step forecast becomes the series' per-period level; its
+    errors over the last :data:`RESIDUAL_PERIODS` give the spread.
+    """
+
+    model = get_model(model_name)
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {PERIODS}.")
+    history = load_demand_history(period, end=end)
+    if not len(history) or not history.periods:
+        raise ValueError("There is no issue history to train on.")
+
+    level = model(history.values, 1)[:, 0]
+    sigma = np.full(len(history), np.nan)
+    if len(history.periods) > RESIDUAL_PERIODS:
+        sigma = np.sqrt(np.mean(one_step_errors(model, history.values, RESIDUAL_PERIODS) ** 2, axis=1))
+    trained_through = next_period(history.periods[-1], period)
+    version = version or f"{model_name}-{period}-{timezone.now():%Y%m%d%H%M%S}"
+    if ForecastModelVersion.objects.filter(version=version).exists():
+        raise FileExistsError(f"Model version {version!r} already exists.")
+    write_artifact(
+        version,
+        {
+            "model": model_name,
+            "period": period,
+            "trained_through": trained_through.isoformat(),
+            "series": len(history),
+            "trained_at": timezone.now().isoformat(),
+        },
+        {"keys": pair_keys(history.facility_ids, history.medicine_ids), "level": level, "sigma": sigma},
+    )
+
+    backtest = (
+        BacktestResult.objects.filter(model=model_name, group_by="all", run__period=period)
+        .order_by("-run__created_at")
+        .first()
+    )
+    with transaction.atomic():
+        if activate:
+            ForecastModelVersion.objects.filter(is_active=True).update(is_active=False)
+        return ForecastModelVersion.objects.create(
+            version=version,
+            model=model_name,
+            period=period,
+            trained_through=trained_through,
+            series=len(history),
+            is_active=activate,
+            mape=backtest.mape if backtest else None,
+            mase=backtest.mase if backtest else None,
+        )
+
+
+def forecast_window(registered: ForecastModelVersion, horizon: int) -> Tuple[date, date]:
+    """First and last day of the ``horizon`` periods following the training data."""
+
+    end = registered.trained_through
+    for _ in range(horizon):
+        end = next_period(end, registered.period)
+    return registered.trained_through, end - timedelta(days=1)
+
+
+def write_forecasts(
+    registered: ForecastModelVersion, horizon: int = 1, forecast_date: Optional[date] = None
+) -> int:
+    """Store the version's forecast of every trained series as ``Forecast`` rows tagged with its version."""
+
+    artifact = load_artifact(registered.version)
+    facility_ids = (np.asarray(artifact.keys) >> 32).astype(np.int64)
+    medicine_ids = (np.asarray(artifact.keys) & 0xFFFFFFFF).astype(np.int64)
+    prediction = artifact.predict(facility_ids, medicine_ids, horizon)
+    start, end = forecast_window(registered, horizon)
+    forecast_date = forecast_date or timezone.localdate()
+
+    def decimal(value: float) -> Optional[Decimal]:
+        return None if np.isnan(value) else Decimal(str(round(value, 2)))
+
+    rows = [
+        Forecast(
+            facility_id=facility_id,
+            medicine_id=medicine_id,
+            forecast_date=forecast_date,
+            period_start=start,
+            period_end=end,
+            predicted_demand=decimal(predicted),
+            confidence_interval_lower=decimal(lower),
+            confidence_interval_upper=decimal(upper),
+            model_version=registered.version,
+        )
+        for facility_id, medicine_id, predicted, lower, upper in zip(
+            facility_ids.tolist(),
+            medicine_ids.tolist(),
+            prediction["predicted"].tolist(),
+            prediction["lower"].tolist(),
+            prediction["upper"].tolist(),
+        )
+    ]
+    Forecast.objects.bulk_create(
+        rows,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["facility", "medicine", "forecast_date", "period_start", "period_end", "model_version"],
+        update_fields=["predicted_demand", "confidence_interval_lower", "confidence_interval_upper", "updated_at"],
+    )
+    return len(rows)
+
+
+def trained_keys(
+    registered: ForecastModelVersion, facility_ids: Iterable[int], medicine_ids: Optional[Iterable[int]] = None
+) -> np.ndarray:
+    """Sorted keys of the version's trained series at ``facility_ids``, optionally only for ``medicine_ids``."""
+
+    keys = np.asarray(load_artifact(registered.version).keys)
+    selected = np.isin(keys >> 32, np.fromiter(facility_ids, dtype=np.int64))
+    if medicine_ids is not None:
+        selected &= np.isin(keys & 0xFFFFFFFF, np.fromiter(medicine_ids, dtype=np.int64))
+    return keys[selected]
+
+
+def predict_pairs(
+    registered: ForecastModelVersion, pairs: Iterable[Tuple[int, int]], horizon: int = 1
+) -> Dict[str, np.ndarray]:
+    """Prediction arrays for ``(facility_id, medicine_id)`` pairs, in the given order."""
+
+    requested = np.array(list(pairs), dtype=np.int64).reshape(-1, 2)
+    artifact = load_artifact(registered.version)
+    return {
+        "facility_ids": requested[:, 0],
+        "medicine_ids": requested[:, 1],
+        **artifact.predict(requested[:, 0], requested[:, 1], horizon),
+    }
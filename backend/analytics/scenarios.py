@@ -0,0 +1,146 @@
+"""State supply networks and replenishment policies for :mod:`analytics.simulation`."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from inventory.consumption import DAYS_PER_MONTH
+from inventory.models import Facility
+from inventory.planning import compute_levels, plan_replenishment
+
+from .simulation import Network, PolicyLevels
+
+# (name, service level, review days) compared when no policy is given.
+DEFAULT_POLICIES: Tuple[Tuple[str, float, int], ...] = (
+    ("minmax-90", 0.90, 30),
+    ("minmax-95", 0.95, 30),
+    ("minmax-99", 0.99, 30),
+    ("weekly-95", 0.95, 7),
+)
+DEFAULT_TRANSPORT_DAYS = 7
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A state's network with the monthly demand behind it; series arrays share the network's order."""
+
+    network: Network
+    facility_ids: np.ndarray
+    medicine_ids: np.ndarray
+    warehouse_ids: np.ndarray
+    monthly_demand: np.ndarray
+    monthly_sigma: np.ndarray
+
+
+def parse_policy(spec: str) -> Tuple[str, float, int]:
+    """Read ``name:service_level:review_days``, e.g. ``minmax-95:0.95:30``."""
+
+    try:
+        name, service_level, review_days = spec.split(":")
+        policy = (name, float(service_level), int(review_days))
+    except ValueError as exc:
+        raise ValueError(f"Policy {spec!r} should look like name:service_level:review_days.") from exc
+    if not name or not 0 < policy[1] < 1 or policy[2] < 1:
+        raise ValueError(f"Policy {spec!r} needs a name, a service level in (0, 1) and at least one review day.")
+    return policy
+
+
+def build_scenario(
+    state: str, medicine_ids: Optional[Iterable[int]] = None, transport_days: int = DEFAULT_TRANSPORT_DAYS
+) -> Scenario:
+    """
+    Facilities of ``state`` supplied by its warehouses, with demand from the replenishment planner.
+
+    Each facility is served by a warehouse in its LGA, else the state's first
+    warehouse by code. Demand and spread per series are those the planner uses:
+    the latest forecast, else AMC. Warehouses are restocked after the
+    medicine's supplier lead time.
+    """
+
+    facilities = Facility.objects.filter(state=state, is_active=True)
+    warehouses = list(
+        facilities.filter(facility_type=Facility.FacilityType.WAREHOUSE).order_by("code").values_list("pk", "lga")
+    )
+    if not warehouses:
+        raise ValueError(f"{state} has no active warehouse.")
+    by_lga = {}
+    for warehouse_id, lga in warehouses:
+        by_lga.setdefault(lga, warehouse_id)
+    served_by = {
+        facility_id: by_lga.get(lga, warehouses[0][0])
+        for facility_id, lga in facilities.exclude(facility_type=Facility.FacilityType.WAREHOUSE).values_list(
+            "pk", "lga"
+        )
+    }
+
+    plan = plan_replenishment(facilities.filter(pk__in=list(served_by)))
+    keep = plan.monthly_demand > 0
+    if medicine_ids is not None:
+        keep &= np.isin(plan.medicine_ids, list(medicine_ids))
+    if not keep.any():
+        raise ValueError(f"No facility in {state} has forecast or consumed demand for the selected medicines.")
+
+    facility_ids, medicines = plan.facility_ids[keep], plan.medicine_ids[keep]
+    warehouse_ids = np.array([served_by[facility_id] for facility_id in facility_ids.tolist()], dtype=np.int64)
+    nodes, node = np.unique(np.stack([warehouse_ids, medicines], axis=1), axis=0, return_inverse=True)
+    node = node.reshape(-1)
+    order = np.argsort(node, kind="stable")
+    node = node[order]
+    lead_time_days = plan.lead_time_days[keep][order]
+    network = Network(
+        daily_mean=plan.monthly_demand[keep][order] / DAYS_PER_MONTH,
+        daily_sigma=plan.monthly_sigma[keep][order] / np.sqrt(DAYS_PER_MONTH),
+        node=node,
+        node_starts=np.searchsorted(node, np.arange(len(nodes))),
+        transport_days=np.full(len(node), transport_days, dtype=np.int64),
+        supplier_days=np.ceil(lead_time_days[np.searchsorted(node, np.arange(len(nodes)))]).astype(np.int64),
+    )
+    return Scenario(
+        network=network,
+        facility_ids=facility_ids[order],
+        medicine_ids=medicines[order],
+        warehouse_ids=nodes[:, 0],
+        monthly_demand=plan.monthly_demand[keep][order],
+        monthly_sigma=plan.monthly_sigma[keep][order],
+    )
+
+
+def policy_levels(scenario: Scenario, name: str, service_level: float, review_days: int) -> PolicyLevels:
+    """
+    Min/max levels the planner would set under a policy, at both echelons.
+
+    Facilities cover the transport time from their warehouse; warehouses cover
+    their facilities' pooled demand over the supplier lead time.
+    """
+
+    network = scenario.network
+    review_months = review_days / DAYS_PER_MONTH
+    facility = compute_levels(
+        np.zeros(network.series),
+        scenario.monthly_demand,
+        scenario.monthly_sigma,
+        network.transport_days,
+        service_level,
+        review_months,
+    )
+    node_demand = np.add.reduceat(scenario.monthly_demand, network.node_starts)
+    node_sigma = np.sqrt(np.add.reduceat(scenario.monthly_sigma**2, network.node_starts))
+    warehouse = compute_levels(
+        np.zeros(network.nodes), node_demand, node_sigma, network.supplier_days, service_level, review_months
+    )
+    return PolicyLevels(
+        name=name,
+        review_days=review_days,
+        facility_min=facility["min_level"],
+        facility_max=facility["max_level"],
+        warehouse_min=warehouse["min_level"],
+        warehouse_max=warehouse["max_level"],
+    )
+
+
+def scenario_policies(
+    scenario: Scenario, specs: Sequence[Tuple[str, float, int]] = DEFAULT_POLICIES
+) -> List[PolicyLevels]:
+    return [policy_levels(scenario, *spec) for spec in specs]
@@ -0,0 +1,12 @@
+"""Serializers for analytics models."""
+from __future__ import annotations
+
+from rest_framework import serializers
+
+from .models import ReconciledForecast
+
+
+class ReconciledForecastSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReconciledForecast
+        exclude = ["created_at"]
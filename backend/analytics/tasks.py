@@ -0,0 +1,57 @@
+"""Background jobs for the analytics app."""
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, Optional
+
+from django.utils import timezone
+
+from jobs.registry import register_job
+
+from .features import refresh_features
+from .reconciliation import reconcile_forecasts
+from .registry import train_model, write_forecasts
+
+
+@register_job("analytics.refresh_features")
+def refresh_demand_features(full: bool = False) -> Dict[str, int]:
+    return refresh_features(full=full)
+
+
+@register_job("analytics.reconcile_forecasts")
+def reconcile_forecast_batch(
+    model_version: Optional[str] = None,
+    forecast_date: Optional[str] = None,
+    method: str = "bottom_up",
+    base_model: str = "ses",
+) -> Dict[str, int]:
+    return reconcile_forecasts(
+        model_version=model_version,
+        forecast_date=date.fromisoformat(forecast_date) if forecast_date else None,
+        method=method,
+        base_model=base_model,
+    )
+
+
+@register_job("analytics.train_forecast_model")
+def train_forecast_model(
+    model: str,
+    version: Optional[str] = None,
+    period: str = "month",
+    end: Optional[str] = None,
+    activate: bool = False,
+    horizon: Optional[int] = None,
+) -> Dict[str, object]:
+    """Train and register a version; with ``horizon``, also store and reconcile its forecasts."""
+
+    registered = train_model(
+        model, version=version, period=period, end=date.fromisoformat(end) if end else None, activate=activate
+    )
+    result: Dict[str, object] = {"version": registered.version, "series": registered.series}
+    if horizon:
+        forecast_date = timezone.localdate()
+        result["forecasts"] = write_forecasts(registered, horizon=horizon, forecast_date=forecast_date)
+        result["reconciled"] = reconcile_forecast_batch(
+            model_version=registered.version, forecast_date=forecast_date.isoformat()
+        )
+    return result
@@ -0,0 +1,122 @@
+"""Tests for the forecasting baselines and the rolling-origin backtest."""
+from __future__ import annotations
+
+import io
+import json
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from analytics.backtest import evaluate, rolling_origins, run_backtest, summarize
+from analytics.forecasting import FORECAST_MODELS
+from analytics.history import load_demand_history
+from analytics.models import BacktestResult, BacktestRun
+from inventory.models import Facility, InventoryTransaction, Medicine
+
+
+class ForecastModelTests(SimpleTestCase):
+    def test_models_forecast_every_series_at_once(self) -> None:
+        history = np.array([[10.0, 20.0, 30.0, 40.0], [0.0, 6.0, 0.0, 6.0]])
+
+        self.assertEqual(FORECAST_MODELS["naive"](history, 2).tolist(), [[40, 40], [6, 6]])
+        self.assertEqual(FORECAST_MODELS["moving_average"](history, 1).tolist(), [[30], [4]])
+        self.assertAlmostEqual(FORECAST_MODELS["ses"](history, 1)[0, 0], 24.67)
+        # Croston: demand size 6 every 2 periods.
+        self.assertAlmostEqual(FORECAST_MODELS["croston"](history, 1)[1, 0], 3.0)
+        for model in FORECAST_MODELS.values():
+            self.assertEqual(model(history, 3).shape, (2, 3))
+
+    def test_metrics(self) -> None:
+        values = np.array([[10.0, 20.0, 10.0, 20.0, 30.0]])
+
+        scores = evaluate("naive", values, [4], horizon=1)
+
+        # Forecast 20 for an actual 30; the naive in-sample MAE is 10.
+        self.assertEqual(scores.ape_sum.tolist(), [1 / 3])
+        self.assertEqual(scores.scaled_sum.tolist(), [1.0])
+        self.assertEqual(scores.error_sum.tolist(), [-10.0])
+        self.assertGreater(scores.peak_bytes, 0)
+
+    def test_parallel_run_matches_serial_run_and_groups(self) -> None:
+        values = np.random.default_rng(7).poisson(20, size=(50, 12)).astype(np.float64)
+        origins = rolling_origins(values.shape[1], horizon=2, origins=4)
+        self.assertEqual(origins, [7, 8, 9, 10])
+
+        serial = run_backtest(values, ["naive", "ses"], 2, origins, workers=1)
+        parallel = run_backtest(values, ["naive", "ses"], 2, origins, workers=3)
+
+        for name in ("naive", "ses"):
+            np.testing.assert_allclose(serial[name].ape_sum, parallel[name].ape_sum)
+            np.testing.assert_allclose(serial[name].scaled_sum, parallel[name].scaled_sum)
+        codes = np.arange(50) % 2
+        rows = summarize(parallel, {"all": (np.zeros(50, dtype=np.int64), ["all"]), "half": (codes, ["a", "b"])})
+        self.assertEqual(len(rows), 6)
+        self.assertEqual({row["series"] for row in rows if row["group_by"] == "half"}, {25})
+
+    def test_short_history_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            rolling_origins(3, horizon=2, origins=4)
+
+
+class BacktestCommandTests(TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.override = override_settings(LEDGER_ARCHIVE_DIR=self.tmpdir.name)
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+
+        hospital = Facility.objects.create(
+            code="F-1", name="Hospital", facility_type="hospital", ownership="public", state="Lagos"
+        )
+        clinic = Facility.objects.create(
+            code="F-2", name="Clinic", facility_type="clinic", ownership="public", state="Lagos"
+        )
+        medicine = Medicine.objects.create(name="ACT", generic_name="AL", category="Antimalarial")
+        rows = []
+        for month in range(1, 13):
+            for facility, base in ((hospital, 100), (clinic, 10)):
+                rows.append(
+                    InventoryTransaction(
+                        facility=facility,
+                        medicine=medicine,
+                        transaction_type=InventoryTransaction.TransactionType.ISSUE,
+                        quantity=Decimal(base + month),
+                        occurred_at=timezone.make_aware(datetime.combine(date(2024, month, 15), time(9))),
+                    )
+                )
+        InventoryTransaction.objects.bulk_create(rows)
+
+    def test_history_matrix(self) -> None:
+        history = load_demand_history("month", end=date(2025, 1, 1))
+
+        self.assertEqual(history.periods[0], date(2024, 1, 1))
+        self.assertEqual(len(history.periods), 12)
+        self.assertEqual(history.values.shape, (2, 12))
+        self.assertEqual(history.values.sum(), sum(110 + 2 * month for month in range(1, 13)))
+        self.assertEqual(sorted(history.facility_types), ["clinic", "hospital"])
+        self.assertEqual(history.categories, ["Antimalarial", "Antimalarial"])
+
+    def test_command_reports_and_stores_results(self) -> None:
+        out = io.StringIO()
+
+        call_command(
+            "backtest_forecasts", "--end", "2025-01-01", "--horizon", "2", "--origins", "3", "--workers", "1", "--json",
+            stdout=out,
+        )
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines() if line.startswith("{")]
+        # Four models over the all, facility type (2) and category (1) groups.
+        self.assertEqual(len(rows), 4 * 4)
+        run = BacktestRun.objects.get()
+        self.assertEqual((run.series, run.origins), (2, 3))
+        self.assertEqual(BacktestResult.objects.filter(run=run).count(), 16)
+        # Steadily rising demand: the naive forecast beats a 3-period average.
+        naive = BacktestResult.objects.get(model="naive", group_by="all")
+        average = BacktestResult.objects.get(model="moving_average", group_by="all")
+        self.assertLess(naive.mase, average.mase)
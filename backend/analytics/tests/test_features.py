@@ -0,0 +1,127 @@
+"""Tests for the forecasting feature store."""
+from __future__ import annotations
+
+import tempfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from analytics.features import compute_features, load_features, refresh_features
+from analytics.models import DemandFeature
+from inventory.models import Facility, InventoryTransaction, Medicine, MonthlyConsumption, StockSnapshot
+
+
+def _at(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time(9)))
+
+
+class ComputeFeaturesTests(SimpleTestCase):
+    def test_lags_rolling_means_and_stockout_adjustment(self) -> None:
+        periods = [date(2024, month, 1) for month in range(1, 5)]
+        demand = np.array([[10.0, 20.0, 30.0, 40.0], [10.0, 20.0, 0.0, 5.0]])
+        # Half of April out of stock for the first series; all of March for the second.
+        stockout_days = np.array([[0, 0, 0, 15], [0, 0, 31, 0]])
+
+        features = compute_features(demand, stockout_days, periods)
+
+        self.assertEqual(features["adjusted_demand"][0].tolist(), [10, 20, 30, 80])
+        # The unobserved March carries the mean of the months before it.
+        self.assertEqual(features["adjusted_demand"][1, 2], 15)
+        self.assertEqual(features["lag_1"][0].tolist(), [0, 10, 20, 30])
+        self.assertEqual(features["lag_12"][0].tolist(), [0, 0, 0, 0])
+        self.assertEqual(features["mean_3"][0, 3], 20)
+        self.assertAlmostEqual(features["std_6"][0, 3], np.round(np.std([0, 0, 0, 10, 20, 30]), 4))
+        self.assertEqual(features["active_months"][:, 3].tolist(), [3, 2])
+        self.assertEqual(features["month_of_year"][0].tolist(), [1, 2, 3, 4])
+        self.assertEqual(features["rainy_season"][0].tolist(), [False, False, False, True])
+        self.assertEqual(features["stockout_days"].dtype, np.int16)
+
+
+class FeatureStoreTests(TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.override = override_settings(LEDGER_ARCHIVE_DIR=self.tmpdir.name)
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+
+        self.facilities = [
+            Facility.objects.create(code=code, name=code, facility_type="clinic", ownership="public", state="Lagos")
+            for code in ("F-1", "F-2")
+        ]
+        self.medicine = Medicine.objects.create(name="ACT", generic_name="AL")
+        InventoryTransaction.objects.bulk_create(
+            InventoryTransaction(
+                facility=facility,
+                medicine=self.medicine,
+                transaction_type=InventoryTransaction.TransactionType.ISSUE,
+                quantity=Decimal(10 * month * (index + 1)),
+                occurred_at=_at(date(2024, month, 10)),
+            )
+            for index, facility in enumerate(self.facilities)
+            for month in range(1, 7)
+        )
+        for day in (3, 4, 4):
+            StockSnapshot.objects.update_or_create(
+                facility=self.facilities[0],
+                medicine=self.medicine,
+                recorded_at=_at(date(2024, 6, day)),
+                defaults={"stock_on_hand": Decimal(0)},
+            )
+        # Source rows written long before the first refresh.
+        StockSnapshot.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+
+    def test_full_refresh_and_load_pair_subset(self) -> None:
+        result = refresh_features(today=date(2024, 7, 15))
+
+        self.assertEqual(result, {"pairs": 2, "rows": 12})
+        matrix = load_features(
+            pairs=[(self.facilities[1].pk, self.medicine.pk), (999, self.medicine.pk)],
+            start=date(2024, 3, 1),
+            columns=["demand", "lag_1", "mean_3"],
+        )
+        self.assertEqual(matrix.periods.tolist(), [date(2024, month, 1) for month in range(3, 7)])
+        self.assertEqual(matrix.present.tolist(), [[True] * 4, [False] * 4])
+        self.assertEqual(matrix["demand"][0].tolist(), [60, 80, 100, 120])
+        self.assertEqual(matrix["lag_1"][0].tolist(), [40, 60, 80, 100])
+        self.assertEqual(matrix["mean_3"][0, 1], 40)
+        self.assertEqual(set(matrix.columns), {"demand", "lag_1", "mean_3"})
+
+        june = DemandFeature.objects.get(facility=self.facilities[0], period=date(2024, 6, 1))
+        # Two distinct stock-out days out of thirty.
+        self.assertEqual(june.stockout_days, 2)
+        self.assertAlmostEqual(june.adjusted_demand, 60 * 30 / 28, places=3)
+
+    def test_incremental_refresh_recomputes_changed_pairs_only(self) -> None:
+        refresh_features(today=date(2024, 7, 15))
+        DemandFeature.objects.update(computed_at=timezone.now() - timedelta(minutes=30))
+        untouched = DemandFeature.objects.get(facility=self.facilities[1], period=date(2024, 4, 1)).computed_at
+
+        # Saving a transaction refreshes its consumption bucket, which marks the pair as changed.
+        InventoryTransaction.objects.create(
+            facility=self.facilities[0],
+            medicine=self.medicine,
+            transaction_type=InventoryTransaction.TransactionType.ISSUE,
+            quantity=Decimal(5),
+            occurred_at=_at(date(2024, 3, 20)),
+        )
+        self.assertTrue(MonthlyConsumption.objects.filter(month=date(2024, 3, 1)).exists())
+
+        result = refresh_features(today=date(2024, 7, 15))
+
+        self.assertEqual(result, {"pairs": 1, "rows": 4})
+        matrix = load_features(facility_ids=[self.facilities[0].pk], columns=["demand", "lag_1"])
+        self.assertEqual(matrix["demand"][0].tolist(), [10, 20, 35, 40, 50, 60])
+        self.assertEqual(matrix["lag_1"][0, 3], 35)
+        self.assertEqual(
+            DemandFeature.objects.get(facility=self.facilities[1], period=date(2024, 4, 1)).computed_at, untouched
+        )
+
+        # Once July closes every active pair gains a row for it.
+        DemandFeature.objects.update(computed_at=timezone.now() - timedelta(minutes=30))
+        MonthlyConsumption.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(refresh_features(today=date(2024, 8, 2)), {"pairs": 2, "rows": 2})
+        self.assertEqual(DemandFeature.objects.filter(period=date(2024, 7, 1), demand=0).count(), 2)
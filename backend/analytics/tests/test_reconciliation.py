@@ -0,0 +1,161 @@
+"""Tests for hierarchical forecast reconciliation."""
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from analytics.models import ReconciledForecast
+from analytics.reconciliation import Hierarchy, reconcile, reconcile_forecasts
+from inventory.models import Facility, Forecast, InventoryTransaction, Medicine
+
+# Four facilities: two in LGA (A, x), one in (A, y) and one in (B, z).
+HIERARCHY = Hierarchy(
+    facility_ids=np.arange(4),
+    parents={"lga": np.array([0, 0, 1, 2]), "state": np.array([0, 0, 1]), "national": np.array([0, 0])},
+    labels={"lga": [("A", "x"), ("A", "y"), ("B", "z")], "state": [("A", ""), ("B", "")], "national": [("", "")]},
+)
+
+
+class ReconcileTests(SimpleTestCase):
+    def test_bottom_up_sums_each_level(self) -> None:
+        # Two groups; the second has no forecast for facility 3.
+        groups = np.array([0, 0, 0, 0, 1, 1, 1])
+        leaves = np.array([0, 1, 2, 3, 0, 1, 2])
+        base = np.array([1.0, 2.0, 3.0, 4.0, 10.0, 20.0, 30.0])
+
+        result = reconcile(groups, leaves, base, np.ones(7), HIERARCHY, 2)
+
+        np.testing.assert_allclose(result.leaves, base)
+        np.testing.assert_allclose(result.totals["lga"], [[3, 3, 4], [30, 30, 0]])
+        np.testing.assert_allclose(result.totals["state"], [[6, 4], [60, 0]])
+        np.testing.assert_allclose(result.totals["national"], [[10], [60]])
+        np.testing.assert_array_equal(result.counts["lga"], [[2, 1, 1], [2, 1, 0]])
+
+    def test_mint_matches_dense_gls_and_is_coherent(self) -> None:
+        leaf_base = np.array([10.0, 20.0, 30.0, 40.0])
+        leaf_var = np.array([4.0, 9.0, 1.0, 16.0])
+        upper_base = {
+            "lga": np.array([[35.0, 28.0, 44.0]]),
+            "state": np.array([[60.0, 41.0]]),
+            "national": np.array([[95.0]]),
+        }
+        # The (A, y) LGA has no forecast of its own.
+        upper_var = {
+            "lga": np.array([[5.0, np.inf, 8.0]]),
+            "state": np.array([[10.0, 3.0]]),
+            "national": np.array([[2.0]]),
+        }
+
+        result = reconcile(
+            np.zeros(4, dtype=np.int64), np.arange(4), leaf_base, leaf_var, HIERARCHY, 1, upper_base, upper_var
+        )
+
+        summing = np.array(
+            [
+                *np.eye(4),
+                [1, 1, 0, 0],
+                [0, 0, 1, 0],
+                [0, 0, 0, 1],
+                [1, 1, 1, 0],
+                [0, 0, 0, 1],
+                [1, 1, 1, 1],
+            ]
+        )
+        observed = np.array([True] * 5 + [False] + [True] * 4)
+        base = np.concatenate([leaf_base, upper_base["lga"][0], upper_base["state"][0], upper_base["national"][0]])
+        var = np.concatenate([leaf_var, upper_var["lga"][0], upper_var["state"][0], upper_var["national"][0]])
+        s, w_inv = summing[observed], np.diag(1 / var[observed])
+        expected = np.linalg.solve(s.T @ w_inv @ s, s.T @ w_inv @ base[observed])
+
+        np.testing.assert_allclose(result.leaves, expected)
+        np.testing.assert_allclose(result.totals["lga"][0], [expected[:2].sum(), expected[2], expected[3]])
+        np.testing.assert_allclose(result.totals["state"][0], [expected[:3].sum(), expected[3]])
+        np.testing.assert_allclose(result.totals["national"][0], [expected.sum()])
+
+
+class ReconcileForecastsTests(TestCase):
+    def setUp(self) -> None:
+        self.facilities = [
+            Facility.objects.create(
+                code=code, name=code, facility_type="clinic", ownership="public", state=state, lga=lga
+            )
+            for code, state, lga in (("F-1", "Lagos", "Ikeja"), ("F-2", "Lagos", "Ikeja"), ("F-3", "Kano", "Nassarawa"))
+        ]
+        self.medicine = Medicine.objects.create(name="ACT", generic_name="AL")
+        self.forecast_date = date(2025, 1, 1)
+        for facility, demand in zip(self.facilities, (100, 200, 400)):
+            Forecast.objects.create(
+                facility=facility,
+                medicine=self.medicine,
+                forecast_date=self.forecast_date,
+                period_start=self.forecast_date,
+                period_end=date(2025, 1, 31),
+                predicted_demand=Decimal(demand),
+                confidence_interval_lower=Decimal(demand * 0.5),
+                confidence_interval_upper=Decimal(demand * 1.5),
+                model_version="v1",
+            )
+
+    def _stored(self, method: str, level: str) -> dict:
+        rows = ReconciledForecast.objects.filter(method=method, level=level)
+        return {(row.state, row.lga): row.predicted_demand for row in rows}
+
+    def test_bottom_up_stores_each_level(self) -> None:
+        result = reconcile_forecasts()
+        # Two LGAs, two states and the nation; reruns replace the batch.
+        self.assertEqual(result, {"groups": 1, "rows": 5})
+        reconcile_forecasts()
+
+        self.assertEqual(ReconciledForecast.objects.count(), 5)
+        self.assertEqual(self._stored("bottom_up", "national"), {("", ""): Decimal("700.00")})
+        self.assertEqual(self._stored("bottom_up", "state"), {("Kano", ""): Decimal(400), ("Lagos", ""): Decimal(300)})
+        self.assertEqual(
+            self._stored("bottom_up", "lga"), {("Kano", "Nassarawa"): Decimal(400), ("Lagos", "Ikeja"): Decimal(300)}
+        )
+
+    def test_mint_pulls_facilities_towards_history_and_stays_coherent(self) -> None:
+        # Twelve months of steady history: each facility issues 150 a month.
+        rows = [
+            InventoryTransaction(
+                facility=facility,
+                medicine=self.medicine,
+                transaction_type=InventoryTransaction.TransactionType.ISSUE,
+                quantity=Decimal(150),
+                occurred_at=timezone.make_aware(datetime.combine(date(2024, month, 10), time(9))),
+            )
+            for facility in self.facilities
+            for month in range(1, 13)
+        ]
+        InventoryTransaction.objects.bulk_create(rows)
+
+        reconcile_forecasts(method="mint")
+
+        national = self._stored("mint", "national")[("", "")]
+        facilities = ReconciledForecast.objects.filter(method="mint", level="facility")
+        self.assertEqual(facilities.count(), 3)
+        self.assertAlmostEqual(float(sum(row.predicted_demand for row in facilities)), float(national), delta=0.05)
+        states = self._stored("mint", "state")
+        self.assertAlmostEqual(float(sum(states.values())), float(national), delta=0.05)
+        # The history says ~150 x 3 a month, below the facility forecasts' 700.
+        self.assertLess(national, Decimal(700))
+        self.assertIsNotNone(ReconciledForecast.objects.get(method="mint", level="national").base_demand)
+
+    def test_endpoint_reads_one_level(self) -> None:
+        reconcile_forecasts()
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="admin", role=User.Roles.SUPER_ADMIN))
+
+        response = client.get(reverse("analytics:reconciled-forecasts"), {"level": "state", "state": "Lagos"})
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"] if isinstance(response.data, dict) else response.data
+        self.assertEqual([(row["state"], row["predicted_demand"]) for row in results], [("Lagos", "300.00")])
+        bad = client.get(reverse("analytics:reconciled-forecasts"), {"level": "ward"})
+        self.assertEqual(bad.status_code, 400)
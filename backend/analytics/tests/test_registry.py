@@ -0,0 +1,159 @@
+"""Tests for the forecast model registry and the on-demand prediction endpoint."""
+from __future__ import annotations
+
+import shutil
+import tempfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from pathlib import Path
+
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from analytics import registry
+from analytics.history import pair_keys
+from analytics.models import ForecastModelVersion, ReconciledForecast
+from analytics.tasks import train_forecast_model
+from inventory.models import Facility, Forecast, InventoryTransaction, Medicine
+
+
+class RegistryTestCase(TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.override = override_settings(MODEL_REGISTRY_DIR=self.tmpdir.name, LEDGER_ARCHIVE_DIR=self.tmpdir.name)
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+        registry.clear_cache()
+        self.addCleanup(registry.clear_cache)
+
+
+class ArtifactTests(RegistryTestCase):
+    def _write(self, version: str) -> None:
+        registry.write_artifact(
+            version,
+            {"model": "naive"},
+            {
+                "keys": pair_keys(np.array([1, 1, 2]), np.array([5, 7, 5])),
+                "level": np.array([10.0, 20.0, 30.0]),
+                "sigma": np.array([1.0, np.nan, 2.0]),
+            },
+        )
+
+    def test_artifacts_are_memory_mapped_and_cached(self) -> None:
+        self._write("v1")
+
+        artifact = registry.load_artifact("v1")
+
+        self.assertIsInstance(artifact.level, np.memmap)
+        self.assertIs(registry.load_artifact("v1"), artifact)
+        prediction = artifact.predict(np.array([2, 1, 3]), np.array([5, 7, 5]), horizon=4)
+        self.assertEqual(prediction["found"].tolist(), [True, True, False])
+        self.assertEqual(prediction["predicted"][:2].tolist(), [120.0, 80.0])
+        self.assertAlmostEqual(prediction["upper"][0], 120 + registry.INTERVAL_Z * 2 * 2)
+        self.assertTrue(np.isnan(prediction["lower"][1]))
+        with self.assertRaises(FileExistsError):
+            self._write("v1")
+        with self.assertRaises(ValueError):
+            self._write("../v2")
+
+    @override_settings(MODEL_REGISTRY_CACHE_SIZE=1)
+    def test_least_recently_used_version_is_evicted(self) -> None:
+        self._write("v1")
+        self._write("v2")
+
+        first = registry.load_artifact("v1")
+        registry.load_artifact("v2")
+
+        self.assertIsNot(registry.load_artifact("v1"), first)
+        self.assertEqual(sorted(path.name for path in Path(self.tmpdir.name).iterdir()), ["v1", "v2"])
+
+
+class TrainAndPredictTests(RegistryTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.clinic, self.other = (
+            Facility.objects.create(code=code, name=code, facility_type="clinic", ownership="public", state=state)
+            for code, state in (("F-1", "Lagos"), ("F-2", "Kano"))
+        )
+        self.medicine = Medicine.objects.create(name="ACT", generic_name="AL")
+        InventoryTransaction.objects.bulk_create(
+            InventoryTransaction(
+                facility=facility,
+                medicine=self.medicine,
+                transaction_type=InventoryTransaction.TransactionType.ISSUE,
+                quantity=Decimal(quantity * month),
+                occurred_at=timezone.make_aware(datetime.combine(date(2024, month, 10), time(9))),
+            )
+            for facility, quantity in ((self.clinic, 10), (self.other, 1))
+            for month in range(1, 9)
+        )
+
+    def test_train_register_and_write_forecasts(self) -> None:
+        registered = registry.train_model("moving_average", version="ma-1", end=date(2024, 9, 1), activate=True)
+
+        self.assertEqual((registered.series, registered.trained_through), (2, date(2024, 9, 1)))
+        self.assertEqual(registry.resolve_version(), registered)
+        self.assertEqual(registry.write_forecasts(registered, horizon=2, forecast_date=date(2024, 9, 1)), 2)
+        forecast = Forecast.objects.get(facility=self.clinic, model_version="ma-1")
+        # Mean of June to August, over two months.
+        self.assertEqual(forecast.predicted_demand, Decimal("140.00"))
+        self.assertEqual((forecast.period_start, forecast.period_end), (date(2024, 9, 1), date(2024, 10, 31)))
+
+        registry.train_model("naive", version="naive-1", end=date(2024, 9, 1), activate=True)
+        self.assertEqual(ForecastModelVersion.objects.filter(is_active=True).get().version, "naive-1")
+
+    def test_training_job_with_a_horizon_reconciles_its_batch(self) -> None:
+        result = train_forecast_model("naive", version="naive-1", end="2024-09-01", horizon=1)
+
+        self.assertEqual(result["forecasts"], 2)
+        self.assertGreater(result["reconciled"]["rows"], 0)
+        national = ReconciledForecast.objects.get(model_version="naive-1", level="national")
+        # August issues: 80 at the clinic plus 8 at the other facility.
+        self.assertEqual(national.predicted_demand, Decimal("88.00"))
+        self.assertEqual(national.forecast_date, timezone.localdate())
+
+    def test_predict_endpoint_is_scoped(self) -> None:
+        registry.train_model("naive", version="naive-1", end=date(2024, 9, 1))
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="pharm", facility=self.clinic))
+
+        response = client.get(reverse("forecast-predict"), {"horizon": 3})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["model_version"], "naive-1")
+        self.assertEqual(response.data["period_end"], date(2024, 11, 30))
+        self.assertEqual(
+            [(row["facility"], row["predicted_demand"]) for row in response.data["results"]], [(self.clinic.pk, 240.0)]
+        )
+        self.assertEqual(client.get(reverse("forecast-predict"), {"facility": self.other.pk}).status_code, 403)
+        self.assertEqual(client.get(reverse("forecast-predict"), {"model_version": "missing"}).status_code, 404)
+
+    @override_settings(FORECAST_PREDICT_PAGE_SIZE=1)
+    def test_predict_endpoint_pages_trained_series(self) -> None:
+        registry.train_model("naive", version="naive-1", end=date(2024, 9, 1))
+        Medicine.objects.create(name="Untrained", generic_name="U")
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="admin", role=User.Roles.SUPER_ADMIN))
+
+        first = client.get(reverse("forecast-predict"), {"limit": 50}).data
+        second = client.get(reverse("forecast-predict"), {"offset": 1}).data
+
+        # Only the two trained series count, however many facility x medicine pairs exist.
+        self.assertEqual((first["count"], second["count"]), (2, 2))
+        self.assertEqual(
+            [row["facility"] for row in first["results"] + second["results"]], [self.clinic.pk, self.other.pk]
+        )
+
+    def test_predict_endpoint_without_the_artifact_is_not_found(self) -> None:
+        registry.train_model("naive", version="naive-1", end=date(2024, 9, 1))
+        shutil.rmtree(Path(self.tmpdir.name) / "naive-1")
+        registry.clear_cache()
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="pharm", facility=self.clinic))
+
+        self.assertEqual(client.get(reverse("forecast-predict")).status_code, 404)
@@ -0,0 +1,132 @@
+"""Tests for the multi-echelon replenishment simulation."""
+from __future__ import annotations
+
+import io
+import json
+from decimal import Decimal
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from analytics.scenarios import build_scenario, parse_policy, policy_levels
+from analytics.simulation import Network, PolicyLevels, demand_distribution, run_simulation, summarize
+from inventory.models import ConsumptionStat, Facility, Medicine
+
+# Three facilities: two served by warehouse node 0, one by node 1.
+NETWORK = Network(
+    daily_mean=np.array([10.0, 5.0, 20.0]),
+    daily_sigma=np.array([3.0, 0.0, 6.0]),
+    node=np.array([0, 0, 1]),
+    node_starts=np.array([0, 2]),
+    transport_days=np.array([3, 3, 5]),
+    supplier_days=np.array([20, 20]),
+)
+
+
+def _policy(name: str, facility_max: float, warehouse_max: float, review_days: int = 7) -> PolicyLevels:
+    return PolicyLevels(
+        name=name,
+        review_days=review_days,
+        facility_min=np.full(3, facility_max / 2),
+        facility_max=np.full(3, facility_max),
+        warehouse_min=np.full(2, warehouse_max / 2),
+        warehouse_max=np.full(2, warehouse_max),
+    )
+
+
+class SimulationTests(SimpleTestCase):
+    def test_gamma_matches_mean_and_spread(self) -> None:
+        distribution = demand_distribution(np.array([10.0, 4.0, 0.0]), np.array([5.0, 0.0, 0.0]))
+
+        np.testing.assert_allclose(distribution["shape"] * distribution["scale"], [10, 4, 0])
+        # Without a spread the variance defaults to the mean.
+        np.testing.assert_allclose(distribution["shape"][:2] * distribution["scale"][:2] ** 2, [25, 4])
+
+    def test_policies_share_demand_paths_and_order_by_stock(self) -> None:
+        policies = [_policy("lean", 40, 300), _policy("rich", 400, 5000)]
+
+        results = run_simulation(NETWORK, policies, days=60, replications=120, seed=3, workers=1)
+
+        np.testing.assert_allclose(results["lean"].demand, results["rich"].demand)
+        rows = {row["policy"]: row for row in summarize(results, days=60, holding_cost=0.5)}
+        self.assertEqual(rows["lean"]["replications"], 120)
+        self.assertGreater(rows["lean"]["stockout_probability"], rows["rich"]["stockout_probability"])
+        self.assertLess(rows["lean"]["holding_cost"], rows["rich"]["holding_cost"])
+        self.assertLess(rows["rich"]["stockout_day_rate"], 0.01)
+        self.assertGreater(rows["rich"]["fill_rate"], 0.99)
+        self.assertAlmostEqual(
+            rows["rich"]["holding_cost"],
+            (results["rich"].facility_stock_days.sum() + results["rich"].warehouse_stock_days.sum()) * 0.5 / 120,
+            places=1,
+        )
+
+    def test_parallel_run_matches_serial_run(self) -> None:
+        policies = [_policy("lean", 60, 200)]
+
+        serial = run_simulation(NETWORK, policies, days=30, replications=70, seed=11, workers=1)
+        parallel = run_simulation(NETWORK, policies, days=30, replications=70, seed=11, workers=2)
+
+        np.testing.assert_allclose(serial["lean"].unmet, parallel["lean"].unmet)
+        np.testing.assert_allclose(serial["lean"].warehouse_stock_days, parallel["lean"].warehouse_stock_days)
+
+    def test_empty_warehouse_rations_and_runs_out(self) -> None:
+        results = run_simulation(NETWORK, [_policy("dry", 50, 0)], days=60, replications=10, seed=1)
+
+        # Facilities sell their opening stock, then never receive more.
+        self.assertEqual(summarize(results, days=60)[0]["stockout_probability"], 1.0)
+
+    def test_parse_policy(self) -> None:
+        self.assertEqual(parse_policy("weekly:0.9:7"), ("weekly", 0.9, 7))
+        for spec in ("weekly", "weekly:1.2:7", "weekly:0.9:0"):
+            with self.assertRaises(ValueError):
+                parse_policy(spec)
+
+
+class ScenarioTests(TestCase):
+    def setUp(self) -> None:
+        def facility(code: str, facility_type: str, lga: str) -> Facility:
+            return Facility.objects.create(
+                code=code, name=code, facility_type=facility_type, ownership="public", state="Kano", lga=lga
+            )
+
+        self.warehouse = facility("W-1", Facility.FacilityType.WAREHOUSE, "Nassarawa")
+        self.other_warehouse = facility("W-2", Facility.FacilityType.WAREHOUSE, "Fagge")
+        self.clinics = [facility("C-1", "clinic", "Fagge"), facility("C-2", "clinic", "Gwale")]
+        self.medicine = Medicine.objects.create(name="ORS", generic_name="ORS", lead_time_days=45)
+        for clinic, amc in zip(self.clinics, (300, 600)):
+            ConsumptionStat.objects.create(
+                facility=clinic, medicine=self.medicine, amc=Decimal(amc), stock_on_hand=Decimal(100)
+            )
+
+    def test_facilities_are_served_by_their_lga_warehouse(self) -> None:
+        scenario = build_scenario("Kano")
+
+        network = scenario.network
+        self.assertEqual(network.series, 2)
+        # C-1 uses the Fagge warehouse; C-2 falls back to the first by code.
+        served = dict(zip(scenario.facility_ids.tolist(), scenario.warehouse_ids[network.node].tolist()))
+        self.assertEqual(served, {self.clinics[0].pk: self.other_warehouse.pk, self.clinics[1].pk: self.warehouse.pk})
+        self.assertEqual(network.supplier_days.tolist(), [45, 45])
+        levels = policy_levels(scenario, "monthly", 0.95, 30)
+        self.assertTrue((levels.facility_max > levels.facility_min).all())
+        with self.assertRaises(ValueError):
+            build_scenario("Lagos")
+
+    def test_command_reports_each_policy(self) -> None:
+        out = io.StringIO()
+        call_command(
+            "simulate_replenishment",
+            "--state=Kano",
+            "--policy=a:0.9:30",
+            "--policy=b:0.99:7",
+            "--days=30",
+            "--replications=20",
+            "--workers=1",
+            "--json",
+            stdout=out,
+        )
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines() if line.startswith("{")]
+        self.assertEqual([row["policy"] for row in rows], ["a", "b"])
+        self.assertEqual({row["series"] for row in rows}, {2})
@@ -0,0 +1,161 @@
+"""Tests for the in-memory stock cube and the analytics endpoints."""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from analytics import cube
+from analytics.cube import StockCube, summarize
+from inventory.models import Facility, Forecast, Medicine, StockSnapshot
+
+RECORDED_AT = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+class StockCubeTests(TestCase):
+    def setUp(self) -> None:
+        self.ikeja = Facility.objects.create(
+            name="Ikeja", code="IKJ", facility_type="hospital", ownership="public", state="Lagos", lga="Ikeja"
+        )
+        self.epe = Facility.objects.create(
+            name="Epe", code="EPE", facility_type="clinic", ownership="private", state="Lagos", lga="Epe"
+        )
+        self.kano = Facility.objects.create(
+            name="Kano", code="KAN", facility_type="hospital", ownership="public", state="Kano", lga="Nassarawa"
+        )
+        self.amoxicillin = Medicine.objects.create(name="Amoxicillin", generic_name="Amoxicillin")
+        self.artemether = Medicine.objects.create(name="Artemether", generic_name="Artemether")
+        # Bulk-created, so the given days of stock are kept instead of derived from AMC.
+        StockSnapshot.objects.bulk_create(
+            StockSnapshot(
+                facility=facility,
+                medicine=medicine,
+                stock_on_hand=Decimal(stock),
+                days_of_stock=days,
+                recorded_at=RECORDED_AT,
+            )
+            for facility, medicine, stock, days in (
+                (self.ikeja, self.amoxicillin, "120", 45),
+                (self.ikeja, self.artemether, "0", 0),
+                (self.epe, self.amoxicillin, "30", 10),
+                (self.kano, self.amoxicillin, "200", 60),
+            )
+        )
+        # An older snapshot must not win over the latest one.
+        StockSnapshot.objects.create(
+            facility=self.kano,
+            medicine=self.amoxicillin,
+            stock_on_hand=Decimal("999"),
+            recorded_at=RECORDED_AT - timedelta(days=30),
+        )
+        Forecast.objects.create(
+            facility=self.ikeja,
+            medicine=self.amoxicillin,
+            forecast_date=date(2024, 6, 1),
+            period_start=date(2024, 6, 1),
+            period_end=date(2024, 6, 30),
+            predicted_demand=Decimal("60"),
+            model_version="v1.0",
+        )
+        self.cube = StockCube(refresh_interval=0)
+
+    def test_groups_by_state_with_latest_positions(self) -> None:
+        groups = {row["key"]: row for row in summarize(self.cube.data(), "state")}
+
+        self.assertEqual(groups["Lagos"]["facilities"], 2)
+        self.assertEqual(groups["Lagos"]["pairs"], 3)
+        self.assertEqual(groups["Lagos"]["stock_on_hand"], 150.0)
+        self.assertEqual(groups["Lagos"]["stocked_out"], 1)
+        self.assertEqual(groups["Lagos"]["low_stock"], 2)
+        self.assertEqual(groups["Lagos"]["forecast_demand"], 60.0)
+        self.assertEqual(groups["Lagos"]["months_of_stock"], 2.0)
+        self.assertEqual(groups["Kano"]["stock_on_hand"], 200.0)
+        self.assertIsNone(groups["Kano"]["months_of_stock"])
+
+    def test_pairs_without_a_snapshot_do_not_count_as_stocked_out(self) -> None:
+        Forecast.objects.create(
+            facility=self.kano,
+            medicine=self.artemether,
+            forecast_date=date(2024, 6, 1),
+            period_start=date(2024, 6, 1),
+            period_end=date(2024, 6, 30),
+            predicted_demand=Decimal("40"),
+            model_version="v1.0",
+        )
+
+        kano = {row["key"]: row for row in summarize(self.cube.data(), "state")}["Kano"]
+
+        self.assertEqual(kano["pairs"], 2)
+        self.assertEqual((kano["stocked_out"], kano["low_stock"]), (0, 0))
+        self.assertEqual(kano["stock_on_hand"], 200.0)
+        self.assertEqual(kano["forecast_demand"], 40.0)
+        self.assertIsNone(kano["months_of_stock"])
+        self.assertEqual(kano["mean_days_of_stock"], 60.0)
+
+    def test_filters_and_medicine_grouping(self) -> None:
+        data = self.cube.data()
+
+        national = summarize(data, "national", {"ownership": ["public"]}, [self.amoxicillin.pk])
+        by_medicine = summarize(data, "medicine", {"state": ["Lagos"]})
+
+        self.assertEqual(national[0]["stock_on_hand"], 320.0)
+        self.assertEqual(national[0]["facilities"], 2)
+        self.assertEqual(
+            {row["key"]: row["pairs"] for row in by_medicine}, {self.amoxicillin.pk: 2, self.artemether.pk: 1}
+        )
+        self.assertEqual(summarize(data, "state", {"state": ["Nowhere"]}), [])
+
+    def test_incremental_refresh_applies_only_changed_rows(self) -> None:
+        self.cube.data()
+        Facility.objects.filter(pk=self.epe.pk).update(state="Ogun", updated_at=datetime.now(timezone.utc))
+        StockSnapshot.objects.create(
+            facility=self.kano,
+            medicine=self.artemether,
+            stock_on_hand=Decimal("15"),
+            days_of_stock=5,
+            recorded_at=RECORDED_AT + timedelta(days=1),
+        )
+
+        with self.assertNumQueries(3):
+            data = self.cube.data()
+
+        groups = {row["key"]: row for row in summarize(data, "state")}
+        self.assertEqual(groups["Kano"]["pairs"], 2)
+        self.assertEqual(groups["Kano"]["stock_on_hand"], 215.0)
+        self.assertEqual(groups["Ogun"]["stock_on_hand"], 30.0)
+        self.assertEqual(groups["Lagos"]["pairs"], 2)
+
+
+class StockSummaryViewTests(TestCase):
+    def setUp(self) -> None:
+        facility = Facility.objects.create(
+            name="Ikeja", code="IKJ", facility_type="hospital", ownership="public", state="Lagos"
+        )
+        medicine = Medicine.objects.create(name="Amoxicillin", generic_name="Amoxicillin")
+        StockSnapshot.objects.create(
+            facility=facility, medicine=medicine, stock_on_hand=Decimal("12"), recorded_at=RECORDED_AT
+        )
+        self.client = APIClient()
+        cube._cube = StockCube(refresh_interval=0)
+        self.addCleanup(setattr, cube, "_cube", None)
+
+    def test_policy_makers_get_grouped_summary(self) -> None:
+        user = User.objects.create_user(username="policy", password="pass", role=User.Roles.POLICY_MAKER)
+        self.client.force_authenticate(user)
+
+        response = self.client.get(reverse("analytics:stock-summary"), {"group_by": "facility_type"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["groups"][0]["key"], "hospital")
+        self.assertEqual(response.json()["groups"][0]["stock_on_hand"], 12.0)
+        self.assertEqual(self.client.get(reverse("analytics:stock-summary"), {"group_by": "city"}).status_code, 400)
+
+    def test_pharmacists_are_forbidden(self) -> None:
+        user = User.objects.create_user(username="pharmacist", password="pass", role=User.Roles.PHARMACIST)
+        self.client.force_authenticate(user)
+
+        self.assertEqual(self.client.get(reverse("analytics:stock-summary")).status_code, 403)
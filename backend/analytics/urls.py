@@ -0,0 +1,13 @@
+"""URL routes for analytics endpoints."""
+from __future__ import annotations
+
+from django.urls import path
+
+from .views import ReconciledForecastListView, StockSummaryView
+
+app_name = "analytics"
+
+urlpatterns = [
+    path("stock-summary/", StockSummaryView.as_view(), name="stock-summary"),
+    path("reconciled-forecasts/", ReconciledForecastListView.as_view(), name="reconciled-forecasts"),
+]
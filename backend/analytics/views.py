@@ -0,0 +1,97 @@
+"""Read-only analytics endpoints served from the in-memory stock cube."""
+from __future__ import annotations
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.permissions import IsPolicyMakerOrSuperAdmin
+
+from .cube import FACILITY_ATTRIBUTES, GROUP_BY_CHOICES, get_stock_cube, summarize
+from .models import ReconciledForecast
+from .reconciliation import METHODS
+from .serializers import ReconciledForecastSerializer
+
+
+def _split(value: str) -> list:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+class StockSummaryView(APIView):
+    """
+    National and sub-national stock position.
+
+    ``group_by`` is one of national, state, lga, facility_type, ownership or
+    medicine; ``state``, ``lga``, ``facility_type``, ``ownership`` and ``medicine``
+    take comma-separated filters.
+    """
+
+    permission_classes = [IsPolicyMakerOrSuperAdmin]
+
+    def get(self, request: Request, *args, **kwargs) -> Response:  # type: ignore[override]
+        group_by = request.query_params.get("group_by", "state")
+        if group_by not in GROUP_BY_CHOICES:
+            raise ValidationError({"group_by": f"Expected one of: {', '.join(GROUP_BY_CHOICES)}."})
+        filters = {
+            name: _split(request.query_params[name]) for name in FACILITY_ATTRIBUTES if name in request.query_params
+        }
+        medicine_ids = None
+        if "medicine" in request.query_params:
+            try:
+                medicine_ids = [int(value) for value in _split(request.query_params["medicine"])]
+            except ValueError as exc:
+                raise ValidationError({"medicine": "Expected comma-separated medicine ids."}) from exc
+
+        data = get_stock_cube().data()
+        return Response(
+            {
+                "group_by": group_by,
+                "refreshed_at": data.refreshed_at,
+                "groups": summarize(data, group_by, filters, medicine_ids),
+            }
+        )
+
+
+class ReconciledForecastListView(ListAPIView):
+    """
+    Coherent forecasts for one level of the facility hierarchy.
+
+    ``level`` is national (default), state, lga or facility and ``method`` is
+    bottom_up (default) or mint. ``state``, ``lga`` and ``medicine`` (ids) take
+    comma-separated filters. The latest reconciled batch is returned unless
+    ``model_version`` and/or ``forecast_date`` select another.
+    """
+
+    permission_classes = [IsPolicyMakerOrSuperAdmin]
+    serializer_class = ReconciledForecastSerializer
+
+    def get_queryset(self):
+        params = self.request.query_params
+        level = params.get("level", ReconciledForecast.Level.NATIONAL)
+        if level not in ReconciledForecast.Level.values:
+            raise ValidationError({"level": f"Expected one of: {', '.join(ReconciledForecast.Level.values)}."})
+        method = params.get("method", "bottom_up")
+        if method not in METHODS:
+            raise ValidationError({"method": f"Expected one of: {', '.join(METHODS)}."})
+
+        batches = ReconciledForecast.objects.filter(method=method)
+        if "model_version" in params:
+            batches = batches.filter(model_version=params["model_version"])
+        if "forecast_date" in params:
+            batches = batches.filter(forecast_date=params["forecast_date"])
+        batch = batches.order_by("-forecast_date", "model_version").values("model_version", "forecast_date").first()
+        if batch is None:
+            return ReconciledForecast.objects.none()
+
+        queryset = ReconciledForecast.objects.filter(method=method, level=level, **batch)
+        for name in ("state", "lga"):
+            if name in params:
+                queryset = queryset.filter(**{f"{name}__in": _split(params[name])})
+        if "medicine" in params:
+            try:
+                queryset = queryset.filter(medicine_id__in=[int(value) for value in _split(params["medicine"])])
+            except ValueError as exc:
+                raise ValidationError({"medicine": "Expected comma-separated medicine ids."}) from exc
+        return queryset
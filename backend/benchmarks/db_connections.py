@@ -0,0 +1,106 @@
+"""
+Measure per-request database connection overhead under concurrency.
+
+Simulates Django's request lifecycle (``request_started`` / ``request_finished``,
+which is where ``CONN_MAX_AGE`` is enforced) on a thread pool, running one small
+query per request. Each mode runs in a fresh interpreter so settings are applied
+from the environment exactly as in a server process:
+
+    DATABASE_URL=postgres://... python benchmarks/db_connections.py --threads 16 --requests 4000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def run_mode(threads: int, requests: int) -> dict:
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "healteex_backend.settings")
+    import django
+
+    django.setup()
+    from django.core import signals
+    from django.db import connection, connections
+    from django.db.backends.signals import connection_created
+
+    opened = 0
+    lock = threading.Lock()
+
+    def count_connection(**kwargs) -> None:
+        nonlocal opened
+        with lock:
+            opened += 1
+
+    connection_created.connect(count_connection)
+
+    def handle_request(_: int) -> float:
+        started = time.perf_counter()
+        signals.request_started.send(sender=None)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        finally:
+            signals.request_finished.send(sender=None)
+        return time.perf_counter() - started
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(handle_request, range(requests)))
+    wall = time.perf_counter() - wall_started
+    connections.close_all()
+
+    return {
+        "conn_max_age": connections["default"].settings_dict["CONN_MAX_AGE"],
+        "connections_opened": opened,
+        "requests_per_second": round(requests / wall, 1),
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 3),
+        "p95_ms": round(1000 * latencies[int(len(latencies) * 0.95) - 1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-age", type=int, default=60, help="CONN_MAX_AGE for the persistent run.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.threads, args.requests)))
+        return
+
+    results = []
+    for max_age in (0, args.max_age):
+        env = {**os.environ, "DB_CONN_MAX_AGE": str(max_age)}
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", "--threads", str(args.threads), "--requests", str(args.requests)],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    header = f"{'CONN_MAX_AGE':>12} {'connections':>12} {'req/s':>10} {'mean ms':>9} {'p95 ms':>9}"
+    print(header)
+    for result in results:
+        print(
+            f"{result['conn_max_age']:>12} {result['connections_opened']:>12} {result['requests_per_second']:>10} "
+            f"{result['mean_ms']:>9} {result['p95_ms']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,4 +7,8 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "healteex_backend.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from notifications.stream import DisconnectWatchMiddleware  # noqa: E402 - needs the app registry
+
+application = DisconnectWatchMiddleware(django_application)
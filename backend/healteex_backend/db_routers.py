@@ -0,0 +1,138 @@
+"""Route read-only analytics traffic to replicas while keeping writes on the primary."""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework.permissions import SAFE_METHODS
+
+_replica_reads: ContextVar[bool] = ContextVar("healteex_replica_reads", default=False)
+_pinned_to_primary: ContextVar[bool] = ContextVar("healteex_pinned_to_primary", default=False)
+
+_unavailable_until: Dict[str, float] = {}
+_unavailable_lock = threading.Lock()
+
+
+@contextmanager
+def use_replicas() -> Iterator[None]:
+    """Allow reads inside the block to be served by a replica."""
+
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def pin_primary() -> Iterator[None]:
+    """Force every read inside the block to the primary."""
+
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def mark_unavailable(alias: str) -> None:
+    with _unavailable_lock:
+        _unavailable_until[alias] = time.monotonic() + settings.DATABASE_REPLICA_RETRY_SECONDS
+
+
+class ReplicaRouter:
+    """
+    Send reads to ``settings.DATABASE_REPLICAS`` only when explicitly allowed.
+
+    Reads go to a replica inside :func:`use_replicas` (see :class:`ReplicaReadMixin`)
+    unless the current request or task has already written, is inside a
+    transaction, or no replica is reachable; everything else uses the primary.
+    A replica that fails to connect is skipped for
+    ``DATABASE_REPLICA_RETRY_SECONDS``.
+    """
+
+    @property
+    def replicas(self) -> List[str]:
+        return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+    def _is_available(self, alias: str) -> bool:
+        if _unavailable_until.get(alias, 0.0) > time.monotonic():
+            return False
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError:
+            mark_unavailable(alias)
+            return False
+        return True
+
+    def _choose_replica(self) -> Optional[str]:
+        candidates = self.replicas
+        random.shuffle(candidates)
+        for alias in candidates:
+            if self._is_available(alias):
+                return alias
+        return None
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if not _replica_reads.get() or _pinned_to_primary.get() or not self.replicas:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return self._choose_replica() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints) -> str:
+        # Later reads in the same request must see this write.
+        _pinned_to_primary.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        return db not in self.replicas
+
+
+class PrimaryPinningMiddleware:
+    """Scope the read-after-write pin to a single request."""
+
+    # Async-capable so ASGI requests (the event stream) do not hop to a thread here.
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _pinned_to_primary.set(False)
+        try:
+            return self.get_response(request)
+        finally:
+            _pinned_to_primary.reset(token)
+
+    async def __acall__(self, request):
+        token = _pinned_to_primary.set(False)
+        try:
+            return await self.get_response(request)
+        finally:
+            _pinned_to_primary.reset(token)
+
+
+class ReplicaReadMixin:
+    """Serve safe (GET/HEAD/OPTIONS) requests of a view from a replica."""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            with use_replicas():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
@@ -16,9 +16,40 @@ env = environ.Env(
     SECRET_KEY=(str, "changeme-in-production"),
     ALLOWED_HOSTS=(list, ["*"]),
     DATABASE_URL=(str, f"sqlite:///{BASE_DIR / 'db.sqlite3'}"),
+    DB_CONN_MAX_AGE=(int, 60),
+    DB_CONN_HEALTH_CHECKS=(bool, True),
+    DB_CONNECT_TIMEOUT=(int, 5),
+    DB_PGBOUNCER=(bool, False),
+    DATABASE_REPLICA_URLS=(list, []),
+    DATABASE_REPLICA_RETRY_SECONDS=(int, 30),
+    INVENTORY_PARTITIONING=(bool, False),
+    INVENTORY_PARTITION_MONTHS_AHEAD=(int, 3),
+    LEDGER_ARCHIVE_DIR=(str, str(BASE_DIR / "archive")),
+    ANALYTICS_CACHE_REFRESH_SECONDS=(int, 30),
+    MODEL_REGISTRY_DIR=(str, str(BASE_DIR / "model_registry")),
+    MODEL_REGISTRY_CACHE_SIZE=(int, 8),
+    FORECAST_PREDICT_PAGE_SIZE=(int, 1000),
+    CONSUMPTION_WINDOW_MONTHS=(int, 3),
+    PLANNING_SERVICE_LEVEL=(float, 0.95),
+    PLANNING_LEAD_TIME_DAYS=(int, 30),
+    PLANNING_REVIEW_MONTHS=(float, 2.0),
     GOOGLE_OAUTH_CLIENT_ID=(str, ""),
+    GOOGLE_OAUTH_CERTS_URL=(str, "https://www.googleapis.com/oauth2/v3/certs"),
     SIGNUP_TOKEN_LIFETIME_MINUTES=(int, 30),
     FRONTEND_BASE_URL=(str, "http://localhost:5173"),
+    EMAIL_HOST=(str, "localhost"),
+    EMAIL_PORT=(int, 25),
+    SMS_BACKEND=(str, "notifications.sms.ConsoleSMSBackend"),
+    OUTBOX_BATCH_SIZE=(int, 100),
+    OUTBOX_MAX_ATTEMPTS=(int, 5),
+    EVENT_STREAM_POLL_SECONDS=(float, 2.0),
+    EVENT_STREAM_HEARTBEAT_SECONDS=(int, 20),
+    EVENT_STREAM_QUEUE_SIZE=(int, 200),
+    EVENT_STREAM_LISTEN_URL=(str, ""),
+    JOB_WORKER_CONCURRENCY=(int, 4),
+    JOB_MAX_ATTEMPTS=(int, 3),
+    JOB_TIMEOUT_SECONDS=(int, 600),
+    JOB_RETENTION_DAYS=(int, 7),
 )
 
 # In production this file should be loaded before Django starts
@@ -30,8 +61,50 @@ SECRET_KEY = env("SECRET_KEY")
 DEBUG = env("DEBUG")
 ALLOWED_HOSTS = env.list("ALLOWED_HOSTS")
 GOOGLE_OAUTH_CLIENT_ID = env("GOOGLE_OAUTH_CLIENT_ID")
+GOOGLE_OAUTH_CERTS_URL = env("GOOGLE_OAUTH_CERTS_URL")
+GOOGLE_OAUTH_CLOCK_SKEW_SECONDS = 10
 SIGNUP_TOKEN_LIFETIME_MINUTES = env("SIGNUP_TOKEN_LIFETIME_MINUTES")
 FRONTEND_BASE_URL = env("FRONTEND_BASE_URL")
+EMAIL_HOST = env("EMAIL_HOST")
+EMAIL_PORT = env("EMAIL_PORT")
+
+# Notification outbox: messages are queued in the database and delivered by
+# `python manage.py send_outbox`.
+SMS_BACKEND = env("SMS_BACKEND")
+OUTBOX_BATCH_SIZE = env("OUTBOX_BATCH_SIZE")
+OUTBOX_MAX_ATTEMPTS = env("OUTBOX_MAX_ATTEMPTS")
+OUTBOX_RETRY_BASE_SECONDS = 30
+OUTBOX_RETRY_MAX_SECONDS = 3600
+OUTBOX_LEASE_SECONDS = 300
+
+# Alert and stock change stream (notifications.stream, ASGI only): fed by LISTEN/NOTIFY
+# on PostgreSQL, optionally over a direct connection when DATABASE_URL is PgBouncer,
+# else by polling. Clients further behind than the queue size are told to resync.
+EVENT_STREAM_POLL_SECONDS = env("EVENT_STREAM_POLL_SECONDS")
+EVENT_STREAM_HEARTBEAT_SECONDS = env("EVENT_STREAM_HEARTBEAT_SECONDS")
+EVENT_STREAM_QUEUE_SIZE = env("EVENT_STREAM_QUEUE_SIZE")
+EVENT_STREAM_LISTEN_URL = env("EVENT_STREAM_LISTEN_URL")
+
+# Background jobs: queued in the database and run by `python manage.py run_worker`.
+# Workers renew the lease of each running job every JOB_HEARTBEAT_SECONDS (or a third
+# of its timeout, if shorter). A job whose lease is not renewed within its timeout,
+# e.g. because its worker died, is claimed again, so jobs must be safe to repeat.
+# Schedules are synced into JobSchedule on worker start.
+JOB_WORKER_CONCURRENCY = env("JOB_WORKER_CONCURRENCY")
+JOB_MAX_ATTEMPTS = env("JOB_MAX_ATTEMPTS")
+JOB_TIMEOUT_SECONDS = env("JOB_TIMEOUT_SECONDS")
+JOB_RETENTION_DAYS = env("JOB_RETENTION_DAYS")
+JOB_HEARTBEAT_SECONDS = 30
+JOB_RETRY_BASE_SECONDS = 10
+JOB_RETRY_MAX_SECONDS = 3600
+JOB_SCHEDULES = {
+    "send-outbox": {"job": "notifications.send_outbox", "interval": 60},
+    # Daily, so the AMC window moves within a day of a month closing.
+    "consumption": {"job": "inventory.compute_consumption", "interval": 86400},
+    "refresh-features": {"job": "analytics.refresh_features", "interval": 3600},
+    "purge-jobs": {"job": "jobs.purge", "interval": 86400},
+    "ledger-partitions": {"job": "inventory.ensure_partitions", "interval": 86400},
+}
 
 # Application definition
 INSTALLED_APPS = [
@@ -47,6 +120,9 @@ INSTALLED_APPS = [
     "rest_framework_simplejwt.token_blacklist",
     "accounts",
     "inventory",
+    "notifications",
+    "analytics",
+    "jobs",
 ]
 
 MIDDLEWARE = [
@@ -58,6 +134,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "healteex_backend.db_routers.PrimaryPinningMiddleware",
 ]
 
 ROOT_URLCONF = "healteex_backend.urls"
@@ -85,6 +162,59 @@ DATABASES = {
     "default": env.db(),
 }
 
+# Read replicas: analytics reads opt in through healteex_backend.db_routers;
+# writes and reads that follow a write in the same request stay on "default".
+DATABASE_REPLICAS = []
+for index, url in enumerate(env("DATABASE_REPLICA_URLS"), start=1):
+    alias = f"replica_{index}"
+    DATABASES[alias] = environ.Env.db_url_config(url)
+    # Tests run against the primary's test database instead of creating one per replica
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ["healteex_backend.db_routers.ReplicaRouter"]
+DATABASE_REPLICA_RETRY_SECONDS = env("DATABASE_REPLICA_RETRY_SECONDS")
+
+# Persistent connections: reuse each worker thread's connection for up to
+# DB_CONN_MAX_AGE seconds (0 closes it after every request)
+# and ping it before reuse so a restarted server does not surface as errors.
+for database in DATABASES.values():
+    database["CONN_MAX_AGE"] = env("DB_CONN_MAX_AGE")
+    database["CONN_HEALTH_CHECKS"] = env("DB_CONN_HEALTH_CHECKS")
+    if database["ENGINE"] == "django.db.backends.postgresql":
+        database.setdefault("OPTIONS", {})["connect_timeout"] = env("DB_CONNECT_TIMEOUT")
+        if env("DB_PGBOUNCER"):
+            # PgBouncer in transaction pooling mode multiplexes server connections
+            # between transactions, so named cursors cannot outlive one.
+            database["DISABLE_SERVER_SIDE_CURSORS"] = True
+
+# Monthly range partitioning of the transaction and snapshot tables (PostgreSQL only);
+# see inventory.partitioning and the partition_ledger command.
+INVENTORY_PARTITIONING = env("INVENTORY_PARTITIONING")
+INVENTORY_PARTITION_MONTHS_AHEAD = env("INVENTORY_PARTITION_MONTHS_AHEAD")
+
+# Compressed columnar segments written by the archive_ledger command
+LEDGER_ARCHIVE_DIR = env("LEDGER_ARCHIVE_DIR")
+
+# In-memory analytics cube: apply changed rows at most this often, rebuild hourly
+ANALYTICS_CACHE_REFRESH_SECONDS = env("ANALYTICS_CACHE_REFRESH_SECONDS")
+ANALYTICS_CACHE_REBUILD_SECONDS = 3600
+
+# Trained forecast model artifacts, and how many versions each process keeps mapped
+MODEL_REGISTRY_DIR = env("MODEL_REGISTRY_DIR")
+MODEL_REGISTRY_CACHE_SIZE = env("MODEL_REGISTRY_CACHE_SIZE")
+# Most series returned by one on-demand forecast request
+FORECAST_PREDICT_PAGE_SIZE = env("FORECAST_PREDICT_PAGE_SIZE")
+
+# Average monthly consumption is taken over this many complete months
+CONSUMPTION_WINDOW_MONTHS = env("CONSUMPTION_WINDOW_MONTHS")
+
+# Replenishment planning: target probability of not stocking out during the lead
+# time, default lead time when neither medicine nor supplier sets one, and months
+# of demand between the min and max levels
+PLANNING_SERVICE_LEVEL = env("PLANNING_SERVICE_LEVEL")
+PLANNING_LEAD_TIME_DAYS = env("PLANNING_LEAD_TIME_DAYS")
+PLANNING_REVIEW_MONTHS = env("PLANNING_REVIEW_MONTHS")
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -27,6 +27,8 @@ urlpatterns = [
     path("api/auth/google/", GoogleSignInView.as_view(), name="google-sign-in"),
     path("api/v1/accounts/", include("accounts.urls")),
     path("api/v1/inventory/", include("inventory.urls")),
+    path("api/v1/analytics/", include("analytics.urls")),
+    path("api/v1/notifications/", include("notifications.urls")),
 ]
 
 if settings.DEBUG:
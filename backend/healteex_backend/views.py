@@ -6,8 +6,6 @@ from django.contrib.auth import get_user_model
 from django.http import JsonResponse
 from django.views import View
 from django.db import transaction
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token as google_id_token
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.permissions import AllowAny
@@ -17,8 +15,9 @@ from rest_framework import serializers, status
 from rest_framework.views import APIView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
+from accounts.google_auth import GoogleKeysUnavailable, get_google_key_store
 from accounts.models import User
-from accounts.utils import build_jwt_response, generate_username
+from accounts.utils import build_jwt_response, generate_username, save_with_unique_username, users_with_email
 
 
 class HealthCheckView(View):
@@ -65,17 +64,19 @@ class EmailOrUsernameTokenObtainPairSerializer(TokenObtainPairSerializer):
     remember_me = serializers.BooleanField(required=False, default=False)
     role = serializers.ChoiceField(choices=User.Roles.choices, required=False)
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # The username is resolved from the email when only an email is supplied.
+        self.fields[self.username_field].required = False
+
     def validate(self, attrs):  # type: ignore[override]
         email = attrs.get("email")
         remember_me = attrs.get("remember_me", False)
         role = attrs.get("role")
         if email:
             user_model = get_user_model()
-            queryset = user_model.objects.filter(email__iexact=email)
-            if role:
-                queryset = queryset.filter(role=role)
             try:
-                user = queryset.get()
+                user = users_with_email(email, role).get()
             except user_model.DoesNotExist as exc:
                 raise serializers.ValidationError({"email": "No user found with this email."}) from exc
             except user_model.MultipleObjectsReturned as exc:
@@ -85,6 +86,8 @@ class EmailOrUsernameTokenObtainPairSerializer(TokenObtainPairSerializer):
                     }
                 ) from exc
             attrs[self.username_field] = getattr(user, self.username_field)
+        elif not attrs.get(self.username_field):
+            raise serializers.ValidationError({"email": "Provide an email or username."})
         super().validate(attrs)
         return build_jwt_response(self.user, remember_me=bool(remember_me))
 
@@ -122,10 +125,13 @@ class GoogleSignInView(APIView):
             )
 
         try:
-            id_info = google_id_token.verify_oauth2_token(
-                id_token_value, google_requests.Request(), settings.GOOGLE_OAUTH_CLIENT_ID
+            id_info = get_google_key_store().verify(id_token_value, settings.GOOGLE_OAUTH_CLIENT_ID)
+        except GoogleKeysUnavailable:
+            return Response(
+                {"detail": "Google sign-in is temporarily unavailable."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
             )
-        except ValueError as exc:  # pragma: no cover - network dependent
+        except ValueError:
             return Response({"detail": "Invalid Google token."}, status=status.HTTP_400_BAD_REQUEST)
 
         if not id_info.get("email_verified", False):
@@ -136,19 +142,13 @@ class GoogleSignInView(APIView):
             return Response({"detail": "Google token missing email claim."}, status=status.HTTP_400_BAD_REQUEST)
 
         user_model = get_user_model()
-        queryset = user_model.objects.filter(email__iexact=email)
-        if requested_role:
-            queryset = queryset.filter(role=requested_role)
-        user = queryset.first()
-        if not user and not requested_role:
-            matches = list(user_model.objects.filter(email__iexact=email)[:2])
-            if len(matches) == 1:
-                user = matches[0]
-            elif len(matches) > 1:
-                return Response(
-                    {"detail": "Multiple accounts exist for this email. Please specify the role."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+        matches = list(users_with_email(email, requested_role).order_by("pk")[:2])
+        if len(matches) > 1 and not requested_role:
+            return Response(
+                {"detail": "Multiple accounts exist for this email. Please specify the role."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        user = matches[0] if matches else None
         if not user:
             with transaction.atomic():
                 role_to_assign = requested_role or User.Roles.PHARMACIST
@@ -163,7 +163,7 @@ class GoogleSignInView(APIView):
                     last_name=id_info.get("family_name", ""),
                 )
                 user.set_unusable_password()
-                user.save()
+                save_with_unique_username(user)
         else:
             if requested_role and user.role != requested_role:
                 return Response(
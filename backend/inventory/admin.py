@@ -3,12 +3,39 @@ from __future__ import annotations
 
 from django.contrib import admin
 
-from .models import Alert, Facility, Forecast, IntegrationConfig, InventoryTransaction, Medicine, StockSnapshot
+from .models import (
+    Alert,
+    ConsumptionStat,
+    Facility,
+    Forecast,
+    IntegrationConfig,
+    InventoryTransaction,
+    Medicine,
+    Requisition,
+    RequisitionLine,
+    StockSnapshot,
+    Supplier,
+)
+
+
+class RequisitionLineInline(admin.TabularInline):
+    model = RequisitionLine
+    extra = 0
+
+
+@admin.register(Requisition)
+class RequisitionAdmin(admin.ModelAdmin):
+    list_display = ("id", "facility", "supplier", "status", "created_at")
+    list_filter = ("status",)
+    inlines = [RequisitionLineInline]
+
 
 admin.site.register(Facility)
+admin.site.register(Supplier)
 admin.site.register(Medicine)
 admin.site.register(InventoryTransaction)
 admin.site.register(StockSnapshot)
 admin.site.register(Forecast)
+admin.site.register(ConsumptionStat)
 admin.site.register(Alert)
 admin.site.register(IntegrationConfig)
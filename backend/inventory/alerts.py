@@ -0,0 +1,35 @@
+"""Bulk acknowledge and resolve transitions for alerts."""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .models import Alert
+
+# Action -> (statuses it applies to, resulting status).
+TRANSITIONS: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "acknowledge": ((Alert.Status.OPEN,), Alert.Status.ACKNOWLEDGED),
+    "resolve": ((Alert.Status.OPEN, Alert.Status.ACKNOWLEDGED), Alert.Status.RESOLVED),
+}
+
+
+def transition_alerts(alerts: QuerySet, action: str, user=None, now: Optional[datetime] = None) -> int:
+    """
+    Apply ``action`` to every alert in ``alerts`` it applies to, in one ``UPDATE``.
+
+    Alerts already past the action (e.g. resolving a resolved alert) are left
+    untouched. Resolving records ``resolved_at`` and ``resolved_by``. ``updated_at``
+    is set explicitly, since ``QuerySet.update`` skips ``auto_now``; it is what
+    the event stream's polling fallback watches, while PostgreSQL's triggers
+    announce the change themselves. Returns the number of alerts changed.
+    """
+
+    sources, target = TRANSITIONS[action]
+    now = now or timezone.now()
+    changes = {"status": target, "updated_at": now}
+    if target == Alert.Status.RESOLVED:
+        changes.update(resolved_at=now, resolved_by=user)
+    return alerts.filter(status__in=sources).update(**changes)
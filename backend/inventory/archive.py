@@ -0,0 +1,381 @@
+"""Cold storage of old ledger rows as compressed columnar segments on local disk."""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Min
+from django.utils import timezone as django_timezone
+from django.utils.text import slugify
+
+from healteex_backend.db_routers import use_replicas
+
+from .consumption import amc_window
+from .models import InventoryTransaction, StockSnapshot
+from .partitioning import add_months, month_start
+
+SEGMENT_ROWS = 250_000
+DELETE_BATCH_SIZE = 5000
+NULL_ID = -1
+
+
+@dataclass(frozen=True)
+class ArchiveTable:
+    name: str
+    model: Type[models.Model]
+    time_field: str
+    # (column, kind); kind is one of id, nullable_id, int, decimal, str, date, datetime.
+    columns: Tuple[Tuple[str, str], ...]
+
+    @property
+    def column_names(self) -> List[str]:
+        return [name for name, _ in self.columns]
+
+    def kind(self, column: str) -> str:
+        return dict(self.columns)[column]
+
+
+TIMESTAMP_COLUMNS = (("created_at", "datetime"), ("updated_at", "datetime"))
+ARCHIVE_TABLES: Dict[str, ArchiveTable] = {
+    "transactions": ArchiveTable(
+        "transactions",
+        InventoryTransaction,
+        "occurred_at",
+        (
+            ("id", "id"),
+            ("facility_id", "id"),
+            ("medicine_id", "id"),
+            ("transaction_type", "str"),
+            ("quantity", "decimal"),
+            ("batch_number", "str"),
+            ("expiry_date", "date"),
+            ("source_destination", "str"),
+            ("reference", "str"),
+            ("notes", "str"),
+            ("source_system", "str"),
+            ("external_id", "str"),
+            ("occurred_at", "datetime"),
+            ("recorded_at", "datetime"),
+            ("created_by_id", "nullable_id"),
+            *TIMESTAMP_COLUMNS,
+        ),
+    ),
+    "snapshots": ArchiveTable(
+        "snapshots",
+        StockSnapshot,
+        "recorded_at",
+        (
+            ("id", "id"),
+            ("facility_id", "id"),
+            ("medicine_id", "id"),
+            ("stock_on_hand", "decimal"),
+            ("days_of_stock", "int"),
+            ("data_source", "str"),
+            ("recorded_at", "datetime"),
+            *TIMESTAMP_COLUMNS,
+        ),
+    ),
+}
+
+
+@dataclass
+class ArchiveResult:
+    table: str
+    rows: int = 0
+    segments: List[Path] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"table": self.table, "rows": self.rows, "segments": [str(path) for path in self.segments]}
+
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _month_bounds(month: date) -> Tuple[datetime, datetime]:
+    start = datetime.combine(month, time.min, tzinfo=timezone.utc)
+    return start, datetime.combine(add_months(month, 1), time.min, tzinfo=timezone.utc)
+
+
+def column_array(kind: str, values: Sequence) -> np.ndarray:
+    """
+    Convert database values to a fixed-dtype array (no object arrays, so segments can be memory-mapped).
+
+    Nulls become ``NULL_ID`` for ids, ``NaT`` for dates and times and ``""`` for strings;
+    datetimes are stored as naive UTC.
+    """
+
+    if kind in ("id", "nullable_id", "int"):
+        return np.array([NULL_ID if value is None else value for value in values], dtype=np.int64)
+    if kind == "decimal":
+        return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+    if kind == "date":
+        return np.array(values, dtype="datetime64[D]")
+    if kind == "datetime":
+        return np.array([_utc_naive(value) for value in values], dtype="datetime64[us]")
+    strings = [value or "" for value in values]
+    width = max((len(value) for value in strings), default=0)
+    return np.array(strings, dtype=f"<U{max(width, 1)}")
+
+
+def to_columns(table: ArchiveTable, rows: Sequence[Tuple], columns: Sequence[str]) -> Dict[str, np.ndarray]:
+    values = list(zip(*rows)) if rows else [() for _ in columns]
+    return {name: column_array(table.kind(name), column) for name, column in zip(columns, values)}
+
+
+class LedgerArchive:
+    """
+    Month/state partitioned archive of ledger rows.
+
+    Segments live under ``<root>/<table>/month=YYYY-MM/state=<slug>/part-<first id>-<last id>.npz``
+    as ``numpy.savez_compressed`` files with one array per column. Reads unpack a
+    segment once into ``<root>/.cache`` as plain ``.npy`` files, which are then
+    memory-mapped, so repeated reads only page in the columns and rows they touch.
+    """
+
+    def __init__(self, root: Optional[os.PathLike] = None) -> None:
+        self.root = Path(root or settings.LEDGER_ARCHIVE_DIR)
+
+    # --- Layout -------------------------------------------------------
+    def segment_dir(self, table: str, month: date, state: str) -> Path:
+        return self.root / table / f"month={month:%Y-%m}" / f"state={slugify(state) or 'unknown'}"
+
+    def segments(
+        self,
+        table: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        states: Optional[Iterable[str]] = None,
+    ) -> List[Path]:
+        """Return segment files whose month overlaps ``[start, end)`` and whose state is in ``states``."""
+
+        state_dirs = None if states is None else {f"state={slugify(state) or 'unknown'}" for state in states}
+        first = month_start(start) if start else None
+        paths = []
+        for month_dir in sorted((self.root / table).glob("month=*")):
+            month = datetime.strptime(month_dir.name[len("month=") :], "%Y-%m").date()
+            if (first and month < first) or (end and month >= end):
+                continue
+            for state_dir in sorted(month_dir.iterdir()):
+                if state_dirs is None or state_dir.name in state_dirs:
+                    paths.extend(sorted(state_dir.glob("part-*.npz")))
+        return paths
+
+    # --- Writing ------------------------------------------------------
+    def write_segment(self, table: str, month: date, state: str, columns: Dict[str, np.ndarray]) -> Path:
+        directory = self.segment_dir(table, month, state)
+        directory.mkdir(parents=True, exist_ok=True)
+        ids = columns["id"]
+        path = directory / f"part-{ids.min()}-{ids.max()}.npz"
+        handle, tmp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(handle, "wb") as tmp:
+            np.savez_compressed(tmp, **columns)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_name, path)
+        return path
+
+    def archive(
+        self,
+        table_name: str,
+        before: date,
+        dry_run: bool = False,
+        segment_rows: int = SEGMENT_ROWS,
+    ) -> ArchiveResult:
+        """
+        Move rows older than ``before`` (UTC midnight) into segments, one month at a time.
+
+        Each segment is fsynced before its rows are deleted, so an interrupted run
+        leaves at worst rows that are both archived and live; readers drop the
+        archived copy in that case and the next run rewrites the segment.
+
+        Consumption is rebuilt from live transactions only, so a cutoff inside the
+        AMC window raises ``ValueError`` for the transactions table.
+        """
+
+        table = ARCHIVE_TABLES[table_name]
+        model, time_field = table.model, table.time_field
+        cutoff = datetime.combine(before, time.min, tzinfo=timezone.utc)
+        if model is InventoryTransaction:
+            window_start = django_timezone.make_aware(datetime.combine(amc_window()[0], time.min))
+            if cutoff > window_start:
+                raise ValueError(
+                    f"Transactions from {window_start:%Y-%m-%d} on are in the AMC window and must stay live; "
+                    f"archive before {window_start.astimezone(timezone.utc):%Y-%m-%d} at the latest."
+                )
+        result = ArchiveResult(table_name)
+        oldest = model.objects.filter(**{f"{time_field}__lt": cutoff}).aggregate(oldest=Min(time_field))["oldest"]
+        if oldest is None:
+            return result
+
+        month = month_start(oldest.astimezone(timezone.utc).date())
+        while month < before:
+            lower, upper = _month_bounds(month)
+            window = model.objects.filter(**{f"{time_field}__gte": lower, f"{time_field}__lt": min(upper, cutoff)})
+            states = window.order_by().values_list("facility__state", flat=True).distinct()
+            for state in sorted(states):
+                rows = window.filter(facility__state=state).order_by("id").values_list(*table.column_names)
+                if dry_run:
+                    result.rows += rows.count()
+                    continue
+                chunk: List[Tuple] = []
+                for row in rows.iterator(chunk_size=DELETE_BATCH_SIZE):
+                    chunk.append(row)
+                    if len(chunk) >= segment_rows:
+                        self._flush(table, month, state, chunk, result)
+                        chunk = []
+                if chunk:
+                    self._flush(table, month, state, chunk, result)
+            month = add_months(month, 1)
+        return result
+
+    def _flush(self, table: ArchiveTable, month: date, state: str, rows: List[Tuple], result: ArchiveResult) -> None:
+        columns = to_columns(table, rows, table.column_names)
+        result.segments.append(self.write_segment(table.name, month, state, columns))
+        ids = columns["id"].tolist()
+        with transaction.atomic():
+            for offset in range(0, len(ids), DELETE_BATCH_SIZE):
+                table.model.objects.filter(pk__in=ids[offset : offset + DELETE_BATCH_SIZE]).delete()
+        result.rows += len(ids)
+
+    # --- Reading ------------------------------------------------------
+    def _cache_dir(self, path: Path) -> Path:
+        return self.root / ".cache" / path.relative_to(self.root).with_suffix("")
+
+    def read_segment(self, path: Path, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """Memory-map the requested columns of one segment, unpacking it on first use."""
+
+        cache = self._cache_dir(path)
+        marker = cache / ".complete"
+        if not marker.exists() or marker.stat().st_mtime < path.stat().st_mtime:
+            self._unpack(path, cache)
+        names = columns or [entry.stem for entry in cache.glob("*.npy")]
+        return {name: np.load(cache / f"{name}.npy", mmap_mode="r") for name in names}
+
+    def _unpack(self, path: Path, cache: Path) -> None:
+        """
+        Unpack a segment into a private directory and rename it into place.
+
+        Concurrent readers never see a half-written cache: whoever renames first
+        wins and the others discard their copy. Files of a replaced stale cache
+        stay readable for processes that still have them mapped.
+        """
+
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=cache.parent, prefix=f".{cache.name}-"))
+        try:
+            with np.load(path) as segment:
+                for name in segment.files:
+                    np.save(staging / f"{name}.npy", segment[name])
+            (staging / ".complete").touch()
+            if cache.exists():
+                stale = cache.with_name(f"{staging.name}-stale")
+                try:
+                    os.rename(cache, stale)
+                except FileNotFoundError:
+                    pass
+                else:
+                    shutil.rmtree(stale, ignore_errors=True)
+            try:
+                os.rename(staging, cache)
+            except OSError:
+                # Another reader installed its copy first.
+                pass
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def read(
+        self,
+        table_name: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        columns: Optional[Sequence[str]] = None,
+        states: Optional[Iterable[str]] = None,
+        facility_ids: Optional[Iterable[int]] = None,
+        medicine_ids: Optional[Iterable[int]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Return archived rows in ``[start, end)`` as column arrays, filtered segment by segment."""
+
+        table = ARCHIVE_TABLES[table_name]
+        columns = list(columns or table.column_names)
+        needed = list(dict.fromkeys([*columns, table.time_field, "facility_id", "medicine_id"]))
+        start_month = _utc_naive(start).date() if start else None
+        end_month = add_months(month_start(_utc_naive(end).date()), 1) if end else None
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in columns}
+        for path in self.segments(table_name, start_month, end_month, states):
+            segment = self.read_segment(path, needed)
+            mask = np.ones(len(segment["facility_id"]), dtype=bool)
+            times = segment[table.time_field]
+            if start:
+                mask &= times >= np.datetime64(_utc_naive(start), "us")
+            if end:
+                mask &= times < np.datetime64(_utc_naive(end), "us")
+            if facility_ids is not None:
+                mask &= np.isin(segment["facility_id"], list(facility_ids))
+            if medicine_ids is not None:
+                mask &= np.isin(segment["medicine_id"], list(medicine_ids))
+            if mask.any():
+                for name in columns:
+                    parts[name].append(segment[name][mask])
+        empty = to_columns(table, [], columns)
+        return {name: np.concatenate(arrays) if arrays else empty[name] for name, arrays in parts.items()}
+
+
+def read_ledger(
+    table_name: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    columns: Optional[Sequence[str]] = None,
+    states: Optional[Iterable[str]] = None,
+    facility_ids: Optional[Iterable[int]] = None,
+    medicine_ids: Optional[Iterable[int]] = None,
+    archive: Optional[LedgerArchive] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Read archived and live rows as one set of column arrays, ordered by time.
+
+    Live rows come from the database (a replica when configured) and win over an
+    archived copy with the same id, which only exists after an interrupted archive run.
+    Archived decimals are floats; ``round(value, 2)`` recovers the stored value.
+    """
+
+    table = ARCHIVE_TABLES[table_name]
+    columns = list(dict.fromkeys(["id", table.time_field, *(columns or table.column_names)]))
+    archive = archive or LedgerArchive()
+    facility_ids = None if facility_ids is None else list(facility_ids)
+    medicine_ids = None if medicine_ids is None else list(medicine_ids)
+    states = None if states is None else list(states)
+
+    archived = archive.read(table_name, start, end, columns, states, facility_ids, medicine_ids)
+
+    queryset = table.model.objects.all()
+    if start:
+        queryset = queryset.filter(**{f"{table.time_field}__gte": start})
+    if end:
+        queryset = queryset.filter(**{f"{table.time_field}__lt": end})
+    if states is not None:
+        queryset = queryset.filter(facility__state__in=states)
+    if facility_ids is not None:
+        queryset = queryset.filter(facility_id__in=facility_ids)
+    if medicine_ids is not None:
+        queryset = queryset.filter(medicine_id__in=medicine_ids)
+    with use_replicas():
+        live = to_columns(table, list(queryset.order_by().values_list(*columns)), columns)
+
+    combined = {name: np.concatenate([archived[name], live[name]]) for name in columns}
+    # Keep the last copy of each id: live rows follow archived ones.
+    ids = combined["id"]
+    _, last_from_end = np.unique(ids[::-1], return_index=True)
+    rows = len(ids) - 1 - last_from_end
+    rows = rows[np.argsort(combined[table.time_field][rows], kind="stable")]
+    return {name: values[rows] for name, values in combined.items()}
@@ -0,0 +1,297 @@
+"""Average monthly consumption (AMC) and days-of-stock engine."""
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DateField, OuterRef, QuerySet, Subquery, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import ConsumptionStat, InventoryTransaction, MonthlyConsumption, StockSnapshot
+from .partitioning import add_months
+
+DAYS_PER_MONTH = 30.4375
+# Reported for stock with no recent consumption (it will not run out).
+MAX_DAYS_OF_STOCK = 999
+BATCH_SIZE = 1000
+
+Pair = Tuple[int, int]
+Key = Tuple[int, int, date]
+
+
+def local_month(value: datetime) -> date:
+    return timezone.localtime(value).date().replace(day=1)
+
+
+def _month_start(month: date) -> datetime:
+    return timezone.make_aware(datetime.combine(month, time.min))
+
+
+def amc_window(today: Optional[date] = None, months: Optional[int] = None) -> Tuple[date, date]:
+    """Return ``[first, end)`` months of the AMC window: the last ``months`` complete months."""
+
+    months = months or settings.CONSUMPTION_WINDOW_MONTHS
+    end = (today or timezone.localdate()).replace(day=1)
+    return add_months(end, -months), end
+
+
+def compute_days_of_stock(stock: np.ndarray, amc: np.ndarray) -> np.ndarray:
+    """Vectorised ``stock / (amc / DAYS_PER_MONTH)``, floored and capped at ``MAX_DAYS_OF_STOCK``."""
+
+    stock = np.asarray(stock, dtype=np.float64)
+    daily = np.asarray(amc, dtype=np.float64) / DAYS_PER_MONTH
+    with np.errstate(divide="ignore", invalid="ignore"):
+        days = np.floor(stock / daily)
+    days = np.where(daily > 0, days, np.where(stock > 0, MAX_DAYS_OF_STOCK, 0))
+    return np.clip(days, 0, MAX_DAYS_OF_STOCK).astype(np.int64)
+
+
+def days_of_stock(stock: Decimal, amc: Decimal) -> int:
+    return int(compute_days_of_stock(np.array([float(stock)]), np.array([float(amc)]))[0])
+
+
+def consumption_keys(transactions: Iterable[InventoryTransaction]) -> Set[Key]:
+    """Buckets touched by the ISSUE transactions in ``transactions``."""
+
+    return {
+        (item.facility_id, item.medicine_id, local_month(item.occurred_at))
+        for item in transactions
+        if item.transaction_type == InventoryTransaction.TransactionType.ISSUE and item.occurred_at is not None
+    }
+
+
+def _monthly_totals(queryset: QuerySet) -> Dict[Key, Decimal]:
+    rows = (
+        queryset.filter(transaction_type=InventoryTransaction.TransactionType.ISSUE)
+        .annotate(month=TruncMonth("occurred_at", output_field=DateField()))
+        .values("facility_id", "medicine_id", "month")
+        .annotate(total=Sum("quantity"))
+        .order_by()
+    )
+    return {(row["facility_id"], row["medicine_id"], row["month"]): row["total"] for row in rows}
+
+
+def refresh_consumption(keys: Iterable[Key], today: Optional[date] = None) -> None:
+    """
+    Recount the given monthly buckets from the ledger and update AMC for their pairs.
+
+    Only the touched facility × medicine × month ranges are re-aggregated (using the
+    ``(facility, medicine, occurred_at)`` index), so a new issue costs a handful of
+    small queries instead of a recomputation over the full history.
+    """
+
+    keys = set(keys)
+    if not keys:
+        return
+    months = {month for _, _, month in keys}
+    totals = _monthly_totals(
+        InventoryTransaction.objects.filter(
+            facility_id__in={facility_id for facility_id, _, _ in keys},
+            medicine_id__in={medicine_id for _, medicine_id, _ in keys},
+            occurred_at__gte=_month_start(min(months)),
+            occurred_at__lt=_month_start(add_months(max(months), 1)),
+        )
+    )
+    with transaction.atomic():
+        MonthlyConsumption.objects.bulk_create(
+            [
+                MonthlyConsumption(facility_id=key[0], medicine_id=key[1], month=key[2], quantity=totals.get(key, 0))
+                for key in sorted(keys)
+            ],
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["facility", "medicine", "month"],
+            update_fields=["quantity", "updated_at"],
+        )
+        recompute_pairs({(facility_id, medicine_id) for facility_id, medicine_id, _ in keys}, today=today)
+
+
+def recompute_pairs(pairs: Iterable[Pair], today: Optional[date] = None) -> None:
+    """Recompute AMC and days of stock of ``pairs`` from their monthly buckets."""
+
+    pairs = set(pairs)
+    if not pairs:
+        return
+    months = settings.CONSUMPTION_WINDOW_MONTHS
+    first, end = amc_window(today, months)
+    facility_ids = {facility_id for facility_id, _ in pairs}
+    medicine_ids = {medicine_id for _, medicine_id in pairs}
+    usage: Dict[Pair, Decimal] = defaultdict(Decimal)
+    for facility_id, medicine_id, quantity in MonthlyConsumption.objects.filter(
+        facility_id__in=facility_ids, medicine_id__in=medicine_ids, month__gte=first, month__lt=end
+    ).values_list("facility_id", "medicine_id", "quantity"):
+        usage[(facility_id, medicine_id)] += quantity
+    positions: Dict[Pair, Tuple[Optional[Decimal], Optional[datetime]]] = {
+        (stat.facility_id, stat.medicine_id): (stat.stock_on_hand, stat.stock_recorded_at)
+        for stat in ConsumptionStat.objects.filter(facility_id__in=facility_ids, medicine_id__in=medicine_ids)
+    }
+    # A pair's first issue may follow its first snapshot: start from the latest one.
+    new = pairs - positions.keys()
+    if new:
+        for facility_id, medicine_id, stock, recorded_at in _latest_snapshots(
+            StockSnapshot.objects.filter(
+                facility_id__in={facility_id for facility_id, _ in new},
+                medicine_id__in={medicine_id for _, medicine_id in new},
+            )
+        ):
+            if (facility_id, medicine_id) in new:
+                positions[(facility_id, medicine_id)] = (stock, recorded_at)
+
+    stats = []
+    for facility_id, medicine_id in sorted(pairs):
+        amc = (usage[(facility_id, medicine_id)] / months).quantize(Decimal("0.01"))
+        stock, recorded_at = positions.get((facility_id, medicine_id), (None, None))
+        stats.append(
+            ConsumptionStat(
+                facility_id=facility_id,
+                medicine_id=medicine_id,
+                amc=amc,
+                window_months=months,
+                stock_on_hand=stock,
+                stock_recorded_at=recorded_at,
+                days_of_stock=None if stock is None else days_of_stock(stock, amc),
+            )
+        )
+    ConsumptionStat.objects.bulk_create(
+        stats,
+        batch_size=BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["facility", "medicine"],
+        update_fields=["amc", "window_months", "days_of_stock", "updated_at"],
+    )
+
+
+def apply_days_of_stock(snapshots: Iterable[StockSnapshot]) -> None:
+    """
+    Set ``days_of_stock`` on unsaved snapshots from their pair's AMC.
+
+    Pairs without a consumption stat get one first, computed from their monthly
+    buckets, so :func:`record_latest_stock` and the planner see them too.
+    """
+
+    snapshots = list(snapshots)
+    amcs = _stats_for(snapshots)
+    missing = {(snapshot.facility_id, snapshot.medicine_id) for snapshot in snapshots} - amcs.keys()
+    if missing:
+        recompute_pairs(missing)
+        amcs = _stats_for(snapshots)
+    for snapshot in snapshots:
+        stat = amcs.get((snapshot.facility_id, snapshot.medicine_id))
+        if stat is not None and snapshot.stock_on_hand is not None:
+            snapshot.days_of_stock = days_of_stock(snapshot.stock_on_hand, stat.amc)
+
+
+def record_latest_stock(snapshots: Iterable[StockSnapshot]) -> None:
+    """Copy the newest of ``snapshots`` per pair onto its consumption stat, if it is newer."""
+
+    newest: Dict[Pair, StockSnapshot] = {}
+    for snapshot in snapshots:
+        pair = (snapshot.facility_id, snapshot.medicine_id)
+        if pair not in newest or snapshot.recorded_at > newest[pair].recorded_at:
+            newest[pair] = snapshot
+    changed = []
+    for pair, stat in _stats_for(newest.values()).items():
+        snapshot = newest[pair]
+        if stat.stock_recorded_at is not None and stat.stock_recorded_at > snapshot.recorded_at:
+            continue
+        stat.stock_on_hand = Decimal(snapshot.stock_on_hand)
+        stat.stock_recorded_at = snapshot.recorded_at
+        stat.days_of_stock = days_of_stock(stat.stock_on_hand, stat.amc)
+        stat.updated_at = timezone.now()
+        changed.append(stat)
+    ConsumptionStat.objects.bulk_update(
+        changed, ["stock_on_hand", "stock_recorded_at", "days_of_stock", "updated_at"], batch_size=BATCH_SIZE
+    )
+
+
+def _stats_for(snapshots: Iterable[StockSnapshot]) -> Dict[Pair, ConsumptionStat]:
+    pairs = {(snapshot.facility_id, snapshot.medicine_id) for snapshot in snapshots}
+    if not pairs:
+        return {}
+    stats = ConsumptionStat.objects.filter(
+        facility_id__in={facility_id for facility_id, _ in pairs},
+        medicine_id__in={medicine_id for _, medicine_id in pairs},
+    )
+    by_pair = {(stat.facility_id, stat.medicine_id): stat for stat in stats}
+    return {pair: stat for pair, stat in by_pair.items() if pair in pairs}
+
+
+def _latest_snapshots(snapshots: QuerySet) -> List[Tuple[int, int, Decimal, datetime]]:
+    """``(facility_id, medicine_id, stock_on_hand, recorded_at)`` of the newest snapshot per pair in ``snapshots``."""
+
+    latest = StockSnapshot.objects.filter(facility=OuterRef("facility"), medicine=OuterRef("medicine")).order_by(
+        "-recorded_at"
+    )
+    return list(
+        snapshots.filter(pk=Subquery(latest.values("pk")[:1])).values_list(
+            "facility_id", "medicine_id", "stock_on_hand", "recorded_at"
+        )
+    )
+
+
+def compute_consumption(months: Optional[int] = None, today: Optional[date] = None) -> Dict[str, int]:
+    """
+    Rebuild monthly buckets and stats for every pair in one pass.
+
+    The database groups ISSUE quantities by pair and month; AMC and days of stock
+    for all pairs are then computed with NumPy over a pairs × months matrix. Run
+    it when a month closes (the window moves) or after bulk history loads.
+    """
+
+    months = months or settings.CONSUMPTION_WINDOW_MONTHS
+    first, end = amc_window(today, months)
+    totals = _monthly_totals(
+        InventoryTransaction.objects.filter(occurred_at__gte=_month_start(first), occurred_at__lt=_month_start(end))
+    )
+    stock_rows = _latest_snapshots(StockSnapshot.objects.all())
+
+    pairs: List[Pair] = sorted({key[:2] for key in totals} | {row[:2] for row in stock_rows})
+    index = {pair: position for position, pair in enumerate(pairs)}
+    month_index = {add_months(first, offset): offset for offset in range(months)}
+    usage = np.zeros((len(pairs), months))
+    if totals:
+        rows = np.array([index[key[:2]] for key in totals])
+        columns = np.array([month_index[key[2]] for key in totals])
+        np.add.at(usage, (rows, columns), np.array([float(total) for total in totals.values()]))
+    amc = np.round(usage.sum(axis=1) / months, 2)
+    stock = np.full(len(pairs), np.nan)
+    recorded_at: List[Optional[datetime]] = [None] * len(pairs)
+    for facility_id, medicine_id, stock_on_hand, recorded in stock_rows:
+        stock[index[(facility_id, medicine_id)]] = float(stock_on_hand)
+        recorded_at[index[(facility_id, medicine_id)]] = recorded
+    days = compute_days_of_stock(np.nan_to_num(stock), amc)
+
+    with transaction.atomic():
+        MonthlyConsumption.objects.filter(month__gte=first, month__lt=end).delete()
+        MonthlyConsumption.objects.bulk_create(
+            [
+                MonthlyConsumption(facility_id=facility_id, medicine_id=medicine_id, month=month, quantity=total)
+                for (facility_id, medicine_id, month), total in totals.items()
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        ConsumptionStat.objects.bulk_create(
+            [
+                ConsumptionStat(
+                    facility_id=facility_id,
+                    medicine_id=medicine_id,
+                    amc=Decimal(f"{amc[position]:.2f}"),
+                    window_months=months,
+                    stock_on_hand=None if np.isnan(stock[position]) else Decimal(f"{stock[position]:.2f}"),
+                    stock_recorded_at=recorded_at[position],
+                    days_of_stock=None if np.isnan(stock[position]) else int(days[position]),
+                )
+                for position, (facility_id, medicine_id) in enumerate(pairs)
+            ],
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["facility", "medicine"],
+            update_fields=["amc", "window_months", "stock_on_hand", "stock_recorded_at", "days_of_stock", "updated_at"],
+        )
+    return {"pairs": len(pairs), "buckets": len(totals)}
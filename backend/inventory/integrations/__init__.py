@@ -0,0 +1,15 @@
+"""Pluggable adapters and the sync engine for third-party integrations."""
+from .adapters import ADAPTERS, BaseAdapter, MappedRecord, SyncWindow, get_adapter_class, register_adapter
+from .engine import SyncEngine, SyncError, SyncResult
+
+__all__ = [
+    "ADAPTERS",
+    "BaseAdapter",
+    "MappedRecord",
+    "SyncEngine",
+    "SyncError",
+    "SyncResult",
+    "SyncWindow",
+    "get_adapter_class",
+    "register_adapter",
+]
@@ -0,0 +1,209 @@
+"""Adapters that page through external systems and map their records."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import requests
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils import timezone
+
+from inventory.models import IntegrationConfig, InventoryTransaction
+
+ADAPTERS: Dict[str, Type["BaseAdapter"]] = {}
+
+
+def register_adapter(cls: Type["BaseAdapter"]) -> Type["BaseAdapter"]:
+    ADAPTERS[cls.name] = cls
+    return cls
+
+
+def get_adapter_class(config: IntegrationConfig) -> Type["BaseAdapter"]:
+    """Resolve the adapter from ``config.adapter``, falling back to the system name."""
+
+    key = config.adapter or ""
+    if not key:
+        system = config.system_name.lower()
+        key = next((name for name in ADAPTERS if name in system), "")
+    try:
+        return ADAPTERS[key]
+    except KeyError as exc:
+        raise ValueError(f"No integration adapter registered for '{config.system_name}'.") from exc
+
+
+@dataclass(frozen=True)
+class SyncWindow:
+    """Half-open ``[since, until)`` interval of source-side update times."""
+
+    since: Optional[datetime]
+    until: datetime
+
+
+@dataclass
+class MappedRecord:
+    """A source record translated to model fields, with codes still unresolved."""
+
+    kind: str  # "transaction" or "snapshot"
+    facility_code: str
+    medicine_code: str
+    fields: Dict[str, Any] = field(default_factory=dict)
+    external_id: Optional[str] = None
+
+
+class BaseAdapter:
+    """
+    Fetch and map one page of a paginated source API.
+
+    Subclasses declare the endpoint and paging conventions; ``fetch_page`` runs on
+    worker threads and must not touch the ORM, while ``map_record`` is pure.
+    """
+
+    name = ""
+    endpoint = ""
+    first_page = 1
+    default_page_size = 500
+
+    def __init__(self, config: IntegrationConfig, session: requests.Session) -> None:
+        self.config = config
+        self.session = session
+        self.page_size = int(config.options.get("page_size", self.default_page_size))
+
+    @property
+    def url(self) -> str:
+        return f"{self.config.base_url.rstrip('/')}/{self.config.options.get('endpoint', self.endpoint).lstrip('/')}"
+
+    def params(self, page: int, window: SyncWindow) -> Dict[str, Any]:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def parse_page(self, payload: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:  # pragma: no cover
+        """Return the page's raw records and the total number of pages."""
+
+        raise NotImplementedError
+
+    def map_record(self, raw: Dict[str, Any]) -> Optional[MappedRecord]:  # pragma: no cover - interface
+        raise NotImplementedError
+
+    def fetch_page(self, page: int, window: SyncWindow, timeout: float = 30.0) -> Tuple[List[Dict[str, Any]], int]:
+        response = self.session.get(self.url, params=self.params(page, window), timeout=timeout)
+        response.raise_for_status()
+        return self.parse_page(response.json())
+
+
+def _aware(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        parsed = datetime(day.year, day.month, day.day)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def _decimal(value: Any) -> Optional[Decimal]:
+    """A finite decimal from a numeric field, or None for text, booleans and the like."""
+
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        return None
+    return number if number.is_finite() else None
+
+
+@register_adapter
+class DHIS2Adapter(BaseAdapter):
+    """
+    DHIS2 logistics data values reporting stock on hand.
+
+    Expects ``{"pager": {"pageCount": n}, "dataValues": [...]}`` where each value has
+    ``orgUnit`` (facility code), ``dataElement`` (medicine code), ``value`` and
+    ``lastUpdated``. Each value becomes a :class:`StockSnapshot`.
+    """
+
+    name = "dhis2"
+    endpoint = "dataValues"
+
+    def params(self, page: int, window: SyncWindow) -> Dict[str, Any]:
+        params = {"page": page, "pageSize": self.page_size, "lastUpdatedEnd": window.until.isoformat()}
+        if window.since:
+            params["lastUpdated"] = window.since.isoformat()
+        return params
+
+    def parse_page(self, payload: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+        return payload.get("dataValues", []), int(payload.get("pager", {}).get("pageCount", 1))
+
+    def map_record(self, raw: Dict[str, Any]) -> Optional[MappedRecord]:
+        recorded_at = _aware(raw.get("lastUpdated"))
+        # Boolean and text data elements share the endpoint; only numeric values are stock.
+        stock_on_hand = _decimal(raw.get("value"))
+        if recorded_at is None or stock_on_hand is None:
+            return None
+        return MappedRecord(
+            kind="snapshot",
+            facility_code=raw.get("orgUnit", ""),
+            medicine_code=raw.get("dataElement", ""),
+            fields={
+                "stock_on_hand": stock_on_hand,
+                "recorded_at": recorded_at,
+                "data_source": self.name,
+            },
+        )
+
+
+@register_adapter
+class OpenLMISAdapter(BaseAdapter):
+    """
+    OpenLMIS stock card line items.
+
+    Expects Spring-style pages ``{"content": [...], "totalPages": n}`` (0-based page
+    numbers). CREDIT reasons become receipts, DEBIT reasons issues and anything else
+    an adjustment.
+    """
+
+    name = "openlmis"
+    endpoint = "stockCardLineItems"
+    first_page = 0
+
+    reason_types = {
+        "CREDIT": InventoryTransaction.TransactionType.RECEIPT,
+        "DEBIT": InventoryTransaction.TransactionType.ISSUE,
+    }
+
+    def params(self, page: int, window: SyncWindow) -> Dict[str, Any]:
+        params = {"page": page, "size": self.page_size, "processedDateTo": window.until.isoformat()}
+        if window.since:
+            params["processedDateFrom"] = window.since.isoformat()
+        return params
+
+    def parse_page(self, payload: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+        return payload.get("content", []), int(payload.get("totalPages", 1))
+
+    def map_record(self, raw: Dict[str, Any]) -> Optional[MappedRecord]:
+        occurred_at = _aware(raw.get("occurredDate"))
+        quantity = _decimal(raw.get("quantity"))
+        if occurred_at is None or quantity is None:
+            return None
+        return MappedRecord(
+            kind="transaction",
+            facility_code=raw.get("facilityCode", ""),
+            medicine_code=raw.get("productCode", ""),
+            fields={
+                "transaction_type": self.reason_types.get(
+                    raw.get("reasonType", ""), InventoryTransaction.TransactionType.ADJUSTMENT
+                ),
+                "quantity": abs(quantity),
+                "batch_number": raw.get("lotCode") or "",
+                "expiry_date": parse_date(raw["expirationDate"]) if raw.get("expirationDate") else None,
+                "source_destination": raw.get("sourceDestination") or "",
+                "reference": raw.get("documentNumber") or "",
+                "occurred_at": occurred_at,
+            },
+            external_id=str(raw["id"]) if raw.get("id") else None,
+        )
@@ -0,0 +1,106 @@
+"""Bulk write helpers for the inventory transaction ledger."""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .models import InventoryTransaction
+from .partitioning import partitioning_enabled
+
+UPSERT_BATCH_SIZE = 1000
+EXTERNAL_KEY_FIELDS = ["source_system", "external_id"]
+# ``facility`` is deliberately absent: a replayed key never moves a row to another facility.
+UPSERT_UPDATE_FIELDS = [
+    "medicine",
+    "transaction_type",
+    "quantity",
+    "batch_number",
+    "expiry_date",
+    "source_destination",
+    "reference",
+    "notes",
+    "occurred_at",
+    "updated_at",
+]
+
+
+def external_key_fields() -> List[str]:
+    """
+    Return the conflict target for upserts.
+
+    Unique constraints on a partitioned table must include the partition key, so
+    once the ledger is partitioned the key also covers ``occurred_at``.
+    """
+
+    if partitioning_enabled(InventoryTransaction.objects.db):
+        return [*EXTERNAL_KEY_FIELDS, "occurred_at"]
+    return list(EXTERNAL_KEY_FIELDS)
+
+
+def upsert_transactions(
+    transactions: Iterable[InventoryTransaction],
+    update: bool = True,
+    batch_size: int = UPSERT_BATCH_SIZE,
+) -> List[InventoryTransaction]:
+    """
+    Insert transactions keyed by ``(source_system, external_id)`` in batches.
+
+    Rows whose key already exists are updated in place (``ON CONFLICT DO UPDATE``),
+    or left untouched when ``update`` is False (``ON CONFLICT DO NOTHING``), so
+    replaying a feed costs one statement per batch rather than a lookup per row.
+    Rows without an ``external_id`` never conflict and are always inserted.
+    """
+
+    key_fields = external_key_fields()
+    # Postgres rejects a statement that upserts the same key twice, so keep the last.
+    keyed = {}
+    unkeyed: List[InventoryTransaction] = []
+    for transaction in transactions:
+        if transaction.external_id is None:
+            unkeyed.append(transaction)
+        else:
+            keyed[tuple(getattr(transaction, name) for name in key_fields)] = transaction
+    transactions = unkeyed + list(keyed.values())
+    if update:
+        return InventoryTransaction.objects.bulk_create(
+            transactions,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=key_fields,
+            update_fields=[name for name in UPSERT_UPDATE_FIELDS if name not in key_fields],
+        )
+    return InventoryTransaction.objects.bulk_create(transactions, batch_size=batch_size, ignore_conflicts=True)
+
+
+def _key(transaction: InventoryTransaction, key_fields: Sequence[str]) -> Tuple:
+    return tuple(getattr(transaction, name) for name in key_fields)
+
+
+def stored_versions(
+    transactions: Sequence[InventoryTransaction], batch_size: int = UPSERT_BATCH_SIZE
+) -> List[Optional[InventoryTransaction]]:
+    """
+    Return the row already stored under each transaction's external key, or None.
+
+    Callers check who owns a key before replaying it, and refresh the consumption
+    buckets a replayed row leaves when its medicine, type or date changes. One
+    query per source system and batch of keys.
+    """
+
+    key_fields = external_key_fields()
+    external_ids: Dict[str, Set[str]] = defaultdict(set)
+    for transaction in transactions:
+        if transaction.external_id is not None:
+            external_ids[transaction.source_system].add(transaction.external_id)
+    stored: Dict[Tuple, InventoryTransaction] = {}
+    for source_system, ids in external_ids.items():
+        ids = sorted(ids)
+        for offset in range(0, len(ids), batch_size):
+            rows = InventoryTransaction.objects.filter(
+                source_system=source_system, external_id__in=ids[offset : offset + batch_size]
+            ).only("facility", "medicine", "transaction_type", "occurred_at", "source_system", "external_id")
+            stored.update((_key(row, key_fields), row) for row in rows)
+    return [
+        stored.get(_key(transaction, key_fields)) if transaction.external_id is not None else None
+        for transaction in transactions
+    ]
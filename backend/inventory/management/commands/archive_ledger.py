@@ -0,0 +1,41 @@
+"""Management command that moves old ledger rows into compressed columnar archive segments."""
+from __future__ import annotations
+
+import json
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.archive import ARCHIVE_TABLES, LedgerArchive
+
+
+class Command(BaseCommand):
+    help = "Archives transactions and stock snapshots older than a cutoff date to month/state partitioned files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before", required=True, help="Archive rows dated before this day (YYYY-MM-DD, UTC).")
+        parser.add_argument(
+            "--table",
+            action="append",
+            choices=sorted(ARCHIVE_TABLES),
+            help="Only archive the named table (repeatable).",
+        )
+        parser.add_argument("--archive-dir", help="Defaults to settings.LEDGER_ARCHIVE_DIR.")
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many rows would be archived.")
+
+    def handle(self, *args, **options):
+        try:
+            before = datetime.strptime(options["before"], "%Y-%m-%d").date()
+        except ValueError as exc:
+            raise CommandError("--before expects YYYY-MM-DD.") from exc
+
+        archive = LedgerArchive(options["archive_dir"])
+        for table in options["table"] or sorted(ARCHIVE_TABLES):
+            try:
+                result = archive.archive(table, before, dry_run=options["dry_run"])
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+            if options["dry_run"]:
+                self.stdout.write(f"{table}: {result.rows} rows would be archived")
+                continue
+            self.stdout.write(self.style.SUCCESS(json.dumps(result.as_dict())))
@@ -0,0 +1,23 @@
+"""Management command that rebuilds average monthly consumption and days of stock for every pair."""
+from __future__ import annotations
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.consumption import compute_consumption
+
+
+class Command(BaseCommand):
+    help = "Recomputes monthly consumption buckets, AMC and days of stock for all facility/medicine pairs."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months", type=int, help="AMC window in complete months (defaults to settings.CONSUMPTION_WINDOW_MONTHS)."
+        )
+
+    def handle(self, *args, **options):
+        if options["months"] is not None and options["months"] < 1:
+            raise CommandError("--months must be at least 1.")
+        result = compute_consumption(months=options["months"])
+        self.stdout.write(self.style.SUCCESS(json.dumps(result)))
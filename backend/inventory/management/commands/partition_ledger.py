@@ -0,0 +1,65 @@
+"""Management command that maintains monthly partitions of the ledger tables."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.partitioning import (
+    PARTITIONED_TABLES,
+    convert_to_partitioned,
+    detach_partitions,
+    ensure_partitions,
+    is_partitioned,
+    partitioning_enabled,
+)
+from notifications.changes import install_change_triggers
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates upcoming monthly partitions for the transaction and snapshot tables "
+        "and optionally detaches, archives or drops old ones (PostgreSQL only)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, help="Future months to keep partitions for.")
+        parser.add_argument(
+            "--convert", action="store_true", help="Partition tables that were migrated before partitioning was enabled."
+        )
+        parser.add_argument("--detach-before", help="Detach partitions that end on or before this month (YYYY-MM).")
+        parser.add_argument("--archive-schema", help="Move detached partitions into this schema.")
+        parser.add_argument("--drop", action="store_true", help="Drop detached partitions instead of keeping them.")
+
+    def handle(self, *args, **options):
+        if not partitioning_enabled():
+            raise CommandError("Partitioning requires PostgreSQL with INVENTORY_PARTITIONING=True.")
+        if options["drop"] and options["archive_schema"]:
+            raise CommandError("Use either --drop or --archive-schema, not both.")
+        before = None
+        if options["detach_before"]:
+            try:
+                before = datetime.strptime(options["detach_before"], "%Y-%m").date()
+            except ValueError as exc:
+                raise CommandError("--detach-before expects YYYY-MM.") from exc
+
+        for table in PARTITIONED_TABLES:
+            if options["convert"] and convert_to_partitioned(table, months_ahead=options["months_ahead"]):
+                # The rebuilt table lacks the event stream's notify triggers.
+                install_change_triggers()
+                self.stdout.write(self.style.SUCCESS(f"{table}: converted to monthly partitions"))
+            if not is_partitioned(table):
+                self.stderr.write(self.style.WARNING(f"{table}: not partitioned, rerun with --convert"))
+                continue
+
+            created = ensure_partitions(table, months_ahead=options["months_ahead"])
+            self.stdout.write(f"{table}: created {len(created)} partition(s) {' '.join(created)}".rstrip())
+            if before is None:
+                continue
+            detached = detach_partitions(
+                table, before, archive_schema=options["archive_schema"], drop=options["drop"]
+            )
+            action = "dropped" if options["drop"] else "detached"
+            self.stdout.write(
+                self.style.SUCCESS(f"{table}: {action} {len(detached)} partition(s) {' '.join(p.name for p in detached)}")
+            )
@@ -0,0 +1,34 @@
+"""Management command that recomputes min/max levels and drafts requisitions."""
+from __future__ import annotations
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory.models import Facility
+from inventory.planning import create_requisitions, plan_replenishment
+
+
+class Command(BaseCommand):
+    help = "Plans replenishment for every active facility (or a state) and replaces draft requisitions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--state", help="Only plan facilities in this state.")
+        parser.add_argument("--facility", action="append", help="Only plan the facility with this code (repeatable).")
+        parser.add_argument("--dry-run", action="store_true", help="Compute the plan without writing requisitions.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        facilities = Facility.objects.filter(is_active=True)
+        if options["state"]:
+            facilities = facilities.filter(state=options["state"])
+        if options["facility"]:
+            facilities = facilities.filter(code__in=options["facility"])
+
+        plan = plan_replenishment(facilities.values("pk"))
+        result = {"pairs": len(plan), "lines": len(plan.to_order)}
+        if not options["dry_run"]:
+            result["requisitions"] = len(create_requisitions(plan))
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        self.stdout.write(self.style.SUCCESS(json.dumps(result)))
@@ -2,35 +2,262 @@
 from __future__ import annotations
 
 import random
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 from decimal import Decimal
 
-from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.utils import timezone
 
 from accounts.models import User
+from analytics.features import refresh_features
+from analytics.reconciliation import reconcile_forecasts
+from inventory.consumption import apply_days_of_stock, compute_consumption, record_latest_stock
+from inventory.ledger import upsert_transactions
 from inventory.models import Alert, Facility, Forecast, IntegrationConfig, InventoryTransaction, Medicine, StockSnapshot
 from rest_framework.authtoken.models import Token
 
 
 DEFAULT_PASSWORD = "ChangeMe123!"
-random.seed(42)
+SEED = 42
+SOURCE_SYSTEM = "demo-seed"
+SNAPSHOT_SOURCE = "demo"
+HISTORY_WEEKS = 26
+BATCH_SIZE = 1000
+
+FACILITIES = [
+    {
+        "code": "LAG-GEN",
+        "name": "Lagos Central Hospital",
+        "facility_type": Facility.FacilityType.HOSPITAL,
+        "ownership": Facility.Ownership.PUBLIC,
+        "address": "12 Marina Road",
+        "city": "Lagos",
+        "state": "Lagos",
+        "lga": "Lagos Island",
+        "contact_email": "info@laggen.gov.ng",
+        "contact_phone": "+234700000001",
+    },
+    {
+        "code": "ABJ-CLN",
+        "name": "Abuja Community Clinic",
+        "facility_type": Facility.FacilityType.CLINIC,
+        "ownership": Facility.Ownership.PUBLIC,
+        "address": "Plot 4, Central Business District",
+        "city": "Abuja",
+        "state": "FCT",
+        "lga": "AMAC",
+        "contact_email": "hello@abjclinic.ng",
+        "contact_phone": "+234700000002",
+    },
+    {
+        "code": "KAN-WHS",
+        "name": "Kano Regional Warehouse",
+        "facility_type": Facility.FacilityType.WAREHOUSE,
+        "ownership": Facility.Ownership.PUBLIC,
+        "address": "Old Airport Road",
+        "city": "Kano",
+        "state": "Kano",
+        "lga": "Tarauni",
+        "contact_email": "warehouse@kano.ng",
+        "contact_phone": "+234700000003",
+    },
+    {
+        "code": "ENU-PHM",
+        "name": "Enugu Sunrise Pharmacy",
+        "facility_type": Facility.FacilityType.PHARMACY,
+        "ownership": Facility.Ownership.PRIVATE,
+        "address": "2 Zik Avenue",
+        "city": "Enugu",
+        "state": "Enugu",
+        "lga": "Enugu South",
+        "contact_email": "support@sunrisepharm.ng",
+        "contact_phone": "+234700000004",
+    },
+]
+
+MEDICINES = [
+    {
+        "name": "Artemisinin-based Combination Therapy",
+        "generic_name": "Artemether/Lumefantrine",
+        "category": "Antimalarial",
+        "pack_size": "24 tablet pack",
+        "unit": "pack",
+    },
+    {
+        "name": "Oxytocin Injection",
+        "generic_name": "Oxytocin",
+        "category": "Maternal Health",
+        "pack_size": "10 IU vial",
+        "unit": "vial",
+    },
+    {
+        "name": "Zinc Sulfate",
+        "generic_name": "Zinc",
+        "category": "Child Health",
+        "pack_size": "10 tablet strip",
+        "unit": "strip",
+    },
+    {
+        "name": "ORS Sachet",
+        "generic_name": "Oral Rehydration Salts",
+        "category": "Child Health",
+        "pack_size": "20.5 g sachet",
+        "unit": "sachet",
+    },
+    {
+        "name": "Insulin",
+        "generic_name": "Human Insulin",
+        "category": "NCD",
+        "pack_size": "10 ml vial",
+        "unit": "vial",
+    },
+]
+
+USERS = [
+    {
+        "username": "superadmin",
+        "first_name": "Sade",
+        "last_name": "Bakare",
+        "role": User.Roles.SUPER_ADMIN,
+        "is_superuser": True,
+        "is_staff": True,
+    },
+    {
+        "username": "policy",
+        "first_name": "David",
+        "last_name": "Okoro",
+        "role": User.Roles.POLICY_MAKER,
+        "facility": "ABJ-CLN",
+    },
+    {
+        "username": "lagos-admin",
+        "first_name": "Ada",
+        "last_name": "Olawale",
+        "role": User.Roles.FACILITY_ADMIN,
+        "facility": "LAG-GEN",
+        "is_staff": True,
+    },
+    {
+        "username": "enugu-pharm",
+        "first_name": "Chinonso",
+        "last_name": "Eke",
+        "role": User.Roles.PHARMACIST,
+        "facility": "ENU-PHM",
+    },
+]
+
+TRANSACTIONS = [
+    {
+        "facility": "LAG-GEN",
+        "medicine": "Artemisinin-based Combination Therapy",
+        "transaction_type": InventoryTransaction.TransactionType.RECEIPT,
+        "quantity": Decimal("450"),
+        "batch_number": "ACT-2024-04",
+        "source_destination": "Central Medical Store",
+        "days_ago": 7,
+        "created_by": "lagos-admin",
+    },
+    {
+        "facility": "LAG-GEN",
+        "medicine": "Oxytocin Injection",
+        "transaction_type": InventoryTransaction.TransactionType.ISSUE,
+        "quantity": Decimal("120"),
+        "source_destination": "Labour Ward",
+        "days_ago": 3,
+        "created_by": "lagos-admin",
+    },
+    {
+        "facility": "ABJ-CLN",
+        "medicine": "Zinc Sulfate",
+        "transaction_type": InventoryTransaction.TransactionType.RECEIPT,
+        "quantity": Decimal("300"),
+        "source_destination": "UNICEF Grant",
+        "days_ago": 12,
+        "created_by": "policy",
+    },
+    {
+        "facility": "ENU-PHM",
+        "medicine": "Insulin",
+        "transaction_type": InventoryTransaction.TransactionType.ADJUSTMENT,
+        "quantity": Decimal("15"),
+        "notes": "Adjustment after cold-chain incident",
+        "days_ago": 2,
+        "created_by": "enugu-pharm",
+    },
+]
+
+ALERTS = [
+    {
+        "facility": "LAG-GEN",
+        "medicine": "Oxytocin Injection",
+        "alert_type": Alert.AlertType.LOW_STOCK,
+        "status": Alert.Status.OPEN,
+        "message": "Only 3 days of stock remaining",
+        "days_ago": 1,
+    },
+    {
+        "facility": "ENU-PHM",
+        "medicine": "Insulin",
+        "alert_type": Alert.AlertType.EXPIRY,
+        "status": Alert.Status.ACKNOWLEDGED,
+        "message": "Batch INS-203 expires in 15 days",
+        "days_ago": 5,
+        "resolved_by": "enugu-pharm",
+        "resolved_days_ago": 2,
+    },
+]
+
+INTEGRATIONS = [
+    {
+        "system_name": "DHIS2 Sandbox",
+        "base_url": "https://dhis2-demo.server/api",
+        "auth_type": IntegrationConfig.AuthType.BASIC,
+        "credentials": {"username": "demo", "password": "District1"},
+    },
+    {
+        "system_name": "OpenLMIS",
+        "base_url": "https://openlmis.example/graphql",
+        "auth_type": IntegrationConfig.AuthType.TOKEN,
+        "credentials": {"token": "sample-token"},
+    },
+]
+
+
+def _copy_key(value: str, copy: int) -> str:
+    """Suffix identifiers for scaled copies; copy 0 keeps the original demo names."""
+
+    return value if copy == 0 else f"{value}-{copy + 1:03d}"
 
 
 class Command(BaseCommand):
     help = "Seeds the database with deterministic demo data so the API and frontend can be exercised."
 
-    def handle(self, *args, **options):  # noqa: ARG002 - required by Django
-        self.stdout.write(self.style.MIGRATE_HEADING("Seeding Healteex demo data"))
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=1,
+            help="Multiply facilities, users and their ledger rows by this factor (default: 1).",
+        )
+
+    def handle(self, *args, **options):
+        scale = options["scale"]
+        if scale < 1:
+            raise CommandError("--scale must be at least 1.")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Seeding Healteex demo data (scale {scale})"))
+        self.rng = random.Random(SEED)
+        self.today = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
         with transaction.atomic():
-            facilities = self._seed_facilities()
+            facilities = self._seed_facilities(scale)
             medicines = self._seed_medicines()
-            users = self._seed_users(facilities)
-            self._seed_transactions(facilities, medicines, users)
+            users = self._seed_users(scale, facilities)
+            self._seed_transactions(scale, facilities, medicines, users)
             self._seed_stock_snapshots(facilities, medicines)
             self._seed_forecasts(facilities, medicines)
-            self._seed_alerts(facilities, medicines, users)
+            self._seed_alerts(scale, facilities, medicines, users)
             self._seed_integrations()
 
         self.stdout.write(
@@ -41,315 +268,208 @@ class Command(BaseCommand):
         )
 
     # --- Seed helpers -------------------------------------------------
-    def _seed_facilities(self) -> dict[str, Facility]:
-        payloads = [
-            {
-                "code": "LAG-GEN",
-                "name": "Lagos Central Hospital",
-                "facility_type": Facility.FacilityType.HOSPITAL,
-                "ownership": Facility.Ownership.PUBLIC,
-                "address": "12 Marina Road",
-                "city": "Lagos",
-                "state": "Lagos",
-                "lga": "Lagos Island",
-                "contact_email": "info@laggen.gov.ng",
-                "contact_phone": "+234700000001",
-            },
-            {
-                "code": "ABJ-CLN",
-                "name": "Abuja Community Clinic",
-                "facility_type": Facility.FacilityType.CLINIC,
-                "ownership": Facility.Ownership.PUBLIC,
-                "address": "Plot 4, Central Business District",
-                "city": "Abuja",
-                "state": "FCT",
-                "lga": "AMAC",
-                "contact_email": "hello@abjclinic.ng",
-                "contact_phone": "+234700000002",
-            },
-            {
-                "code": "KAN-WHS",
-                "name": "Kano Regional Warehouse",
-                "facility_type": Facility.FacilityType.WAREHOUSE,
-                "ownership": Facility.Ownership.PUBLIC,
-                "address": "Old Airport Road",
-                "city": "Kano",
-                "state": "Kano",
-                "lga": "Tarauni",
-                "contact_email": "warehouse@kano.ng",
-                "contact_phone": "+234700000003",
-            },
-            {
-                "code": "ENU-PHM",
-                "name": "Enugu Sunrise Pharmacy",
-                "facility_type": Facility.FacilityType.PHARMACY,
-                "ownership": Facility.Ownership.PRIVATE,
-                "address": "2 Zik Avenue",
-                "city": "Enugu",
-                "state": "Enugu",
-                "lga": "Enugu South",
-                "contact_email": "support@sunrisepharm.ng",
-                "contact_phone": "+234700000004",
-            },
-        ]
-
-        facilities: dict[str, Facility] = {}
-        for payload in payloads:
-            facility, _ = Facility.objects.update_or_create(code=payload["code"], defaults=payload)
-            facilities[facility.code] = facility
+    def _seed_facilities(self, scale: int) -> dict[str, int]:
+        rows = []
+        for copy in range(scale):
+            for payload in FACILITIES:
+                name = payload["name"] if copy == 0 else f"{payload['name']} {copy + 1}"
+                rows.append(Facility(**{**payload, "code": _copy_key(payload["code"], copy), "name": name}))
+        update_fields = [key for key in FACILITIES[0] if key != "code"] + ["updated_at"]
+        Facility.objects.bulk_create(
+            rows, batch_size=BATCH_SIZE, update_conflicts=True, unique_fields=["code"], update_fields=update_fields
+        )
+        facilities = dict(
+            Facility.objects.filter(code__in=[row.code for row in rows]).order_by("code").values_list("code", "id")
+        )
         self.stdout.write(self.style.SUCCESS(f"Facilities: {len(facilities)} records"))
         return facilities
 
-    def _seed_medicines(self) -> dict[str, Medicine]:
-        payloads = [
-            {
-                "name": "Artemisinin-based Combination Therapy",
-                "generic_name": "Artemether/Lumefantrine",
-                "category": "Antimalarial",
-                "pack_size": "24 tablet pack",
-                "unit": "pack",
-            },
-            {
-                "name": "Oxytocin Injection",
-                "generic_name": "Oxytocin",
-                "category": "Maternal Health",
-                "pack_size": "10 IU vial",
-                "unit": "vial",
-            },
-            {
-                "name": "Zinc Sulfate",
-                "generic_name": "Zinc",
-                "category": "Child Health",
-                "pack_size": "10 tablet strip",
-                "unit": "strip",
-            },
-            {
-                "name": "ORS Sachet",
-                "generic_name": "Oral Rehydration Salts",
-                "category": "Child Health",
-                "pack_size": "20.5 g sachet",
-                "unit": "sachet",
-            },
-            {
-                "name": "Insulin",
-                "generic_name": "Human Insulin",
-                "category": "NCD",
-                "pack_size": "10 ml vial",
-                "unit": "vial",
-            },
-        ]
-
-        medicines: dict[str, Medicine] = {}
-        for payload in payloads:
-            medicine, _ = Medicine.objects.update_or_create(name=payload["name"], defaults=payload)
-            medicines[medicine.name] = medicine
+    def _seed_medicines(self) -> dict[str, int]:
+        Medicine.objects.bulk_create(
+            [Medicine(**payload) for payload in MEDICINES],
+            update_conflicts=True,
+            unique_fields=["name", "pack_size", "unit"],
+            update_fields=["generic_name", "category", "updated_at"],
+        )
+        medicines = dict(
+            Medicine.objects.filter(name__in=[payload["name"] for payload in MEDICINES]).values_list("name", "id")
+        )
         self.stdout.write(self.style.SUCCESS(f"Medicines: {len(medicines)} records"))
         return medicines
 
-    def _seed_users(self, facilities: dict[str, Facility]) -> dict[str, User]:
-        payloads = [
-            {
-                "username": "superadmin",
-                "first_name": "Sade",
-                "last_name": "Bakare",
-                "role": User.Roles.SUPER_ADMIN,
-                "is_superuser": True,
-                "is_staff": True,
-            },
-            {
-                "username": "policy",
-                "first_name": "David",
-                "last_name": "Okoro",
-                "role": User.Roles.POLICY_MAKER,
-                "facility": facilities["ABJ-CLN"],
-            },
-            {
-                "username": "lagos-admin",
-                "first_name": "Ada",
-                "last_name": "Olawale",
-                "role": User.Roles.FACILITY_ADMIN,
-                "facility": facilities["LAG-GEN"],
-                "is_staff": True,
-            },
-            {
-                "username": "enugu-pharm",
-                "first_name": "Chinonso",
-                "last_name": "Eke",
-                "role": User.Roles.PHARMACIST,
-                "facility": facilities["ENU-PHM"],
-            },
-        ]
-
-        users: dict[str, User] = {}
-        for payload in payloads:
-            username = payload.pop("username")
-            facility = payload.pop("facility", None)
-            user, _ = User.objects.get_or_create(username=username)
-            for key, value in payload.items():
-                setattr(user, key, value)
-            user.facility = facility
-            if not user.email:
-                user.email = f"{username}@demo.healteex.ng"
-            user.set_password(DEFAULT_PASSWORD)
-            user.save()
-            Token.objects.get_or_create(user=user)
-            users[username] = user
+    def _seed_users(self, scale: int, facilities: dict[str, int]) -> dict[str, int]:
+        # One PBKDF2 hash per run instead of one per user.
+        password_hash = make_password(DEFAULT_PASSWORD)
+        rows = []
+        for copy in range(scale):
+            for payload in USERS:
+                if copy and payload["role"] == User.Roles.SUPER_ADMIN:
+                    continue
+                username = _copy_key(payload["username"], copy)
+                facility_code = payload.get("facility")
+                rows.append(
+                    User(
+                        username=username,
+                        email=f"{username}@demo.healteex.ng",
+                        first_name=payload["first_name"],
+                        last_name=payload["last_name"],
+                        role=payload["role"],
+                        is_superuser=payload.get("is_superuser", False),
+                        is_staff=payload.get("is_staff", False),
+                        facility_id=facilities[_copy_key(facility_code, copy)] if facility_code else None,
+                        password=password_hash,
+                    )
+                )
+        User.objects.bulk_create(
+            rows,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["username"],
+            update_fields=["email", "first_name", "last_name", "role", "is_superuser", "is_staff", "facility", "password"],
+        )
+        users = dict(User.objects.filter(username__in=[row.username for row in rows]).values_list("username", "id"))
+        Token.objects.bulk_create(
+            [Token(key=Token.generate_key(), user_id=user_id) for user_id in users.values()],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
         self.stdout.write(self.style.SUCCESS(f"Users: {len(users)} records (password: {DEFAULT_PASSWORD})"))
         return users
 
-    def _seed_transactions(self, facilities: dict[str, Facility], medicines: dict[str, Medicine], users: dict[str, User]) -> None:
-        now = timezone.now()
-        payloads = [
-            {
-                "facility": facilities["LAG-GEN"],
-                "medicine": medicines["Artemisinin-based Combination Therapy"],
-                "transaction_type": InventoryTransaction.TransactionType.RECEIPT,
-                "quantity": Decimal("450"),
-                "batch_number": "ACT-2024-04",
-                "source_destination": "Central Medical Store",
-                "occurred_at": now - timedelta(days=7),
-                "created_by": users["lagos-admin"],
-            },
-            {
-                "facility": facilities["LAG-GEN"],
-                "medicine": medicines["Oxytocin Injection"],
-                "transaction_type": InventoryTransaction.TransactionType.ISSUE,
-                "quantity": Decimal("120"),
-                "source_destination": "Labour Ward",
-                "occurred_at": now - timedelta(days=3),
-                "created_by": users["lagos-admin"],
-            },
-            {
-                "facility": facilities["ABJ-CLN"],
-                "medicine": medicines["Zinc Sulfate"],
-                "transaction_type": InventoryTransaction.TransactionType.RECEIPT,
-                "quantity": Decimal("300"),
-                "source_destination": "UNICEF Grant",
-                "occurred_at": now - timedelta(days=12),
-                "created_by": users["policy"],
-            },
-            {
-                "facility": facilities["ENU-PHM"],
-                "medicine": medicines["Insulin"],
-                "transaction_type": InventoryTransaction.TransactionType.ADJUSTMENT,
-                "quantity": Decimal("15"),
-                "notes": "Adjustment after cold-chain incident",
-                "occurred_at": now - timedelta(days=2),
-                "created_by": users["enugu-pharm"],
-            },
-        ]
+    def _seed_transactions(
+        self,
+        scale: int,
+        facilities: dict[str, int],
+        medicines: dict[str, int],
+        users: dict[str, int],
+    ) -> None:
+        rows = []
+        for copy in range(scale):
+            for index, payload in enumerate(TRANSACTIONS):
+                payload = payload.copy()
+                days_ago = payload.pop("days_ago")
+                rows.append(
+                    InventoryTransaction(
+                        facility_id=facilities[_copy_key(payload.pop("facility"), copy)],
+                        medicine_id=medicines[payload.pop("medicine")],
+                        created_by_id=users[_copy_key(payload.pop("created_by"), copy)],
+                        occurred_at=self.today - timedelta(days=days_ago),
+                        source_system=SOURCE_SYSTEM,
+                        external_id=f"sample-{copy}-{index}",
+                        **payload,
+                    )
+                )
 
-        for payload in payloads:
-            defaults = payload.copy()
-            defaults.pop("facility")
-            defaults.pop("medicine")
-            InventoryTransaction.objects.update_or_create(
-                facility=payload["facility"],
-                medicine=payload["medicine"],
-                transaction_type=payload["transaction_type"],
-                occurred_at=payload["occurred_at"],
-                defaults=defaults,
-            )
-        self.stdout.write(self.style.SUCCESS("Transactions: sample records created"))
+        # Weekly dispensing history so consumption and forecasting have data to work with.
+        for code, facility_id in facilities.items():
+            for medicine_index, medicine_id in enumerate(medicines.values()):
+                base = 20 + 15 * medicine_index
+                for week in range(1, HISTORY_WEEKS + 1):
+                    rows.append(
+                        InventoryTransaction(
+                            facility_id=facility_id,
+                            medicine_id=medicine_id,
+                            transaction_type=InventoryTransaction.TransactionType.ISSUE,
+                            quantity=Decimal(base + self.rng.randint(0, base)),
+                            source_destination="Dispensary",
+                            occurred_at=self.today - timedelta(weeks=week),
+                            source_system=SOURCE_SYSTEM,
+                            external_id=f"history-{code}-{medicine_index}-{week}",
+                        )
+                    )
+        upsert_transactions(rows, batch_size=BATCH_SIZE)
+        self.stdout.write(self.style.SUCCESS(f"Transactions: {len(rows)} records"))
 
-    def _seed_stock_snapshots(self, facilities: dict[str, Facility], medicines: dict[str, Medicine]) -> None:
-        now = timezone.now()
-        for f_index, facility in enumerate(facilities.values()):
-            for m_index, medicine in enumerate(medicines.values()):
-                recorded_at = now - timedelta(days=1 + f_index + m_index)
-                defaults = {
-                    "stock_on_hand": Decimal(120 + ((f_index + m_index) * 37) % 250),
-                    "days_of_stock": 5 + ((f_index + m_index) * 3) % 35,
-                    "recorded_at": recorded_at,
-                }
-                StockSnapshot.objects.update_or_create(
-                    facility=facility,
-                    medicine=medicine,
-                    recorded_at=recorded_at,
-                    defaults=defaults,
+    def _seed_stock_snapshots(self, facilities: dict[str, int], medicines: dict[str, int]) -> None:
+        rows = []
+        for f_index, facility_id in enumerate(facilities.values()):
+            for m_index, medicine_id in enumerate(medicines.values()):
+                offset = f_index % len(FACILITIES) + m_index
+                rows.append(
+                    StockSnapshot(
+                        facility_id=facility_id,
+                        medicine_id=medicine_id,
+                        stock_on_hand=Decimal(120 + (offset * 37) % 250),
+                        data_source=SNAPSHOT_SOURCE,
+                        recorded_at=self.today - timedelta(days=1 + offset),
+                    )
                 )
-        self.stdout.write(self.style.SUCCESS("Stock snapshots generated"))
+        # Replace rather than accumulate so reruns on later days stay idempotent.
+        StockSnapshot.objects.filter(facility_id__in=facilities.values(), data_source=SNAPSHOT_SOURCE).delete()
+        # Derive days of stock from the seeded dispensing history instead of inventing it.
+        compute_consumption(today=self.today.date())
+        apply_days_of_stock(rows)
+        StockSnapshot.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        record_latest_stock(rows)
+        features = refresh_features(full=True, today=self.today.date())
+        self.stdout.write(
+            self.style.SUCCESS(f"Stock snapshots: {len(rows)} records ({features['rows']} demand feature rows)")
+        )
 
-    def _seed_forecasts(self, facilities: dict[str, Facility], medicines: dict[str, Medicine]) -> None:
-        base_date = timezone.now().date()
-        for facility in facilities.values():
-            for medicine in list(medicines.values())[:3]:
-                defaults = {
-                    "period_start": base_date,
-                    "period_end": base_date + timedelta(days=30),
-                    "predicted_demand": Decimal(random.randint(200, 800)),
-                    "confidence_interval_lower": Decimal(random.randint(150, 300)),
-                    "confidence_interval_upper": Decimal(random.randint(900, 1200)),
-                    "model_version": "v1.0",
-                }
-                Forecast.objects.update_or_create(
-                    facility=facility,
-                    medicine=medicine,
-                    forecast_date=base_date,
-                    period_start=defaults["period_start"],
-                    period_end=defaults["period_end"],
-                    model_version=defaults["model_version"],
-                    defaults=defaults,
+    def _seed_forecasts(self, facilities: dict[str, int], medicines: dict[str, int]) -> None:
+        base_date = self.today.date()
+        rows = []
+        for facility_id in facilities.values():
+            for medicine_id in list(medicines.values())[:3]:
+                rows.append(
+                    Forecast(
+                        facility_id=facility_id,
+                        medicine_id=medicine_id,
+                        forecast_date=base_date,
+                        period_start=base_date,
+                        period_end=base_date + timedelta(days=30),
+                        predicted_demand=Decimal(self.rng.randint(200, 800)),
+                        confidence_interval_lower=Decimal(self.rng.randint(150, 300)),
+                        confidence_interval_upper=Decimal(self.rng.randint(900, 1200)),
+                        model_version="v1.0",
+                    )
                 )
-        self.stdout.write(self.style.SUCCESS("Forecasts generated"))
+        Forecast.objects.bulk_create(
+            rows,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["facility", "medicine", "forecast_date", "period_start", "period_end", "model_version"],
+            update_fields=["predicted_demand", "confidence_interval_lower", "confidence_interval_upper", "updated_at"],
+        )
+        reconciled = reconcile_forecasts(model_version="v1.0", forecast_date=base_date)
+        self.stdout.write(
+            self.style.SUCCESS(f"Forecasts: {len(rows)} records ({reconciled['rows']} reconciled aggregates)")
+        )
 
     def _seed_alerts(
         self,
-        facilities: dict[str, Facility],
-        medicines: dict[str, Medicine],
-        users: dict[str, User],
+        scale: int,
+        facilities: dict[str, int],
+        medicines: dict[str, int],
+        users: dict[str, int],
     ) -> None:
-        now = timezone.now()
-        payloads = [
-            {
-                "facility": facilities["LAG-GEN"],
-                "medicine": medicines["Oxytocin Injection"],
-                "alert_type": Alert.AlertType.LOW_STOCK,
-                "status": Alert.Status.OPEN,
-                "message": "Only 3 days of stock remaining",
-                "triggered_at": now - timedelta(days=1),
-            },
-            {
-                "facility": facilities["ENU-PHM"],
-                "medicine": medicines["Insulin"],
-                "alert_type": Alert.AlertType.EXPIRY,
-                "status": Alert.Status.ACKNOWLEDGED,
-                "message": "Batch INS-203 expires in 15 days",
-                "triggered_at": now - timedelta(days=5),
-                "resolved_by": users["enugu-pharm"],
-                "resolved_at": now - timedelta(days=2),
-            },
-        ]
-
-        for payload in payloads:
-            defaults = payload.copy()
-            defaults.pop("facility")
-            defaults.pop("medicine")
-            Alert.objects.update_or_create(
-                facility=payload["facility"],
-                medicine=payload["medicine"],
-                alert_type=payload["alert_type"],
-                triggered_at=payload["triggered_at"],
-                defaults=defaults,
-            )
-        self.stdout.write(self.style.SUCCESS("Alerts created"))
+        rows = []
+        for copy in range(scale):
+            for payload in ALERTS:
+                payload = payload.copy()
+                resolved_by = payload.pop("resolved_by", None)
+                resolved_days_ago = payload.pop("resolved_days_ago", None)
+                rows.append(
+                    Alert(
+                        facility_id=facilities[_copy_key(payload.pop("facility"), copy)],
+                        medicine_id=medicines[payload.pop("medicine")],
+                        triggered_at=self.today - timedelta(days=payload.pop("days_ago")),
+                        resolved_by_id=users[_copy_key(resolved_by, copy)] if resolved_by else None,
+                        resolved_at=self.today - timedelta(days=resolved_days_ago) if resolved_days_ago else None,
+                        **payload,
+                    )
+                )
+        Alert.objects.filter(
+            facility_id__in=facilities.values(), message__in=[payload["message"] for payload in ALERTS]
+        ).delete()
+        Alert.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+        self.stdout.write(self.style.SUCCESS(f"Alerts: {len(rows)} records"))
 
     def _seed_integrations(self) -> None:
-        payloads = [
-            {
-                "system_name": "DHIS2 Sandbox",
-                "base_url": "https://dhis2-demo.server/api",
-                "auth_type": IntegrationConfig.AuthType.BASIC,
-                "credentials": {"username": "demo", "password": "District1"},
-            },
-            {
-                "system_name": "OpenLMIS",
-                "base_url": "https://openlmis.example/graphql",
-                "auth_type": IntegrationConfig.AuthType.TOKEN,
-                "credentials": {"token": "sample-token"},
-            },
-        ]
-
-        for payload in payloads:
-            IntegrationConfig.objects.update_or_create(system_name=payload["system_name"], defaults=payload)
+        IntegrationConfig.objects.bulk_create(
+            [IntegrationConfig(**payload) for payload in INTEGRATIONS],
+            update_conflicts=True,
+            unique_fields=["system_name"],
+            update_fields=["base_url", "auth_type", "credentials", "updated_at"],
+        )
         self.stdout.write(self.style.SUCCESS("Integration configs synced"))
@@ -0,0 +1,33 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="integrationconfig",
+            name="adapter",
+            field=models.CharField(
+                blank=True,
+                help_text="Sync adapter key (e.g. 'dhis2', 'openlmis'); inferred from the system name when blank.",
+                max_length=32,
+            ),
+        ),
+        migrations.AddField(
+            model_name="integrationconfig",
+            name="options",
+            field=models.JSONField(blank=True, default=dict, help_text="Adapter options such as endpoint and page_size."),
+        ),
+        migrations.AddField(
+            model_name="integrationconfig",
+            name="sync_state",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Checkpoint of an in-progress sync, used to resume after interruption.",
+            ),
+        ),
+    ]
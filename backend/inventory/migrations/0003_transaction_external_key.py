@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0002_integration_sync_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inventorytransaction",
+            name="source_system",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="System the transaction was imported from; blank for manual entries.",
+                max_length=128,
+            ),
+        ),
+        migrations.AddField(
+            model_name="inventorytransaction",
+            name="external_id",
+            field=models.CharField(
+                blank=True,
+                help_text="Identifier in the source system; replays with the same key update the existing row.",
+                max_length=128,
+                null=True,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="inventorytransaction",
+            constraint=models.UniqueConstraint(
+                fields=("source_system", "external_id"),
+                name="inventory_transaction_external_key",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from inventory.partitioning import PARTITIONED_TABLES, convert_to_partitioned, partitioning_enabled
+
+
+def partition_tables(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    if not partitioning_enabled(alias):
+        return
+    for table in PARTITIONED_TABLES:
+        convert_to_partitioned(table, using=alias)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0003_transaction_external_key"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
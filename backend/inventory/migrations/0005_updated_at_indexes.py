@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0004_partition_ledger_tables"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="stocksnapshot",
+            index=models.Index(fields=["updated_at"], name="inventory_snapshot_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="forecast",
+            index=models.Index(fields=["updated_at"], name="inventory_forecast_updated_idx"),
+        ),
+    ]
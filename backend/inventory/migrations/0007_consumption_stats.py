@@ -0,0 +1,83 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0006_facility_state_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyConsumption",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("month", models.DateField(help_text="First day of the month, in the project time zone.")),
+                ("quantity", models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                (
+                    "facility",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_consumption",
+                        to="inventory.facility",
+                    ),
+                ),
+                (
+                    "medicine",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_consumption",
+                        to="inventory.medicine",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-month"],
+                "unique_together": {("facility", "medicine", "month")},
+            },
+        ),
+        migrations.CreateModel(
+            name="ConsumptionStat",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "amc",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Mean quantity issued over the last complete months of the window.",
+                        max_digits=12,
+                        verbose_name="average monthly consumption",
+                    ),
+                ),
+                ("window_months", models.PositiveSmallIntegerField(default=3)),
+                ("stock_on_hand", models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ("stock_recorded_at", models.DateTimeField(blank=True, null=True)),
+                ("days_of_stock", models.PositiveIntegerField(blank=True, null=True)),
+                (
+                    "facility",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="consumption_stats",
+                        to="inventory.facility",
+                    ),
+                ),
+                (
+                    "medicine",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="consumption_stats",
+                        to="inventory.medicine",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["facility", "medicine"],
+                "unique_together": {("facility", "medicine")},
+            },
+        ),
+    ]
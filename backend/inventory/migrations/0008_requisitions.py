@@ -0,0 +1,145 @@
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("inventory", "0007_consumption_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Supplier",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=255)),
+                ("code", models.CharField(max_length=50, unique=True)),
+                (
+                    "lead_time_days",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Days from requisition to delivery; defaults to PLANNING_LEAD_TIME_DAYS.",
+                        null=True,
+                    ),
+                ),
+                ("contact_email", models.EmailField(blank=True, max_length=254)),
+                ("contact_phone", models.CharField(blank=True, max_length=32)),
+                ("is_active", models.BooleanField(default=True)),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="medicine",
+            name="supplier",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="medicines",
+                to="inventory.supplier",
+            ),
+        ),
+        migrations.AddField(
+            model_name="medicine",
+            name="lead_time_days",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Overrides the supplier's lead time for this medicine.", null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name="Requisition",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("draft", "Draft"),
+                            ("submitted", "Submitted"),
+                            ("approved", "Approved"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        default="draft",
+                        max_length=16,
+                    ),
+                ),
+                ("notes", models.TextField(blank=True)),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="requisitions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "facility",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="requisitions",
+                        to="inventory.facility",
+                    ),
+                ),
+                (
+                    "supplier",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="requisitions",
+                        to="inventory.supplier",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-created_at"],
+                "indexes": [models.Index(fields=["facility", "status"], name="inventory_req_status_idx")],
+            },
+        ),
+        migrations.CreateModel(
+            name="RequisitionLine",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("stock_on_hand", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("monthly_demand", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("safety_stock", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("min_level", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("max_level", models.DecimalField(decimal_places=2, max_digits=12)),
+                (
+                    "quantity",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=12, validators=[django.core.validators.MinValueValidator(0)]
+                    ),
+                ),
+                (
+                    "medicine",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="requisition_lines",
+                        to="inventory.medicine",
+                    ),
+                ),
+                (
+                    "requisition",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="lines", to="inventory.requisition"
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["requisition", "medicine"],
+                "unique_together": {("requisition", "medicine")},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("inventory", "0009_alert_updated_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="requisition",
+            name="generated",
+            field=models.BooleanField(
+                default=False,
+                help_text="Drafted by the planner, which replaces it on its next run while still a draft.",
+            ),
+        ),
+    ]
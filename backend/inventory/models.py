@@ -49,6 +49,29 @@ class Facility(TimeStampedModel):
     class Meta:
         verbose_name_plural = "Facilities"
         ordering = ["name"]
+        indexes = [
+            # Policy makers are scoped to every facility in their state.
+            models.Index(fields=["state"], name="inventory_facility_state_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.name} ({self.code})"
+
+
+class Supplier(TimeStampedModel):
+    """Warehouse, distributor or manufacturer that fills requisitions."""
+
+    name = models.CharField(max_length=255)
+    code = models.CharField(max_length=50, unique=True)
+    lead_time_days = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Days from requisition to delivery; defaults to PLANNING_LEAD_TIME_DAYS."
+    )
+    contact_email = models.EmailField(blank=True)
+    contact_phone = models.CharField(max_length=32, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["name"]
 
     def __str__(self) -> str:  # pragma: no cover - trivial representation
         return f"{self.name} ({self.code})"
@@ -64,6 +87,12 @@ class Medicine(TimeStampedModel):
     pack_size = models.CharField(max_length=64, blank=True)
     unit = models.CharField(max_length=32, default="unit")
     description = models.TextField(blank=True)
+    supplier = models.ForeignKey(
+        Supplier, on_delete=models.SET_NULL, null=True, blank=True, related_name="medicines"
+    )
+    lead_time_days = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Overrides the supplier's lead time for this medicine."
+    )
     is_active = models.BooleanField(default=True)
 
     class Meta:
@@ -92,6 +121,18 @@ class InventoryTransaction(TimeStampedModel):
     source_destination = models.CharField(max_length=255, blank=True)
     reference = models.CharField(max_length=255, blank=True)
     notes = models.TextField(blank=True)
+    source_system = models.CharField(
+        max_length=128,
+        blank=True,
+        default="",
+        help_text="System the transaction was imported from; blank for manual entries.",
+    )
+    external_id = models.CharField(
+        max_length=128,
+        null=True,
+        blank=True,
+        help_text="Identifier in the source system; replays with the same key update the existing row.",
+    )
     occurred_at = models.DateTimeField(help_text="When the transaction occurred at the facility level.")
     recorded_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(
@@ -107,6 +148,29 @@ class InventoryTransaction(TimeStampedModel):
         indexes = [
             models.Index(fields=["facility", "medicine", "occurred_at"]),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source_system", "external_id"],
+                name="inventory_transaction_external_key",
+            ),
+        ]
+
+    def save(self, *args, **kwargs) -> None:
+        from .consumption import consumption_keys, refresh_consumption
+
+        previous = []
+        if self.pk is not None:
+            previous = list(InventoryTransaction.objects.filter(pk=self.pk))
+        super().save(*args, **kwargs)
+        refresh_consumption(consumption_keys([*previous, self]))
+
+    def delete(self, *args, **kwargs):
+        from .consumption import consumption_keys, refresh_consumption
+
+        keys = consumption_keys([self])
+        result = super().delete(*args, **kwargs)
+        refresh_consumption(keys)
+        return result
 
     def __str__(self) -> str:  # pragma: no cover - trivial representation
         return f"{self.transaction_type} - {self.medicine} at {self.facility}"
@@ -125,6 +189,17 @@ class StockSnapshot(TimeStampedModel):
     class Meta:
         unique_together = ("facility", "medicine", "recorded_at")
         ordering = ["-recorded_at"]
+        indexes = [
+            # Incremental refreshes of the analytics cube read rows changed since a watermark.
+            models.Index(fields=["updated_at"], name="inventory_snapshot_updated_idx"),
+        ]
+
+    def save(self, *args, **kwargs) -> None:
+        from .consumption import apply_days_of_stock, record_latest_stock
+
+        apply_days_of_stock([self])
+        super().save(*args, **kwargs)
+        record_latest_stock([self])
 
     def __str__(self) -> str:  # pragma: no cover - trivial representation
         return f"{self.facility} - {self.medicine} ({self.recorded_at:%Y-%m-%d})"
@@ -146,11 +221,109 @@ class Forecast(TimeStampedModel):
     class Meta:
         unique_together = ("facility", "medicine", "forecast_date", "period_start", "period_end", "model_version")
         ordering = ["-forecast_date"]
+        indexes = [
+            models.Index(fields=["updated_at"], name="inventory_forecast_updated_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - trivial representation
         return f"Forecast for {self.medicine} at {self.facility}"
 
 
+class MonthlyConsumption(TimeStampedModel):
+    """Quantity issued per facility, medicine and calendar month, maintained by ``inventory.consumption``."""
+
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="monthly_consumption")
+    medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE, related_name="monthly_consumption")
+    month = models.DateField(help_text="First day of the month, in the project time zone.")
+    quantity = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("facility", "medicine", "month")
+        ordering = ["-month"]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.medicine} at {self.facility} ({self.month:%Y-%m})"
+
+
+class ConsumptionStat(TimeStampedModel):
+    """Average monthly consumption and days of stock of a facility × medicine pair."""
+
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="consumption_stats")
+    medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE, related_name="consumption_stats")
+    amc = models.DecimalField(
+        "average monthly consumption",
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Mean quantity issued over the last complete months of the window.",
+    )
+    window_months = models.PositiveSmallIntegerField(default=3)
+    stock_on_hand = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    stock_recorded_at = models.DateTimeField(null=True, blank=True)
+    days_of_stock = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("facility", "medicine")
+        ordering = ["facility", "medicine"]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"AMC of {self.medicine} at {self.facility}"
+
+
+class Requisition(TimeStampedModel):
+    """Order of a facility to one supplier, drafted by ``inventory.planning`` or by hand."""
+
+    class Status(models.TextChoices):
+        DRAFT = "draft", "Draft"
+        SUBMITTED = "submitted", "Submitted"
+        APPROVED = "approved", "Approved"
+        CANCELLED = "cancelled", "Cancelled"
+
+    facility = models.ForeignKey(Facility, on_delete=models.CASCADE, related_name="requisitions")
+    supplier = models.ForeignKey(
+        Supplier, on_delete=models.SET_NULL, null=True, blank=True, related_name="requisitions"
+    )
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.DRAFT)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="requisitions",
+    )
+    notes = models.TextField(blank=True)
+    generated = models.BooleanField(
+        default=False, help_text="Drafted by the planner, which replaces it on its next run while still a draft."
+    )
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["facility", "status"], name="inventory_req_status_idx")]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"Requisition {self.pk} for {self.facility}"
+
+
+class RequisitionLine(models.Model):
+    """Planned order quantity of one medicine, with the levels it was derived from."""
+
+    requisition = models.ForeignKey(Requisition, on_delete=models.CASCADE, related_name="lines")
+    medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE, related_name="requisition_lines")
+    stock_on_hand = models.DecimalField(max_digits=12, decimal_places=2)
+    monthly_demand = models.DecimalField(max_digits=12, decimal_places=2)
+    safety_stock = models.DecimalField(max_digits=12, decimal_places=2)
+    min_level = models.DecimalField(max_digits=12, decimal_places=2)
+    max_level = models.DecimalField(max_digits=12, decimal_places=2)
+    quantity = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(0)])
+
+    class Meta:
+        unique_together = ("requisition", "medicine")
+        ordering = ["requisition", "medicine"]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.quantity} x {self.medicine}"
+
+
 class Alert(TimeStampedModel):
     """Alerts generated from stock thresholds or forecasts."""
 
@@ -182,6 +355,10 @@ class Alert(TimeStampedModel):
 
     class Meta:
         ordering = ["-triggered_at"]
+        indexes = [
+            # The event stream's polling fallback reads alerts changed since a watermark.
+            models.Index(fields=["updated_at"], name="inventory_alert_updated_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - trivial representation
         return f"{self.alert_type} - {self.medicine} at {self.facility}"
@@ -200,8 +377,19 @@ class IntegrationConfig(TimeStampedModel):
     base_url = models.URLField()
     auth_type = models.CharField(max_length=16, choices=AuthType.choices, default=AuthType.NONE)
     credentials = models.JSONField(default=dict, blank=True)
+    adapter = models.CharField(
+        max_length=32,
+        blank=True,
+        help_text="Sync adapter key (e.g. 'dhis2', 'openlmis'); inferred from the system name when blank.",
+    )
+    options = models.JSONField(default=dict, blank=True, help_text="Adapter options such as endpoint and page_size.")
     is_active = models.BooleanField(default=True)
     last_sync_at = models.DateTimeField(null=True, blank=True)
+    sync_state = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Checkpoint of an in-progress sync, used to resume after interruption.",
+    )
 
     class Meta:
         verbose_name = "Integration Configuration"
@@ -0,0 +1,262 @@
+"""Monthly range partitioning of the ledger tables on PostgreSQL."""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+# Table -> partition key column. Both tables are append-mostly and queried by time.
+PARTITIONED_TABLES = {
+    "inventory_inventorytransaction": "occurred_at",
+    "inventory_stocksnapshot": "recorded_at",
+}
+PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+@dataclass(frozen=True)
+class Partition:
+    table: str
+    name: str
+    start: date
+    end: date
+
+
+def partitioning_enabled(using: str = DEFAULT_DB_ALIAS) -> bool:
+    return settings.INVENTORY_PARTITIONING and connections[using].vendor == "postgresql"
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(first: date, last: date) -> List[date]:
+    """Return the first day of every month from ``first`` to ``last`` inclusive."""
+
+    months = []
+    current = month_start(first)
+    while current <= last:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def _quote(using: str, name: str) -> str:
+    return connections[using].ops.quote_name(name)
+
+
+def _bounds(month: date) -> Tuple[str, str]:
+    return f"{month:%Y-%m-%d} 00:00:00+00", f"{add_months(month, 1):%Y-%m-%d} 00:00:00+00"
+
+
+def is_partitioned(table: str, using: str = DEFAULT_DB_ALIAS) -> bool:
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table: str, using: str = DEFAULT_DB_ALIAS) -> List[Partition]:
+    """Return the monthly partitions attached to ``table``, oldest first (the default partition is excluded)."""
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = %s AND pg_table_is_visible(parent.oid)",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        match = PARTITION_SUFFIX.search(name)
+        if match:
+            start = date(int(match.group(1)), int(match.group(2)), 1)
+            partitions.append(Partition(table, name, start, add_months(start, 1)))
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+def create_partition(table: str, month: date, using: str = DEFAULT_DB_ALIAS) -> bool:
+    """
+    Create the partition holding ``month`` unless it exists; returns True when created.
+
+    Rows that already landed in the default partition for that month are moved
+    into the new partition, since Postgres refuses to create a partition whose
+    range overlaps rows in the default one.
+    """
+
+    column = PARTITIONED_TABLES[table]
+    name = partition_name(table, month)
+    lower, upper = _bounds(month)
+    quoted_table, quoted_name = _quote(using, table), _quote(using, name)
+    quoted_default, quoted_column = _quote(using, f"{table}_default"), _quote(using, column)
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [name])
+        if cursor.fetchone()[0] is not None:
+            return False
+        cursor.execute(
+            f"SELECT EXISTS (SELECT 1 FROM {quoted_default} WHERE {quoted_column} >= %s AND {quoted_column} < %s)",
+            [lower, upper],
+        )
+        stray = cursor.fetchone()[0]
+        if stray:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE stray_rows ON COMMIT DROP AS SELECT * FROM {quoted_default} "
+                f"WHERE {quoted_column} >= %s AND {quoted_column} < %s",
+                [lower, upper],
+            )
+            cursor.execute(
+                f"DELETE FROM {quoted_default} WHERE {quoted_column} >= %s AND {quoted_column} < %s",
+                [lower, upper],
+            )
+        cursor.execute(
+            f"CREATE TABLE {quoted_name} PARTITION OF {quoted_table} FOR VALUES FROM (%s) TO (%s)",
+            [lower, upper],
+        )
+        if stray:
+            cursor.execute(f"INSERT INTO {quoted_table} SELECT * FROM stray_rows")
+            cursor.execute("DROP TABLE stray_rows")
+    return True
+
+
+def ensure_partitions(
+    table: str,
+    months_ahead: Optional[int] = None,
+    today: Optional[date] = None,
+    using: str = DEFAULT_DB_ALIAS,
+) -> List[str]:
+    """Create partitions from the current month through ``months_ahead`` months ahead."""
+
+    if months_ahead is None:
+        months_ahead = settings.INVENTORY_PARTITION_MONTHS_AHEAD
+    current = month_start(today or date.today())
+    created = []
+    for month in month_range(current, add_months(current, months_ahead)):
+        if create_partition(table, month, using=using):
+            created.append(partition_name(table, month))
+    return created
+
+
+def detach_partitions(
+    table: str,
+    before: date,
+    archive_schema: Optional[str] = None,
+    drop: bool = False,
+    using: str = DEFAULT_DB_ALIAS,
+) -> List[Partition]:
+    """
+    Detach every partition whose range ends on or before ``before``.
+
+    Detached partitions become ordinary tables; they are moved into
+    ``archive_schema`` or dropped when requested, otherwise left in place.
+    """
+
+    detached = []
+    quoted_table = _quote(using, table)
+    for partition in list_partitions(table, using=using):
+        if partition.end > before:
+            continue
+        quoted_name = _quote(using, partition.name)
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {quoted_table} DETACH PARTITION {quoted_name}")
+            if drop:
+                cursor.execute(f"DROP TABLE {quoted_name}")
+            elif archive_schema:
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {_quote(using, archive_schema)}")
+                cursor.execute(f"ALTER TABLE {quoted_name} SET SCHEMA {_quote(using, archive_schema)}")
+        detached.append(partition)
+    return detached
+
+
+def _widen_to_partition_key(definition: str, column: str) -> str:
+    """Append the partition key to a PRIMARY KEY/UNIQUE definition, as Postgres requires."""
+
+    columns = definition[definition.index("(") + 1 : definition.rindex(")")]
+    if column in [name.strip().strip('"') for name in columns.split(",")]:
+        return definition
+    head, tail = definition[: definition.rindex(")")], definition[definition.rindex(")") :]
+    return f"{head}, {column}{tail}"
+
+
+def convert_to_partitioned(
+    table: str,
+    months_ahead: Optional[int] = None,
+    today: Optional[date] = None,
+    using: str = DEFAULT_DB_ALIAS,
+) -> bool:
+    """
+    Rebuild ``table`` as a table partitioned by month on its time column.
+
+    Existing rows are copied into monthly partitions covering their range, and
+    constraints and indexes are recreated on the parent so every partition
+    inherits them. Primary key and unique constraints gain the partition key,
+    which Postgres requires on partitioned tables. Returns False when the table
+    is already partitioned.
+    """
+
+    if is_partitioned(table, using=using):
+        return False
+    column = PARTITIONED_TABLES[table]
+    legacy = f"{table}_unpartitioned"
+    quoted_table, quoted_legacy = _quote(using, table), _quote(using, legacy)
+    quoted_column = _quote(using, column)
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('p', 'u', 'f') ORDER BY contype DESC",
+            [table],
+        )
+        constraints: Sequence[Tuple[str, str, str]] = cursor.fetchall()
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN "
+            "(SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)",
+            [table, table],
+        )
+        indexes: Sequence[Tuple[str, str]] = cursor.fetchall()
+        cursor.execute(f"SELECT min({quoted_column}) FROM {quoted_table}")
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(f"ALTER TABLE {quoted_table} RENAME TO {quoted_legacy}")
+        cursor.execute(
+            f"CREATE TABLE {quoted_table} (LIKE {quoted_legacy} INCLUDING DEFAULTS INCLUDING IDENTITY "
+            f"INCLUDING CONSTRAINTS) PARTITION BY RANGE ({quoted_column})"
+        )
+        cursor.execute(f"CREATE TABLE {_quote(using, f'{table}_default')} PARTITION OF {quoted_table} DEFAULT")
+        current = month_start(today or date.today())
+        first = month_start(oldest.date()) if oldest is not None else current
+        if months_ahead is None:
+            months_ahead = settings.INVENTORY_PARTITION_MONTHS_AHEAD
+        for month in month_range(first, add_months(current, months_ahead)):
+            create_partition(table, month, using=using)
+
+        cursor.execute(f"INSERT INTO {quoted_table} SELECT * FROM {quoted_legacy}")
+        cursor.execute(
+            "SELECT setval(pg_get_serial_sequence(%s, 'id'), coalesce(max(id), 0) + 1, false) FROM " + quoted_table,
+            [table],
+        )
+        cursor.execute(f"DROP TABLE {quoted_legacy}")
+
+        for name, kind, definition in constraints:
+            if kind in ("p", "u"):
+                definition = _widen_to_partition_key(definition, column)
+            cursor.execute(f"ALTER TABLE {quoted_table} ADD CONSTRAINT {_quote(using, name)} {definition}")
+        # Definitions were captured before the rename, so they already target the new parent.
+        for _, definition in indexes:
+            cursor.execute(definition)
+    return True
@@ -0,0 +1,218 @@
+"""Min/max replenishment planning and draft requisition generation."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from statistics import NormalDist
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, QuerySet, Subquery
+from django.utils import timezone
+
+from .consumption import DAYS_PER_MONTH
+from .models import ConsumptionStat, Forecast, Medicine, Requisition, RequisitionLine
+
+BATCH_SIZE = 1000
+# Forecast bounds are read as a 95% prediction interval.
+INTERVAL_Z = NormalDist().inv_cdf(0.975)
+NO_SUPPLIER = -1
+
+
+@dataclass
+class ReplenishmentPlan:
+    """Levels and order quantities of ``len(facility_ids)`` pairs, one array entry per pair."""
+
+    facility_ids: np.ndarray
+    medicine_ids: np.ndarray
+    supplier_ids: np.ndarray
+    stock_on_hand: np.ndarray
+    monthly_demand: np.ndarray
+    monthly_sigma: np.ndarray
+    lead_time_days: np.ndarray
+    safety_stock: np.ndarray
+    min_level: np.ndarray
+    max_level: np.ndarray
+    order_quantity: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.facility_ids)
+
+    @property
+    def to_order(self) -> np.ndarray:
+        return np.flatnonzero(self.order_quantity > 0)
+
+
+def compute_levels(
+    stock: np.ndarray,
+    monthly_demand: np.ndarray,
+    monthly_sigma: np.ndarray,
+    lead_time_days: np.ndarray,
+    service_level: float,
+    review_months: float,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorised min/max levels for every pair.
+
+    Safety stock covers demand variability over the lead time at ``service_level``;
+    the min level (reorder point) is lead-time demand plus safety stock and the max
+    level adds ``review_months`` of demand. Pairs at or below their min are ordered
+    up to the max, in whole units.
+    """
+
+    lead_months = np.asarray(lead_time_days, dtype=np.float64) / DAYS_PER_MONTH
+    safety = NormalDist().inv_cdf(service_level) * monthly_sigma * np.sqrt(lead_months)
+    minimum = monthly_demand * lead_months + safety
+    maximum = minimum + monthly_demand * review_months
+    order = np.where((stock <= minimum) & (maximum > stock), np.ceil(maximum - stock), 0.0)
+    return {
+        "safety_stock": np.round(safety, 2),
+        "min_level": np.round(minimum, 2),
+        "max_level": np.round(maximum, 2),
+        "order_quantity": order,
+    }
+
+
+def plan_replenishment(facilities: Optional[QuerySet] = None, today: Optional[date] = None) -> ReplenishmentPlan:
+    """
+    Compute levels and order quantities for every facility × medicine pair in ``facilities``.
+
+    Demand is the latest forecast converted to a monthly rate, falling back to AMC
+    for pairs without one; its spread comes from the forecast's interval bounds.
+    Stock on hand is the latest snapshot kept on :class:`ConsumptionStat` (pairs
+    without one count as stocked out). Lead time is the medicine's, else its
+    supplier's, else ``PLANNING_LEAD_TIME_DAYS``. Data is loaded in three queries and
+    the arithmetic runs over NumPy arrays, so a national plan takes seconds.
+    """
+
+    today = today or timezone.localdate()
+    stats = ConsumptionStat.objects.all()
+    latest = Forecast.objects.filter(facility=OuterRef("facility"), medicine=OuterRef("medicine")).order_by(
+        "-forecast_date", "-period_start"
+    )
+    forecasts = Forecast.objects.filter(pk=Subquery(latest.values("pk")[:1]), period_end__gte=today)
+    if facilities is not None:
+        stats = stats.filter(facility__in=facilities)
+        forecasts = forecasts.filter(facility__in=facilities)
+
+    stat_rows = list(stats.values_list("facility_id", "medicine_id", "amc", "stock_on_hand"))
+    forecast_rows = list(
+        forecasts.values_list(
+            "facility_id",
+            "medicine_id",
+            "predicted_demand",
+            "confidence_interval_lower",
+            "confidence_interval_upper",
+            "period_start",
+            "period_end",
+        )
+    )
+    pairs = sorted({row[:2] for row in stat_rows} | {row[:2] for row in forecast_rows})
+    index = {pair: position for position, pair in enumerate(pairs)}
+    size = len(pairs)
+
+    amc = np.zeros(size)
+    stock = np.zeros(size)
+    for facility_id, medicine_id, pair_amc, stock_on_hand in stat_rows:
+        position = index[(facility_id, medicine_id)]
+        amc[position] = float(pair_amc)
+        stock[position] = float(stock_on_hand or 0)
+
+    demand = amc.copy()
+    sigma = np.zeros(size)
+    if forecast_rows:
+        positions = np.array([index[row[:2]] for row in forecast_rows])
+        predicted = np.array([float(row[2]) for row in forecast_rows])
+        lower = np.array([np.nan if row[3] is None else float(row[3]) for row in forecast_rows])
+        upper = np.array([np.nan if row[4] is None else float(row[4]) for row in forecast_rows])
+        period_days = np.array([(row[6] - row[5]).days + 1 for row in forecast_rows], dtype=np.float64)
+        months = np.maximum(period_days, 1) / DAYS_PER_MONTH
+        demand[positions] = predicted / months
+        sigma[positions] = np.nan_to_num((upper - lower) / (2 * INTERVAL_Z) / np.sqrt(months))
+    demand = np.maximum(demand, 0)
+    sigma = np.maximum(sigma, 0)
+
+    medicine_ids = np.array([medicine_id for _, medicine_id in pairs], dtype=np.int64)
+    suppliers, lead_times = _medicine_supply(set(medicine_ids.tolist()))
+    lead_time_days = np.array([lead_times[medicine_id] for medicine_id in medicine_ids.tolist()], dtype=np.float64)
+    levels = compute_levels(
+        stock, demand, sigma, lead_time_days, settings.PLANNING_SERVICE_LEVEL, settings.PLANNING_REVIEW_MONTHS
+    )
+    return ReplenishmentPlan(
+        facility_ids=np.array([facility_id for facility_id, _ in pairs], dtype=np.int64),
+        medicine_ids=medicine_ids,
+        supplier_ids=np.array([suppliers[medicine_id] for medicine_id in medicine_ids.tolist()], dtype=np.int64),
+        stock_on_hand=stock,
+        monthly_demand=np.round(demand, 2),
+        monthly_sigma=np.round(sigma, 2),
+        lead_time_days=lead_time_days,
+        **levels,
+    )
+
+
+def _medicine_supply(medicine_ids: Set[int]) -> Tuple[Dict[int, int], Dict[int, int]]:
+    suppliers: Dict[int, int] = {}
+    lead_times: Dict[int, int] = {}
+    rows = Medicine.objects.filter(pk__in=medicine_ids).values_list(
+        "pk", "supplier_id", "lead_time_days", "supplier__lead_time_days"
+    )
+    for medicine_id, supplier_id, lead_time, supplier_lead_time in rows:
+        suppliers[medicine_id] = NO_SUPPLIER if supplier_id is None else supplier_id
+        lead_times[medicine_id] = lead_time or supplier_lead_time or settings.PLANNING_LEAD_TIME_DAYS
+    return suppliers, lead_times
+
+
+def create_requisitions(plan: ReplenishmentPlan, user=None) -> List[Requisition]:
+    """
+    Replace the planner's draft requisitions of the planned facilities with one per facility and supplier.
+
+    Submitted and approved requisitions are left untouched, as are drafts made or
+    edited by hand, so rerunning the planner only refreshes its own drafts that
+    nobody has acted on yet.
+    """
+
+    ordered = plan.to_order
+    ordered = ordered[np.lexsort((plan.medicine_ids[ordered], plan.supplier_ids[ordered], plan.facility_ids[ordered]))]
+    groups = sorted({(int(plan.facility_ids[i]), int(plan.supplier_ids[i])) for i in ordered})
+
+    with transaction.atomic():
+        Requisition.objects.filter(
+            facility_id__in=set(plan.facility_ids.tolist()), status=Requisition.Status.DRAFT, generated=True
+        ).delete()
+        requisitions = Requisition.objects.bulk_create(
+            [
+                Requisition(
+                    facility_id=facility_id,
+                    supplier_id=None if supplier_id == NO_SUPPLIER else supplier_id,
+                    created_by=user,
+                    generated=True,
+                )
+                for facility_id, supplier_id in groups
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        by_group = dict(zip(groups, requisitions))
+        RequisitionLine.objects.bulk_create(
+            [
+                RequisitionLine(
+                    requisition=by_group[(int(plan.facility_ids[i]), int(plan.supplier_ids[i]))],
+                    medicine_id=int(plan.medicine_ids[i]),
+                    stock_on_hand=_decimal(plan.stock_on_hand[i]),
+                    monthly_demand=_decimal(plan.monthly_demand[i]),
+                    safety_stock=_decimal(plan.safety_stock[i]),
+                    min_level=_decimal(plan.min_level[i]),
+                    max_level=_decimal(plan.max_level[i]),
+                    quantity=_decimal(plan.order_quantity[i]),
+                )
+                for i in ordered.tolist()
+            ],
+            batch_size=BATCH_SIZE,
+        )
+    return requisitions
+
+
+def _decimal(value: float) -> Decimal:
+    return Decimal(f"{value:.2f}")
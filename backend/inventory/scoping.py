@@ -0,0 +1,73 @@
+"""Restrict inventory querysets to the facilities a user is allowed to see."""
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.db.models import QuerySet, Subquery
+from rest_framework.exceptions import PermissionDenied
+
+from accounts.models import User
+
+from .models import Facility
+
+FACILITY_ROLES = (User.Roles.PHARMACIST, User.Roles.FACILITY_ADMIN)
+
+
+def is_unrestricted(user) -> bool:
+    return user.is_superuser or user.role == User.Roles.SUPER_ADMIN
+
+
+def scope_queryset(queryset: QuerySet, user, facility_field: str = "facility") -> QuerySet:
+    """
+    Filter ``queryset`` to the caller's facilities in SQL.
+
+    Pharmacists and facility admins see their own facility, policy makers every
+    facility in their facility's state, and super admins everything. Users without
+    a facility (other than super admins) see nothing. ``facility_field`` names the
+    foreign key to :class:`Facility`; pass ``""`` to scope facilities themselves.
+    """
+
+    if is_unrestricted(user):
+        return queryset
+    if user.facility_id is None:
+        return queryset.none()
+    key = f"{facility_field}_id" if facility_field else "pk"
+    if user.role in FACILITY_ROLES:
+        return queryset.filter(**{key: user.facility_id})
+    if user.role == User.Roles.POLICY_MAKER:
+        state = Facility.objects.filter(pk=user.facility_id).values("state")
+        if not facility_field:
+            return queryset.filter(state=Subquery(state))
+        facility_ids = Facility.objects.filter(state=Subquery(state)).values("pk")
+        return queryset.filter(**{f"{key}__in": facility_ids})
+    return queryset.none()
+
+
+def check_facilities_in_scope(user, facilities: Iterable[Facility]) -> None:
+    """Raise ``PermissionDenied`` when a write targets a facility outside the caller's scope."""
+
+    facility_ids = {facility.pk for facility in facilities if facility is not None}
+    if not facility_ids or is_unrestricted(user):
+        return
+    visible = set(scope_queryset(Facility.objects.filter(pk__in=facility_ids), user, "").values_list("pk", flat=True))
+    if facility_ids - visible:
+        raise PermissionDenied("You cannot write records for facilities outside your scope.")
+
+
+class FacilityScopedMixin:
+    """ViewSet mixin applying :func:`scope_queryset` to reads and the facility of writes."""
+
+    facility_field = "facility"
+
+    def get_queryset(self):
+        return scope_queryset(super().get_queryset(), self.request.user, self.facility_field)
+
+    def perform_create(self, serializer):
+        if self.facility_field:
+            check_facilities_in_scope(self.request.user, [serializer.validated_data.get(self.facility_field)])
+        super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        if self.facility_field:
+            check_facilities_in_scope(self.request.user, [serializer.validated_data.get(self.facility_field)])
+        super().perform_update(serializer)
@@ -3,7 +3,20 @@ from __future__ import annotations
 
 from rest_framework import serializers
 
-from .models import Alert, Facility, Forecast, IntegrationConfig, InventoryTransaction, Medicine, StockSnapshot
+from .alerts import TRANSITIONS
+from .models import (
+    Alert,
+    ConsumptionStat,
+    Facility,
+    Forecast,
+    IntegrationConfig,
+    InventoryTransaction,
+    Medicine,
+    Requisition,
+    RequisitionLine,
+    StockSnapshot,
+    Supplier,
+)
 
 
 class FacilitySerializer(serializers.ModelSerializer):
@@ -12,6 +25,12 @@ class FacilitySerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class SupplierSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Supplier
+        fields = "__all__"
+
+
 class MedicineSerializer(serializers.ModelSerializer):
     class Meta:
         model = Medicine
@@ -24,10 +43,54 @@ class InventoryTransactionSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class InventoryTransactionBulkListSerializer(serializers.ListSerializer):
+    """A bulk sync batch of at most ``max_length`` rows, whose facilities and medicines are looked up together."""
+
+    max_batch_size = 10000
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("max_length", self.max_batch_size)
+        super().__init__(*args, **kwargs)
+
+    def validate(self, attrs):
+        errors = {}
+        for field, model in (("facility", Facility), ("medicine", Medicine)):
+            found = model.objects.in_bulk({row[field] for row in attrs})
+            missing = sorted({row[field] for row in attrs} - found.keys())
+            if missing:
+                errors[field] = [f"Unknown ids: {', '.join(map(str, missing))}."]
+            for row in attrs:
+                row[field] = found.get(row[field])
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
+class InventoryTransactionBulkSerializer(serializers.ModelSerializer):
+    """Row serializer for bulk sync; the external key is enforced by the upsert, not per row."""
+
+    # Plain ids, resolved for the whole batch by the list serializer instead of one query per row.
+    facility = serializers.IntegerField(min_value=1)
+    medicine = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = InventoryTransaction
+        exclude = ["created_by"]
+        list_serializer_class = InventoryTransactionBulkListSerializer
+        validators: list = []
+
+
 class StockSnapshotSerializer(serializers.ModelSerializer):
     class Meta:
         model = StockSnapshot
         fields = "__all__"
+        read_only_fields = ["days_of_stock"]
+
+
+class ConsumptionStatSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ConsumptionStat
+        fields = "__all__"
 
 
 class ForecastSerializer(serializers.ModelSerializer):
@@ -36,13 +99,69 @@ class ForecastSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class ForecastPredictSerializer(serializers.Serializer):
+    """Series and horizon of an on-demand forecast; omitted facilities and medicines mean all in scope."""
+
+    facility = serializers.PrimaryKeyRelatedField(queryset=Facility.objects.all(), many=True, required=False)
+    medicine = serializers.PrimaryKeyRelatedField(queryset=Medicine.objects.all(), many=True, required=False)
+    horizon = serializers.IntegerField(min_value=1, max_value=24, default=1)
+    model_version = serializers.CharField(required=False)
+    limit = serializers.IntegerField(min_value=1, required=False)
+    offset = serializers.IntegerField(min_value=0, default=0)
+
+
+class RequisitionLineSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RequisitionLine
+        exclude = ["requisition"]
+
+
+class RequisitionSerializer(serializers.ModelSerializer):
+    lines = RequisitionLineSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Requisition
+        fields = "__all__"
+        read_only_fields = ["created_by", "generated"]
+
+
+class RequisitionPlanSerializer(serializers.Serializer):
+    """Optional filters narrowing a planner run to some of the caller's facilities."""
+
+    facility = serializers.PrimaryKeyRelatedField(queryset=Facility.objects.all(), many=True, required=False)
+    state = serializers.CharField(required=False)
+
+
 class AlertSerializer(serializers.ModelSerializer):
     class Meta:
         model = Alert
         fields = "__all__"
 
 
+class AlertTransitionSerializer(serializers.Serializer):
+    """
+    A bulk acknowledge/resolve request: alert ids and/or filters, combined with AND.
+
+    Alert ids are not looked up one by one; ids outside the caller's scope simply match nothing.
+    """
+
+    action = serializers.ChoiceField(choices=list(TRANSITIONS))
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), max_length=10000, required=False)
+    facility = serializers.PrimaryKeyRelatedField(queryset=Facility.objects.all(), many=True, required=False)
+    medicine = serializers.PrimaryKeyRelatedField(queryset=Medicine.objects.all(), many=True, required=False)
+    alert_type = serializers.MultipleChoiceField(choices=Alert.AlertType.choices, required=False)
+    triggered_after = serializers.DateTimeField(required=False)
+    triggered_before = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        selectors = ("ids", "facility", "medicine", "alert_type", "triggered_after", "triggered_before")
+        if not any(attrs.get(field) for field in selectors):
+            raise serializers.ValidationError("Select alerts by ids or at least one filter.")
+        return attrs
+
+
 class IntegrationConfigSerializer(serializers.ModelSerializer):
     class Meta:
         model = IntegrationConfig
         fields = "__all__"
+        read_only_fields = ["sync_state"]
@@ -0,0 +1,52 @@
+"""Background jobs for the inventory app."""
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from jobs.registry import register_job
+
+from .consumption import compute_consumption
+from .integrations import SyncEngine, SyncError
+from .models import IntegrationConfig
+from .partitioning import PARTITIONED_TABLES, ensure_partitions, is_partitioned, partitioning_enabled
+
+
+@register_job("inventory.sync_integrations")
+def sync_integrations(systems: Optional[List[str]] = None, workers: int = 4) -> Dict[str, object]:
+    """
+    Sync active integrations; raises if any failed so the job is retried.
+
+    A retry resumes each failed integration from its checkpoint.
+    """
+
+    configs = IntegrationConfig.objects.filter(is_active=True)
+    if systems:
+        configs = configs.filter(system_name__in=systems)
+    results: Dict[str, object] = {}
+    failures = []
+    for config in configs:
+        try:
+            results[config.system_name] = SyncEngine(config, workers=workers).run().as_dict()
+        except (SyncError, ValueError) as exc:
+            failures.append(f"{config.system_name}: {exc}")
+    if failures:
+        raise SyncError("; ".join(failures))
+    return results
+
+
+@register_job("inventory.compute_consumption")
+def rebuild_consumption(months: Optional[int] = None) -> Dict[str, int]:
+    return compute_consumption(months=months)
+
+
+@register_job("inventory.ensure_partitions")
+def ensure_ledger_partitions(months_ahead: Optional[int] = None) -> Dict[str, List[str]]:
+    """Create the upcoming monthly ledger partitions; does nothing unless partitioning is enabled."""
+
+    if not partitioning_enabled():
+        return {}
+    return {
+        table: ensure_partitions(table, months_ahead=months_ahead)
+        for table in PARTITIONED_TABLES
+        if is_partitioned(table)
+    }
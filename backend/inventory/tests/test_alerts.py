@@ -0,0 +1,93 @@
+"""Tests for bulk alert transitions."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from inventory.models import Alert, Facility, Medicine
+from notifications.changes import poll_changes
+
+TRIGGERED_AT = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+class AlertTransitionTests(TestCase):
+    def setUp(self) -> None:
+        self.lagos, self.kano = (
+            Facility.objects.create(name=code, code=code, facility_type="clinic", ownership="public", state=state)
+            for code, state in (("LAG", "Lagos"), ("KAN", "Kano"))
+        )
+        self.medicine = Medicine.objects.create(name="ORS", generic_name="ORS")
+        self.alerts = Alert.objects.bulk_create(
+            Alert(
+                facility=facility,
+                medicine=self.medicine,
+                alert_type=alert_type,
+                status=alert_status,
+                message="Stock alert",
+                triggered_at=TRIGGERED_AT + timedelta(days=day),
+            )
+            for day, (facility, alert_type, alert_status) in enumerate(
+                [
+                    (self.lagos, Alert.AlertType.LOW_STOCK, Alert.Status.OPEN),
+                    (self.lagos, Alert.AlertType.STOCK_OUT, Alert.Status.OPEN),
+                    (self.lagos, Alert.AlertType.LOW_STOCK, Alert.Status.ACKNOWLEDGED),
+                    (self.lagos, Alert.AlertType.LOW_STOCK, Alert.Status.RESOLVED),
+                    (self.kano, Alert.AlertType.LOW_STOCK, Alert.Status.OPEN),
+                ]
+            )
+        )
+        self.user = User.objects.create_user(username="admin", role=User.Roles.FACILITY_ADMIN, facility=self.lagos)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("alert-transition")
+
+    def _statuses(self) -> list:
+        return list(Alert.objects.order_by("triggered_at").values_list("status", flat=True))
+
+    def test_resolve_by_ids_is_one_update_within_scope(self) -> None:
+        since = Alert.objects.latest("updated_at").updated_at
+        ids = [alert.pk for alert in self.alerts]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"action": "resolve", "ids": ids}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {"action": "resolve", "updated": 3, "skipped": 2})
+        self.assertEqual([query["sql"].split()[0] for query in queries.captured_queries], ["UPDATE"])
+        self.assertEqual(self._statuses(), ["resolved", "resolved", "resolved", "resolved", "open"])
+        resolved = Alert.objects.get(pk=ids[0])
+        self.assertEqual(resolved.resolved_by, self.user)
+        self.assertIsNotNone(resolved.resolved_at)
+        # The stream's polling fallback sees the transitioned rows.
+        events, _ = poll_changes(since)
+        self.assertEqual(sorted(event["id"] for event in events), ids[:3])
+
+    def test_acknowledge_by_filter(self) -> None:
+        response = self.client.post(
+            self.url,
+            {
+                "action": "acknowledge",
+                "alert_type": ["low_stock"],
+                "triggered_before": (TRIGGERED_AT + timedelta(days=4)).isoformat(),
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.data, {"action": "acknowledge", "updated": 1})
+        self.assertEqual(self._statuses(), ["acknowledged", "open", "acknowledged", "resolved", "open"])
+        self.assertIsNone(Alert.objects.get(pk=self.alerts[0].pk).resolved_by)
+
+    def test_selection_is_required_and_scoped(self) -> None:
+        self.assertEqual(self.client.post(self.url, {"action": "resolve"}, format="json").status_code, 400)
+        self.assertEqual(
+            self.client.post(self.url, {"action": "close", "ids": [1]}, format="json").status_code, 400
+        )
+        response = self.client.post(self.url, {"action": "resolve", "facility": [self.kano.pk]}, format="json")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self._statuses()[-1], "open")
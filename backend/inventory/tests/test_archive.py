@@ -0,0 +1,138 @@
+"""Tests for cold-history archival and the archived/live ledger reader."""
+from __future__ import annotations
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone as django_timezone
+
+from inventory.archive import ARCHIVE_TABLES, LedgerArchive, read_ledger, to_columns
+from inventory.models import Facility, InventoryTransaction, Medicine, StockSnapshot
+
+
+class LedgerArchiveTests(TestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.archive = LedgerArchive(self.tmpdir.name)
+        self.lagos = Facility.objects.create(
+            name="Lagos", code="LAG", facility_type="hospital", ownership="public", state="Lagos"
+        )
+        self.kano = Facility.objects.create(
+            name="Kano", code="KAN", facility_type="clinic", ownership="public", state="Kano"
+        )
+        self.medicine = Medicine.objects.create(name="Amoxicillin", generic_name="Amoxicillin")
+        transactions = []
+        for month in (1, 2, 3):
+            for facility in (self.lagos, self.kano):
+                for day in (5, 20):
+                    transactions.append(
+                        InventoryTransaction(
+                            facility=facility,
+                            medicine=self.medicine,
+                            transaction_type="issue",
+                            quantity=Decimal(f"{month * 10 + day}.25"),
+                            occurred_at=datetime(2024, month, day, 9, tzinfo=timezone.utc),
+                            external_id=f"{facility.code}-{month}-{day}" if day == 5 else None,
+                        )
+                    )
+        InventoryTransaction.objects.bulk_create(transactions)
+        StockSnapshot.objects.create(
+            facility=self.lagos,
+            medicine=self.medicine,
+            stock_on_hand=Decimal("40.50"),
+            recorded_at=datetime(2024, 1, 31, tzinfo=timezone.utc),
+        )
+
+    def test_archive_moves_old_rows_into_month_and_state_segments(self) -> None:
+        call_command("archive_ledger", before="2024-03-01", archive_dir=self.tmpdir.name, stdout=StringIO())
+
+        self.assertEqual(InventoryTransaction.objects.count(), 4)
+        self.assertEqual(StockSnapshot.objects.count(), 0)
+        root = Path(self.tmpdir.name)
+        self.assertEqual(
+            sorted(str(path.parent.relative_to(root)) for path in root.glob("*/month=*/state=*/part-*.npz")),
+            [
+                "snapshots/month=2024-01/state=lagos",
+                "transactions/month=2024-01/state=kano",
+                "transactions/month=2024-01/state=lagos",
+                "transactions/month=2024-02/state=kano",
+                "transactions/month=2024-02/state=lagos",
+            ],
+        )
+
+    def test_reader_unions_archived_and_live_rows(self) -> None:
+        before = read_ledger("transactions", columns=["quantity", "facility_id"], archive=self.archive)
+        self.archive.archive("transactions", date(2024, 3, 1))
+
+        after = read_ledger("transactions", columns=["quantity", "facility_id"], archive=self.archive)
+        for name in ("id", "occurred_at", "quantity", "facility_id"):
+            np.testing.assert_array_equal(after[name], before[name])
+        self.assertEqual(len(after["id"]), 12)
+
+        lagos_february = read_ledger(
+            "transactions",
+            start=datetime(2024, 2, 1, tzinfo=timezone.utc),
+            end=datetime(2024, 3, 10, tzinfo=timezone.utc),
+            states=["Lagos"],
+            columns=["quantity"],
+            archive=self.archive,
+        )
+        self.assertEqual(lagos_february["quantity"].round(2).tolist(), [25.25, 40.25, 35.25])
+
+    def test_archived_segments_are_memory_mapped(self) -> None:
+        self.archive.archive("transactions", date(2024, 2, 1))
+        segment = self.archive.segments("transactions", states=["Kano"])[0]
+
+        columns = self.archive.read_segment(segment, ["id", "quantity", "external_id"])
+
+        self.assertIsInstance(columns["quantity"], np.memmap)
+        self.assertEqual(columns["external_id"].tolist(), ["KAN-1-5", ""])
+
+    def test_concurrent_first_reads_share_one_complete_cache(self) -> None:
+        self.archive.archive("transactions", date(2024, 2, 1))
+        segment = self.archive.segments("transactions", states=["Lagos"])[0]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            reads = list(pool.map(lambda _: self.archive.read_segment(segment, ["quantity"]), range(16)))
+
+        self.assertTrue(all(read["quantity"].tolist() == [15.25, 30.25] for read in reads))
+        cache_root = Path(self.tmpdir.name) / ".cache" / "transactions" / "month=2024-01"
+        self.assertEqual([entry.name for entry in cache_root.iterdir()], ["state=lagos"])
+
+        # A segment rewritten after unpacking is unpacked again.
+        stale = os.stat(segment).st_mtime + 10
+        os.utime(segment, (stale, stale))
+        self.assertEqual(self.archive.read_segment(segment, ["quantity"])["quantity"].tolist(), [15.25, 30.25])
+        self.assertEqual(len(list(cache_root.iterdir())), 1)
+
+    def test_transactions_in_the_amc_window_stay_live(self) -> None:
+        with self.assertRaises(CommandError):
+            call_command(
+                "archive_ledger",
+                before=django_timezone.localdate().isoformat(),
+                table=["transactions"],
+                archive_dir=self.tmpdir.name,
+                stdout=StringIO(),
+            )
+        self.assertEqual(InventoryTransaction.objects.count(), 12)
+
+    def test_interrupted_run_does_not_duplicate_rows(self) -> None:
+        table = ARCHIVE_TABLES["transactions"]
+        rows = InventoryTransaction.objects.filter(facility=self.lagos, occurred_at__month=1).order_by("id")
+        # Segment written but rows not yet deleted, as after a crash.
+        columns = to_columns(table, list(rows.values_list(*table.column_names)), table.column_names)
+        self.archive.write_segment("transactions", date(2024, 1, 1), "Lagos", columns)
+        self.assertEqual(len(read_ledger("transactions", archive=self.archive)["id"]), 12)
+
+        self.archive.archive("transactions", date(2024, 2, 1))
+        self.assertEqual(len(read_ledger("transactions", archive=self.archive)["id"]), 12)
+        self.assertEqual(len(self.archive.segments("transactions", states=["Lagos"])), 1)
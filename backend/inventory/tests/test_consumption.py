@@ -0,0 +1,175 @@
+"""Tests for the AMC and days-of-stock engine."""
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import numpy as np
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from inventory.consumption import MAX_DAYS_OF_STOCK, compute_consumption, compute_days_of_stock
+from inventory.models import (
+    ConsumptionStat,
+    Facility,
+    InventoryTransaction,
+    Medicine,
+    MonthlyConsumption,
+    StockSnapshot,
+)
+
+
+def _at(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time(12)))
+
+
+@override_settings(CONSUMPTION_WINDOW_MONTHS=3)
+class ConsumptionTests(TestCase):
+    def setUp(self) -> None:
+        self.facility = Facility.objects.create(
+            code="F-1", name="Clinic", facility_type="clinic", ownership="public", state="Lagos"
+        )
+        self.medicine = Medicine.objects.create(name="ACT", generic_name="AL")
+        self.today = timezone.localdate()
+        self.first_of_month = self.today.replace(day=1)
+
+    def _months_ago(self, months: int) -> date:
+        year, month = divmod(self.first_of_month.year * 12 + self.first_of_month.month - 1 - months, 12)
+        return date(year, month + 1, 10)
+
+    def _issue(self, quantity: int, day: date) -> InventoryTransaction:
+        return InventoryTransaction.objects.create(
+            facility=self.facility,
+            medicine=self.medicine,
+            transaction_type=InventoryTransaction.TransactionType.ISSUE,
+            quantity=Decimal(quantity),
+            occurred_at=_at(day),
+        )
+
+    def _stat(self) -> ConsumptionStat:
+        return ConsumptionStat.objects.get(facility=self.facility, medicine=self.medicine)
+
+    def test_days_of_stock_is_vectorised_and_capped(self) -> None:
+        days = compute_days_of_stock(np.array([300.0, 10.0, 0.0, 5.0]), np.array([30.4375, 0.0, 0.0, 1e-9]))
+
+        self.assertEqual(days.tolist(), [300, MAX_DAYS_OF_STOCK, 0, MAX_DAYS_OF_STOCK])
+
+    def test_issues_update_amc_incrementally(self) -> None:
+        for months in (1, 2, 3):
+            self._issue(30, self._months_ago(months))
+        # The current, incomplete month is outside the window.
+        self._issue(500, self.first_of_month)
+        self.assertEqual(self._stat().amc, Decimal("30.00"))
+
+        with CaptureQueriesContext(connection) as queries:
+            self._issue(60, self._months_ago(2))
+
+        self.assertEqual(self._stat().amc, Decimal("50.00"))
+        self.assertLessEqual(len(queries), 10)
+        bucket = MonthlyConsumption.objects.get(month=self._months_ago(2).replace(day=1))
+        self.assertEqual(bucket.quantity, Decimal("90.00"))
+
+    def test_receipts_and_deletes_are_reflected(self) -> None:
+        issue = self._issue(90, self._months_ago(1))
+        InventoryTransaction.objects.create(
+            facility=self.facility,
+            medicine=self.medicine,
+            transaction_type=InventoryTransaction.TransactionType.RECEIPT,
+            quantity=Decimal(1000),
+            occurred_at=_at(self._months_ago(1)),
+        )
+        self.assertEqual(self._stat().amc, Decimal("30.00"))
+
+        issue.delete()
+
+        self.assertEqual(self._stat().amc, Decimal("0.00"))
+
+    def test_snapshot_save_computes_days_of_stock(self) -> None:
+        self._issue(91, self._months_ago(1))
+
+        snapshot = StockSnapshot.objects.create(
+            facility=self.facility, medicine=self.medicine, stock_on_hand=Decimal(60), recorded_at=timezone.now()
+        )
+
+        # 91 / 3 months = 30.33 a month, ~1 a day.
+        self.assertEqual(snapshot.days_of_stock, 60)
+        stat = self._stat()
+        self.assertEqual(stat.stock_on_hand, Decimal("60.00"))
+        self.assertEqual(stat.days_of_stock, 60)
+
+    def test_first_snapshot_of_a_new_pair_creates_its_stat(self) -> None:
+        snapshot = StockSnapshot.objects.create(
+            facility=self.facility, medicine=self.medicine, stock_on_hand=Decimal(500), recorded_at=timezone.now()
+        )
+
+        # No consumption yet: the stock will not run out, rather than counting as none.
+        self.assertEqual(snapshot.days_of_stock, MAX_DAYS_OF_STOCK)
+        stat = self._stat()
+        self.assertEqual((stat.amc, stat.stock_on_hand), (Decimal("0.00"), Decimal("500.00")))
+        self.assertEqual(stat.days_of_stock, MAX_DAYS_OF_STOCK)
+
+    def test_first_issue_after_a_snapshot_picks_up_its_stock(self) -> None:
+        recorded_at = timezone.now()
+        StockSnapshot.objects.create(
+            facility=self.facility, medicine=self.medicine, stock_on_hand=Decimal(60), recorded_at=recorded_at
+        )
+        self.assertEqual(self._stat().amc, Decimal("0.00"))
+
+        self._issue(91, self._months_ago(1))
+
+        stat = self._stat()
+        self.assertEqual((stat.stock_on_hand, stat.stock_recorded_at), (Decimal("60.00"), recorded_at))
+        self.assertEqual(stat.days_of_stock, 60)
+
+    def test_full_pass_matches_incremental_results(self) -> None:
+        other = Medicine.objects.create(name="ORS", generic_name="ORS")
+        for months in (1, 2, 3, 4):
+            self._issue(10 * months, self._months_ago(months))
+        InventoryTransaction.objects.create(
+            facility=self.facility,
+            medicine=other,
+            transaction_type=InventoryTransaction.TransactionType.ISSUE,
+            quantity=Decimal(45),
+            occurred_at=_at(self._months_ago(1)),
+        )
+        StockSnapshot.objects.create(
+            facility=self.facility, medicine=self.medicine, stock_on_hand=Decimal(40), recorded_at=timezone.now()
+        )
+        incremental = {(stat.medicine_id, stat.amc, stat.days_of_stock) for stat in ConsumptionStat.objects.all()}
+        ConsumptionStat.objects.all().delete()
+        MonthlyConsumption.objects.all().delete()
+
+        result = compute_consumption(today=self.today)
+
+        self.assertEqual(result["pairs"], 2)
+        self.assertEqual(
+            {(stat.medicine_id, stat.amc, stat.days_of_stock) for stat in ConsumptionStat.objects.all()}, incremental
+        )
+        self.assertEqual(self._stat().amc, Decimal("20.00"))
+
+    def test_endpoint_is_scoped_to_facility(self) -> None:
+        self._issue(30, self._months_ago(1))
+        elsewhere = Facility.objects.create(
+            code="F-2", name="Other", facility_type="clinic", ownership="public", state="Kano"
+        )
+        InventoryTransaction.objects.create(
+            facility=elsewhere,
+            medicine=self.medicine,
+            transaction_type=InventoryTransaction.TransactionType.ISSUE,
+            quantity=Decimal(30),
+            occurred_at=_at(self._months_ago(1)),
+        )
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="pharm", facility=self.facility))
+
+        response = client.get(reverse("consumptionstat-list"))
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data["results"] if isinstance(response.data, dict) else response.data
+        self.assertEqual([row["facility"] for row in results], [self.facility.pk])
+        self.assertEqual(results[0]["amc"], "10.00")
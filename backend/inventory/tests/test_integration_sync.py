@@ -0,0 +1,166 @@
+"""Tests for the integration sync engine against a local paginated stand-in."""
+from __future__ import annotations
+
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from inventory.integrations import SyncEngine, SyncError
+from inventory.models import Facility, IntegrationConfig, InventoryTransaction, Medicine, StockSnapshot
+
+PAGES = 40
+PAGE_SIZE = 250
+FACILITIES = ["F-1", "F-2", "F-3"]
+PRODUCTS = ["P01", "P02"]
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        page = int(query["page"][0])
+        with self.server.lock:
+            self.server.requests.append((url.path, page))
+            if page in self.server.fail_pages:
+                self.server.fail_pages.discard(page)
+                self.send_error(500)
+                return
+
+        if url.path.endswith("stockCardLineItems"):
+            start = page * PAGE_SIZE
+            payload = {
+                "totalPages": PAGES,
+                "content": [
+                    {
+                        "id": f"line-{n}",
+                        "facilityCode": FACILITIES[n % 3] if n % 97 else "UNKNOWN",
+                        "productCode": PRODUCTS[n % 2],
+                        "occurredDate": f"2024-05-{1 + n % 28:02d}T08:00:00Z",
+                        "quantity": (n % 50) + 1,
+                        "reasonType": "DEBIT" if n % 2 else "CREDIT",
+                    }
+                    for n in range(start, start + PAGE_SIZE)
+                ],
+            }
+        else:
+            payload = {
+                "pager": {"page": page, "pageCount": 2},
+                "dataValues": [
+                    {"orgUnit": code, "dataElement": "P01", "value": str(10 * page), "lastUpdated": "2024-05-31"}
+                    for code in FACILITIES
+                ],
+            }
+            if self.server.malformed:
+                # Boolean and text data elements from the same endpoint.
+                payload["dataValues"] += [
+                    {"orgUnit": "F-1", "dataElement": "P01", "value": value, "lastUpdated": "2024-05-31"}
+                    for value in ("true", "Low")
+                ]
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class SyncEngineTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _FeedHandler)
+        cls.server.daemon_threads = True
+        cls.server.lock = threading.Lock()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/api"
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.server.requests = []
+        self.server.fail_pages = set()
+        self.server.malformed = False
+        for code in FACILITIES:
+            Facility.objects.create(code=code, name=code, facility_type="clinic", ownership="public", state="Lagos")
+        Medicine.objects.create(name="ACT", generic_name="AL", atc_code="P01")
+        Medicine.objects.create(name="ORS", generic_name="ORS", atc_code="P02")
+        self.openlmis = IntegrationConfig.objects.create(
+            system_name="OpenLMIS", base_url=self.base_url, options={"page_size": PAGE_SIZE}
+        )
+
+    def test_full_pull_maps_and_writes_all_pages(self) -> None:
+        result = SyncEngine(self.openlmis, workers=4).run()
+
+        total = PAGES * PAGE_SIZE
+        unknown = len([n for n in range(total) if n % 97 == 0])
+        self.assertEqual(result.pages, PAGES)
+        self.assertEqual(result.transactions, total - unknown)
+        self.assertEqual(result.skipped, unknown)
+        self.assertEqual(InventoryTransaction.objects.count(), total - unknown)
+        self.assertEqual(
+            InventoryTransaction.objects.filter(transaction_type=InventoryTransaction.TransactionType.ISSUE).count(),
+            len([n for n in range(total) if n % 2 and n % 97]),
+        )
+        self.openlmis.refresh_from_db()
+        self.assertIsNotNone(self.openlmis.last_sync_at)
+        self.assertEqual(self.openlmis.sync_state, {})
+
+    def test_interrupted_sync_resumes_from_checkpoint(self) -> None:
+        self.server.fail_pages = {17}
+
+        with self.assertRaises(SyncError):
+            SyncEngine(self.openlmis, workers=4).run()
+
+        self.openlmis.refresh_from_db()
+        done = set(self.openlmis.sync_state["done_pages"])
+        self.assertNotIn(17, done)
+        self.assertIsNone(self.openlmis.last_sync_at)
+        self.server.requests = []
+
+        result = SyncEngine(self.openlmis, workers=4).run()
+
+        fetched = {page for _, page in self.server.requests}
+        self.assertTrue(result.resumed)
+        self.assertFalse(fetched & done)
+        self.assertEqual(InventoryTransaction.objects.count(), len([n for n in range(PAGES * PAGE_SIZE) if n % 97]))
+
+    def test_failed_first_page_does_not_stop_other_integrations(self) -> None:
+        IntegrationConfig.objects.create(system_name="DHIS2 Sandbox", base_url=self.base_url)
+        self.server.fail_pages = {0}
+
+        with self.assertRaises(CommandError):
+            call_command("sync_integrations", stdout=io.StringIO(), stderr=io.StringIO())
+
+        self.assertEqual(StockSnapshot.objects.count(), len(FACILITIES))
+        self.openlmis.refresh_from_db()
+        self.assertIsNone(self.openlmis.last_sync_at)
+
+    def test_dhis2_values_upsert_snapshots(self) -> None:
+        config = IntegrationConfig.objects.create(system_name="DHIS2 Sandbox", base_url=self.base_url)
+
+        SyncEngine(config).run()
+        SyncEngine(config, workers=2).run(restart=True)
+
+        self.assertEqual(StockSnapshot.objects.count(), len(FACILITIES))
+        self.assertEqual(set(StockSnapshot.objects.values_list("data_source", flat=True)), {"dhis2"})
+
+    def test_malformed_values_are_skipped_not_fatal(self) -> None:
+        self.server.malformed = True
+        config = IntegrationConfig.objects.create(system_name="DHIS2 Sandbox", base_url=self.base_url)
+
+        result = SyncEngine(config).run()
+
+        self.assertEqual((result.pages, result.skipped), (2, 4))
+        self.assertEqual(StockSnapshot.objects.count(), len(FACILITIES))
@@ -0,0 +1,161 @@
+"""Tests for idempotent ledger writes."""
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from inventory.ledger import upsert_transactions
+from inventory.models import Facility, InventoryTransaction, Medicine, MonthlyConsumption
+from inventory.serializers import InventoryTransactionBulkListSerializer
+
+FEED_SIZE = 100_000
+
+
+class UpsertTransactionsTests(TestCase):
+    def setUp(self) -> None:
+        self.facility = Facility.objects.create(
+            code="F-1", name="Clinic", facility_type="clinic", ownership="public", state="Lagos"
+        )
+        self.medicine = Medicine.objects.create(name="ACT", generic_name="AL")
+        self.started = timezone.now()
+
+    def _feed(self, quantity: int):
+        return (
+            InventoryTransaction(
+                facility=self.facility,
+                medicine=self.medicine,
+                transaction_type=InventoryTransaction.TransactionType.ISSUE,
+                quantity=Decimal(quantity),
+                occurred_at=self.started - timedelta(minutes=n),
+                source_system="OpenLMIS",
+                external_id=f"line-{n}",
+            )
+            for n in range(FEED_SIZE)
+        )
+
+    def test_replaying_feed_is_idempotent_and_batched(self) -> None:
+        upsert_transactions(self._feed(quantity=1))
+
+        with CaptureQueriesContext(connection) as queries:
+            upsert_transactions(self._feed(quantity=2))
+
+        # One statement per batch (SQLite caps batches below UPSERT_BATCH_SIZE), no per-row lookups.
+        statements = [q["sql"] for q in queries if not q["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        self.assertTrue(all(sql.startswith("INSERT") and "ON CONFLICT" in sql for sql in statements))
+        self.assertLessEqual(len(statements), FEED_SIZE // 50)
+        self.assertEqual(InventoryTransaction.objects.count(), FEED_SIZE)
+        self.assertFalse(InventoryTransaction.objects.exclude(quantity=Decimal(2)).exists())
+
+    def test_do_nothing_mode_keeps_first_version(self) -> None:
+        upsert_transactions(list(self._feed(quantity=1))[:10])
+        upsert_transactions(list(self._feed(quantity=5))[:20], update=False)
+
+        self.assertEqual(InventoryTransaction.objects.count(), 20)
+        self.assertEqual(InventoryTransaction.objects.filter(quantity=Decimal(1)).count(), 10)
+
+    def test_bulk_endpoint_replays_without_duplicates(self) -> None:
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="pharm", facility=self.facility))
+        rows = [
+            {
+                "facility": self.facility.pk,
+                "medicine": self.medicine.pk,
+                "transaction_type": "issue",
+                "quantity": "3.00",
+                "occurred_at": self.started.isoformat(),
+                "source_system": "mobile",
+                "external_id": f"device-1:{n}",
+            }
+            for n in range(5)
+        ]
+
+        for _ in range(2):
+            response = client.post(reverse("inventorytransaction-bulk"), rows, format="json")
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(InventoryTransaction.objects.filter(source_system="mobile").count(), 5)
+
+    def test_bulk_endpoint_validates_a_batch_in_a_few_queries(self) -> None:
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="pharm", facility=self.facility))
+        row = {
+            "facility": self.facility.pk,
+            "medicine": self.medicine.pk,
+            "transaction_type": "receipt",
+            "quantity": "3.00",
+            "occurred_at": self.started.isoformat(),
+            "source_system": "mobile",
+        }
+        rows = [{**row, "external_id": f"device-1:{n}"} for n in range(200)]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(reverse("inventorytransaction-bulk"), rows, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(queries), 15)
+
+        unknown = client.post(reverse("inventorytransaction-bulk"), [{**rows[0], "medicine": 999}], format="json")
+        self.assertEqual(unknown.status_code, 400)
+        self.assertIn("medicine", unknown.data)
+        too_many = [rows[0]] * (InventoryTransactionBulkListSerializer.max_batch_size + 1)
+        self.assertEqual(client.post(reverse("inventorytransaction-bulk"), too_many, format="json").status_code, 400)
+
+    def test_bulk_endpoint_cannot_take_over_another_facilitys_key(self) -> None:
+        other = Facility.objects.create(code="F-2", name="Other", facility_type="clinic", ownership="public")
+        InventoryTransaction.objects.create(
+            facility=other,
+            medicine=self.medicine,
+            transaction_type="issue",
+            quantity=Decimal(7),
+            occurred_at=self.started,
+            source_system="mobile",
+            external_id="device-9:1",
+        )
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="pharm", facility=self.facility))
+        row = {
+            "facility": self.facility.pk,
+            "medicine": self.medicine.pk,
+            "transaction_type": "issue",
+            "quantity": "0.00",
+            "occurred_at": self.started.isoformat(),
+            "source_system": "mobile",
+            "external_id": "device-9:1",
+        }
+
+        response = client.post(reverse("inventorytransaction-bulk"), [row], format="json")
+
+        self.assertEqual(response.status_code, 400)
+        stored = InventoryTransaction.objects.get(external_id="device-9:1")
+        self.assertEqual((stored.facility, stored.quantity), (other, Decimal(7)))
+
+    def test_bulk_replay_moving_a_row_refreshes_the_month_it_left(self) -> None:
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="pharm", facility=self.facility))
+        row = {
+            "facility": self.facility.pk,
+            "medicine": self.medicine.pk,
+            "transaction_type": "issue",
+            "quantity": "4.00",
+            "occurred_at": "2024-03-15T10:00:00Z",
+            "source_system": "mobile",
+            "external_id": "device-1:1",
+        }
+        client.post(reverse("inventorytransaction-bulk"), [row], format="json")
+
+        client.post(
+            reverse("inventorytransaction-bulk"), [{**row, "occurred_at": "2024-04-15T10:00:00Z"}], format="json"
+        )
+
+        self.assertEqual(
+            dict(MonthlyConsumption.objects.values_list("month__month", "quantity")),
+            {3: Decimal(0), 4: Decimal(4)},
+        )
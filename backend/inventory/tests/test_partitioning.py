@@ -0,0 +1,88 @@
+"""Tests for ledger partitioning; the PostgreSQL behaviour tests are skipped on other databases."""
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from inventory.ledger import external_key_fields
+from inventory.models import Facility, Medicine, StockSnapshot
+from inventory.partitioning import (
+    _widen_to_partition_key,
+    add_months,
+    convert_to_partitioned,
+    month_range,
+    month_start,
+    partition_name,
+)
+from inventory.tasks import ensure_ledger_partitions
+
+
+class PartitionHelperTests(SimpleTestCase):
+    def test_month_arithmetic_crosses_year_boundaries(self) -> None:
+        self.assertEqual(add_months(date(2024, 11, 17), 3), date(2025, 2, 1))
+        self.assertEqual(add_months(date(2024, 1, 1), -1), date(2023, 12, 1))
+        self.assertEqual(
+            month_range(date(2024, 11, 30), date(2025, 1, 1)),
+            [date(2024, 11, 1), date(2024, 12, 1), date(2025, 1, 1)],
+        )
+        self.assertEqual(
+            partition_name("inventory_stocksnapshot", date(2024, 5, 1)), "inventory_stocksnapshot_p202405"
+        )
+
+    def test_unique_definitions_gain_the_partition_key_once(self) -> None:
+        self.assertEqual(_widen_to_partition_key("PRIMARY KEY (id)", "occurred_at"), "PRIMARY KEY (id, occurred_at)")
+        self.assertEqual(
+            _widen_to_partition_key("UNIQUE (source_system, external_id)", "occurred_at"),
+            "UNIQUE (source_system, external_id, occurred_at)",
+        )
+        definition = "UNIQUE (facility_id, medicine_id, recorded_at)"
+        self.assertEqual(_widen_to_partition_key(definition, "recorded_at"), definition)
+
+
+class PartitioningBackendTests(TestCase):
+    @override_settings(INVENTORY_PARTITIONING=True)
+    def test_non_postgres_databases_keep_the_plain_ledger(self) -> None:
+        self.assertEqual(external_key_fields(), ["source_system", "external_id"])
+        with self.assertRaises(CommandError):
+            call_command("partition_ledger")
+        self.assertEqual(ensure_ledger_partitions(), {})
+
+
+@skipUnless(connection.vendor == "postgresql", "Partitioning requires PostgreSQL.")
+@override_settings(INVENTORY_PARTITIONING=True)
+class PostgresPartitioningTests(TestCase):
+    table = "inventory_stocksnapshot"
+
+    def setUp(self) -> None:
+        # DDL is transactional on PostgreSQL, so the conversion is rolled back after each test.
+        convert_to_partitioned(self.table, months_ahead=0)
+        self.facility = Facility.objects.create(code="F-1", name="F-1", facility_type="clinic", ownership="public")
+        self.medicine = Medicine.objects.create(name="ORS", generic_name="ORS")
+
+    def _partition_of(self, snapshot: StockSnapshot) -> str:
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT tableoid::regclass::text FROM {self.table} WHERE id = %s", [snapshot.pk])
+            return cursor.fetchone()[0]
+
+    def test_scheduled_job_creates_upcoming_months_and_moves_early_rows(self) -> None:
+        month = add_months(month_start(date.today()), 6)
+        snapshot = StockSnapshot.objects.create(
+            facility=self.facility,
+            medicine=self.medicine,
+            stock_on_hand=Decimal(5),
+            recorded_at=datetime(month.year, month.month, 10, tzinfo=timezone.utc),
+        )
+        self.assertEqual(self._partition_of(snapshot), f"{self.table}_default")
+
+        created = ensure_ledger_partitions(months_ahead=6)
+
+        self.assertEqual(len(created[self.table]), 6)
+        self.assertIn(partition_name(self.table, month), created[self.table])
+        self.assertEqual(self._partition_of(snapshot), partition_name(self.table, month))
+        self.assertEqual(ensure_ledger_partitions(months_ahead=6), {self.table: []})
@@ -0,0 +1,136 @@
+"""Tests for min/max replenishment planning."""
+from __future__ import annotations
+
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from inventory.consumption import DAYS_PER_MONTH
+from inventory.models import ConsumptionStat, Facility, Forecast, Medicine, Requisition, RequisitionLine, Supplier
+from inventory.planning import compute_levels, create_requisitions, plan_replenishment
+
+
+class ComputeLevelsTests(TestCase):
+    def test_orders_up_to_max_only_at_or_below_min(self) -> None:
+        levels = compute_levels(
+            stock=np.array([10.0, 120.0, 500.0]),
+            monthly_demand=np.array([100.0, 100.0, 100.0]),
+            monthly_sigma=np.array([0.0, 20.0, 0.0]),
+            lead_time_days=np.array([DAYS_PER_MONTH] * 3),
+            service_level=0.95,
+            review_months=2,
+        )
+
+        self.assertEqual(levels["min_level"].tolist(), [100.0, 132.9, 100.0])
+        self.assertEqual(levels["safety_stock"].tolist(), [0.0, 32.9, 0.0])
+        self.assertEqual(levels["max_level"].tolist(), [300.0, 332.9, 300.0])
+        self.assertEqual(levels["order_quantity"].tolist(), [290.0, 213.0, 0.0])
+
+
+@override_settings(PLANNING_SERVICE_LEVEL=0.95, PLANNING_LEAD_TIME_DAYS=30, PLANNING_REVIEW_MONTHS=2)
+class RequisitionPlanningTests(TestCase):
+    def setUp(self) -> None:
+        self.today = timezone.localdate()
+        self.clinic = Facility.objects.create(
+            code="F-1", name="Clinic", facility_type="clinic", ownership="public", state="Lagos"
+        )
+        self.other = Facility.objects.create(
+            code="F-2", name="Other", facility_type="clinic", ownership="public", state="Kano"
+        )
+        self.supplier = Supplier.objects.create(name="CMS", code="CMS", lead_time_days=61)
+        self.act = Medicine.objects.create(name="ACT", generic_name="AL", supplier=self.supplier)
+        self.ors = Medicine.objects.create(name="ORS", generic_name="ORS")
+        for facility in (self.clinic, self.other):
+            ConsumptionStat.objects.create(facility=facility, medicine=self.act, amc=Decimal(100), stock_on_hand=10)
+            ConsumptionStat.objects.create(facility=facility, medicine=self.ors, amc=Decimal(30), stock_on_hand=500)
+
+    def test_forecast_demand_and_lead_times_drive_levels(self) -> None:
+        Forecast.objects.create(
+            facility=self.clinic,
+            medicine=self.ors,
+            forecast_date=self.today,
+            period_start=self.today,
+            period_end=self.today + timedelta(days=int(DAYS_PER_MONTH * 3) - 1),
+            predicted_demand=Decimal(1200),
+            confidence_interval_lower=Decimal(1000),
+            confidence_interval_upper=Decimal(1400),
+            model_version="test",
+        )
+        ConsumptionStat.objects.filter(facility=self.clinic, medicine=self.ors).update(stock_on_hand=300)
+
+        plan = plan_replenishment(Facility.objects.filter(pk=self.clinic.pk))
+
+        self.assertEqual(len(plan), 2)
+        by_medicine = dict(zip(plan.medicine_ids.tolist(), range(len(plan))))
+        act, ors = by_medicine[self.act.pk], by_medicine[self.ors.pk]
+        # ACT uses AMC and the supplier's 61-day lead time; it has no forecast interval.
+        self.assertAlmostEqual(plan.min_level[act], round(100 * 61 / DAYS_PER_MONTH, 2))
+        self.assertEqual(plan.safety_stock[act], 0)
+        self.assertGreater(plan.order_quantity[act], 0)
+        # ORS demand comes from the quarterly forecast (~400 a month), with safety stock from its bounds.
+        self.assertAlmostEqual(plan.monthly_demand[ors], 400, delta=5)
+        self.assertGreater(plan.safety_stock[ors], 0)
+        self.assertGreater(plan.order_quantity[ors], 0)
+
+    def test_drafts_are_grouped_by_supplier_and_replaced(self) -> None:
+        submitted = Requisition.objects.create(facility=self.clinic, status=Requisition.Status.SUBMITTED)
+        plan = plan_replenishment()
+
+        create_requisitions(plan)
+        create_requisitions(plan_replenishment())
+
+        drafts = Requisition.objects.filter(status=Requisition.Status.DRAFT)
+        # Only ACT is below its min, at both facilities, from one supplier.
+        self.assertEqual(
+            sorted(drafts.values_list("facility_id", "supplier_id")),
+            [(self.clinic.pk, self.supplier.pk), (self.other.pk, self.supplier.pk)],
+        )
+        self.assertEqual(RequisitionLine.objects.count(), 2)
+        self.assertTrue(Requisition.objects.filter(pk=submitted.pk).exists())
+        line = RequisitionLine.objects.get(requisition__facility=self.clinic)
+        self.assertEqual(line.medicine, self.act)
+        self.assertEqual(line.quantity, Decimal(int(np.ceil(float(line.max_level) - 10))))
+
+    def test_drafts_made_or_edited_by_hand_survive_a_rerun(self) -> None:
+        manual = Requisition.objects.create(facility=self.clinic, notes="Urgent top-up")
+        create_requisitions(plan_replenishment())
+        generated = Requisition.objects.get(facility=self.other, generated=True)
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="other", facility=self.other))
+        response = client.patch(
+            reverse("requisition-detail", args=[generated.pk]), {"notes": "Checked"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        create_requisitions(plan_replenishment())
+
+        self.assertEqual(Requisition.objects.filter(pk__in=[manual.pk, generated.pk], generated=False).count(), 2)
+        # The rerun replaced only its own clinic draft and drafted afresh alongside the edited one.
+        self.assertEqual(
+            sorted(Requisition.objects.filter(generated=True).values_list("facility_id", flat=True)),
+            sorted([self.clinic.pk, self.other.pk]),
+        )
+        self.assertEqual(Requisition.objects.count(), 4)
+
+    def test_generate_endpoint_is_scoped(self) -> None:
+        client = APIClient()
+        client.force_authenticate(User.objects.create(username="pharm", facility=self.clinic))
+
+        response = client.post(reverse("requisition-generate"), {}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {"pairs": 2, "requisitions": 1, "lines": 1})
+        self.assertFalse(Requisition.objects.filter(facility=self.other).exists())
+
+        listed = client.get(reverse("requisition-list"))
+        results = listed.data["results"] if isinstance(listed.data, dict) else listed.data
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["lines"][0]["medicine"], self.act.pk)
+
+        response = client.post(reverse("requisition-generate"), {"facility": [self.other.pk]}, format="json")
+        self.assertEqual(response.status_code, 403)
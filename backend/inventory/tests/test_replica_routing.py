@@ -0,0 +1,107 @@
+"""Tests for read-replica routing using a second SQLite database as the replica."""
+from __future__ import annotations
+
+import tempfile
+from datetime import date
+from pathlib import Path
+
+from django.db import connections
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from healteex_backend import db_routers
+from healteex_backend.db_routers import PrimaryPinningMiddleware, ReplicaRouter, use_replicas
+from inventory.models import Facility, Forecast, Medicine, Supplier
+
+REPLICA = "replica_test"
+
+
+def _add_sqlite_alias(alias: str, name: str) -> None:
+    connections.settings[alias] = {**connections.settings["default"], "NAME": name, "TEST": {}}
+
+
+def _remove_alias(alias: str) -> None:
+    connections[alias].close()
+    del connections[alias]
+    del connections.settings[alias]
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTests(TransactionTestCase):
+    def setUp(self) -> None:
+        self.tmpdir = tempfile.TemporaryDirectory()
+        _add_sqlite_alias(REPLICA, str(Path(self.tmpdir.name) / "replica.sqlite3"))
+        with connections[REPLICA].schema_editor() as editor:
+            for model in (Facility, Supplier, Medicine, Forecast):
+                editor.create_model(model)
+
+        self.primary_facility = Facility.objects.create(
+            name="Primary", code="PRIMARY", facility_type="hospital", ownership="public", state="Lagos"
+        )
+        replica_facility = Facility.objects.using(REPLICA).create(
+            name="Replica", code="REPLICA", facility_type="hospital", ownership="public", state="Lagos"
+        )
+        medicine = Medicine.objects.using(REPLICA).create(name="Amoxicillin", generic_name="Amoxicillin")
+        Forecast.objects.using(REPLICA).create(
+            facility=replica_facility,
+            medicine=medicine,
+            forecast_date=date(2024, 6, 1),
+            period_start=date(2024, 6, 1),
+            period_end=date(2024, 6, 30),
+            predicted_demand=120,
+            model_version="replica",
+        )
+        self.user = User.objects.create_user(username="analyst", password="pass", role=User.Roles.SUPER_ADMIN)
+
+    def tearDown(self) -> None:
+        _remove_alias(REPLICA)
+        self.tmpdir.cleanup()
+        db_routers._unavailable_until.clear()
+
+    def test_safe_requests_on_replica_views_read_from_replica(self) -> None:
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get("/api/v1/inventory/forecasts/")
+
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        rows = payload["results"] if isinstance(payload, dict) else payload
+        self.assertEqual([row["model_version"] for row in rows], ["replica"])
+        self.assertFalse(Forecast.objects.exists())
+
+    def test_reads_after_a_write_in_the_same_request_use_the_primary(self) -> None:
+        seen = []
+
+        def view(request):
+            with use_replicas():
+                seen.append(sorted(Facility.objects.values_list("code", flat=True)))
+                if request.method == "POST":
+                    Facility.objects.create(
+                        name="New", code="NEW", facility_type="clinic", ownership="public", state="Lagos"
+                    )
+                    seen.append(sorted(Facility.objects.values_list("code", flat=True)))
+
+        middleware = PrimaryPinningMiddleware(view)
+        middleware(RequestFactory().post("/"))
+        middleware(RequestFactory().get("/"))
+
+        self.assertEqual(seen[0], ["REPLICA"])
+        self.assertEqual(seen[1], ["NEW", "PRIMARY"])
+        # The pin does not leak into the next request.
+        self.assertEqual(seen[2], ["REPLICA"])
+
+    def test_unreachable_replica_falls_back_to_primary(self) -> None:
+        _remove_alias(REPLICA)
+        _add_sqlite_alias(REPLICA, str(Path(self.tmpdir.name) / "missing" / "replica.sqlite3"))
+
+        def view(request):
+            with use_replicas():
+                return ReplicaRouter().db_for_read(Facility), list(Facility.objects.values_list("code", flat=True))
+
+        self.assertEqual(PrimaryPinningMiddleware(view)(RequestFactory().get("/")), ("default", ["PRIMARY"]))
+        self.assertIn(REPLICA, db_routers._unavailable_until)
+
+    def test_reads_outside_replica_scope_use_the_primary(self) -> None:
+        self.assertEqual(list(Facility.objects.values_list("code", flat=True)), ["PRIMARY"])
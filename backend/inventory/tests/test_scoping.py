@@ -0,0 +1,87 @@
+"""Tests for role- and facility-scoped inventory querysets."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from inventory.models import Facility, InventoryTransaction, Medicine, StockSnapshot
+
+
+class FacilityScopingTests(TestCase):
+    def setUp(self) -> None:
+        self.ikeja = Facility.objects.create(
+            name="Ikeja", code="IKJ", facility_type="hospital", ownership="public", state="Lagos"
+        )
+        self.epe = Facility.objects.create(
+            name="Epe", code="EPE", facility_type="clinic", ownership="public", state="Lagos"
+        )
+        self.kano = Facility.objects.create(
+            name="Kano", code="KAN", facility_type="hospital", ownership="public", state="Kano"
+        )
+        self.medicine = Medicine.objects.create(name="Amoxicillin", generic_name="Amoxicillin")
+        for facility in (self.ikeja, self.epe, self.kano):
+            StockSnapshot.objects.create(
+                facility=facility,
+                medicine=self.medicine,
+                stock_on_hand=Decimal("10"),
+                recorded_at=datetime(2024, 6, 1, tzinfo=timezone.utc),
+            )
+        self.client = APIClient()
+
+    def _codes(self, user: User, path: str) -> list:
+        self.client.force_authenticate(user)
+        response = self.client.get(f"/api/v1/inventory/{path}/")
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        rows = payload["results"] if isinstance(payload, dict) else payload
+        facility_codes = dict(Facility.objects.values_list("pk", "code"))
+        return sorted(row["code"] if path == "facilities" else facility_codes[row["facility"]] for row in rows)
+
+    def test_each_role_sees_its_scope(self) -> None:
+        pharmacist = User.objects.create_user(username="pharm", role=User.Roles.PHARMACIST, facility=self.ikeja)
+        policy_maker = User.objects.create_user(username="policy", role=User.Roles.POLICY_MAKER, facility=self.epe)
+        super_admin = User.objects.create_user(username="admin", role=User.Roles.SUPER_ADMIN)
+        unassigned = User.objects.create_user(username="floating", role=User.Roles.FACILITY_ADMIN)
+
+        for path in ("facilities", "stock-snapshots"):
+            self.assertEqual(self._codes(pharmacist, path), ["IKJ"])
+            self.assertEqual(self._codes(policy_maker, path), ["EPE", "IKJ"])
+            self.assertEqual(self._codes(super_admin, path), ["EPE", "IKJ", "KAN"])
+            self.assertEqual(self._codes(unassigned, path), [])
+
+    def test_scope_is_a_single_query(self) -> None:
+        policy_maker = User.objects.create_user(username="policy", role=User.Roles.POLICY_MAKER, facility=self.epe)
+        self.client.force_authenticate(policy_maker)
+
+        # The state lookup is a subquery, not an extra round trip.
+        with self.assertNumQueries(1):
+            self.client.get("/api/v1/inventory/stock-snapshots/")
+
+    def test_writes_outside_scope_are_rejected(self) -> None:
+        pharmacist = User.objects.create_user(username="pharm", role=User.Roles.PHARMACIST, facility=self.ikeja)
+        self.client.force_authenticate(pharmacist)
+        row = {
+            "medicine": self.medicine.pk,
+            "transaction_type": "issue",
+            "quantity": "1.00",
+            "occurred_at": "2024-06-02T08:00:00Z",
+        }
+
+        denied = self.client.post("/api/v1/inventory/transactions/", {**row, "facility": self.kano.pk})
+        allowed = self.client.post("/api/v1/inventory/transactions/", {**row, "facility": self.ikeja.pk})
+        bulk = self.client.post(
+            "/api/v1/inventory/transactions/bulk/", [{**row, "facility": self.kano.pk}], format="json"
+        )
+        other_snapshot = StockSnapshot.objects.get(facility=self.kano)
+
+        self.assertEqual(denied.status_code, 403)
+        self.assertEqual(allowed.status_code, 201)
+        self.assertEqual(bulk.status_code, 403)
+        self.assertEqual(InventoryTransaction.objects.count(), 1)
+        self.assertEqual(
+            self.client.delete(f"/api/v1/inventory/stock-snapshots/{other_snapshot.pk}/").status_code, 404
+        )
@@ -0,0 +1,37 @@
+"""Tests for the demo data seeding command."""
+from __future__ import annotations
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.models import User
+from inventory.models import Alert, Facility, Forecast, InventoryTransaction, StockSnapshot
+
+
+class SeedDemoDataTests(TestCase):
+    def _counts(self) -> dict[str, int]:
+        return {
+            model.__name__: model.objects.count()
+            for model in (Facility, User, InventoryTransaction, StockSnapshot, Forecast, Alert)
+        }
+
+    def test_scaled_seed_is_idempotent_and_deterministic(self) -> None:
+        call_command("seed_demo_data", scale=3, stdout=StringIO())
+        first_counts = self._counts()
+        first_quantities = list(InventoryTransaction.objects.order_by("external_id").values_list("quantity", flat=True))
+
+        call_command("seed_demo_data", scale=3, stdout=StringIO())
+
+        self.assertEqual(self._counts(), first_counts)
+        self.assertEqual(first_counts["Facility"], 12)
+        self.assertEqual(first_counts["User"], 10)
+        self.assertEqual(
+            list(InventoryTransaction.objects.order_by("external_id").values_list("quantity", flat=True)),
+            first_quantities,
+        )
+        user = User.objects.get(username="lagos-admin-003")
+        self.assertEqual(user.facility.code, "LAG-GEN-003")
+        self.assertTrue(user.check_password("ChangeMe123!"))
+        self.assertTrue(hasattr(user, "auth_token"))
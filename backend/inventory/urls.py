@@ -6,20 +6,26 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (
     AlertViewSet,
+    ConsumptionStatViewSet,
     FacilityViewSet,
     ForecastViewSet,
     IntegrationConfigViewSet,
     InventoryTransactionViewSet,
     MedicineViewSet,
+    RequisitionViewSet,
     StockSnapshotViewSet,
+    SupplierViewSet,
 )
 
 router = DefaultRouter()
 router.register(r"facilities", FacilityViewSet)
+router.register(r"suppliers", SupplierViewSet)
 router.register(r"medicines", MedicineViewSet)
 router.register(r"transactions", InventoryTransactionViewSet)
 router.register(r"stock-snapshots", StockSnapshotViewSet)
 router.register(r"forecasts", ForecastViewSet)
+router.register(r"consumption", ConsumptionStatViewSet)
+router.register(r"requisitions", RequisitionViewSet)
 router.register(r"alerts", AlertViewSet)
 router.register(r"integrations", IntegrationConfigViewSet)
 
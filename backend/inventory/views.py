@@ -1,23 +1,63 @@
 """ViewSets for inventory resources."""
 from __future__ import annotations
 
-from rest_framework import viewsets
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
 
-from .models import Alert, Facility, Forecast, IntegrationConfig, InventoryTransaction, Medicine, StockSnapshot
+from analytics.models import ForecastModelVersion
+from analytics.registry import forecast_window, predict_pairs, resolve_version, trained_keys
+from healteex_backend.db_routers import ReplicaReadMixin
+from notifications.outbox import enqueue_alert_notifications
+
+from .alerts import transition_alerts
+from .consumption import consumption_keys, refresh_consumption
+from .ledger import stored_versions, upsert_transactions
+from .models import (
+    Alert,
+    ConsumptionStat,
+    Facility,
+    Forecast,
+    IntegrationConfig,
+    InventoryTransaction,
+    Medicine,
+    Requisition,
+    StockSnapshot,
+    Supplier,
+)
+from .planning import create_requisitions, plan_replenishment
+from .scoping import FacilityScopedMixin, check_facilities_in_scope, scope_queryset
 from .serializers import (
     AlertSerializer,
+    AlertTransitionSerializer,
+    ConsumptionStatSerializer,
     FacilitySerializer,
+    ForecastPredictSerializer,
     ForecastSerializer,
     IntegrationConfigSerializer,
+    InventoryTransactionBulkSerializer,
     InventoryTransactionSerializer,
     MedicineSerializer,
+    RequisitionPlanSerializer,
+    RequisitionSerializer,
     StockSnapshotSerializer,
+    SupplierSerializer,
 )
 
 
-class FacilityViewSet(viewsets.ModelViewSet):
+class FacilityViewSet(FacilityScopedMixin, viewsets.ModelViewSet):
     queryset = Facility.objects.all()
     serializer_class = FacilitySerializer
+    facility_field = ""
+
+
+class SupplierViewSet(viewsets.ModelViewSet):
+    queryset = Supplier.objects.all()
+    serializer_class = SupplierSerializer
 
 
 class MedicineViewSet(viewsets.ModelViewSet):
@@ -25,25 +65,191 @@ class MedicineViewSet(viewsets.ModelViewSet):
     serializer_class = MedicineSerializer
 
 
-class InventoryTransactionViewSet(viewsets.ModelViewSet):
+class InventoryTransactionViewSet(FacilityScopedMixin, viewsets.ModelViewSet):
     queryset = InventoryTransaction.objects.select_related("facility", "medicine", "created_by")
     serializer_class = InventoryTransactionSerializer
 
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk(self, request, *args, **kwargs):
+        """Idempotently upsert a batch of transactions keyed by ``(source_system, external_id)``."""
 
-class StockSnapshotViewSet(viewsets.ModelViewSet):
+        serializer = InventoryTransactionBulkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        check_facilities_in_scope(request.user, [attrs["facility"] for attrs in serializer.validated_data])
+        transactions = [
+            InventoryTransaction(created_by=request.user, **attrs) for attrs in serializer.validated_data
+        ]
+        with transaction.atomic():
+            previous = stored_versions(transactions)
+            # A key recorded for another facility is not the caller's to rewrite.
+            foreign = sorted(
+                {
+                    item.external_id
+                    for item, stored in zip(transactions, previous)
+                    if stored is not None and stored.facility_id != item.facility_id
+                }
+            )
+            if foreign:
+                raise ValidationError(
+                    {"external_id": [f"Already recorded for another facility: {', '.join(foreign)}."]}
+                )
+            upsert_transactions(transactions)
+            refresh_consumption(consumption_keys(transactions) | consumption_keys(filter(None, previous)))
+        return Response({"received": len(transactions)}, status=status.HTTP_200_OK)
+
+
+class StockSnapshotViewSet(ReplicaReadMixin, FacilityScopedMixin, viewsets.ModelViewSet):
     queryset = StockSnapshot.objects.select_related("facility", "medicine")
     serializer_class = StockSnapshotSerializer
 
 
-class ForecastViewSet(viewsets.ModelViewSet):
+class ConsumptionStatViewSet(ReplicaReadMixin, FacilityScopedMixin, viewsets.ReadOnlyModelViewSet):
+    """Average monthly consumption and days of stock per facility and medicine."""
+
+    queryset = ConsumptionStat.objects.select_related("facility", "medicine")
+    serializer_class = ConsumptionStatSerializer
+
+
+class ForecastViewSet(ReplicaReadMixin, FacilityScopedMixin, viewsets.ModelViewSet):
     queryset = Forecast.objects.select_related("facility", "medicine")
     serializer_class = ForecastSerializer
 
+    @action(detail=False, methods=["get"], url_path="predict")
+    def predict(self, request, *args, **kwargs):
+        """
+        Forecast the requested series on demand from a registered model version.
+
+        Only series the version was trained on are returned, a page of at most
+        ``FORECAST_PREDICT_PAGE_SIZE`` at a time; ``count`` is their total.
+        """
+
+        serializer = ForecastPredictSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        try:
+            registered = resolve_version(params.get("model_version"))
+        except ForecastModelVersion.DoesNotExist as exc:
+            raise NotFound("No such forecast model version.") from exc
+
+        if params.get("facility"):
+            check_facilities_in_scope(request.user, params["facility"])
+            facility_ids = [facility.pk for facility in params["facility"]]
+        else:
+            facility_ids = list(scope_queryset(Facility.objects.all(), request.user, "").values_list("pk", flat=True))
+        if params.get("medicine"):
+            medicine_ids = [medicine.pk for medicine in params["medicine"]]
+        else:
+            medicine_ids = None
+
+        try:
+            keys = trained_keys(registered, facility_ids, medicine_ids)
+        except FileNotFoundError as exc:
+            # Registered, but the artifact has not reached this host's MODEL_REGISTRY_DIR.
+            raise NotFound(f"Model version {registered.version!r} is not available on this server.") from exc
+        limit = min(params.get("limit") or settings.FORECAST_PREDICT_PAGE_SIZE, settings.FORECAST_PREDICT_PAGE_SIZE)
+        page = keys[params["offset"] : params["offset"] + limit]
+        pairs = zip((page >> 32).tolist(), (page & 0xFFFFFFFF).tolist())
+        prediction = predict_pairs(registered, pairs, params["horizon"])
+        period_start, period_end = forecast_window(registered, params["horizon"])
+        results = [
+            {
+                "facility": facility_id,
+                "medicine": medicine_id,
+                "predicted_demand": round(predicted, 2),
+                "confidence_interval_lower": None if np.isnan(lower) else round(lower, 2),
+                "confidence_interval_upper": None if np.isnan(upper) else round(upper, 2),
+            }
+            for facility_id, medicine_id, predicted, lower, upper in zip(
+                prediction["facility_ids"].tolist(),
+                prediction["medicine_ids"].tolist(),
+                prediction["predicted"].tolist(),
+                prediction["lower"].tolist(),
+                prediction["upper"].tolist(),
+            )
+        ]
+        return Response(
+            {
+                "model_version": registered.version,
+                "model": registered.model,
+                "period_start": period_start,
+                "period_end": period_end,
+                "count": len(keys),
+                "results": results,
+            }
+        )
 
-class AlertViewSet(viewsets.ModelViewSet):
+
+class RequisitionViewSet(FacilityScopedMixin, viewsets.ModelViewSet):
+    queryset = Requisition.objects.select_related("facility", "supplier", "created_by").prefetch_related("lines")
+    serializer_class = RequisitionSerializer
+
+    def perform_create(self, serializer):
+        serializer.validated_data["created_by"] = self.request.user
+        super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        # An edited draft is the user's now; the planner must not replace it.
+        serializer.validated_data["generated"] = False
+        super().perform_update(serializer)
+
+    @action(detail=False, methods=["post"], url_path="generate")
+    def generate(self, request, *args, **kwargs):
+        """Recompute min/max levels and replace draft requisitions for the caller's facilities."""
+
+        serializer = RequisitionPlanSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        facilities = scope_queryset(Facility.objects.filter(is_active=True), request.user, "")
+        if serializer.validated_data.get("facility"):
+            check_facilities_in_scope(request.user, serializer.validated_data["facility"])
+            facilities = facilities.filter(pk__in=[facility.pk for facility in serializer.validated_data["facility"]])
+        if serializer.validated_data.get("state"):
+            facilities = facilities.filter(state=serializer.validated_data["state"])
+
+        plan = plan_replenishment(facilities.values("pk"))
+        requisitions = create_requisitions(plan, user=request.user)
+        return Response(
+            {"pairs": len(plan), "requisitions": len(requisitions), "lines": len(plan.to_order)},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class AlertViewSet(FacilityScopedMixin, viewsets.ModelViewSet):
     queryset = Alert.objects.select_related("facility", "medicine", "resolved_by")
     serializer_class = AlertSerializer
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        enqueue_alert_notifications([serializer.instance])
+
+    @action(detail=False, methods=["post"], url_path="transition")
+    def transition(self, request, *args, **kwargs):
+        """Acknowledge or resolve every matching alert in the caller's scope with a single UPDATE."""
+
+        serializer = AlertTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        alerts = scope_queryset(Alert.objects.all(), request.user)
+        if params.get("ids"):
+            alerts = alerts.filter(pk__in=set(params["ids"]))
+        if params.get("facility"):
+            check_facilities_in_scope(request.user, params["facility"])
+            alerts = alerts.filter(facility__in=[facility.pk for facility in params["facility"]])
+        if params.get("medicine"):
+            alerts = alerts.filter(medicine__in=[medicine.pk for medicine in params["medicine"]])
+        if params.get("alert_type"):
+            alerts = alerts.filter(alert_type__in=params["alert_type"])
+        if params.get("triggered_after"):
+            alerts = alerts.filter(triggered_at__gte=params["triggered_after"])
+        if params.get("triggered_before"):
+            alerts = alerts.filter(triggered_at__lt=params["triggered_before"])
+
+        updated = transition_alerts(alerts, params["action"], user=request.user)
+        result = {"action": params["action"], "updated": updated}
+        if params.get("ids"):
+            # Missing, out of scope or already transitioned.
+            result["skipped"] = len(set(params["ids"])) - updated
+        return Response(result, status=status.HTTP_200_OK)
+
 
 class IntegrationConfigViewSet(viewsets.ModelViewSet):
     queryset = IntegrationConfig.objects.all()
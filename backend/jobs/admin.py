@@ -0,0 +1,19 @@
+"""Admin configuration for background jobs."""
+from __future__ import annotations
+
+from django.contrib import admin
+
+from .models import Job, JobSchedule
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "priority", "attempts", "run_at", "wait_ms", "duration_ms", "worker")
+    list_filter = ("status", "name")
+    search_fields = ("name", "last_error")
+
+
+@admin.register(JobSchedule)
+class JobScheduleAdmin(admin.ModelAdmin):
+    list_display = ("name", "job", "interval_seconds", "next_run_at", "is_active")
+    list_filter = ("is_active",)
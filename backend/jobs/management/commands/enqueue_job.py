@@ -0,0 +1,40 @@
+"""Management command that queues one background job."""
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from jobs.queue import enqueue
+from jobs.registry import JOBS, UnknownJob
+
+
+class Command(BaseCommand):
+    help = "Queues a registered background job for run_worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", help="Registered job name, e.g. analytics.refresh_features.")
+        parser.add_argument("--payload", default="{}", help="Keyword arguments as a JSON object.")
+        parser.add_argument("--priority", type=int, default=0, help="Higher runs first.")
+        parser.add_argument("--delay", type=float, default=0.0, help="Seconds before the job becomes due.")
+
+    def handle(self, *args, **options):
+        try:
+            payload = json.loads(options["payload"])
+        except ValueError as exc:
+            raise CommandError("--payload must be a JSON object.") from exc
+        if not isinstance(payload, dict):
+            raise CommandError("--payload must be a JSON object.")
+        try:
+            job = enqueue(
+                options["name"],
+                payload,
+                priority=options["priority"],
+                run_at=timezone.now() + timedelta(seconds=options["delay"]),
+            )
+        except UnknownJob as exc:
+            raise CommandError(f"{exc}; registered jobs: {', '.join(sorted(JOBS))}.") from exc
+        result = {"id": job.pk, "name": job.name, "run_at": job.run_at.isoformat()}
+        self.stdout.write(self.style.SUCCESS(json.dumps(result)))
@@ -0,0 +1,23 @@
+"""Management command that reports background job throughput and latency."""
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from jobs.queue import job_stats
+
+
+class Command(BaseCommand):
+    help = "Prints per-job outcome counts and p50/p95 run time and queue wait over the last hours."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=float, default=24.0, help="Window of finished jobs to summarise.")
+
+    def handle(self, *args, **options):
+        if options["hours"] <= 0:
+            raise CommandError("--hours must be positive.")
+        stats = job_stats(timezone.now() - timedelta(hours=options["hours"]))
+        self.stdout.write(self.style.SUCCESS(json.dumps(stats)))
@@ -0,0 +1,39 @@
+"""Management command that runs background jobs from the database queue."""
+from __future__ import annotations
+
+import json
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Claims due background jobs, highest priority first, and runs them on a thread or process pool; "
+        "also enqueues periodic schedules. SIGTERM finishes running jobs, then exits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKER_CONCURRENCY)
+        parser.add_argument(
+            "--processes", action="store_true", help="Run jobs in worker processes, for CPU-bound work."
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls when idle.")
+        parser.add_argument("--burst", action="store_true", help="Exit once no job is due.")
+        parser.add_argument("--no-schedules", action="store_true", help="Do not enqueue periodic schedules.")
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1.")
+        worker = Worker(
+            concurrency=options["concurrency"],
+            processes=options["processes"],
+            poll_interval=options["poll_interval"],
+        )
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: worker.stop())
+        result = worker.run(burst=options["burst"], schedules=not options["no_schedules"])
+        self.stdout.write(self.style.SUCCESS(json.dumps(result)))
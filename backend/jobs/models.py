@@ -0,0 +1,73 @@
+"""Database-backed background jobs and their periodic schedules."""
+from __future__ import annotations
+
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from inventory.models import TimeStampedModel
+
+
+class Job(TimeStampedModel):
+    """
+    One run of a registered job function, claimed by ``run_worker``.
+
+    ``run_at`` is when a queued job becomes due; while the job runs it holds the
+    lease expiry, after which another worker may claim it again.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0, help_text="Higher runs first.")
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    timeout_seconds = models.PositiveIntegerField(default=600)
+    worker = models.CharField(max_length=100, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    wait_ms = models.FloatField(null=True, blank=True, help_text="Time from due to started, last attempt.")
+    duration_ms = models.FloatField(null=True, blank=True, help_text="Run time of the last attempt.")
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # Claiming only ever looks at unfinished jobs, so the index stays small as history grows.
+            models.Index(
+                fields=["-priority", "run_at"],
+                name="jobs_job_due_idx",
+                condition=Q(status__in=["queued", "running"]),
+            ),
+            models.Index(fields=["name", "finished_at"], name="jobs_job_name_finished_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class JobSchedule(TimeStampedModel):
+    """Enqueues ``job`` every ``interval_seconds``; entries in ``settings.JOB_SCHEDULES`` are synced at worker start."""
+
+    name = models.CharField(max_length=100, unique=True)
+    job = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0)
+    interval_seconds = models.PositiveIntegerField()
+    next_run_at = models.DateTimeField(default=timezone.now)
+    is_active = models.BooleanField(default=True)
+    last_job = models.ForeignKey(Job, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial representation
+        return f"{self.name}: {self.job} every {self.interval_seconds}s"
@@ -0,0 +1,260 @@
+"""
+Enqueue, claim and settle background jobs stored in the database.
+
+Workers claim due jobs with ``SELECT ... FOR UPDATE SKIP LOCKED``, so any
+number of them share the queue without blocking each other, and lease them by
+moving ``run_at`` ``timeout_seconds`` ahead. Workers renew the leases of the
+jobs they are running, so a job is only claimed again once its worker has
+stopped renewing it, e.g. because it died. Like the notification outbox, failures are
+retried with exponential backoff until ``max_attempts``.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Job, JobSchedule
+from .registry import UnknownJob, get_job
+
+logger = logging.getLogger(__name__)
+
+UNFINISHED = (Job.Status.QUEUED, Job.Status.RUNNING)
+PURGE_BATCH_SIZE = 5000
+
+
+def enqueue(
+    name: str,
+    payload: Optional[Dict[str, object]] = None,
+    priority: int = 0,
+    run_at: Optional[datetime] = None,
+    max_attempts: Optional[int] = None,
+    timeout_seconds: Optional[int] = None,
+) -> Job:
+    """
+    Queue job ``name`` with keyword arguments ``payload``.
+
+    Inside a transaction the job only becomes visible to workers on commit, so it
+    never runs against data that was rolled back.
+    """
+
+    get_job(name)
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+        timeout_seconds=timeout_seconds or settings.JOB_TIMEOUT_SECONDS,
+    )
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    seconds = settings.JOB_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, settings.JOB_RETRY_MAX_SECONDS))
+
+
+def claim_jobs(limit: int, worker: str = "") -> List[Job]:
+    """
+    Lease up to ``limit`` due jobs, highest priority first, then oldest due.
+
+    Returned jobs carry their new ``attempts`` and the time they waited since
+    becoming due in ``wait_ms``. Jobs whose last allowed attempt lost its lease
+    are marked failed instead of being run again.
+    """
+
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status__in=UNFINISHED, run_at__lte=now)
+            .order_by("-priority", "run_at")[:limit]
+        )
+        expired = [job for job in jobs if job.status == Job.Status.RUNNING and job.attempts >= job.max_attempts]
+        if expired:
+            Job.objects.filter(pk__in=[job.pk for job in expired]).update(
+                status=Job.Status.FAILED,
+                finished_at=now,
+                last_error="Lease expired on the last attempt.",
+                updated_at=now,
+            )
+        jobs = [job for job in jobs if job.attempts < job.max_attempts or job.status == Job.Status.QUEUED]
+        # One UPDATE per distinct timeout, which is usually one.
+        by_timeout = sorted(jobs, key=lambda job: job.timeout_seconds)
+        for timeout, group in groupby(by_timeout, lambda job: job.timeout_seconds):
+            Job.objects.filter(pk__in=[job.pk for job in group]).update(
+                status=Job.Status.RUNNING,
+                attempts=F("attempts") + 1,
+                run_at=now + timedelta(seconds=timeout),
+                started_at=now,
+                worker=worker,
+                updated_at=now,
+            )
+    for job in jobs:
+        job.wait_ms = (now - job.run_at).total_seconds() * 1000
+        job.attempts += 1
+        job.status, job.started_at, job.worker = Job.Status.RUNNING, now, worker
+    return jobs
+
+
+def renew_leases(jobs: Sequence[Job], worker: str = "") -> int:
+    """
+    Move the leases of running ``jobs`` ``timeout_seconds`` ahead again; returns how many were renewed.
+
+    Leases that already went to another worker are left alone.
+    """
+
+    now = timezone.now()
+    renewed = 0
+    by_timeout = sorted(jobs, key=lambda job: job.timeout_seconds)
+    for timeout, group in groupby(by_timeout, lambda job: job.timeout_seconds):
+        renewed += Job.objects.filter(
+            pk__in=[job.pk for job in group], status=Job.Status.RUNNING, worker=worker
+        ).update(run_at=now + timedelta(seconds=timeout), updated_at=now)
+    return renewed
+
+
+@dataclass
+class Outcome:
+    """What happened when a claimed job ran."""
+
+    job: Job
+    ok: bool
+    duration_ms: float
+    result: object = None
+    error: str = ""
+    # Retrying cannot help, e.g. the job name is not registered.
+    permanent: bool = False
+    # Time between the claim and the start of execution, added to the job's wait.
+    queued_ms: float = 0.0
+
+
+def settle(outcomes: Sequence[Outcome]) -> Dict[str, int]:
+    """
+    Record outcomes in one transaction: success, a retry with backoff, or failure.
+
+    An outcome is dropped if its lease was lost and another worker claimed the job again.
+    """
+
+    counts = {"succeeded": 0, "retried": 0, "failed": 0}
+    now = timezone.now()
+    with transaction.atomic():
+        for outcome in outcomes:
+            job = outcome.job
+            update = {
+                "wait_ms": job.wait_ms + outcome.queued_ms,
+                "duration_ms": outcome.duration_ms,
+                "updated_at": now,
+            }
+            if outcome.ok:
+                update.update(status=Job.Status.SUCCEEDED, finished_at=now, result=outcome.result, last_error="")
+                key = "succeeded"
+            elif outcome.permanent or job.attempts >= job.max_attempts:
+                update.update(status=Job.Status.FAILED, finished_at=now, last_error=outcome.error)
+                key = "failed"
+            else:
+                update.update(
+                    status=Job.Status.QUEUED, run_at=now + _retry_delay(job.attempts), last_error=outcome.error
+                )
+                key = "retried"
+            if Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, attempts=job.attempts).update(**update):
+                counts[key] += 1
+    return counts
+
+
+def sync_schedules(schedules: Optional[Dict[str, Dict[str, object]]] = None) -> int:
+    """Create or update the schedules defined in ``settings.JOB_SCHEDULES``, keeping their next run and state."""
+
+    schedules = settings.JOB_SCHEDULES if schedules is None else schedules
+    for name, spec in schedules.items():
+        JobSchedule.objects.update_or_create(
+            name=name,
+            defaults={
+                "job": spec["job"],
+                "interval_seconds": spec["interval"],
+                "payload": spec.get("payload", {}),
+                "priority": spec.get("priority", 0),
+            },
+        )
+    return len(schedules)
+
+
+def enqueue_due_schedules(now: Optional[datetime] = None) -> List[Job]:
+    """Queue a job for every due schedule whose previous job has finished."""
+
+    now = now or timezone.now()
+    jobs = []
+    with transaction.atomic():
+        due = (
+            JobSchedule.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(is_active=True, next_run_at__lte=now)
+            .select_related("last_job")
+        )
+        for schedule in due:
+            schedule.next_run_at = now + timedelta(seconds=schedule.interval_seconds)
+            if schedule.last_job is None or schedule.last_job.status not in UNFINISHED:
+                try:
+                    schedule.last_job = enqueue(schedule.job, schedule.payload, priority=schedule.priority, run_at=now)
+                except UnknownJob:
+                    logger.warning("Schedule %s names unregistered job %s", schedule.name, schedule.job)
+                else:
+                    jobs.append(schedule.last_job)
+            schedule.save(update_fields=["next_run_at", "last_job", "updated_at"])
+    return jobs
+
+
+def purge_finished(days: Optional[int] = None) -> int:
+    """Delete jobs that finished more than ``days`` (default ``JOB_RETENTION_DAYS``) ago, in batches."""
+
+    cutoff = timezone.now() - timedelta(days=settings.JOB_RETENTION_DAYS if days is None else days)
+    queryset = Job.objects.exclude(status__in=UNFINISHED).filter(finished_at__lt=cutoff)
+    deleted = 0
+    while True:
+        batch = list(queryset.values_list("pk", flat=True)[:PURGE_BATCH_SIZE])
+        if not batch:
+            return deleted
+        deleted += Job.objects.filter(pk__in=batch).delete()[0]
+
+
+def _percentile(values: np.ndarray, q: float) -> Optional[float]:
+    return round(float(np.percentile(values, q)), 1) if len(values) else None
+
+
+def job_stats(since: datetime) -> List[Dict[str, object]]:
+    """Per job name: outcomes since ``since``, run time and wait percentiles in ms, and jobs still queued."""
+
+    pending = dict(
+        Job.objects.filter(status=Job.Status.QUEUED).values_list("name").annotate(count=Count("pk")).order_by()
+    )
+    rows = sorted(
+        Job.objects.filter(finished_at__gte=since).values_list("name", "status", "duration_ms", "wait_ms"),
+        key=lambda row: row[0],
+    )
+    stats = []
+    names = sorted(set(pending) | {row[0] for row in rows})
+    by_name = {name: list(group) for name, group in groupby(rows, lambda row: row[0])}
+    for name in names:
+        group = by_name.get(name, [])
+        duration = np.array([row[2] for row in group if row[2] is not None], dtype=float)
+        wait = np.array([row[3] for row in group if row[3] is not None], dtype=float)
+        stats.append(
+            {
+                "name": name,
+                "succeeded": sum(row[1] == Job.Status.SUCCEEDED for row in group),
+                "failed": sum(row[1] == Job.Status.FAILED for row in group),
+                "queued": pending.get(name, 0),
+                "duration_p50_ms": _percentile(duration, 50),
+                "duration_p95_ms": _percentile(duration, 95),
+                "wait_p50_ms": _percentile(wait, 50),
+                "wait_p95_ms": _percentile(wait, 95),
+            }
+        )
+    return stats
@@ -0,0 +1,33 @@
+"""Names of the functions background jobs may run."""
+from __future__ import annotations
+
+from typing import Callable, Dict
+
+JOBS: Dict[str, Callable[..., object]] = {}
+
+
+class UnknownJob(LookupError):
+    """No function is registered under a job name; retrying cannot help."""
+
+
+def register_job(name: str) -> Callable[[Callable[..., object]], Callable[..., object]]:
+    """
+    Register the decorated function as job ``name``.
+
+    Jobs are called with their JSON payload as keyword arguments and may return
+    a JSON-serializable result. A job can be retried after a failure or an
+    expired lease, so it must be safe to run more than once.
+    """
+
+    def decorator(function: Callable[..., object]) -> Callable[..., object]:
+        JOBS[name] = function
+        return function
+
+    return decorator
+
+
+def get_job(name: str) -> Callable[..., object]:
+    try:
+        return JOBS[name]
+    except KeyError as exc:
+        raise UnknownJob(f"No job registered as '{name}'.") from exc
@@ -0,0 +1,12 @@
+"""Background jobs of the jobs app itself."""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from .queue import purge_finished
+from .registry import register_job
+
+
+@register_job("jobs.purge")
+def purge(days: Optional[int] = None) -> Dict[str, int]:
+    return {"deleted": purge_finished(days)}
@@ -0,0 +1,179 @@
+"""Tests for the background job queue and worker."""
+from __future__ import annotations
+
+import time
+from datetime import timedelta
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from jobs.models import Job, JobSchedule
+from jobs.queue import (
+    Outcome,
+    claim_jobs,
+    enqueue,
+    enqueue_due_schedules,
+    job_stats,
+    renew_leases,
+    settle,
+    sync_schedules,
+)
+from jobs.registry import register_job
+from jobs.worker import Worker, execute
+
+
+@register_job("tests.add")
+def add(a: int, b: int) -> int:
+    return a + b
+
+
+@register_job("tests.fail")
+def fail() -> None:
+    raise RuntimeError("boom")
+
+
+@register_job("tests.leases")
+def leases() -> dict:
+    # Outlive a one-second lease, then report what a second worker would see.
+    time.sleep(1.2)
+    running = Job.objects.filter(status=Job.Status.RUNNING)
+    return {"running": running.count(), "leased": running.filter(run_at__gt=timezone.now()).count()}
+
+
+def _make_due(job: Job) -> None:
+    Job.objects.filter(pk=job.pk).update(run_at=timezone.now() - timedelta(seconds=1))
+
+
+@override_settings(JOB_MAX_ATTEMPTS=2, JOB_RETRY_BASE_SECONDS=60)
+class QueueTests(TestCase):
+    def test_claims_by_priority_then_due_time(self) -> None:
+        past = timezone.now() - timedelta(minutes=5)
+        low = enqueue("tests.add", {"a": 1, "b": 2}, run_at=past)
+        high = enqueue("tests.add", {"a": 1, "b": 2}, priority=5)
+        older = enqueue("tests.add", {"a": 1, "b": 2}, priority=5, run_at=past)
+        enqueue("tests.add", {"a": 1, "b": 2}, run_at=timezone.now() + timedelta(hours=1))
+
+        jobs = claim_jobs(10, "w1")
+
+        self.assertEqual([job.pk for job in jobs], [older.pk, high.pk, low.pk])
+        self.assertEqual(claim_jobs(10, "w2"), [])
+        claimed = Job.objects.get(pk=older.pk)
+        self.assertEqual((claimed.status, claimed.attempts, claimed.worker), ("running", 1, "w1"))
+        self.assertGreaterEqual(jobs[0].wait_ms, 5 * 60 * 1000)
+
+    def test_failures_retry_with_backoff_then_fail(self) -> None:
+        job = enqueue("tests.fail")
+
+        (claimed,) = claim_jobs(1)
+        outcome = Outcome(job=claimed, **execute(claimed.name, claimed.payload))
+        self.assertEqual(settle([outcome]), {"succeeded": 0, "retried": 1, "failed": 0})
+        job.refresh_from_db()
+        self.assertEqual(job.status, "queued")
+        self.assertIn("RuntimeError: boom", job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=50))
+
+        _make_due(job)
+        (claimed,) = claim_jobs(1)
+        outcome = Outcome(job=claimed, **execute(claimed.name, claimed.payload))
+        self.assertEqual(settle([outcome]), {"succeeded": 0, "retried": 0, "failed": 1})
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("failed", 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_outcome_of_a_lost_lease_is_dropped(self) -> None:
+        job = enqueue("tests.add", {"a": 2, "b": 3})
+        (first,) = claim_jobs(1, "slow")
+        _make_due(job)
+        (second,) = claim_jobs(1, "fast")
+
+        self.assertEqual(settle([Outcome(job=first, ok=True, duration_ms=1.0, result=5)])["succeeded"], 0)
+        self.assertEqual(settle([Outcome(job=second, ok=True, duration_ms=1.0, result=5)])["succeeded"], 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.result), ("succeeded", "fast", 5))
+
+        # A lease that expires on the last attempt fails the job instead of running it again.
+        expired = enqueue("tests.add", {"a": 1, "b": 1}, max_attempts=1)
+        claim_jobs(1)
+        _make_due(expired)
+        self.assertEqual(claim_jobs(1), [])
+        self.assertEqual(Job.objects.get(pk=expired.pk).status, "failed")
+
+    def test_renewed_lease_is_not_claimed_again(self) -> None:
+        job = enqueue("tests.add", {"a": 1, "b": 1})
+        (claimed,) = claim_jobs(1, "w1")
+        _make_due(job)
+
+        self.assertEqual(renew_leases([claimed], "w1"), 1)
+        self.assertEqual(claim_jobs(1, "w2"), [])
+
+        _make_due(job)
+        claim_jobs(1, "w2")
+        self.assertEqual(renew_leases([claimed], "w1"), 0)
+        self.assertEqual(Job.objects.get(pk=job.pk).worker, "w2")
+
+    def test_wait_includes_time_queued_after_the_claim(self) -> None:
+        enqueue("tests.add", {"a": 1, "b": 1})
+        (claimed,) = claim_jobs(1)
+
+        settle([Outcome(job=claimed, ok=True, duration_ms=1.0, result=2, queued_ms=500.0)])
+
+        self.assertEqual(Job.objects.get(pk=claimed.pk).wait_ms, claimed.wait_ms + 500.0)
+
+    def test_unknown_job_fails_without_retry(self) -> None:
+        job = Job.objects.create(name="tests.missing")
+        (claimed,) = claim_jobs(1)
+
+        self.assertEqual(settle([Outcome(job=claimed, **execute(claimed.name, {}))])["failed"], 1)
+        self.assertEqual(Job.objects.get(pk=job.pk).attempts, 1)
+
+    def test_schedule_enqueues_once_until_its_job_finishes(self) -> None:
+        sync_schedules({"adder": {"job": "tests.add", "interval": 60, "payload": {"a": 1, "b": 1}}})
+        now = timezone.now()
+
+        self.assertEqual(len(enqueue_due_schedules(now)), 1)
+        self.assertEqual(enqueue_due_schedules(now), [])
+        # Due again, but the previous job is still queued.
+        self.assertEqual(enqueue_due_schedules(now + timedelta(seconds=61)), [])
+        Job.objects.update(status=Job.Status.SUCCEEDED)
+        self.assertEqual(len(enqueue_due_schedules(now + timedelta(seconds=122))), 1)
+        self.assertEqual(JobSchedule.objects.get().last_job, Job.objects.filter(status="queued").get())
+
+    def test_job_stats(self) -> None:
+        now = timezone.now()
+        Job.objects.bulk_create(
+            Job(name="tests.add", status=status, finished_at=now, duration_ms=duration, wait_ms=10.0)
+            for status, duration in (("succeeded", 10.0), ("succeeded", 30.0), ("failed", 20.0))
+        )
+        enqueue("tests.add", {"a": 1, "b": 1})
+
+        (stats,) = job_stats(now - timedelta(hours=1))
+
+        self.assertEqual((stats["succeeded"], stats["failed"], stats["queued"]), (2, 1, 1))
+        self.assertEqual(stats["duration_p50_ms"], 20.0)
+        self.assertEqual(stats["wait_p95_ms"], 10.0)
+
+
+class WorkerTests(TransactionTestCase):
+    def test_burst_run_settles_every_job(self) -> None:
+        for value in range(20):
+            enqueue("tests.add", {"a": value, "b": 1})
+        enqueue("tests.fail", max_attempts=1)
+
+        totals = Worker(concurrency=3, poll_interval=0.01).run(burst=True, schedules=False)
+
+        self.assertEqual(totals, {"succeeded": 20, "retried": 0, "failed": 1})
+        self.assertEqual(
+            sorted(Job.objects.filter(name="tests.add").values_list("result", flat=True)), list(range(1, 21))
+        )
+        self.assertFalse(Job.objects.filter(duration_ms__isnull=True).exists())
+
+    def test_claims_only_free_slots_and_renews_running_leases(self) -> None:
+        for _ in range(2):
+            enqueue("tests.leases", timeout_seconds=1)
+
+        totals = Worker(concurrency=1, poll_interval=0.01).run(burst=True, schedules=False)
+
+        self.assertEqual(totals["succeeded"], 2)
+        # Each job ran alone, its lease renewed past its one-second timeout.
+        self.assertEqual(list(Job.objects.values_list("result", flat=True)), [{"running": 1, "leased": 1}] * 2)
+        self.assertEqual(Job.objects.filter(attempts=1).count(), 2)
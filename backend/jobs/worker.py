@@ -0,0 +1,137 @@
+"""Run claimed jobs on a thread or process pool."""
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import socket
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Optional
+
+import django
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections
+
+from .models import Job
+from .queue import Outcome, claim_jobs, enqueue_due_schedules, renew_leases, settle, sync_schedules
+from .registry import UnknownJob, get_job
+
+ERROR_LENGTH = 4000
+
+
+def execute(name: str, payload: Dict[str, object], submitted_at: Optional[float] = None) -> Dict[str, object]:
+    """Run one job in a pool thread or process; never raises."""
+
+    # Wall clock, since a pool process does not share the worker's monotonic clock.
+    queued_ms = (time.time() - submitted_at) * 1000 if submitted_at is not None else 0.0
+    close_old_connections()
+    start = time.perf_counter()
+    try:
+        result = get_job(name)(**payload)
+        outcome = {"ok": True, "result": json.loads(json.dumps(result, cls=DjangoJSONEncoder))}
+    except UnknownJob as exc:
+        outcome = {"ok": False, "error": str(exc), "permanent": True}
+    except Exception:  # noqa: BLE001 - any job error is recorded and retried
+        outcome = {"ok": False, "error": traceback.format_exc()[-ERROR_LENGTH:]}
+    finally:
+        close_old_connections()
+    outcome["duration_ms"] = (time.perf_counter() - start) * 1000
+    outcome["queued_ms"] = max(queued_ms, 0.0)
+    return outcome
+
+
+class Worker:
+    """
+    Claims due jobs while it has free slots and settles them as they finish.
+
+    Threads suit jobs that wait on the database or the network; ``processes``
+    runs jobs in spawned interpreters for CPU-bound numpy work. Only as many
+    jobs as there are free slots are claimed, so every lease starts as its job
+    does, and running jobs have their leases renewed every
+    ``heartbeat_interval`` seconds (or a third of their timeout, if shorter).
+    The loop also enqueues due periodic schedules every ``poll_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        processes: bool = False,
+        poll_interval: float = 1.0,
+        heartbeat_interval: Optional[float] = None,
+    ) -> None:
+        self.concurrency = max(concurrency, 1)
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = settings.JOB_HEARTBEAT_SECONDS if heartbeat_interval is None else heartbeat_interval
+        self.name = f"{socket.gethostname()}:{os.getpid()}"[:100]
+        self.stopping = False
+        self.totals = {"succeeded": 0, "retried": 0, "failed": 0}
+
+    def stop(self) -> None:
+        """Stop claiming; jobs already running are finished and settled."""
+
+        self.stopping = True
+
+    def _executor(self) -> Executor:
+        if self.processes:
+            # Spawned children open their own connections instead of inheriting this process's sockets,
+            # and set Django up before unpickling ``execute`` imports any models.
+            connections.close_all()
+            return ProcessPoolExecutor(
+                max_workers=self.concurrency,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job")
+
+    def _heartbeat_interval(self, jobs: Iterable[Job]) -> float:
+        return min([self.heartbeat_interval, *(job.timeout_seconds / 3 for job in jobs)])
+
+    def run(self, burst: bool = False, schedules: bool = True) -> Dict[str, int]:
+        """Work until stopped, or with ``burst`` until no job is due. Returns outcome counts."""
+
+        if schedules:
+            sync_schedules()
+        running: Dict[Future, Job] = {}
+        next_schedule_check = 0.0
+        next_heartbeat = float("inf")
+        with self._executor() as executor:
+            while True:
+                if schedules and not self.stopping and time.monotonic() >= next_schedule_check:
+                    enqueue_due_schedules()
+                    next_schedule_check = time.monotonic() + self.poll_interval
+                claimed = []
+                if not self.stopping and len(running) < self.concurrency:
+                    claimed = claim_jobs(self.concurrency - len(running), self.name)
+                    for job in claimed:
+                        running[executor.submit(execute, job.name, job.payload, time.time())] = job
+                    if claimed:
+                        next_heartbeat = min(next_heartbeat, time.monotonic() + self._heartbeat_interval(claimed))
+                if not running:
+                    if self.stopping or burst:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+                if time.monotonic() >= next_heartbeat:
+                    renew_leases(list(running.values()), self.name)
+                    next_heartbeat = time.monotonic() + self._heartbeat_interval(running.values())
+                timeout = min(self.poll_interval, max(next_heartbeat - time.monotonic(), 0.0))
+                done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                if done:
+                    self._settle(done, running)
+        return self.totals
+
+    def _settle(self, done, running: Dict[Future, Job]) -> None:
+        outcomes = []
+        for future in done:
+            job = running.pop(future)
+            try:
+                outcome = future.result()
+            except Exception as exc:  # noqa: BLE001 - e.g. a pool process died
+                outcome = {"ok": False, "error": f"{type(exc).__name__}: {exc}", "duration_ms": 0.0}
+            outcomes.append(Outcome(job=job, **outcome))
+        for key, value in settle(outcomes).items():
+            self.totals[key] += value
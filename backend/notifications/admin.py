@@ -0,0 +1,13 @@
+"""Admin configuration for notification models."""
+from __future__ import annotations
+
+from django.contrib import admin
+
+from .models import OutboundMessage
+
+
+@admin.register(OutboundMessage)
+class OutboundMessageAdmin(admin.ModelAdmin):
+    list_display = ("channel", "recipient", "subject", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("channel", "status")
+    search_fields = ("recipient", "subject")
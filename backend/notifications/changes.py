@@ -0,0 +1,154 @@
+"""
+Change events for alerts and stock snapshots, as read by the event stream.
+
+On PostgreSQL, statement-level triggers on the alert and snapshot tables
+``pg_notify`` one JSON payload per inserted or updated row on
+:data:`CHANNEL`. Statements touching more than :data:`NOTIFY_ROW_LIMIT` rows
+(bulk loads, archiving, bulk transitions) send a single ``resync`` payload
+naming the facilities involved instead, so a large write never floods the
+notification queue or exceeds its 8000-byte payload limit. Other databases are
+polled with :func:`poll_changes`, which builds the same payloads from rows
+whose ``updated_at`` moved past a watermark.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from inventory.models import Alert, StockSnapshot
+
+CHANNEL = "healteex_changes"
+# Statements changing more rows than this notify a resync rather than each row.
+NOTIFY_ROW_LIMIT = 100
+# Resyncs naming more facilities than this apply to every subscriber.
+RESYNC_FACILITY_LIMIT = 500
+MESSAGE_LENGTH = 1000
+
+# Event type -> (model, payload fields). Every payload also carries its "type".
+EVENT_SOURCES = {
+    "alert": (
+        Alert,
+        (
+            "id",
+            "facility_id",
+            "medicine_id",
+            "alert_type",
+            "status",
+            "message",
+            "triggered_at",
+            "resolved_at",
+            "updated_at",
+        ),
+    ),
+    "stock": (
+        StockSnapshot,
+        ("id", "facility_id", "medicine_id", "stock_on_hand", "days_of_stock", "recorded_at", "updated_at"),
+    ),
+}
+EVENT_TYPES = tuple(EVENT_SOURCES)
+
+
+def _column(field: str) -> str:
+    return f"left(message, {MESSAGE_LENGTH})" if field == "message" else field
+
+
+def trigger_sql(event_type: str) -> List[str]:
+    """Statements (re)creating the notify function and triggers of one event type; safe to rerun."""
+
+    model, fields = EVENT_SOURCES[event_type]
+    table = model._meta.db_table
+    function = f"healteex_notify_{event_type}"
+    payload = ", ".join(f"'{field}', {_column(field)}" for field in fields)
+    statements = [
+        f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF (SELECT count(*) FROM (SELECT 1 FROM changed LIMIT {NOTIFY_ROW_LIMIT + 1}) AS sample)
+                    <= {NOTIFY_ROW_LIMIT} THEN
+                PERFORM pg_notify('{CHANNEL}', json_build_object('type', '{event_type}', {payload})::text)
+                FROM changed;
+            ELSE
+                PERFORM pg_notify(
+                    '{CHANNEL}',
+                    json_build_object(
+                        'type', 'resync',
+                        'facility_ids',
+                        CASE WHEN count(DISTINCT facility_id) <= {RESYNC_FACILITY_LIMIT}
+                            THEN json_agg(DISTINCT facility_id) END
+                    )::text
+                )
+                FROM changed;
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """
+    ]
+    # Transition tables allow one event per trigger, hence a trigger for each.
+    for operation in ("INSERT", "UPDATE"):
+        trigger = f"{function}_{operation.lower()}"
+        statements += [
+            f"DROP TRIGGER IF EXISTS {trigger} ON {table}",
+            f"CREATE TRIGGER {trigger} AFTER {operation} ON {table} REFERENCING NEW TABLE AS changed "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION {function}()",
+        ]
+    return statements
+
+
+def install_change_triggers(using: str = DEFAULT_DB_ALIAS) -> bool:
+    """Install the notify triggers on PostgreSQL; returns False on other databases."""
+
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        for event_type in EVENT_TYPES:
+            for statement in trigger_sql(event_type):
+                cursor.execute(statement)
+    return True
+
+
+def remove_change_triggers(using: str = DEFAULT_DB_ALIAS) -> None:
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        for event_type, (model, _) in EVENT_SOURCES.items():
+            function = f"healteex_notify_{event_type}"
+            for operation in ("insert", "update"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {function}_{operation} ON {model._meta.db_table}")
+            cursor.execute(f"DROP FUNCTION IF EXISTS {function}()")
+
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def poll_changes(since: datetime, limit: int = NOTIFY_ROW_LIMIT) -> Tuple[List[Dict[str, object]], bool]:
+    """
+    Payloads of rows changed after ``since``, oldest first, like those the triggers send.
+
+    At most ``limit`` rows are read per event type; the flag is True when more
+    changed, in which case subscribers should resync instead.
+    """
+
+    changed: List[Tuple[datetime, Dict[str, object]]] = []
+    overflow = False
+    for event_type, (model, fields) in EVENT_SOURCES.items():
+        rows = list(model.objects.filter(updated_at__gt=since).order_by("updated_at").values(*fields)[: limit + 1])
+        overflow |= len(rows) > limit
+        for row in rows[:limit]:
+            if event_type == "alert":
+                row["message"] = row["message"][:MESSAGE_LENGTH]
+            changed.append(
+                (row["updated_at"], {"type": event_type, **{field: _jsonable(row[field]) for field in fields}})
+            )
+    changed.sort(key=lambda item: item[0])
+    return [payload for _, payload in changed], overflow
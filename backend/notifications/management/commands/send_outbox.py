@@ -0,0 +1,36 @@
+"""Management command that drains the notification outbox."""
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    help = "Delivers queued email/SMS notifications in batches, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE)
+        parser.add_argument("--loop", action="store_true", help="Keep polling instead of exiting when drained.")
+        parser.add_argument("--interval", type=float, default=5.0, help="Seconds to sleep between polls with --loop.")
+
+    def handle(self, *args, **options):
+        totals = {"sent": 0, "retried": 0, "failed": 0}
+        while True:
+            result = drain_outbox(options["batch_size"])
+            for key, value in result.items():
+                totals[key] += value
+            if any(result.values()):
+                continue
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Outbox drained: {totals['sent']} sent, {totals['retried']} retried, {totals['failed']} failed"
+            )
+        )
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from notifications.changes import install_change_triggers, remove_change_triggers
+
+
+def install_triggers(apps, schema_editor):
+    install_change_triggers(using=schema_editor.connection.alias)
+
+
+def remove_triggers(apps, schema_editor):
+    remove_change_triggers(using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("notifications", "0001_initial"),
+        ("inventory", "0009_alert_updated_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_triggers, remove_triggers),
+    ]
@@ -0,0 +1,171 @@
+"""Enqueue and deliver outbox messages in batches."""
+from __future__ import annotations
+
+import smtplib
+from datetime import timedelta
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboundMessage
+from .sms import get_sms_backend
+
+
+def enqueue_email(recipient: str, subject: str, body: str) -> OutboundMessage:
+    """Queue an email for the outbox worker instead of sending it inline."""
+
+    return OutboundMessage.objects.create(
+        channel=OutboundMessage.Channel.EMAIL,
+        recipient=recipient,
+        subject=subject,
+        body=body,
+    )
+
+
+def enqueue_sms(recipient: str, body: str) -> OutboundMessage:
+    return OutboundMessage.objects.create(channel=OutboundMessage.Channel.SMS, recipient=recipient, body=body)
+
+
+def enqueue_alert_notifications(alerts: Iterable) -> List[OutboundMessage]:
+    """Queue email and SMS notifications to each alert's facility contacts."""
+
+    messages: List[OutboundMessage] = []
+    for alert in alerts:
+        facility = alert.facility
+        subject = f"Healteex alert: {alert.get_alert_type_display()} - {alert.medicine}"
+        body = f"{facility.name}: {alert.message}"
+        if facility.contact_email:
+            messages.append(
+                OutboundMessage(
+                    channel=OutboundMessage.Channel.EMAIL,
+                    recipient=facility.contact_email,
+                    subject=subject,
+                    body=body,
+                )
+            )
+        if facility.contact_phone:
+            messages.append(
+                OutboundMessage(channel=OutboundMessage.Channel.SMS, recipient=facility.contact_phone, body=body)
+            )
+    return OutboundMessage.objects.bulk_create(messages)
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    seconds = settings.OUTBOX_RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0))
+    return timedelta(seconds=min(seconds, settings.OUTBOX_RETRY_MAX_SECONDS))
+
+
+def claim_batch(batch_size: int) -> List[OutboundMessage]:
+    """
+    Lease up to ``batch_size`` due messages.
+
+    Rows are locked with ``SKIP LOCKED`` so several workers can drain the outbox
+    concurrently, and their ``next_attempt_at`` is pushed past the lease window so a
+    crashed worker's batch is picked up again later instead of being lost.
+    """
+
+    now = timezone.now()
+    with transaction.atomic():
+        messages = list(
+            OutboundMessage.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundMessage.Status.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at")[:batch_size]
+        )
+        if messages:
+            OutboundMessage.objects.filter(pk__in=[message.pk for message in messages]).update(
+                next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            )
+    return messages
+
+
+def _rejected(exc: Exception) -> bool:
+    """Whether the server refused this one message but kept the session usable."""
+
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+def deliver(messages: List[OutboundMessage]) -> Dict[int, str]:
+    """
+    Send messages, reusing one SMTP connection for the batch. Returns errors by message id.
+
+    A transport error reconnects before the next message; if the server cannot be
+    reached again, only the messages not yet sent are reported as errors.
+    """
+
+    errors: Dict[int, str] = {}
+    emails = [message for message in messages if message.channel == OutboundMessage.Channel.EMAIL]
+    if emails:
+        sent = set()
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+            for message in emails:
+                try:
+                    EmailMessage(
+                        subject=message.subject,
+                        body=message.body,
+                        to=[message.recipient],
+                        connection=connection,
+                    ).send()
+                except Exception as exc:  # noqa: BLE001 - any transport error is retried
+                    errors[message.pk] = f"{type(exc).__name__}: {exc}"
+                    if not _rejected(exc):
+                        connection.close()
+                        connection.open()
+                else:
+                    sent.add(message.pk)
+        except Exception as exc:  # noqa: BLE001 - the server is unreachable
+            for message in emails:
+                if message.pk not in sent:
+                    errors.setdefault(message.pk, f"{type(exc).__name__}: {exc}")
+        finally:
+            connection.close()
+
+    sms_messages = [message for message in messages if message.channel == OutboundMessage.Channel.SMS]
+    if sms_messages:
+        backend = get_sms_backend()
+        for message in sms_messages:
+            try:
+                backend.send(message.recipient, message.body)
+            except Exception as exc:  # noqa: BLE001 - any gateway error is retried
+                errors[message.pk] = f"{type(exc).__name__}: {exc}"
+    return errors
+
+
+def drain_outbox(batch_size: int | None = None) -> Dict[str, int]:
+    """Deliver one batch of due messages and record the outcome of each."""
+
+    messages = claim_batch(batch_size or settings.OUTBOX_BATCH_SIZE)
+    if not messages:
+        return {"sent": 0, "retried": 0, "failed": 0}
+
+    errors = deliver(messages)
+    now = timezone.now()
+    sent_ids = [message.pk for message in messages if message.pk not in errors]
+    OutboundMessage.objects.filter(pk__in=sent_ids).update(
+        status=OutboundMessage.Status.SENT,
+        sent_at=now,
+        attempts=F("attempts") + 1,
+        last_error="",
+    )
+
+    retried = failed = 0
+    for message in messages:
+        if message.pk not in errors:
+            continue
+        attempts = message.attempts + 1
+        update = {"attempts": attempts, "last_error": errors[message.pk]}
+        if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            update["status"] = OutboundMessage.Status.FAILED
+            failed += 1
+        else:
+            update["next_attempt_at"] = now + _retry_delay(attempts)
+            retried += 1
+        OutboundMessage.objects.filter(pk=message.pk).update(**update)
+    return {"sent": len(sent_ids), "retried": retried, "failed": failed}
@@ -0,0 +1,27 @@
+"""Pluggable SMS delivery backends used by the outbox worker."""
+from __future__ import annotations
+
+import logging
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class BaseSMSBackend:
+    """Deliver a single SMS; implementations raise on failure so the outbox can retry."""
+
+    def send(self, recipient: str, body: str) -> None:  # pragma: no cover - interface
+        raise NotImplementedError
+
+
+class ConsoleSMSBackend(BaseSMSBackend):
+    """Log messages instead of sending them; the default until a gateway is configured."""
+
+    def send(self, recipient: str, body: str) -> None:
+        logger.info("SMS to %s: %s", recipient, body)
+
+
+def get_sms_backend() -> BaseSMSBackend:
+    return import_string(settings.SMS_BACKEND)()
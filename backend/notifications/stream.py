@@ -0,0 +1,334 @@
+"""
+In-process fan-out of change events to Server-Sent Events subscribers.
+
+Each event loop (one per ASGI worker process) has a single :class:`Broker`. Its
+feed is the only database consumer however many clients are connected: on
+PostgreSQL one connection ``LISTEN``s for the payloads sent by the triggers in
+:mod:`notifications.changes`, elsewhere one thread polls for changed rows every
+``EVENT_STREAM_POLL_SECONDS``. The broker routes each event to the subscribers
+whose facilities include the event's facility.
+
+An idle subscriber is a parked coroutine and a small buffer, so a process holds
+thousands of them. Subscribers never slow the feed down: events queue per
+connection, and a client that falls ``EVENT_STREAM_QUEUE_SIZE`` events behind
+has its backlog dropped and receives a single ``resync`` event telling it to
+refetch from the REST API.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import logging
+import weakref
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.utils import timezone
+
+from .changes import CHANNEL, EVENT_TYPES, poll_changes
+
+logger = logging.getLogger(__name__)
+
+# Rows committed slightly out of order are caught by re-reading this window.
+WATERMARK_OVERLAP = timedelta(seconds=5)
+# Delay before reconnecting a lost LISTEN connection; also the client's reconnect delay.
+RETRY_SECONDS = 5
+# ASGI scope key holding an asyncio.Event set when the client disconnects.
+DISCONNECTED_SCOPE_KEY = "disconnected"
+
+
+def encode(event_type: str, data: str) -> bytes:
+    return f"event: {event_type}\ndata: {data}\n\n".encode()
+
+
+class Event(NamedTuple):
+    """An encoded event and the facilities it concerns (``None``: every facility)."""
+
+    type: str
+    facility_ids: Optional[Tuple[int, ...]]
+    encoded: bytes
+
+
+RESYNC_CHUNK = encode("resync", "{}")
+KEEPALIVE_CHUNK = b": keepalive\n\n"
+
+
+def parse_payload(text: str) -> Event:
+    """Turn a change payload (see :mod:`notifications.changes`) into an :class:`Event`."""
+
+    payload = json.loads(text)
+    if payload["type"] == "resync":
+        facility_ids = payload.get("facility_ids")
+        return Event("resync", None if facility_ids is None else tuple(facility_ids), RESYNC_CHUNK)
+    return Event(payload["type"], (payload["facility_id"],), encode(payload["type"], text))
+
+
+class Subscriber:
+    """One client's pending events, filtered by event type."""
+
+    def __init__(self, facility_ids: Optional[Iterable[int]], types: Iterable[str], max_pending: int) -> None:
+        self.facility_ids = None if facility_ids is None else frozenset(facility_ids)
+        self.types = frozenset(types)
+        self.max_pending = max(max_pending, 1)
+        self.pending: Deque[bytes] = deque()
+        self.resync = False
+        self.closed = False
+        self.ready = asyncio.Event()
+
+    def push(self, event: Event) -> None:
+        if self.closed:
+            return
+        if event.type == "resync" or len(self.pending) >= self.max_pending:
+            # Whatever is queued is superseded by the refetch the client is about to do.
+            self.pending.clear()
+            self.resync = True
+        elif event.type in self.types:
+            self.pending.append(event.encoded)
+        else:
+            return
+        self.ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self.ready.set()
+
+    async def next_chunk(self, timeout: float) -> bytes:
+        """Everything queued since the last call, waiting up to ``timeout`` seconds; empty on timeout or close."""
+
+        if not (self.pending or self.resync or self.closed):
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return b""
+        if self.closed:
+            return b""
+        chunks = [RESYNC_CHUNK] if self.resync else []
+        chunks.extend(self.pending)
+        self.resync = False
+        self.pending.clear()
+        return b"".join(chunks)
+
+
+class Broker:
+    """Routes events from the process's feed to subscribers by facility."""
+
+    def __init__(self) -> None:
+        self.everywhere: Set[Subscriber] = set()
+        self.by_facility: Dict[int, Set[Subscriber]] = defaultdict(set)
+        self.subscriber_count = 0
+        self.feed: Optional["PollingFeed"] = None
+        self.feed_task: Optional[asyncio.Task] = None
+
+    def subscribe(self, facility_ids: Optional[Iterable[int]], types: Iterable[str] = EVENT_TYPES) -> Subscriber:
+        """Register a subscriber for events of ``facility_ids`` (``None``: all facilities)."""
+
+        subscriber = Subscriber(facility_ids, types, settings.EVENT_STREAM_QUEUE_SIZE)
+        if subscriber.facility_ids is None:
+            self.everywhere.add(subscriber)
+        for facility_id in subscriber.facility_ids or ():
+            self.by_facility[facility_id].add(subscriber)
+        self.subscriber_count += 1
+        if self.feed_task is None:
+            self.feed = ListenFeed(self) if connections[DEFAULT_DB_ALIAS].vendor == "postgresql" else PollingFeed(self)
+            # Run the feed outside the first subscriber's request context.
+            self.feed_task = contextvars.Context().run(asyncio.get_running_loop().create_task, self.feed.run())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        subscriber.close()
+        if subscriber.facility_ids is None:
+            self.everywhere.discard(subscriber)
+        for facility_id in subscriber.facility_ids or ():
+            subscribers = self.by_facility.get(facility_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.by_facility[facility_id]
+        self.subscriber_count -= 1
+
+    def publish(self, event: Event) -> None:
+        if event.facility_ids is None:
+            targets: Iterable[Subscriber] = set(self.everywhere).union(*self.by_facility.values())
+        elif len(event.facility_ids) == 1:
+            targets = list(self.everywhere) + list(self.by_facility.get(event.facility_ids[0], ()))
+        else:
+            targets = set(self.everywhere).union(*(self.by_facility.get(pk, ()) for pk in event.facility_ids))
+        for subscriber in targets:
+            subscriber.push(event)
+
+    def publish_payload(self, text: str) -> None:
+        try:
+            event = parse_payload(text)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed change payload %r", text[:200])
+            return
+        self.publish(event)
+
+    async def stop(self) -> None:
+        """Stop the feed and disconnect every subscriber."""
+
+        if self.feed_task is not None:
+            self.feed_task.cancel()
+            try:
+                await self.feed_task
+            except asyncio.CancelledError:
+                pass
+            await asyncio.get_running_loop().run_in_executor(None, self.feed.close)
+        self.feed = self.feed_task = None
+        for subscriber in set(self.everywhere).union(*self.by_facility.values()):
+            self.unsubscribe(subscriber)
+
+
+_brokers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Broker]" = weakref.WeakKeyDictionary()
+
+
+def get_broker() -> Broker:
+    """The running event loop's broker."""
+
+    loop = asyncio.get_running_loop()
+    broker = _brokers.get(loop)
+    if broker is None:
+        broker = _brokers[loop] = Broker()
+    return broker
+
+
+class PollingFeed:
+    """Reads changed rows on one dedicated thread while anyone is subscribed."""
+
+    def __init__(self, broker: Broker) -> None:
+        self.broker = broker
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-stream")
+        self.since: Optional[datetime] = None
+        # Rows already sent from the overlap window, with the updated_at they were sent at.
+        self.seen: Dict[Tuple[str, int], str] = {}
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(settings.EVENT_STREAM_POLL_SECONDS)
+            if not self.broker.subscriber_count:
+                # Clients refetch on connect, so changes made while nobody listened are not replayed.
+                self.since = None
+                continue
+            try:
+                payloads = await loop.run_in_executor(self.executor, self.poll)
+            except Exception:
+                logger.exception("Polling for changes failed")
+                continue
+            for payload in payloads:
+                self.broker.publish_payload(payload)
+
+    def poll(self) -> List[str]:
+        """JSON payloads of rows changed since the previous poll; the first poll only sets the watermark."""
+
+        close_old_connections()
+        if self.since is None:
+            self.since = timezone.now()
+            return []
+        events, overflow = poll_changes(self.since - WATERMARK_OVERLAP)
+        if overflow:
+            self.since, self.seen = timezone.now(), {}
+            return [json.dumps({"type": "resync", "facility_ids": None})]
+        fresh = [event for event in events if self.seen.get((event["type"], event["id"])) != event["updated_at"]]
+        self.seen = {(event["type"], event["id"]): event["updated_at"] for event in events}
+        if events:
+            self.since = max(self.since, datetime.fromisoformat(events[-1]["updated_at"]))
+        return [json.dumps(event) for event in fresh]
+
+    def close(self) -> None:
+        self.executor.submit(connections.close_all).result()
+        self.executor.shutdown()
+
+
+class ListenFeed(PollingFeed):
+    """Receives trigger payloads on a ``LISTEN`` connection, read when its socket becomes readable."""
+
+    def connect(self):
+        if settings.EVENT_STREAM_LISTEN_URL:
+            import psycopg2
+
+            # LISTEN needs a session of its own, which PgBouncer's transaction pooling cannot provide.
+            connection = psycopg2.connect(settings.EVENT_STREAM_LISTEN_URL)
+        else:
+            wrapper = connections[DEFAULT_DB_ALIAS]
+            connection = wrapper.get_new_connection(wrapper.get_connection_params())
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return connection
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        reconnecting = False
+        while True:
+            try:
+                connection = await loop.run_in_executor(self.executor, self.connect)
+            except Exception:
+                logger.exception("Could not LISTEN for changes; retrying in %s seconds", RETRY_SECONDS)
+                await asyncio.sleep(RETRY_SECONDS)
+                continue
+            readable = asyncio.Event()
+            loop.add_reader(connection.fileno(), readable.set)
+            try:
+                if reconnecting:
+                    # Changes made while disconnected were not received.
+                    self.broker.publish(Event("resync", None, RESYNC_CHUNK))
+                while True:
+                    await readable.wait()
+                    readable.clear()
+                    connection.poll()
+                    while connection.notifies:
+                        self.broker.publish_payload(connection.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Lost the LISTEN connection; reconnecting in %s seconds", RETRY_SECONDS)
+            finally:
+                loop.remove_reader(connection.fileno())
+                connection.close()
+            reconnecting = True
+            await asyncio.sleep(RETRY_SECONDS)
+
+
+class DisconnectWatchMiddleware:
+    """
+    ASGI middleware exposing client disconnects to long-lived responses.
+
+    Django 4.2 stops reading from the client once the request body is in, so a
+    streaming response would keep running after its client left. This sets an
+    ``asyncio.Event`` under :data:`DISCONNECTED_SCOPE_KEY` in the scope when
+    the server reports ``http.disconnect``.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        disconnected = asyncio.Event()
+        watcher: Optional[asyncio.Future] = None
+
+        async def watch() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+
+        async def receive_body():
+            nonlocal watcher
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                disconnected.set()
+            elif not message.get("more_body", False) and watcher is None:
+                watcher = asyncio.ensure_future(watch())
+            return message
+
+        try:
+            await self.app({**scope, DISCONNECTED_SCOPE_KEY: disconnected}, receive_body, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
@@ -0,0 +1,21 @@
+"""Background jobs for the notifications app."""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from jobs.registry import register_job
+
+from .outbox import drain_outbox
+
+
+@register_job("notifications.send_outbox")
+def send_outbox(batch_size: Optional[int] = None) -> Dict[str, int]:
+    """Deliver batches until no message is due."""
+
+    totals = {"sent": 0, "retried": 0, "failed": 0}
+    while True:
+        result = drain_outbox(batch_size)
+        for key, value in result.items():
+            totals[key] += value
+        if not any(result.values()):
+            return totals
@@ -0,0 +1,147 @@
+"""Tests for the notification outbox worker."""
+from __future__ import annotations
+
+import socketserver
+import threading
+import time
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from notifications.models import OutboundMessage
+from notifications.outbox import drain_outbox, enqueue_email
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough of RFC 5321 for Django's SMTP backend."""
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        self.server.connections += 1
+        if self.server.refusing:
+            self._reply("554 no service")
+            return
+        self._reply("220 localhost stand-in")
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+            command = line.split(" ", 1)[0].upper()
+            if command in ("EHLO", "HELO"):
+                self._reply("250 localhost")
+            elif command == "DATA":
+                self._reply("354 end with .")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                self.server.delivered += 1
+                self._reply("250 queued")
+            elif command == "QUIT":
+                self._reply("221 bye")
+                return
+            elif command == "RCPT" and "reject" in line:
+                self._reply("550 mailbox unavailable")
+            elif command == "RCPT" and "drop" in line:
+                # The server goes away mid-batch and refuses new connections.
+                self.server.refusing = True
+                return
+            else:
+                self._reply("250 ok")
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.connections = 0
+        self.delivered = 0
+        self.refusing = False
+
+
+class OutboxDeliveryTests(TestCase):
+    """Drain the outbox against a local SMTP stand-in."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.smtp = _SMTPServer()
+        threading.Thread(target=cls.smtp.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.smtp.shutdown()
+        cls.smtp.server_close()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        self.smtp.connections = 0
+        self.smtp.delivered = 0
+        self.smtp.refusing = False
+        smtp_settings = override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=self.smtp.server_address[1],
+        )
+        smtp_settings.enable()
+        self.addCleanup(smtp_settings.disable)
+
+    def test_batch_uses_one_connection(self) -> None:
+        OutboundMessage.objects.bulk_create(
+            OutboundMessage(recipient=f"user{n}@example.ng", subject="Hi", body="Body") for n in range(500)
+        )
+
+        started = time.perf_counter()
+        result = drain_outbox(batch_size=500)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(result, {"sent": 500, "retried": 0, "failed": 0})
+        self.assertEqual(self.smtp.delivered, 500)
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertFalse(OutboundMessage.objects.exclude(status=OutboundMessage.Status.SENT).exists())
+        self.assertLess(elapsed, 10)
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_failures_back_off_then_fail(self) -> None:
+        message = enqueue_email("reject@example.ng", "Hi", "Body")
+        enqueue_email("ok@example.ng", "Hi", "Body")
+
+        self.assertEqual(drain_outbox(), {"sent": 1, "retried": 1, "failed": 0})
+        message.refresh_from_db()
+        self.assertEqual(message.attempts, 1)
+        self.assertGreater(message.next_attempt_at, timezone.now())
+        self.assertIn("SMTPRecipientsRefused", message.last_error)
+        # A rejected recipient does not cost a reconnect.
+        self.assertEqual(self.smtp.connections, 1)
+
+        OutboundMessage.objects.filter(pk=message.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(drain_outbox(), {"sent": 0, "retried": 0, "failed": 1})
+        message.refresh_from_db()
+        self.assertEqual(message.status, OutboundMessage.Status.FAILED)
+
+    def test_lost_server_only_retries_unsent_messages(self) -> None:
+        first = enqueue_email("first@example.ng", "Hi", "Body")
+        enqueue_email("drop@example.ng", "Hi", "Body")
+        enqueue_email("last@example.ng", "Hi", "Body")
+
+        self.assertEqual(drain_outbox(), {"sent": 1, "retried": 2, "failed": 0})
+        first.refresh_from_db()
+        self.assertEqual(first.status, OutboundMessage.Status.SENT)
+        self.assertEqual(self.smtp.delivered, 1)
+
+
+class SignupQueuesEmailTests(TestCase):
+    def test_signup_request_enqueues_without_sending(self) -> None:
+        response = APIClient().post(
+            reverse("accounts:signup-request"), {"email": "new@example.ng", "role": "pharmacist"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 202)
+        message = OutboundMessage.objects.get()
+        self.assertEqual(message.recipient, "new@example.ng")
+        self.assertEqual(message.status, OutboundMessage.Status.PENDING)
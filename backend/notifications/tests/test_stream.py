@@ -0,0 +1,148 @@
+"""Tests for the alert and stock change stream."""
+from __future__ import annotations
+
+import asyncio
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from inventory.models import Alert, Facility, Medicine, StockSnapshot
+from notifications.changes import poll_changes
+from notifications.stream import (
+    DISCONNECTED_SCOPE_KEY,
+    KEEPALIVE_CHUNK,
+    RESYNC_CHUNK,
+    Broker,
+    PollingFeed,
+    get_broker,
+)
+
+
+def _payload(event_type: str, facility_id: int, **fields) -> str:
+    return json.dumps({"type": event_type, "id": 1, "facility_id": facility_id, **fields})
+
+
+@override_settings(EVENT_STREAM_QUEUE_SIZE=3, EVENT_STREAM_POLL_SECONDS=60)
+class BrokerTests(SimpleTestCase):
+    async def test_events_reach_subscribers_in_scope(self) -> None:
+        broker = Broker()
+        clinic = broker.subscribe([1], ["alert"])
+        state = broker.subscribe([1, 2], ["alert", "stock"])
+        national = broker.subscribe(None)
+
+        broker.publish_payload(_payload("alert", 2, status="open"))
+        broker.publish_payload(_payload("stock", 1, stock_on_hand=5.0))
+        broker.publish_payload("not json")
+
+        self.assertEqual(await clinic.next_chunk(0.01), b"")
+        self.assertEqual((await state.next_chunk(0.01)).count(b"event: "), 2)
+        self.assertIn(b"event: stock\ndata: ", await national.next_chunk(0.01))
+        broker.unsubscribe(state)
+        self.assertEqual(dict(broker.by_facility), {1: {clinic}})
+        await broker.stop()
+        self.assertEqual(broker.subscriber_count, 0)
+
+    async def test_slow_subscriber_is_told_to_resync(self) -> None:
+        broker = Broker()
+        subscriber = broker.subscribe([1])
+
+        for _ in range(4):
+            broker.publish_payload(_payload("alert", 1))
+        broker.publish_payload(_payload("alert", 1, status="resolved"))
+
+        # The backlog overflowed: one resync, then only what arrived after it.
+        chunk = await subscriber.next_chunk(0.01)
+        self.assertTrue(chunk.startswith(RESYNC_CHUNK))
+        self.assertEqual(chunk.count(b"event: alert"), 1)
+        broker.publish_payload(json.dumps({"type": "resync", "facility_ids": [2]}))
+        self.assertEqual(await subscriber.next_chunk(0.01), b"")
+        await broker.stop()
+
+
+class PollingFeedTests(TestCase):
+    def setUp(self) -> None:
+        self.facility = Facility.objects.create(code="F-1", name="F-1", facility_type="clinic", ownership="public")
+        self.medicine = Medicine.objects.create(name="ORS", generic_name="ORS")
+
+    def _alert(self) -> Alert:
+        return Alert.objects.create(
+            facility=self.facility,
+            medicine=self.medicine,
+            alert_type=Alert.AlertType.LOW_STOCK,
+            message="Low stock",
+            triggered_at=timezone.now(),
+        )
+
+    def test_poll_sends_each_change_once(self) -> None:
+        feed = PollingFeed(Broker())
+        self.addCleanup(feed.executor.shutdown)
+        self.assertEqual(feed.poll(), [])
+        alert = self._alert()
+
+        events = [json.loads(payload) for payload in feed.poll()]
+
+        self.assertEqual(
+            [(event["type"], event["id"], event["status"]) for event in events], [("alert", alert.pk, "open")]
+        )
+        self.assertEqual(feed.poll(), [])
+        alert.status = Alert.Status.ACKNOWLEDGED
+        alert.save()
+        self.assertEqual([json.loads(payload)["status"] for payload in feed.poll()], ["acknowledged"])
+
+    def test_poll_overflow_asks_for_resync(self) -> None:
+        since = timezone.now() - timedelta(seconds=1)
+        for day in range(3):
+            StockSnapshot.objects.create(
+                facility=self.facility,
+                medicine=self.medicine,
+                stock_on_hand=Decimal(day),
+                recorded_at=timezone.now() - timedelta(days=day),
+            )
+
+        events, overflow = poll_changes(since, limit=2)
+
+        self.assertTrue(overflow)
+        self.assertEqual([event["stock_on_hand"] for event in events], [0.0, 1.0])
+
+
+@override_settings(EVENT_STREAM_POLL_SECONDS=60)
+class EventStreamViewTests(TestCase):
+    def setUp(self) -> None:
+        self.clinic, self.other = (
+            Facility.objects.create(code=code, name=code, facility_type="clinic", ownership="public", state=state)
+            for code, state in (("F-1", "Lagos"), ("F-2", "Kano"))
+        )
+        self.user = User.objects.create(username="pharm", role=User.Roles.PHARMACIST, facility=self.clinic)
+
+    async def test_stream_is_authenticated_and_scoped(self) -> None:
+        disconnected = asyncio.Event()
+        client = AsyncClient(**{DISCONNECTED_SCOPE_KEY: disconnected})
+        url = reverse("event-stream")
+        self.assertEqual((await client.get(url)).status_code, 401)
+        token = await sync_to_async(lambda: str(RefreshToken.for_user(self.user).access_token))()
+        self.assertEqual((await client.get(url, {"token": token, "types": "orders"})).status_code, 400)
+
+        response = await client.get(url, {"token": token})
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = aiter(response.streaming_content)
+        ready = await anext(chunks)
+        self.assertIn(b'event: ready\ndata: {"facilities": 1, "types": ["alert", "stock"]}', ready)
+        broker = get_broker()
+        broker.publish_payload(_payload("alert", self.other.pk))
+        broker.publish_payload(_payload("alert", self.clinic.pk, status="open"))
+        self.assertIn(f'"facility_id": {self.clinic.pk}'.encode(), await anext(chunks))
+        with override_settings(EVENT_STREAM_HEARTBEAT_SECONDS=0.01):
+            self.assertEqual(await anext(chunks), KEEPALIVE_CHUNK)
+        disconnected.set()
+        with self.assertRaises(StopAsyncIteration):
+            await anext(chunks)
+        self.assertEqual(broker.subscriber_count, 0)
+        await broker.stop()
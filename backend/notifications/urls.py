@@ -0,0 +1,10 @@
+"""URL routes for the notifications app."""
+from __future__ import annotations
+
+from django.urls import path
+
+from .views import event_stream
+
+urlpatterns = [
+    path("stream/", event_stream, name="event-stream"),
+]
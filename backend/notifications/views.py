@@ -0,0 +1,101 @@
+"""Server-Sent Events endpoint streaming alert and stock changes."""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Iterable, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from inventory.models import Facility
+from inventory.scoping import is_unrestricted, scope_queryset
+
+from .changes import EVENT_TYPES
+from .stream import DISCONNECTED_SCOPE_KEY, KEEPALIVE_CHUNK, RETRY_SECONDS, encode, get_broker
+
+
+def authenticate_stream(request):
+    """
+    The user behind the session, the ``Authorization`` header or a ``token`` query parameter.
+
+    Browsers' ``EventSource`` cannot set headers, so the JWT access token (or DRF
+    token) may be passed as ``?token=``. Returns None for anonymous requests.
+    """
+
+    token = request.GET.get("token")
+    headers = [f"Bearer {token}", f"Token {token}"] if token else [request.META.get("HTTP_AUTHORIZATION")]
+    for header in headers:
+        if header:
+            request.META["HTTP_AUTHORIZATION"] = header
+        authenticators = [authenticator() for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+        try:
+            user = Request(request, authenticators=authenticators).user
+        except AuthenticationFailed:
+            continue
+        if user is not None and user.is_authenticated:
+            return user
+    return None
+
+
+def scope_facility_ids(user) -> Optional[List[int]]:
+    """Facilities whose events ``user`` receives; None when unrestricted."""
+
+    if is_unrestricted(user):
+        return None
+    return list(scope_queryset(Facility.objects.all(), user, "").values_list("pk", flat=True))
+
+
+async def _events(facility_ids: Optional[List[int]], types: Iterable[str], disconnected):
+    broker = get_broker()
+    subscriber = broker.subscribe(facility_ids, types)
+    watcher = None
+    if disconnected is not None:
+        watcher = asyncio.ensure_future(disconnected.wait())
+        watcher.add_done_callback(lambda _: subscriber.close())
+    try:
+        ready = {"facilities": None if facility_ids is None else len(facility_ids), "types": sorted(types)}
+        yield f"retry: {RETRY_SECONDS * 1000}\n\n".encode() + encode("ready", json.dumps(ready))
+        while True:
+            chunk = await subscriber.next_chunk(settings.EVENT_STREAM_HEARTBEAT_SECONDS)
+            if subscriber.closed:
+                break
+            yield chunk or KEEPALIVE_CHUNK
+    finally:
+        broker.unsubscribe(subscriber)
+        if watcher is not None:
+            watcher.cancel()
+
+
+async def event_stream(request):
+    """
+    Stream ``alert`` and ``stock`` change events for the caller's facilities.
+
+    ``types`` narrows the stream to a comma-separated subset of event types. A
+    ``resync`` event means changes were missed: refetch from the REST API.
+    """
+
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if "wsgi.input" in request.META:
+        return JsonResponse({"detail": "The event stream is only served by the ASGI application."}, status=501)
+    user = await sync_to_async(authenticate_stream)(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+    types = [value for value in request.GET.get("types", ",".join(EVENT_TYPES)).split(",") if value]
+    unknown = set(types) - set(EVENT_TYPES)
+    if unknown or not types:
+        return JsonResponse({"types": [f"Choose from {', '.join(EVENT_TYPES)}."]}, status=400)
+
+    facility_ids = await sync_to_async(scope_facility_ids)(user)
+    response = StreamingHttpResponse(
+        _events(facility_ids, types, request.scope.get(DISCONNECTED_SCOPE_KEY)), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Keep reverse proxies such as nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response